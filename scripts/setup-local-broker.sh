@@ -82,6 +82,17 @@ sed -i '/<\/address-settings>/i \
             <auto-create-queues>true</auto-create-queues>\
             <default-address-routing-type>ANYCAST</default-address-routing-type>\
          </address-setting>\
+         <address-setting match="qit.fanout.#">\
+            <auto-create-addresses>true</auto-create-addresses>\
+            <auto-create-queues>true</auto-create-queues>\
+            <auto-delete-queues>true</auto-delete-queues>\
+            <auto-delete-queues-delay>600000</auto-delete-queues-delay>\
+            <auto-delete-queues-message-count>-1</auto-delete-queues-message-count>\
+            <auto-delete-addresses>true</auto-delete-addresses>\
+            <auto-delete-addresses-delay>600000</auto-delete-addresses-delay>\
+            <default-address-routing-type>MULTICAST</default-address-routing-type>\
+            <default-queue-routing-type>MULTICAST</default-queue-routing-type>\
+         </address-setting>\
          <address-setting match="test.#">\
             <auto-create-addresses>true</auto-create-addresses>\
             <auto-create-queues>true</auto-create-queues>\
@@ -74,8 +74,8 @@ private:
     Json::Value message_header_;
 
     int8_t get_jms_message_type(const std::string& amqp_type) const;
-    void apply_headers(proton::message& msg);
-    void apply_properties(proton::message& msg);
+    void apply_headers(proton::message& msg, const Json::Value& headers);
+    void apply_properties(proton::message& msg, const Json::Value& properties);
     void apply_message_header(proton::message& msg);
 };
 
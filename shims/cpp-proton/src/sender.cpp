@@ -178,12 +178,16 @@ void Sender::on_sendable(proton::sender& s) {
             }
         }
 
-        if (!headers_.isNull()) {
-            apply_headers(msg);
+        // Headers and properties of the message data replace --headers
+        // and --properties for this message
+        const Json::Value& headers = test_value.isMember("headers") ? test_value["headers"] : headers_;
+        if (!headers.isNull()) {
+            apply_headers(msg, headers);
         }
 
-        if (!properties_.isNull()) {
-            apply_properties(msg);
+        const Json::Value& properties = test_value.isMember("properties") ? test_value["properties"] : properties_;
+        if (!properties.isNull()) {
+            apply_properties(msg, properties);
         }
 
         if (!message_header_.isNull()) {
@@ -195,9 +199,9 @@ void Sender::on_sendable(proton::sender& s) {
     }
 }
 
-void Sender::apply_headers(proton::message& msg) {
-    if (headers_.isMember("JMSCorrelationID")) {
-        const Json::Value& h = headers_["JMSCorrelationID"];
+void Sender::apply_headers(proton::message& msg, const Json::Value& headers) {
+    if (headers.isMember("JMSCorrelationID")) {
+        const Json::Value& h = headers["JMSCorrelationID"];
         std::string htype = h["type"].asString();
         if (htype == "string") {
             msg.correlation_id(h["value"].asString());
@@ -205,21 +209,21 @@ void Sender::apply_headers(proton::message& msg) {
             msg.correlation_id(hex_to_binary(h["value"].asString()));
         }
     }
-    if (headers_.isMember("JMSReplyTo")) {
-        const Json::Value& h = headers_["JMSReplyTo"];
+    if (headers.isMember("JMSReplyTo")) {
+        const Json::Value& h = headers["JMSReplyTo"];
         msg.reply_to(h["value"].asString());
         int8_t reply_type = (h["type"].asString() == "topic") ? 1 : 0;
         proton::annotation_key rt_key(proton::symbol("x-opt-jms-reply-to"));
         msg.message_annotations().put(rt_key, reply_type);
     }
-    if (headers_.isMember("JMSType")) {
-        msg.subject(headers_["JMSType"]["value"].asString());
+    if (headers.isMember("JMSType")) {
+        msg.subject(headers["JMSType"]["value"].asString());
     }
 }
 
-void Sender::apply_properties(proton::message& msg) {
+void Sender::apply_properties(proton::message& msg, const Json::Value& properties) {
     std::map<std::string, proton::scalar> props;
-    for (auto it = properties_.begin(); it != properties_.end(); ++it) {
+    for (auto it = properties.begin(); it != properties.end(); ++it) {
         std::string name = it.key().asString();
         const Json::Value& prop = *it;
         std::string ptype = prop["type"].asString();
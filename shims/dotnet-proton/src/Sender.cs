@@ -153,12 +153,17 @@ namespace Qit.Shim
                         }
                     }
 
+                    // Headers and properties of the message data replace --headers
+                    // and --properties for this message
+                    var msgHeaders = testMsg.Headers ?? headers;
+                    var msgProperties = testMsg.Properties ?? properties;
+
                     // Apply JMS headers
-                    if (headers != null)
+                    if (msgHeaders != null)
                     {
-                        if (headers.ContainsKey("JMSCorrelationID"))
+                        if (msgHeaders.ContainsKey("JMSCorrelationID"))
                         {
-                            var h = headers["JMSCorrelationID"];
+                            var h = msgHeaders["JMSCorrelationID"];
                             if (h["type"] == "string")
                             {
                                 message.CorrelationId = h["value"];
@@ -171,24 +176,24 @@ namespace Qit.Shim
                                 Environment.Exit(1);
                             }
                         }
-                        if (headers.ContainsKey("JMSReplyTo"))
+                        if (msgHeaders.ContainsKey("JMSReplyTo"))
                         {
-                            var h = headers["JMSReplyTo"];
+                            var h = msgHeaders["JMSReplyTo"];
                             message.ReplyTo = h["value"];
                             sbyte replyType = (sbyte)(h["type"] == "topic" ? 1 : 0);
                             message.SetAnnotation("x-opt-jms-reply-to", replyType);
                         }
-                        if (headers.ContainsKey("JMSType"))
+                        if (msgHeaders.ContainsKey("JMSType"))
                         {
-                            var h = headers["JMSType"];
+                            var h = msgHeaders["JMSType"];
                             message.Subject = h["value"];
                         }
                     }
 
                     // Apply JMS application properties
-                    if (properties != null)
+                    if (msgProperties != null)
                     {
-                        foreach (var kvp in properties)
+                        foreach (var kvp in msgProperties)
                         {
                             var name = kvp.Key;
                             var prop = kvp.Value;
@@ -374,6 +379,12 @@ namespace Qit.Shim
 
         [JsonProperty("value")]
         public object Value { get; set; }
+
+        [JsonProperty("headers")]
+        public Dictionary<string, Dictionary<string, string>> Headers { get; set; }
+
+        [JsonProperty("properties")]
+        public Dictionary<string, Dictionary<string, string>> Properties { get; set; }
     }
 
     public class MessageResult
@@ -255,10 +255,15 @@ public class Sender {
                     }
                 }
 
+                // Headers and properties of the message data replace --headers
+                // and --properties for this message
+                JsonObject msgHeaders = testMsg.has("headers") ? testMsg.getAsJsonObject("headers") : headers;
+                JsonObject msgProperties = testMsg.has("properties") ? testMsg.getAsJsonObject("properties") : properties;
+
                 // Apply JMS headers
-                if (headers != null) {
-                    if (headers.has("JMSCorrelationID")) {
-                        JsonObject h = headers.getAsJsonObject("JMSCorrelationID");
+                if (msgHeaders != null) {
+                    if (msgHeaders.has("JMSCorrelationID")) {
+                        JsonObject h = msgHeaders.getAsJsonObject("JMSCorrelationID");
                         String htype = h.get("type").getAsString();
                         if ("string".equals(htype)) {
                             message.correlationId(h.get("value").getAsString());
@@ -267,21 +272,21 @@ public class Sender {
                             System.exit(1);
                         }
                     }
-                    if (headers.has("JMSReplyTo")) {
-                        JsonObject h = headers.getAsJsonObject("JMSReplyTo");
+                    if (msgHeaders.has("JMSReplyTo")) {
+                        JsonObject h = msgHeaders.getAsJsonObject("JMSReplyTo");
                         message.replyTo(h.get("value").getAsString());
                         byte replyType = (byte) ("topic".equals(h.get("type").getAsString()) ? 1 : 0);
                         message.annotation("x-opt-jms-reply-to", replyType);
                     }
-                    if (headers.has("JMSType")) {
-                        JsonObject h = headers.getAsJsonObject("JMSType");
+                    if (msgHeaders.has("JMSType")) {
+                        JsonObject h = msgHeaders.getAsJsonObject("JMSType");
                         message.subject(h.get("value").getAsString());
                     }
                 }
 
                 // Apply JMS application properties
-                if (properties != null) {
-                    for (Map.Entry<String, JsonElement> entry : properties.entrySet()) {
+                if (msgProperties != null) {
+                    for (Map.Entry<String, JsonElement> entry : msgProperties.entrySet()) {
                         String name = entry.getKey();
                         JsonObject prop = entry.getValue().getAsJsonObject();
                         String ptype = prop.get("type").getAsString();
@@ -19,7 +19,8 @@
 #
 
 # QIT 2.0 - JMS Shim Wrapper
-# Dispatches send/receive subcommands to sender.sh/receiver.sh
+# Dispatches send/receive subcommands to sender.sh/receiver.sh; serve runs
+# ShimServer, which reads commands as JSON lines from stdin
 
 set -e
 
@@ -29,5 +30,6 @@ SUBCMD="$1"; shift
 case "$SUBCMD" in
     send)    exec "$SCRIPT_DIR/sender.sh" "$@" ;;
     receive) exec "$SCRIPT_DIR/receiver.sh" "$@" ;;
-    *)       echo "Usage: shim.sh {send|receive} [args...]" >&2; exit 1 ;;
+    serve)   exec java -cp "$SCRIPT_DIR/target/qit-jms-shim-2.0.0-jar-with-dependencies.jar" org.apache.qpid.qit.ShimServer ;;
+    *)       echo "Usage: shim.sh {send|receive|serve} [args...]" >&2; exit 1 ;;
 esac
@@ -44,6 +44,8 @@ public class JmsReceiver {
         try {
             JmsReceiver receiver = new JmsReceiver();
             receiver.run(args);
+        } catch (ShimExit e) {
+            System.exit(e.status);
         } catch (Exception e) {
             System.err.println("ERROR: " + e.getMessage());
             e.printStackTrace();
@@ -51,6 +53,19 @@ public class JmsReceiver {
         }
     }
 
+    /**
+     * Close the connection if run() left it open, e.g. after a ShimExit.
+     */
+    public void close() {
+        if (connection != null) {
+            try {
+                connection.close();
+            } catch (JMSException e) {
+                // Already closed or broken; nothing left to release
+            }
+        }
+    }
+
     public void run(String[] args) throws Exception {
         // Parse command-line arguments
         String broker = null;
@@ -99,12 +114,12 @@ public class JmsReceiver {
 
         if (broker == null || queue == null) {
             System.err.println("Usage: JmsReceiver --broker <url> --queue <name> --count <n> [--timeout <seconds>]");
-            System.exit(1);
+            throw new ShimExit(1);
         }
 
         if (largeContent == null && count == 0) {
             System.err.println("Usage: JmsReceiver --broker <url> --queue <name> --count <n> [--timeout <seconds>]");
-            System.exit(1);
+            throw new ShimExit(1);
         }
 
         // Connect to broker
@@ -626,7 +641,7 @@ public class JmsReceiver {
         if (received.size() != elementsCount) {
             sb.append(", \"match\": false}");
             System.out.println(sb.toString());
-            System.exit(1);
+            throw new ShimExit(1);
         } else {
             boolean matched = true;
             int mismatchElem = -1;
@@ -655,7 +670,7 @@ public class JmsReceiver {
             }
             sb.append("}");
             System.out.println(sb.toString());
-            if (!matched) System.exit(1);
+            if (!matched) throw new ShimExit(1);
         }
     }
 }
@@ -44,6 +44,8 @@ public class JmsSender {
         try {
             JmsSender sender = new JmsSender();
             sender.run(args);
+        } catch (ShimExit e) {
+            System.exit(e.status);
         } catch (Exception e) {
             System.err.println("ERROR: " + e.getMessage());
             e.printStackTrace();
@@ -51,6 +53,19 @@ public class JmsSender {
         }
     }
 
+    /**
+     * Close the connection if run() left it open, e.g. after a ShimExit.
+     */
+    public void close() {
+        if (connection != null) {
+            try {
+                connection.close();
+            } catch (JMSException e) {
+                // Already closed or broken; nothing left to release
+            }
+        }
+    }
+
     public void run(String[] args) throws Exception {
         // Parse command-line arguments
         String broker = null;
@@ -107,12 +122,12 @@ public class JmsSender {
 
         if (broker == null || queue == null) {
             System.err.println("Usage: JmsSender --broker <url> --queue <name> --type <jms_type> --data <json> [--headers <json>] [--properties <json>]");
-            System.exit(1);
+            throw new ShimExit(1);
         }
 
         if (largeContent == null && (type == null || data == null)) {
             System.err.println("Usage: JmsSender --broker <url> --queue <name> --type <jms_type> --data <json> [--headers <json>] [--properties <json>]");
-            System.exit(1);
+            throw new ShimExit(1);
         }
 
         // Connect to broker
@@ -178,11 +193,10 @@ public class JmsSender {
             JsonObject msgData = element.getAsJsonObject();
             Message message = createMessage(type, msgData);
 
-            // Add headers
-            addHeaders(message, headers);
-
-            // Add properties
-            addProperties(message, properties);
+            // Add headers and properties; those of the message data replace
+            // --headers and --properties for this message
+            addHeaders(message, msgData.has("headers") ? msgData.getAsJsonObject("headers") : headers);
+            addProperties(message, msgData.has("properties") ? msgData.getAsJsonObject("properties") : properties);
 
             producer.send(message, DeliveryMode.NON_PERSISTENT, Message.DEFAULT_PRIORITY, Message.DEFAULT_TIME_TO_LIVE);
             messagesSent++;
@@ -0,0 +1,33 @@
+/**
+ * Licensed to the Apache Software Foundation (ASF) under one or more
+ * contributor license agreements.  See the NOTICE file distributed with
+ * this work for additional information regarding copyright ownership.
+ * The ASF licenses this file to You under the Apache License, Version 2.0
+ * (the "License"); you may not use this file except in compliance with
+ * the License.  You may obtain a copy of the License at
+ *
+ *      http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+package org.apache.qpid.qit;
+
+/**
+ * Ends a shim command with an exit status.
+ *
+ * Thrown instead of calling System.exit so that ShimServer can run many
+ * commands in one JVM; the main methods turn it back into an exit.
+ */
+public class ShimExit extends RuntimeException {
+    public final int status;
+
+    public ShimExit(int status) {
+        super("exit status " + status);
+        this.status = status;
+    }
+}
@@ -0,0 +1,116 @@
+/**
+ * Licensed to the Apache Software Foundation (ASF) under one or more
+ * contributor license agreements.  See the NOTICE file distributed with
+ * this work for additional information regarding copyright ownership.
+ * The ASF licenses this file to You under the Apache License, Version 2.0
+ * (the "License"); you may not use this file except in compliance with
+ * the License.  You may obtain a copy of the License at
+ *
+ *      http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+package org.apache.qpid.qit;
+
+import com.google.gson.Gson;
+import com.google.gson.JsonArray;
+import com.google.gson.JsonObject;
+import com.google.gson.JsonParser;
+
+import java.io.BufferedReader;
+import java.io.ByteArrayOutputStream;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+
+/**
+ * Long-lived JMS shim process for QIT 2.0
+ *
+ * Runs send and receive commands read as JSON lines from stdin in one JVM.
+ * Each request line is {"argv": [subcommand, *options]}; each answer line is
+ * {"returncode": N, "stdout": "...", "stderr": "..."}, as if the command had
+ * run in a process of its own.
+ */
+public class ShimServer {
+    public static void main(String[] args) throws Exception {
+        PrintStream out = System.out;
+        PrintStream err = System.err;
+        Gson gson = new Gson();
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+
+        String line;
+        while ((line = in.readLine()) != null) {
+            if (line.trim().isEmpty()) {
+                continue;
+            }
+            JsonArray argvJson = JsonParser.parseString(line).getAsJsonObject().getAsJsonArray("argv");
+            String[] argv = new String[argvJson.size()];
+            for (int i = 0; i < argv.length; i++) {
+                argv[i] = argvJson.get(i).getAsString();
+            }
+
+            ByteArrayOutputStream stdout = new ByteArrayOutputStream();
+            ByteArrayOutputStream stderr = new ByteArrayOutputStream();
+            System.setOut(new PrintStream(stdout, true, StandardCharsets.UTF_8));
+            System.setErr(new PrintStream(stderr, true, StandardCharsets.UTF_8));
+            int returncode;
+            try {
+                returncode = runCommand(argv);
+            } finally {
+                System.setOut(out);
+                System.setErr(err);
+            }
+
+            JsonObject response = new JsonObject();
+            response.addProperty("returncode", returncode);
+            response.addProperty("stdout", stdout.toString(StandardCharsets.UTF_8));
+            response.addProperty("stderr", stderr.toString(StandardCharsets.UTF_8));
+            out.println(gson.toJson(response));
+            out.flush();
+        }
+    }
+
+    private static int runCommand(String[] argv) {
+        String command = argv.length > 0 ? argv[0] : "";
+        String[] rest = argv.length > 0 ? Arrays.copyOfRange(argv, 1, argv.length) : argv;
+        if ("send".equals(command)) {
+            JmsSender sender = new JmsSender();
+            try {
+                sender.run(rest);
+                return 0;
+            } catch (ShimExit e) {
+                return e.status;
+            } catch (Exception e) {
+                return error(e);
+            } finally {
+                sender.close();
+            }
+        } else if ("receive".equals(command)) {
+            JmsReceiver receiver = new JmsReceiver();
+            try {
+                receiver.run(rest);
+                return 0;
+            } catch (ShimExit e) {
+                return e.status;
+            } catch (Exception e) {
+                return error(e);
+            } finally {
+                receiver.close();
+            }
+        }
+        System.err.println("Usage: ShimServer, then {\"argv\": [\"send\"|\"receive\", ...]} per line");
+        return 2;
+    }
+
+    private static int error(Exception e) {
+        System.err.println("ERROR: " + e.getMessage());
+        e.printStackTrace();
+        return 1;
+    }
+}
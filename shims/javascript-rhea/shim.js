@@ -1066,31 +1066,36 @@ function send(options) {
                 }
             }
 
+            // Headers and properties of the message data replace --headers
+            // and --properties for this message
+            const msgHeaders = msgData.headers !== undefined ? msgData.headers : headers;
+            const msgProperties = msgData.properties !== undefined ? msgData.properties : properties;
+
             // Apply JMS headers
-            if (headers) {
-                if (headers.JMSCorrelationID) {
-                    const h = headers.JMSCorrelationID;
+            if (msgHeaders) {
+                if (msgHeaders.JMSCorrelationID) {
+                    const h = msgHeaders.JMSCorrelationID;
                     if (h.type === 'string') {
                         message.correlation_id = h.value;
                     } else if (h.type === 'bytes') {
                         message.correlation_id = rhea.types.wrap_binary(Buffer.from(h.value, 'hex'));
                     }
                 }
-                if (headers.JMSReplyTo) {
-                    const h = headers.JMSReplyTo;
+                if (msgHeaders.JMSReplyTo) {
+                    const h = msgHeaders.JMSReplyTo;
                     message.reply_to = h.value;
                     if (!message.message_annotations) message.message_annotations = {};
                     message.message_annotations['x-opt-jms-reply-to'] = rhea.types.wrap_byte(h.type === 'topic' ? 1 : 0);
                 }
-                if (headers.JMSType) {
-                    message.subject = headers.JMSType.value;
+                if (msgHeaders.JMSType) {
+                    message.subject = msgHeaders.JMSType.value;
                 }
             }
 
             // Apply JMS application properties
-            if (properties) {
+            if (msgProperties) {
                 const appProps = {};
-                for (const [name, prop] of Object.entries(properties)) {
+                for (const [name, prop] of Object.entries(msgProperties)) {
                     const ptype = prop.type;
                     const pval = prop.value;
                     if (ptype === 'boolean') {
@@ -26,14 +26,19 @@ Supports send/receive via broker and direct peer-to-peer modes.
 """
 
 import argparse
+import contextlib
+import functools
+import hashlib
+import io
 import json
 import math
 import struct
 import sys
+import traceback
 import uuid as uuid_module
 from typing import Any
 
-from proton import Array, Data, Described, Message, UNDESCRIBED
+from proton import Array, Data, Described, Message, UNDESCRIBED, VERSION
 from proton.handlers import MessagingHandler
 from proton.reactor import Container
 
@@ -49,50 +54,251 @@ AMQP_TYPE_TO_DATA_TYPE = {
 DATA_TYPE_TO_AMQP_TYPE = {v: k for k, v in AMQP_TYPE_TO_DATA_TYPE.items()}
 
 
-def encode_typed_element(elem_type, elem_value):
-    """Encode a typed element ["type", value] to a proton value. Recurses for complex types."""
-    if elem_type == "array":
-        return encode_array(elem_value)
-    if elem_type == "list":
-        return encode_list(elem_value)
-    if elem_type == "map":
-        return encode_map(elem_value)
-    if elem_type == "described":
-        return encode_described(elem_value)
-    return encode_primitive(elem_type, elem_value)
-
-
-def encode_array(value):
-    """Encode array: {"element_type": str, "elements": [...]}."""
-    elem_type = value["element_type"]
-    elements = value.get("elements", [])
-    data_type = AMQP_TYPE_TO_DATA_TYPE.get(elem_type, Data.NULL)
-    if not elements:
-        return Array(UNDESCRIBED, data_type)
-    encoded = [encode_typed_element(elem_type, e) for e in elements]
-    return Array(UNDESCRIBED, data_type, *encoded)
-
-
-def encode_list(value):
-    """Encode list: [["type", value], ...]."""
-    return [encode_typed_element(e[0], e[1]) for e in value]
-
-
-def encode_map(value):
-    """Encode map: [[["ktype", kval], ["vtype", vval]], ...]."""
-    result = {}
-    for pair in value:
-        k = encode_typed_element(pair[0][0], pair[0][1])
-        v = encode_typed_element(pair[1][0], pair[1][1])
-        result[k] = v
+# Canonical value form and digests (shim contract, see docs/SHIM_HOWTO.md).
+# Must stay in step with qit.core.canonical.
+INTEGER_TYPES = frozenset({
+    "ubyte", "ushort", "uint", "ulong", "byte", "short", "int", "long", "timestamp", "char",
+})
+FLOAT_WIDTHS = {"float": 8, "double": 16}
+
+# Reported in every "stats" object
+CLIENT_VERSION = "python-qpid-proton " + ".".join(str(part) for part in VERSION)
+
+
+def canonical_json(value: Any) -> str:
+    try:
+        return _dumps(value)
+    except RecursionError:
+        return _dumps_iterative(value)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _dumps_iterative(value: Any) -> str:
+    """canonical_json with an explicit stack, for values too deep for json.dumps."""
+    parts: list[str] = []
+    stack: list[tuple[bool, Any]] = [(False, value)]
+    while stack:
+        is_text, item = stack.pop()
+        if is_text:
+            parts.append(item)
+        elif isinstance(item, (list, tuple)):
+            parts.append("[")
+            stack.append((True, "]"))
+            for i in range(len(item) - 1, -1, -1):
+                stack.append((False, item[i]))
+                if i:
+                    stack.append((True, ","))
+        elif isinstance(item, dict):
+            parts.append("{")
+            stack.append((True, "}"))
+            keys = sorted(item)
+            for i in range(len(keys) - 1, -1, -1):
+                stack.append((False, item[keys[i]]))
+                stack.append((True, _dumps(keys[i]) + ":"))
+                if i:
+                    stack.append((True, ","))
+        else:
+            parts.append(_dumps(item))
+    return "".join(parts)
+
+
+def canonical_value(amqp_type: str, value: Any) -> Any:
+    """Canonical form of a value in typed-element notation (explicit stack, no recursion)."""
+    root: list[Any] = [None]
+    stack: list[tuple[Any, ...]] = [(amqp_type, value, root, 0)]
+    while stack:
+        task = stack.pop()
+        if task[0] is _SORT:
+            if len(task[1]) > 1:
+                task[1].sort(key=canonical_json)
+            continue
+        elem_type, elem_value, target, slot = task
+        target[slot] = _canonical_step(elem_type, elem_value, stack)
+    return root[0]
+
+
+_SORT = object()
+COMPOUND_TYPES = frozenset({"list", "map", "array", "described"})
+
+
+def _canonical_step(amqp_type: str, value: Any, stack: list[tuple[Any, ...]]) -> Any:
+    """Canonical form of one value; nested values are pushed onto the stack."""
+    if value is None:
+        return None
+    try:
+        if amqp_type in INTEGER_TYPES:
+            return int(value)
+        if amqp_type in ("string", "symbol"):
+            return str(value)
+        if amqp_type in FLOAT_WIDTHS:
+            if isinstance(value, str):
+                s = value.strip()
+                bits = int(s, 16) if s.lower().startswith("0x") else int(s)
+            elif isinstance(value, int) and not isinstance(value, bool):
+                bits = value
+            else:
+                return {"invalid": repr(value)}
+            return f"0x{bits:0{FLOAT_WIDTHS[amqp_type]}x}"
+        if amqp_type == "binary":
+            s = value.hex() if isinstance(value, bytes) else str(value).replace(" ", "").lower()
+            return s[2:] if s.startswith("0x") else s
+        if amqp_type == "uuid":
+            return str(value).lower()
+        if amqp_type == "boolean":
+            return bool(value)
+        if amqp_type not in COMPOUND_TYPES:
+            return value
+
+        tasks: list[tuple[Any, ...]] = []
+        if amqp_type == "list":
+            result: Any = [_pending_element(elem, tasks) for elem in value]
+        elif amqp_type == "map":
+            result = [[_pending_element(k, tasks), _pending_element(v, tasks)] for k, v in value]
+            stack.append((_SORT, result))
+        elif amqp_type == "array":
+            elem_type = value["element_type"]
+            elements = list(value.get("elements", []))
+            if elem_type in COMPOUND_TYPES:
+                canonical = [None] * len(elements)
+                tasks.extend((elem_type, e, canonical, i) for i, e in enumerate(elements))
+            else:
+                canonical = [_canonical_step(elem_type, e, stack) for e in elements]
+            result = {"element_type": elem_type, "elements": canonical}
+        else:
+            result = {
+                "descriptor": _pending_element(value["descriptor"], tasks),
+                "value": _pending_element(value["value"], tasks),
+            }
+        stack.extend(tasks)
+        return result
+    except (TypeError, ValueError, KeyError, IndexError, AttributeError):
+        return {"invalid": repr(value)}
+
+
+def _pending_element(element: Any, tasks: list[tuple[Any, ...]]) -> list[Any]:
+    if not isinstance(element, list) or len(element) != 2:
+        return ["invalid", repr(element)]
+    result = [element[0], None]
+    tasks.append((element[0], element[1], result, 1))
     return result
 
 
-def encode_described(value):
-    """Encode described: {"descriptor": ["type", val], "value": ["type", val]}."""
-    desc = encode_typed_element(value["descriptor"][0], value["descriptor"][1])
-    inner = encode_typed_element(value["value"][0], value["value"][1])
-    return Described(desc, inner)
+def canonical_element(element: Any) -> list[Any]:
+    if not isinstance(element, list) or len(element) != 2:
+        return ["invalid", repr(element)]
+    return [element[0], canonical_value(element[0], element[1])]
+
+
+def message_hash(amqp_type: str, value: Any) -> str:
+    """SHA-256 of a message's canonical [type, value]."""
+    encoded = canonical_json([amqp_type, canonical_value(amqp_type, value)]).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def has_invalid(canonical: str) -> bool:
+    """Whether canonical JSON holds an invalid marker (string contents escape their quotes)."""
+    return '{"invalid":' in canonical or '["invalid",' in canonical
+
+
+def messages_digest(messages: list[dict[str, Any]]) -> str:
+    """SHA-256 over the concatenated message hashes, in order."""
+    digest = hashlib.sha256()
+    for msg in messages:
+        digest.update(message_hash(msg["type"], msg["value"]).encode("ascii"))
+    return digest.hexdigest()
+
+
+class Deadline:
+    """Stops the container when its timer fires or once the connection is gone."""
+
+    def __init__(self) -> None:
+        self.expired = False
+
+    def on_timer_task(self, event: Any) -> None:
+        self.expired = True
+        event.container.stop()
+
+    def on_transport_closed(self, event: Any) -> None:
+        event.container.stop()
+
+
+def run_handler(handler: MessagingHandler, timeout: float | None = None) -> bool:
+    """
+    Run a handler on a new Container in the calling thread.
+
+    The timeout is a reactor timer rather than SIGALRM, so handlers can also
+    run on worker threads of an embedding process.
+
+    Returns:
+        True if the timeout expired before the connection closed
+    """
+    deadline = Deadline()
+    container = Container(handler, deadline)
+    if timeout is not None:
+        container.schedule(timeout, deadline)
+    container.run()
+    return deadline.expired
+
+
+def encode_typed_element(elem_type, elem_value):
+    """Encode a typed element ["type", value] to a proton value.
+
+    Nested values are encoded with an explicit stack rather than by
+    recursion. Containers whose parts must exist first (arrays, map keys,
+    described values) are built by a task that runs after their children.
+    """
+    root = [None]
+    stack = [(elem_type, elem_value, root, 0)]
+    while stack:
+        task = stack.pop()
+        if callable(task[0]):
+            build, parts, target, slot = task
+            target[slot] = build(parts)
+            continue
+        amqp_type, value, target, slot = task
+        if amqp_type == "list":
+            # Filled in place by the queued element tasks
+            target[slot] = [None] * len(value)
+            stack.extend((e[0], e[1], target[slot], i) for i, e in enumerate(value))
+        elif amqp_type == "map":
+            parts = [None] * (2 * len(value))
+            stack.append((_build_map, parts, target, slot))
+            for i, pair in enumerate(value):
+                stack.append((pair[0][0], pair[0][1], parts, 2 * i))
+                stack.append((pair[1][0], pair[1][1], parts, 2 * i + 1))
+        elif amqp_type == "array":
+            nested_type = value["element_type"]
+            elements = value.get("elements", [])
+            data_type = AMQP_TYPE_TO_DATA_TYPE.get(nested_type, Data.NULL)
+            parts = [None] * len(elements)
+            stack.append((functools.partial(_build_array, data_type), parts, target, slot))
+            stack.extend((nested_type, e, parts, i) for i, e in enumerate(elements))
+        elif amqp_type == "described":
+            parts = [None, None]
+            stack.append((_build_described, parts, target, slot))
+            stack.append((value["descriptor"][0], value["descriptor"][1], parts, 0))
+            stack.append((value["value"][0], value["value"][1], parts, 1))
+        else:
+            target[slot] = encode_primitive(amqp_type, value)
+    return root[0]
+
+
+def _build_map(parts):
+    """Map from encoded [k0, v0, k1, v1, ...]."""
+    return dict(zip(parts[::2], parts[1::2]))
+
+
+def _build_array(data_type, elements):
+    """Array of already encoded elements."""
+    return Array(UNDESCRIBED, data_type, *elements)
+
+
+def _build_described(parts):
+    """Described value from encoded [descriptor, value]."""
+    return Described(parts[0], parts[1])
 
 
 def encode_primitive(amqp_type, value):
@@ -157,36 +363,45 @@ def encode_primitive(amqp_type, value):
     raise ValueError(f"Unsupported AMQP type: {amqp_type}")
 
 
-def decode_value_recursive(value):
-    """Decode a proton value to a typed element ["type", decoded_value]. Recurses for complex types."""
-    if value is None:
-        return ["null", None]
-
-    if isinstance(value, Array):
-        elem_type_name = DATA_TYPE_TO_AMQP_TYPE.get(value.type, "unknown")
-        decoded_elements = []
-        for elem in value.elements:
-            _, decoded = decode_value_recursive(elem)
-            decoded_elements.append(decoded)
-        return ["array", {"element_type": elem_type_name, "elements": decoded_elements}]
-
-    if isinstance(value, Described):
-        desc_elem = decode_value_recursive(value.descriptor)
-        val_elem = decode_value_recursive(value.value)
-        return ["described", {"descriptor": desc_elem, "value": val_elem}]
-
-    if isinstance(value, dict):
-        pairs = []
-        for k, v in value.items():
-            pairs.append([decode_value_recursive(k), decode_value_recursive(v)])
-        return ["map", pairs]
-
-    if isinstance(value, (list, tuple)):
-        elements = [decode_value_recursive(elem) for elem in value]
-        return ["list", elements]
+def decode_typed_element(value):
+    """Decode a proton value to a typed element ["type", decoded_value].
 
-    # Primitive value — infer type and decode
-    return _decode_primitive_to_typed(value)
+    Nested values are decoded with an explicit stack rather than by
+    recursion; each container is created first and filled in by the tasks
+    queued for its children.
+    """
+    root = [None]
+    # (value, target, slot, bare): bare slots (array elements) take the
+    # decoded value without its type
+    stack = [(value, root, 0, False)]
+    while stack:
+        item, target, slot, bare = stack.pop()
+        if item is None:
+            decoded = ["null", None]
+        elif isinstance(item, Array):
+            elements = [None] * len(item.elements)
+            elem_type_name = DATA_TYPE_TO_AMQP_TYPE.get(item.type, "unknown")
+            decoded = ["array", {"element_type": elem_type_name, "elements": elements}]
+            stack.extend((elem, elements, i, True) for i, elem in enumerate(item.elements))
+        elif isinstance(item, Described):
+            parts = {"descriptor": None, "value": None}
+            decoded = ["described", parts]
+            stack.append((item.descriptor, parts, "descriptor", False))
+            stack.append((item.value, parts, "value", False))
+        elif isinstance(item, dict):
+            pairs = [[None, None] for _ in range(len(item))]
+            decoded = ["map", pairs]
+            for pair, (k, v) in zip(pairs, item.items()):
+                stack.append((k, pair, 0, False))
+                stack.append((v, pair, 1, False))
+        elif isinstance(item, (list, tuple)):
+            elements = [None] * len(item)
+            decoded = ["list", elements]
+            stack.extend((elem, elements, i, False) for i, elem in enumerate(item))
+        else:
+            decoded = _decode_primitive_to_typed(item)
+        target[slot] = decoded[1] if bare else decoded
+    return root[0]
 
 
 def _decode_primitive_to_typed(value):
@@ -257,6 +472,8 @@ class SenderHandler(MessagingHandler):
         self.message_header = message_header
         self.sent_count = 0
         self.confirmed_count = 0
+        self.acks: list[int] = []
+        self.delivery_index: dict[Any, int] = {}
 
     def on_start(self, event: Any) -> None:
         """Create sender when container starts."""
@@ -296,21 +513,27 @@ class SenderHandler(MessagingHandler):
                     # This matches Qpid JMS Client wire format
                     msg.annotations = {symbol("x-opt-jms-msg-type"): byte(jms_type)}
 
-            if self.headers:
-                self._apply_headers(msg)
+            # Headers and properties of the message data replace --headers
+            # and --properties for that message
+            headers = msg_data.get("headers", self.headers)
+            if headers:
+                self._apply_headers(msg, headers)
 
-            if self.properties:
-                self._apply_properties(msg)
+            properties = msg_data.get("properties", self.properties)
+            if properties:
+                self._apply_properties(msg, properties)
 
             if self.message_header:
                 self._apply_message_header(msg)
 
-            event.sender.send(msg)
+            delivery = event.sender.send(msg)
+            self.delivery_index[delivery.tag] = msg_data["index"]
             self.sent_count += 1
 
     def on_accepted(self, event: Any) -> None:
         """Track message confirmations."""
         self.confirmed_count += 1
+        self.acks.append(self.delivery_index.get(event.delivery.tag, -1))
         if self.confirmed_count == len(self.messages):
             event.connection.close()
 
@@ -342,34 +565,34 @@ class SenderHandler(MessagingHandler):
 
         return None
 
-    def _apply_headers(self, msg: Message) -> None:
+    def _apply_headers(self, msg: Message, headers: dict[str, Any]) -> None:
         """Set JMS headers as AMQP message properties."""
         from proton import byte, symbol
 
-        if "JMSCorrelationID" in self.headers:
-            h = self.headers["JMSCorrelationID"]
+        if "JMSCorrelationID" in headers:
+            h = headers["JMSCorrelationID"]
             if h["type"] == "string":
                 msg.correlation_id = h["value"]
             elif h["type"] == "bytes":
                 msg.correlation_id = bytes.fromhex(h["value"])
-        if "JMSReplyTo" in self.headers:
-            h = self.headers["JMSReplyTo"]
+        if "JMSReplyTo" in headers:
+            h = headers["JMSReplyTo"]
             msg.reply_to = h["value"]
             reply_type = byte(1) if h["type"] == "topic" else byte(0)
             if msg.annotations is None:
                 msg.annotations = {}
             msg.annotations[symbol("x-opt-jms-reply-to")] = reply_type
-        if "JMSType" in self.headers:
-            h = self.headers["JMSType"]
+        if "JMSType" in headers:
+            h = headers["JMSType"]
             msg.subject = h["value"]
 
-    def _apply_properties(self, msg: Message) -> None:
+    def _apply_properties(self, msg: Message, properties: dict[str, Any]) -> None:
         """Set JMS application properties as AMQP application-properties."""
         import struct
         from proton import byte, float32, int32, short
 
         props = {}
-        for name, prop in self.properties.items():
+        for name, prop in properties.items():
             ptype = prop["type"]
             pval = prop["value"]
             if ptype == "boolean":
@@ -517,11 +740,12 @@ class SenderHandler(MessagingHandler):
 class ReceiverHandler(MessagingHandler):
     """Handler for receiving AMQP messages."""
 
-    def __init__(self, url: str, queue: str, count: int) -> None:
+    def __init__(self, url: str, queue: str, count: int, expected_hashes: list[str] | None = None) -> None:
         super().__init__()
         self.url = url
         self.queue = queue
         self.expected_count = count
+        self.expected_hashes = expected_hashes
         self.received_messages: list[dict[str, Any]] = []
 
     def on_start(self, event: Any) -> None:
@@ -531,8 +755,15 @@ class ReceiverHandler(MessagingHandler):
 
     def on_message(self, event: Any) -> None:
         """Process received message."""
-        msg = event.message
+        self.received_messages.append(self._decode_message(event.message, len(self.received_messages)))
 
+        # Close when all messages received
+        if len(self.received_messages) >= self.expected_count:
+            event.receiver.close()
+            event.connection.close()
+
+    def _decode_message(self, msg: Message, default_index: int) -> dict[str, Any]:
+        """Decode a received message into the shim JSON message format."""
         # Check for JMS message type annotation
         # NOTE: Qpid JMS Client uses symbol as key
         from proton import symbol
@@ -548,16 +779,16 @@ class ReceiverHandler(MessagingHandler):
             msg_data = self._decode_jms_message(msg, jms_msg_type)
         elif self._is_complex_type(msg.body):
             # Decode as complex AMQP type
-            typed_elem = decode_value_recursive(msg.body)
+            typed_elem = decode_typed_element(msg.body)
             msg_data = {
-                "index": msg.id if msg.id is not None else len(self.received_messages),
+                "index": msg.id if msg.id is not None else default_index,
                 "type": typed_elem[0],
                 "value": typed_elem[1],
             }
         else:
             # Decode as regular AMQP primitive
             msg_data = {
-                "index": msg.id if msg.id is not None else len(self.received_messages),
+                "index": msg.id if msg.id is not None else default_index,
                 "type": self._infer_type(msg.body),
                 "value": self._decode_value(msg.body),
             }
@@ -572,12 +803,19 @@ class ReceiverHandler(MessagingHandler):
 
         msg_data["message_header"] = self._extract_message_header(msg)
 
-        self.received_messages.append(msg_data)
+        if self.expected_hashes is not None:
+            # Keep the value only when it differs from what the orchestrator
+            # expects; invalid values never match, even an identical one
+            canonical = canonical_json([msg_data["type"], canonical_value(msg_data["type"], msg_data.get("value"))])
+            msg_data["hash"] = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+            position = default_index
+            if (
+                position < len(self.expected_hashes) and self.expected_hashes[position] == msg_data["hash"]
+                and not has_invalid(canonical)
+            ):
+                msg_data.pop("value", None)
 
-        # Close when all messages received
-        if len(self.received_messages) >= self.expected_count:
-            event.receiver.close()
-            event.connection.close()
+        return msg_data
 
     def _is_complex_type(self, body: Any) -> bool:
         """Check if body is a complex AMQP type (array, list, map, described)."""
@@ -823,6 +1061,79 @@ class ReceiverHandler(MessagingHandler):
         return str(value)
 
 
+class MultiQueueReceiverHandler(ReceiverHandler):
+    """Handler draining several queues over one connection, one link per queue."""
+
+    def __init__(
+        self, url: str, queues: list[str], count: int, expected_hashes: list[str] | None = None,
+    ) -> None:
+        super().__init__(url, queues[0], count, expected_hashes)
+        self.queues = queues
+        self.received_by_queue: dict[str, list[dict[str, Any]]] = {q: [] for q in queues}
+        self.link_queues: dict[str, str] = {}
+
+    def on_start(self, event: Any) -> None:
+        """Open one receiver link per queue on a shared connection."""
+        connection = event.container.connect(url=self.url, sasl_enabled=False, reconnect=False)
+        for queue in self.queues:
+            link = event.container.create_receiver(connection, source=queue)
+            self.link_queues[link.name] = queue
+
+    def on_message(self, event: Any) -> None:
+        """Record the message against the queue of the link it arrived on."""
+        received = self.received_by_queue[self.link_queues[event.receiver.name]]
+        received.append(self._decode_message(event.message, len(received)))
+
+        if len(received) >= self.expected_count:
+            event.receiver.close()
+        if all(len(msgs) >= self.expected_count for msgs in self.received_by_queue.values()):
+            event.connection.close()
+
+
+class RoundtripHandler(MessagingHandler):
+    """Handler sending and receiving back on one connection (sender == receiver)."""
+
+    def __init__(
+        self, url: str, queue: str, messages: list[dict[str, Any]], amqp_type: str,
+        expected_hashes: list[str] | None = None,
+    ) -> None:
+        super().__init__()
+        self.url = url
+        self.queue = queue
+        self.sender = SenderHandler(url, queue, messages, amqp_type=amqp_type)
+        self.receiver = ReceiverHandler(url, queue, len(messages), expected_hashes)
+
+    def on_start(self, event: Any) -> None:
+        """Open a sender link and a receiver link on one connection."""
+        connection = event.container.connect(url=self.url, sasl_enabled=False, reconnect=False)
+        event.container.create_sender(connection, target=self.queue)
+        event.container.create_receiver(connection, source=self.queue)
+
+    def on_sendable(self, event: Any) -> None:
+        """Send messages when credit is available."""
+        self.sender.on_sendable(event)
+
+    def on_accepted(self, event: Any) -> None:
+        """Track message confirmations."""
+        self.sender.confirmed_count += 1
+        self._close_if_done(event)
+
+    def on_rejected(self, event: Any) -> None:
+        """Handle rejected messages."""
+        self.sender.on_rejected(event)
+
+    def on_message(self, event: Any) -> None:
+        """Decode a message received back from the queue."""
+        received = self.receiver.received_messages
+        received.append(self.receiver._decode_message(event.message, len(received)))
+        self._close_if_done(event)
+
+    def _close_if_done(self, event: Any) -> None:
+        expected = len(self.sender.messages)
+        if self.sender.confirmed_count >= expected and len(self.receiver.received_messages) >= expected:
+            event.connection.close()
+
+
 class LargeContentSender(MessagingHandler):
     """Handler for sending a single large content message."""
 
@@ -958,26 +1269,12 @@ def send_large_content(args: argparse.Namespace) -> None:
 
 def receive_large_content(args: argparse.Namespace) -> None:
     """Receive a single large content message and verify against PRNG seed."""
-    import signal
-
     content_type = args.large_content
     size = args.size
     seed = args.seed
 
     handler = LargeContentReceiver(args.broker, args.queue)
-
-    def timeout_handler(signum, frame):
-        raise TimeoutError(f"Receiver timed out after {args.timeout} seconds")
-
-    signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(args.timeout)
-
-    try:
-        Container(handler).run()
-    except TimeoutError:
-        pass
-    finally:
-        signal.alarm(0)
+    run_handler(handler, args.timeout)
 
     if handler.body is None:
         print(json.dumps({"match": False, "error": "no message received"}))
@@ -1081,6 +1378,11 @@ def receive_large_content(args: argparse.Namespace) -> None:
         sys.exit(1)
 
 
+def client_stats(**counts: int) -> dict[str, Any]:
+    """A "stats" object: message counts plus the client library version."""
+    return {**counts, "client_version": CLIENT_VERSION}
+
+
 def send_messages(args: argparse.Namespace) -> None:
     """Send messages via broker."""
     messages = json.loads(args.data)
@@ -1092,42 +1394,106 @@ def send_messages(args: argparse.Namespace) -> None:
     Container(handler).run()
 
     # Output result
-    result = {
-        "messages": messages,
-        "stats": {"sent": len(messages)},
-    }
+    result: dict[str, Any] = {"stats": client_stats(sent=len(messages))}
+    if args.expect_digest:
+        # Acks plus digest; echo the messages only if the digest disagrees
+        result["acks"] = sorted(handler.acks)
+        result["digest"] = messages_digest(messages)
+        result["stats"]["acked"] = len(handler.acks)
+        if result["digest"] != args.expect_digest:
+            result["messages"] = messages
+    else:
+        result["messages"] = messages
     print(json.dumps(result, indent=2))
 
 
 def receive_messages(args: argparse.Namespace) -> None:
     """Receive messages via broker."""
-    import signal
+    expected_hashes = args.expect_hashes.split(",") if args.expect_hashes else None
+    if args.queues:
+        handler = MultiQueueReceiverHandler(args.broker, args.queues.split(","), args.count, expected_hashes)
+    else:
+        handler = ReceiverHandler(args.broker, args.queue, args.count, expected_hashes)
 
-    handler = ReceiverHandler(args.broker, args.queue, args.count)
+    # Output whatever arrived if the timeout expires
+    run_handler(handler, args.timeout)
 
-    # Set alarm for timeout
-    def timeout_handler(signum, frame):
-        raise TimeoutError(f"Receiver timed out after {args.timeout} seconds")
+    # Output result
+    if args.queues:
+        result = {
+            "queues": {
+                queue: {"messages": msgs, "stats": client_stats(received=len(msgs))}
+                for queue, msgs in handler.received_by_queue.items()
+            },
+            "stats": client_stats(received=sum(len(msgs) for msgs in handler.received_by_queue.values())),
+        }
+    else:
+        result = {
+            "messages": handler.received_messages,
+            "stats": client_stats(received=len(handler.received_messages)),
+        }
+    print(json.dumps(result, indent=2))
 
-    signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(args.timeout)
 
-    try:
-        Container(handler).run()
-    except TimeoutError:
-        pass  # Expected if we don't receive all messages
-    finally:
-        signal.alarm(0)  # Cancel alarm
+def roundtrip_messages(args: argparse.Namespace) -> None:
+    """Send messages and receive them back over one connection."""
+    messages = json.loads(args.data)
+    expected_hashes = args.expect_hashes.split(",") if args.expect_hashes else None
+    handler = RoundtripHandler(args.broker, args.queue, messages, args.type, expected_hashes)
 
-    # Output result
+    # Report whatever made it back if the timeout expires
+    run_handler(handler, args.timeout)
+
+    received = handler.receiver.received_messages
     result = {
-        "messages": handler.received_messages,
-        "stats": {"received": len(handler.received_messages)},
+        "sent": {"messages": messages, "stats": client_stats(sent=len(messages))},
+        "received": {"messages": received, "stats": client_stats(received=len(received))},
     }
     print(json.dumps(result, indent=2))
 
 
-def main() -> None:
+def serve() -> None:
+    """
+    Run commands read as JSON lines from stdin in this one process.
+
+    Each request line is {"argv": [subcommand, *options]}; each answer line
+    is {"returncode": N, "stdout": "...", "stderr": "..."}, as if the command
+    had run in a process of its own. A malformed request line is answered
+    with returncode 2 and the reason on stderr; the loop goes on.
+    """
+    out = sys.stdout
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            argv = json.loads(line)["argv"]
+            if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+                raise TypeError("argv must be a list of strings")
+        except (ValueError, KeyError, TypeError) as e:
+            response = {"returncode": 2, "stdout": "", "stderr": f"malformed request: {e!r}\n"}
+            out.write(json.dumps(response) + "\n")
+            out.flush()
+            continue
+        stdout, stderr = io.StringIO(), io.StringIO()
+        returncode = 0
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                if argv[:1] == ["serve"]:
+                    raise ValueError("serve cannot be nested")
+                main(argv)
+            except SystemExit as e:
+                if isinstance(e.code, str):
+                    print(e.code, file=sys.stderr)
+                returncode = e.code if isinstance(e.code, int) else int(e.code is not None)
+            except Exception:
+                traceback.print_exc()
+                returncode = 1
+        response = {"returncode": returncode, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+        out.write(json.dumps(response) + "\n")
+        out.flush()
+
+
+def main(argv: list[str] | None = None) -> None:
     """Main entry point."""
     parser = argparse.ArgumentParser(description="QIT Python Proton Shim")
     subparsers = parser.add_subparsers(dest="command", required=True)
@@ -1147,6 +1513,11 @@ def main() -> None:
     send_parser.add_argument("--headers", default=None, help="JSON JMS headers")
     send_parser.add_argument("--properties", default=None, help="JSON JMS application properties")
     send_parser.add_argument("--message-header", default=None, help="JSON AMQP Header section fields")
+    send_parser.add_argument(
+        "--expect-digest",
+        default=None,
+        help="Expected digest of --data; report acks and digest, echoing messages only on mismatch",
+    )
     send_parser.add_argument("--large-content", default=None, help="Large content type (binary, string, list, array, map, described)")
     send_parser.add_argument("--size", type=int, default=None, help="Large content size in bytes (binary/string)")
     send_parser.add_argument("--seed", type=int, default=None, help="PRNG seed for large content")
@@ -1156,18 +1527,44 @@ def main() -> None:
     # Receive command
     recv_parser = subparsers.add_parser("receive", help="Receive messages")
     recv_parser.add_argument("--broker", required=True, help="Broker URL")
-    recv_parser.add_argument("--queue", required=True, help="Queue name")
-    recv_parser.add_argument("--count", type=int, required=False, default=1, help="Message count")
+    recv_source = recv_parser.add_mutually_exclusive_group(required=True)
+    recv_source.add_argument("--queue", help="Queue name")
+    recv_source.add_argument("--queues", help="Comma-separated queue names, drained over one connection")
+    recv_parser.add_argument("--count", type=int, required=False, default=1, help="Message count (per queue with --queues)")
     recv_parser.add_argument("--timeout", type=int, default=30, help="Timeout in seconds")
+    recv_parser.add_argument(
+        "--expect-hashes",
+        default=None,
+        help="Comma-separated expected message hashes; report hashes, with values only on mismatch",
+    )
     recv_parser.add_argument("--large-content", default=None, help="Large content type (binary, string, list, array, map, described)")
     recv_parser.add_argument("--size", type=int, default=None, help="Expected large content size in bytes (binary/string)")
     recv_parser.add_argument("--seed", type=int, default=None, help="PRNG seed for verification")
     recv_parser.add_argument("--elements", type=int, default=None, help="Expected number of collection elements")
     recv_parser.add_argument("--element-size", type=int, default=None, help="Expected size of each element in bytes")
 
-    args = parser.parse_args()
+    # Roundtrip command (send and receive back on one connection)
+    rt_parser = subparsers.add_parser("roundtrip", help="Send messages and receive them back")
+    rt_parser.add_argument("--broker", required=True, help="Broker URL")
+    rt_parser.add_argument("--queue", required=True, help="Queue name")
+    rt_parser.add_argument("--type", required=True, help="AMQP type")
+    rt_parser.add_argument("--count", type=int, required=False, help="Message count")
+    rt_parser.add_argument("--data", required=True, help="JSON message data")
+    rt_parser.add_argument("--timeout", type=int, default=30, help="Timeout in seconds")
+    rt_parser.add_argument(
+        "--expect-hashes",
+        default=None,
+        help="Comma-separated expected message hashes; report hashes, with values only on mismatch",
+    )
+
+    # Serve command (many commands in one long-lived process)
+    subparsers.add_parser("serve", help="Run commands read as JSON lines from stdin")
+
+    args = parser.parse_args(argv)
 
-    if args.command == "send":
+    if args.command == "serve":
+        serve()
+    elif args.command == "send":
         if args.large_content:
             send_large_content(args)
         else:
@@ -1177,6 +1574,8 @@ def main() -> None:
             receive_large_content(args)
         else:
             receive_messages(args)
+    elif args.command == "roundtrip":
+        roundtrip_messages(args)
 
 
 if __name__ == "__main__":
@@ -24,20 +24,42 @@ Command-line interface for running AMQP interoperability tests.
 """
 
 import sys
+from collections.abc import Callable
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import click
 
 from qit import __version__
 
+if TYPE_CHECKING:
+    from qit.core.broker import BrokerManager
+    from qit.core.history import HistoryStore
+    from qit.core.orchestrator import Orchestrator, TestCase, TestResult
+    from qit.core.shim import ShimConfig, ShimInfo
+
 
 @click.group()
 @click.version_option(version=__version__, prog_name="qit")
-def cli() -> None:
+@click.option(
+    "--shims-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    envvar="QIT_SHIMS_DIR",
+    help="Directory of shims (default: shims/ of the source checkout, else ./shims) [env: QIT_SHIMS_DIR]",
+)
+def cli(shims_dir: Path | None) -> None:
     """QIT - AMQP Interoperability Test Suite."""
     pass
 
 
+def _discover_shims() -> tuple[Path, dict[str, "ShimInfo"]]:
+    """The shims directory selected for this invocation and the shims in it."""
+    from qit.core.shim import DISCOVERY_CACHE_FILE, default_shims_dir, discover_shims
+
+    shims_dir = click.get_current_context().find_root().params.get("shims_dir") or default_shims_dir()
+    return shims_dir, discover_shims(shims_dir, cache_file=DISCOVERY_CACHE_FILE)
+
+
 @cli.command()
 @click.option(
     "--build-shims",
@@ -131,16 +153,58 @@ def test() -> None:
     type=click.Path(),
     help="Generate JUnit XML report (for CI/CD integration)",
 )
+@click.option(
+    "--results-out",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write one JSON Lines row per case (plus .parquet if pyarrow is installed)",
+)
+@click.option(
+    "--history-db",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="QIT_HISTORY_DB",
+    help="Record the run in this SQLite history database [env: QIT_HISTORY_DB]",
+)
+@click.option(
+    "--rerun-flaky",
+    type=int,
+    default=2,
+    show_default=True,
+    help="Reruns of failing cases the history marks as flaky (0: none)",
+)
 @click.option(
     "--extended",
     is_flag=True,
     help="Include extended tier test values for complex types",
 )
+@click.option(
+    "--deep",
+    is_flag=True,
+    help="Include deep-nesting tier test values for complex types",
+)
 @click.option(
     "--strict",
     is_flag=True,
     help="Treat known failures (xfail) as real failures",
 )
+@click.option(
+    "--known-failures",
+    "known_failures_files",
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Extra known-failure list (TOML or JSON), added to the built-in one",
+)
+@click.option(
+    "--verify-xfail",
+    is_flag=True,
+    help="Run cases that a whole-case known failure covers (default: report them as not run)",
+)
+@click.option(
+    "--verify-xfail-every",
+    type=int,
+    default=10,
+    show_default=True,
+    help="Also run them every N runs, to detect fixes (0: never)",
+)
 @click.option(
     "--workers",
     "-j",
@@ -148,6 +212,26 @@ def test() -> None:
     default=1,
     help="Number of parallel test workers (default: 1 = sequential)",
 )
+@click.option(
+    "--fanout",
+    is_flag=True,
+    help="Send each type once per sender to a multicast address read by all receivers",
+)
+@click.option(
+    "--in-process/--no-in-process",
+    default=True,
+    help="Run Python shims that support it inside this process (default: on)",
+)
+@click.option(
+    "--consolidate-receivers",
+    is_flag=True,
+    help="Launch each receiver once per type, draining all senders' queues",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="List the cases and estimate wall time, memory and payload from the history, without running",
+)
 def test_amqp_types(
     sender: tuple[str, ...],
     receiver: tuple[str, ...],
@@ -156,39 +240,49 @@ def test_amqp_types(
     mode: str,
     verbose: bool,
     junit_xml: str | None,
+    results_out: Path | None,
+    history_db: Path | None,
+    rerun_flaky: int,
     extended: bool,
+    deep: bool,
     strict: bool,
+    known_failures_files: tuple[Path, ...],
+    verify_xfail: bool,
+    verify_xfail_every: int,
     workers: int,
+    fanout: bool,
+    consolidate_receivers: bool,
+    in_process: bool,
+    dry_run: bool,
 ) -> None:
     """Test AMQP primitive and complex types interoperability."""
-    from pathlib import Path
-
-    from qit.core import BrokerConfig, BrokerManager, Orchestrator, Shim, ShimConfig
-    from qit.core.shim import discover_shims
+    from qit.core import Orchestrator, Shim
+    from qit.core.xfail import KnownFailureRegistry, verification_due
     from qit.types import AmqpComplexTypes, AmqpPrimitiveTypes
 
     click.echo("QIT - AMQP Types Test")
     click.echo("=" * 80)
 
-    project_root = Path(__file__).parent.parent.parent.parent
-    discovered = discover_shims(project_root / "shims")
+    shims_dir, discovered = _discover_shims()
 
-    available_shims = {}
+    available_shims: dict[str, Shim] = {}
     for key, info in discovered.items():
         if info.shim_type == "jms":
             continue
-        available_shims[key] = Shim(
-            ShimConfig(
-                name=key,
-                language=key.split("-")[0],
-                client=info.name,
-                executable=info.shim_dir / "shim.sh",
-            )
-        )
+        config = _shim_config(key, info)
+        if in_process and info.in_process is not None:
+            try:
+                from qit.core.inprocess import InProcessShim
+
+                available_shims[key] = InProcessShim(config, info.in_process)
+                continue
+            except ImportError as e:
+                click.echo(f"⚠ {key}: in-process mode unavailable ({e}), using subprocess", err=True)
+        available_shims[key] = Shim(config)
 
     if not available_shims:
         click.echo("❌ No shims found!", err=True)
-        click.echo(f"   Expected shims in: {shim_dir}", err=True)
+        click.echo(f"   Expected shims in: {shims_dir} (set with --shims-dir or QIT_SHIMS_DIR)", err=True)
         sys.exit(1)
 
     click.echo(f"Found {len(available_shims)} shim(s): {', '.join(available_shims.keys())}")
@@ -198,58 +292,196 @@ def test_amqp_types(
     receiver_shims = list(receiver) if receiver else list(available_shims.keys())
 
     # Get AMQP types to test (primitives + complex)
-    all_types = {**AmqpPrimitiveTypes.get_all_types(), **AmqpComplexTypes.get_all_types(include_extended=extended)}
+    all_types = {
+        **AmqpPrimitiveTypes.get_all_types(),
+        **AmqpComplexTypes.get_all_types(include_extended=extended, include_deep=deep),
+    }
     if amqp_types:
         test_types = {k: all_types[k]["values"] for k in amqp_types if k in all_types}
     else:
         test_types = {k: v["values"] for k, v in all_types.items()}
 
+    unknown_types = [k for k in amqp_types if k not in all_types]
+    if unknown_types:
+        click.echo(f"⚠ Unknown type(s) skipped: {', '.join(unknown_types)}", err=True)
     click.echo(f"Testing {len(test_types)} type(s)")
     click.echo()
 
-    # Set up broker if needed
-    broker_manager = None
-    if mode == "broker":
-        compose_file = project_root / "docker" / "compose.yaml"
-        if not compose_file.exists():
-            click.echo(f"❌ Compose file not found: {compose_file}", err=True)
-            sys.exit(1)
+    if (fanout or consolidate_receivers) and mode != "broker":
+        click.echo("❌ --fanout and --consolidate-receivers require --mode broker", err=True)
+        sys.exit(1)
 
-        broker_config = BrokerConfig(
-            name="artemis",
-            type="artemis",
-            url=broker,
-            compose_file=compose_file,
+    try:
+        known_failures = KnownFailureRegistry.from_files(*known_failures_files)
+    except ValueError as e:
+        click.echo(f"❌ {e}", err=True)
+        sys.exit(1)
+
+    # Strict runs report xfails as failures, so they need real outcomes
+    due = verification_due(verify_xfail_every, "amqp-types", record=not dry_run)
+    verify_xfail = verify_xfail or strict or due
+
+    if dry_run:
+        _print_dry_run(
+            Orchestrator(shims=available_shims, known_failures=known_failures),
+            test_types, sender_shims, receiver_shims,
+            workers=workers, fanout=fanout, consolidate=consolidate_receivers,
+            verify_xfail=verify_xfail, history_db=history_db,
+            skipped_shims=[key for key, info in discovered.items() if info.shim_type == "jms"],
         )
-        broker_manager = BrokerManager(broker_config)
+        return
 
-        # Check if broker is running (don't auto-start for now)
-        click.echo("Note: Ensure broker is running:")
-        click.echo(f"  docker compose -f {compose_file} up -d")
-        click.echo()
+    broker_manager = _broker_manager(shims_dir, broker) if mode == "broker" else None
+    history, flaky_cases = _run_history(history_db, rerun_flaky)
 
     # Run tests
     orchestrator = Orchestrator(
         shims=available_shims,
         broker=broker_manager,
+        known_failures=known_failures,
+        flaky_cases=flaky_cases,
+        max_reruns=rerun_flaky,
+    )
+    _run_and_report(
+        orchestrator,
+        lambda on_result: orchestrator.run_test_matrix(
+            amqp_types=test_types,
+            sender_shims=sender_shims,
+            receiver_shims=receiver_shims,
+            workers=workers,
+            fanout=fanout,
+            consolidate=consolidate_receivers,
+            verify_xfail=verify_xfail,
+            on_result=on_result,
+        ),
+        junit_xml=junit_xml,
+        results_out=results_out,
+        history=history,
+        strict=strict,
     )
 
-    results = orchestrator.run_test_matrix(
-        amqp_types=test_types,
-        sender_shims=sender_shims,
-        receiver_shims=receiver_shims,
-        workers=workers,
+
+def _shim_config(key: str, info: "ShimInfo") -> "ShimConfig":
+    """Configuration of a discovered shim."""
+    from qit.core import ShimConfig
+
+    return ShimConfig(
+        name=key,
+        language=key.split("-")[0],
+        client=info.name,
+        executable=info.shim_dir / "shim.sh",
+        jms_only=info.shim_type == "jms",
+        capabilities=info.capabilities,
+        argv=info.argv,
+        commands=info.commands,
+        env=info.env,
     )
 
+
+def _broker_manager(shims_dir: Path, broker: str) -> "BrokerManager":
+    """Manager of the Docker Compose broker next to the shims directory."""
+    from qit.core import BrokerConfig, BrokerManager
+
+    compose_file = shims_dir.parent / "docker" / "compose.yaml"
+    if not compose_file.exists():
+        click.echo(f"❌ Compose file not found: {compose_file}", err=True)
+        sys.exit(1)
+
+    broker_config = BrokerConfig(
+        name="artemis",
+        type="artemis",
+        url=broker,
+        compose_file=compose_file,
+    )
+
+    # Check if broker is running (don't auto-start for now)
+    click.echo("Note: Ensure broker is running:")
+    click.echo(f"  docker compose -f {compose_file} up -d")
+    click.echo()
+    return BrokerManager(broker_config)
+
+
+def _run_history(history_db: Path | None, rerun_flaky: int) -> tuple["HistoryStore | None", set[Any]]:
+    """History store to record the run in, and the flaky cases it knows of."""
+    # Flaky cases seen in past runs are rerun when they fail
+    history = None
+    if history_db:
+        from qit.core.history import HistoryStore
+
+        history = HistoryStore(history_db)
+    flaky_cases = history.flaky_cases() if history and rerun_flaky > 0 else set()
+    if flaky_cases:
+        click.echo(f"Rerunning {len(flaky_cases)} flaky case(s) up to {rerun_flaky} time(s) if they fail")
+    return history, flaky_cases
+
+
+def _run_and_report(
+    orchestrator: "Orchestrator",
+    run: Callable[[Callable[["TestResult"], None] | None], list["TestResult"]],
+    junit_xml: str | None,
+    results_out: Path | None,
+    history: "HistoryStore | None",
+    strict: bool,
+    junit_name: str | None = None,
+) -> None:
+    """
+    Run tests, streaming results into the requested reports, then print the
+    summary and exit with status 1 on failures (or, if strict, xfails).
+
+    Args:
+        orchestrator: Orchestrator running the tests
+        run: Runs them, given the callback for each result (None: no reports)
+        junit_xml: JUnit XML report path
+        results_out: Results export path
+        history: History store the run is recorded in
+        strict: Treat known failures as failures
+        junit_name: Name of the JUnit report's root element
+    """
+    # Stream results into the reports as they complete
+    writers: list[Any] = []
+    rows = None
+    if results_out or history:
+        from qit.core.results import ResultRows
+
+        rows = ResultRows()
+    if junit_xml:
+        from qit.core.junit import JUnitWriter
+
+        junit_args = {"name": junit_name} if junit_name else {}
+        writers.append(JUnitWriter(junit_xml, strict=strict, **junit_args))
+    results_writer = None
+    if results_out:
+        from qit.core.results import ResultsWriter
+
+        results_writer = ResultsWriter(results_out, rows)
+        writers.append(results_writer)
+
+    def on_result(result: "TestResult") -> None:
+        for writer in writers:
+            writer.add(result)
+
+    try:
+        results = run(on_result if writers else None)
+    finally:
+        for writer in writers:
+            writer.close()
+
     # Print report
     click.echo()
     report = orchestrator.generate_report(results)
     click.echo(report)
 
-    # Generate JUnit XML if requested
     if junit_xml:
-        orchestrator.generate_junit_xml(results, junit_xml, strict=strict)
         click.echo(f"\n✓ JUnit XML report written to: {junit_xml}")
+    if results_writer:
+        parquet = f" and {results_writer.parquet_path}" if results_writer.parquet else ""
+        click.echo(
+            f"✓ Results ({results_writer.rows_written} rows) written to: {results_writer.output_path}{parquet}"
+        )
+    if history and rows is not None:
+        with history:
+            history.record(rows.row(r) for r in results)
+        click.echo(f"✓ Run {rows.run_id} recorded in: {history.path}")
 
     # Exit with error if any tests failed
     has_failures = any(not r.success for r in results)
@@ -258,6 +490,443 @@ def test_amqp_types(
         sys.exit(1)
 
 
+def _print_dry_run(
+    orchestrator: "Orchestrator",
+    test_types: dict[str, list[Any]],
+    sender_shims: list[str],
+    receiver_shims: list[str],
+    workers: int,
+    fanout: bool,
+    consolidate: bool,
+    verify_xfail: bool,
+    history_db: Path | None,
+    skipped_shims: list[str],
+) -> None:
+    """Print the cases a run would execute and what it is estimated to cost."""
+    from qit.core.history import DEFAULT_HISTORY_DB, ESTIMATE_WINDOW, HistoryStore
+    from qit.core.plan import estimate_plan, format_plan
+
+    if skipped_shims:
+        click.echo(f"Skipped (JMS-only): {', '.join(skipped_shims)}")
+    missing = [name for name in dict.fromkeys([*sender_shims, *receiver_shims]) if name not in orchestrator.shims]
+    if missing:
+        click.echo(f"⚠ Not found, their cases would fail: {', '.join(missing)}", err=True)
+
+    plan = orchestrator.plan_test_matrix(
+        test_types,
+        [name for name in sender_shims if name in orchestrator.shims],
+        [name for name in receiver_shims if name in orchestrator.shims],
+        fanout=fanout,
+        consolidate=consolidate,
+        verify_xfail=verify_xfail,
+    )
+
+    durations: dict[Any, float] = {}
+    shim_memory: dict[str, int] = {}
+    runs = 0
+    db_path = history_db or DEFAULT_HISTORY_DB
+    if db_path.exists():
+        with HistoryStore(db_path) as store:
+            runs = len(store.runs(ESTIMATE_WINDOW))
+            durations = store.case_durations(ESTIMATE_WINDOW)
+            shim_memory = store.shim_memory(ESTIMATE_WINDOW)
+
+    estimate = estimate_plan(
+        plan, orchestrator.shims,
+        workers=workers, fanout=fanout, consolidate=consolidate,
+        durations=durations, shim_memory=shim_memory,
+    )
+    click.echo(format_plan(plan, estimate, history_runs=runs))
+
+
+def _suite_options(command: Callable[..., None]) -> Callable[..., None]:
+    """Options shared by the message suite commands."""
+    options = [
+        click.option("--sender", multiple=True, help="Sender shim(s) to test (default: all)"),
+        click.option("--receiver", multiple=True, help="Receiver shim(s) to test (default: all)"),
+        click.option("--broker", default="amqp://localhost:5672", help="Broker URL"),
+        click.option("--junit-xml", type=click.Path(), help="Generate JUnit XML report (for CI/CD integration)"),
+        click.option(
+            "--results-out",
+            type=click.Path(dir_okay=False, path_type=Path),
+            help="Write one JSON Lines row per case (plus .parquet if pyarrow is installed)",
+        ),
+        click.option(
+            "--history-db",
+            type=click.Path(dir_okay=False, path_type=Path),
+            envvar="QIT_HISTORY_DB",
+            help="Record the run in this SQLite history database [env: QIT_HISTORY_DB]",
+        ),
+        click.option("--rerun-flaky", type=int, default=2, show_default=True,
+                     help="Reruns of failing cases the history marks as flaky (0: none)"),
+        click.option("--strict", is_flag=True, help="Treat known failures (xfail) as real failures"),
+        click.option(
+            "--known-failures",
+            "known_failures_files",
+            multiple=True,
+            type=click.Path(exists=True, dir_okay=False, path_type=Path),
+            help="Extra known-failure list (TOML or JSON), added to the built-in one",
+        ),
+        click.option("--verify-xfail", is_flag=True,
+                     help="Run cases that a whole-case known failure covers (default: report them as not run)"),
+        click.option("--verify-xfail-every", type=int, default=10, show_default=True,
+                     help="Also run them every N runs, to detect fixes (0: never)"),
+        click.option("--workers", "-j", type=int, default=1,
+                     help="Number of parallel test workers (default: 1 = sequential)"),
+    ]
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+@test.command(name="jms")
+@_suite_options
+def test_jms(**options: Any) -> None:
+    """Test JMS messages, headers and properties between the JMS client and every AMQP client."""
+    from qit.suites import jms_cases
+
+    _run_suite("JMS Test", "QIT JMS Interoperability Tests",
+               lambda amqp, jms: jms_cases(amqp, jms), **options)
+
+
+@test.command(name="headers")
+@_suite_options
+def test_headers(**options: Any) -> None:
+    """Test AMQP message header fields between all AMQP clients."""
+    from qit.suites import header_cases
+
+    _run_suite("AMQP Header Test", "QIT AMQP Header Interoperability Tests",
+               lambda amqp, jms: header_cases(amqp), **options)
+
+
+@test.command(name="large-content")
+@_suite_options
+@click.option("--extended", is_flag=True, help="Include the extended tier (10 MB, large maps and described types)")
+@click.option(
+    "--small-frame-broker",
+    envvar="QIT_BROKER_URL_SMALL_FRAME",
+    help="Broker with 4 KiB frames; also run the frame-size cases through it [env: QIT_BROKER_URL_SMALL_FRAME]",
+)
+@click.option(
+    "--large-frame-broker",
+    envvar="QIT_BROKER_URL_LARGE_FRAME",
+    help="Broker with 1 MiB frames; also run the frame-size cases through it [env: QIT_BROKER_URL_LARGE_FRAME]",
+)
+def test_large_content(
+    extended: bool,
+    small_frame_broker: str | None,
+    large_frame_broker: str | None,
+    **options: Any,
+) -> None:
+    """Test large messages and collections that span many AMQP frames."""
+    from qit.suites import large_content_cases
+    from qit.suites.large_content import (
+        EXPECTED_LARGE_FRAME_SIZE,
+        EXPECTED_SMALL_FRAME_SIZE,
+        negotiated_frame_size,
+    )
+
+    frame_brokers = {}
+    for name, url, expected in (
+        ("small", small_frame_broker, EXPECTED_SMALL_FRAME_SIZE),
+        ("large", large_frame_broker, EXPECTED_LARGE_FRAME_SIZE),
+    ):
+        if not url:
+            continue
+        url = url if "://" in url else f"amqp://{url}"
+        try:
+            actual = negotiated_frame_size(url)
+        except RuntimeError as e:
+            click.echo(f"❌ {e}", err=True)
+            sys.exit(1)
+        if actual != expected:
+            click.echo(f"❌ Broker at {url} negotiated max_frame_size={actual}, expected {expected}. "
+                       f"Check broker acceptor 'maxFrameSize' parameter.", err=True)
+            sys.exit(1)
+        frame_brokers[name] = url
+
+    _run_suite(
+        "Large Content Test", "QIT Large Content Interoperability Tests",
+        lambda amqp, jms: large_content_cases(
+            amqp, jms, extended=extended,
+            small_frame_url=frame_brokers.get("small"),
+            large_frame_url=frame_brokers.get("large"),
+        ),
+        **options,
+    )
+
+
+def _run_suite(
+    title: str,
+    junit_name: str,
+    build_cases: Callable[[list[str], list[str]], list["TestCase"]],
+    sender: tuple[str, ...],
+    receiver: tuple[str, ...],
+    broker: str,
+    junit_xml: str | None,
+    results_out: Path | None,
+    history_db: Path | None,
+    rerun_flaky: int,
+    strict: bool,
+    known_failures_files: tuple[Path, ...],
+    verify_xfail: bool,
+    verify_xfail_every: int,
+    workers: int,
+) -> None:
+    """
+    Run a message suite through the orchestrator.
+
+    build_cases builds the suite's cases from the AMQP and the JMS shims;
+    the remaining arguments are the options of _suite_options.
+    """
+    from qit.core import Orchestrator, Shim
+    from qit.core.xfail import KnownFailureRegistry, verification_due
+    from qit.suites import select_cases
+
+    click.echo(f"QIT - {title}")
+    click.echo("=" * 80)
+
+    shims_dir, discovered = _discover_shims()
+    if not discovered:
+        click.echo("❌ No shims found!", err=True)
+        click.echo(f"   Expected shims in: {shims_dir} (set with --shims-dir or QIT_SHIMS_DIR)", err=True)
+        sys.exit(1)
+    shims = {key: Shim(_shim_config(key, info)) for key, info in discovered.items()}
+    amqp_shims = sorted(key for key, info in discovered.items() if info.shim_type == "amqp")
+    jms_shims = sorted(key for key, info in discovered.items() if info.shim_type == "jms")
+    click.echo(f"Found {len(shims)} shim(s): {', '.join(shims)}")
+
+    test_cases = select_cases(build_cases(amqp_shims, jms_shims), sender, receiver)
+    if not test_cases:
+        click.echo("❌ No test cases for the selected shims", err=True)
+        sys.exit(1)
+    click.echo()
+
+    try:
+        known_failures = KnownFailureRegistry.from_files(*known_failures_files)
+    except ValueError as e:
+        click.echo(f"❌ {e}", err=True)
+        sys.exit(1)
+    verify_xfail = verify_xfail or strict or verification_due(
+        verify_xfail_every, click.get_current_context().info_name or junit_name
+    )
+
+    history, flaky_cases = _run_history(history_db, rerun_flaky)
+    orchestrator = Orchestrator(
+        shims=shims,
+        broker=_broker_manager(shims_dir, broker),
+        known_failures=known_failures,
+        flaky_cases=flaky_cases,
+        max_reruns=rerun_flaky,
+    )
+    _run_and_report(
+        orchestrator,
+        lambda on_result: orchestrator.run_cases(
+            test_cases, workers=workers, verify_xfail=verify_xfail, on_result=on_result,
+        ),
+        junit_xml=junit_xml,
+        results_out=results_out,
+        history=history,
+        strict=strict,
+        junit_name=junit_name,
+    )
+
+
+@cli.command()
+@click.argument("files", nargs=-1, required=True,
+                type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--html",
+    "html_out",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write an HTML matrix report to this file",
+)
+@click.option("--title", default="QIT Interoperability Matrix", show_default=True, help="Report title")
+def report(files: tuple[Path, ...], html_out: Path | None, title: str) -> None:
+    """Summarize --results-out exports (e.g. the shards of one run)."""
+    from qit.core.report import ResultsMatrix, render_html, text_summary
+    from qit.core.results import read_results
+
+    matrix = ResultsMatrix(row for path in files for row in read_results(path))
+    click.echo(text_summary(matrix))
+    if html_out:
+        html_out.parent.mkdir(parents=True, exist_ok=True)
+        html_out.write_text(render_html(matrix, title), encoding="utf-8")
+        click.echo(f"\n✓ HTML report written to: {html_out}")
+
+
+history_db_option = click.option(
+    "--db",
+    "db_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="QIT_HISTORY_DB",
+    help="History database [env: QIT_HISTORY_DB; default: ~/.local/share/qit/history.sqlite]",
+)
+
+
+@cli.command(name="compare-runs")
+@click.argument("run_a")
+@click.argument("run_b")
+@history_db_option
+@click.option("--threshold", type=float, default=0.2, show_default=True,
+              help="Relative timing/throughput change treated as noise")
+@click.option("--min-delta-ms", type=float, default=20.0, show_default=True,
+              help="Duration change (ms) treated as noise")
+@click.option("--ignore-timing", is_flag=True, help="Only status regressions fail the comparison")
+def compare_runs_command(
+    run_a: str,
+    run_b: str,
+    db_path: Path | None,
+    threshold: float,
+    min_delta_ms: float,
+    ignore_timing: bool,
+) -> None:
+    """Compare run RUN_A (before) with RUN_B (after).
+
+    Each run is a --results-out file, or a run id in the history database.
+    Exits with status 1 on regressions.
+    """
+    from qit.core.compare import compare_runs, format_comparison
+    from qit.core.results import read_results
+
+    store = None
+    runs = []
+    for run in (run_a, run_b):
+        if Path(run).is_file():
+            rows = read_results(run)
+        else:
+            store = store or _open_history(db_path)
+            rows = store.run_rows(run)
+            if not rows:
+                click.echo(f"❌ {run} is neither a results file nor a recorded run", err=True)
+                sys.exit(2)
+        runs.append(rows)
+    if store:
+        store.close()
+
+    comparison = compare_runs(runs[0], runs[1], ratio=threshold, min_delta_ms=min_delta_ms)
+    click.echo(format_comparison(comparison, run_a, run_b))
+    if comparison.has_regressions(timing=not ignore_timing):
+        click.echo("\n❌ Regressions found")
+        sys.exit(1)
+    click.echo("\n✓ No regressions")
+
+
+@cli.group()
+def history() -> None:
+    """Query the run history (record runs with --history-db)."""
+    pass
+
+
+def _open_history(db_path: Path | None) -> "HistoryStore":
+    from qit.core.history import DEFAULT_HISTORY_DB, HistoryStore
+
+    path = db_path or DEFAULT_HISTORY_DB
+    if not path.exists():
+        click.echo(f"❌ No history database at {path}", err=True)
+        sys.exit(1)
+    return HistoryStore(path)
+
+
+@history.command(name="runs")
+@history_db_option
+@click.option("--limit", type=int, default=20, show_default=True, help="Number of runs")
+def history_runs(db_path: Path | None, limit: int) -> None:
+    """List recorded runs, newest first."""
+    with _open_history(db_path) as store:
+        for run in store.runs(limit):
+            click.echo(f"{run.run_id}  {run.started}  {run.cases:5d} cases  {run.failures:4d} failed")
+
+
+@history.command(name="trend")
+@history_db_option
+@click.option("--sender", help="Only this sender")
+@click.option("--receiver", help="Only this receiver")
+@click.option("--type", "amqp_type", help="Only this AMQP type")
+@click.option("--limit", type=int, default=20, show_default=True, help="Number of most recent runs")
+def history_trend(
+    db_path: Path | None,
+    sender: str | None,
+    receiver: str | None,
+    amqp_type: str | None,
+    limit: int,
+) -> None:
+    """Show case durations over recent runs."""
+    with _open_history(db_path) as store:
+        points = store.trend(sender, receiver, amqp_type, limit)
+    if not points:
+        click.echo("No matching cases recorded")
+        return
+    first = points[0].median_ms or 1.0
+    click.echo(f"{'run':12}  {'started':25}  {'cases':>5}  {'failed':>6}  {'median ms':>10}  {'max ms':>10}  change")
+    for p in points:
+        click.echo(f"{p.run_id:12}  {p.started:25}  {p.cases:5d}  {p.failures:6d}  "
+                   f"{p.median_ms:10.1f}  {p.max_ms:10.1f}  {p.median_ms / first:5.2f}x")
+
+
+@history.command(name="regressions")
+@history_db_option
+@click.argument("baseline")
+@click.argument("run", required=False)
+@click.option("--factor", type=float, default=1.5, show_default=True,
+              help="Report cases whose duration grew by this factor")
+@click.option("--min-delta-ms", type=float, default=50.0, show_default=True,
+              help="...and by at least this many milliseconds")
+def history_regressions(
+    db_path: Path | None,
+    baseline: str,
+    run: str | None,
+    factor: float,
+    min_delta_ms: float,
+) -> None:
+    """List cases that regressed in RUN (default: latest) against BASELINE."""
+    from qit.core.history import DurationRegression
+
+    with _open_history(db_path) as store:
+        regressions = store.regressions(baseline, run, factor, min_delta_ms)
+    if not regressions:
+        click.echo("No regressions")
+        return
+    for reg in regressions:
+        case = f"{reg.sender} → {reg.receiver} ({reg.amqp_type})"
+        if isinstance(reg, DurationRegression):
+            click.echo(f"  {case}: {reg.baseline:.1f} ms → {reg.current:.1f} ms ({reg.ratio:.2f}x)")
+        else:
+            click.echo(f"  {case}: {reg.baseline} → {reg.current}")
+    sys.exit(1)
+
+
+@history.command(name="flaky")
+@history_db_option
+@click.option("--window", type=int, default=20, show_default=True, help="Number of most recent runs")
+@click.option("--min-runs", type=int, default=3, show_default=True, help="Ignore cases seen in fewer runs")
+def history_flaky(db_path: Path | None, window: int, min_runs: int) -> None:
+    """List cases with unstable outcomes and their flake rates."""
+    with _open_history(db_path) as store:
+        scores = store.flake_scores(window, min_runs)
+    if not scores:
+        click.echo("No flaky cases")
+        return
+    for s in scores:
+        click.echo(f"  {s.rate:6.1%}  {s.sender} → {s.receiver} ({s.amqp_type}): "
+                   f"{s.failures} failed, {s.reruns} passed on rerun, in {s.runs} runs")
+
+
+@history.command(name="import")
+@history_db_option
+@click.argument("files", nargs=-1, required=True,
+                type=click.Path(exists=True, dir_okay=False, path_type=Path))
+def history_import(db_path: Path | None, files: tuple[Path, ...]) -> None:
+    """Record runs from --results-out JSON Lines exports."""
+    from qit.core.history import DEFAULT_HISTORY_DB, HistoryStore
+    from qit.core.results import read_results
+
+    with HistoryStore(db_path or DEFAULT_HISTORY_DB) as store:
+        for path in files:
+            count = store.record(read_results(path))
+            click.echo(f"✓ {path}: {count} rows")
+
+
 @cli.command()
 def broker() -> None:
     """Manage test broker."""
@@ -21,7 +21,7 @@
 
 from qit.core.broker import BrokerConfig, BrokerManager
 from qit.core.comparison import MessageComparator, MessageDiff
-from qit.core.orchestrator import Orchestrator, TestCase, TestResult
+from qit.core.orchestrator import Orchestrator, SuiteCase, TestCase, TestResult
 from qit.core.shim import Message, Shim, ShimConfig, ShimResult
 
 __all__ = [
@@ -34,6 +34,7 @@ __all__ = [
     "Shim",
     "ShimConfig",
     "ShimResult",
+    "SuiteCase",
     "TestCase",
     "TestResult",
 ]
@@ -124,6 +124,29 @@ class BrokerManager:
         except subprocess.CalledProcessError:
             return False
 
+    def prepare_subscriptions(self, address: str, queues: list[str], timeout: int = 10) -> None:
+        """
+        Ensure subscription queues exist on a multicast address.
+
+        Attaches and detaches a receiver on each fully qualified queue name
+        (``address::queue``), which makes the broker auto-create the queue.
+        Messages published to the address afterwards are copied to every
+        subscription, even though no consumer is attached yet.
+
+        Args:
+            address: Multicast address the sender will publish to
+            queues: Subscription queue names to create
+            timeout: Connection and link attach timeout in seconds
+        """
+        from proton.utils import BlockingConnection
+
+        connection = BlockingConnection(self.config.url, timeout=timeout, sasl_enabled=False)
+        try:
+            for queue in queues:
+                connection.create_receiver(f"{address}::{queue}", credit=0).close()
+        finally:
+            connection.close()
+
     def get_logs(self) -> str:
         """Get broker logs for debugging."""
         try:
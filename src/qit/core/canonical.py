@@ -0,0 +1,261 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+Canonical form and digests of typed values.
+
+Two values that MessageComparator considers equal have the same canonical
+form, so shims can report a hash instead of the value. The algorithm is
+part of the shim contract (see docs/SHIM_HOWTO.md); the Python shim carries
+its own copy.
+
+Canonical form, by type:
+
+- float/double: bit pattern as lowercase zero-padded hex (``0x3f800000``)
+- binary: lowercase hex without ``0x`` or spaces
+- uuid: lowercase string
+- string/symbol: string; boolean: bool; integer types, char, timestamp: int
+- list: ``[[type, canonical], ...]``
+- map: pairs ``[[ktype, kcanon], [vtype, vcanon]]`` sorted by canonical JSON
+- array: ``{"element_type": t, "elements": [canonical, ...]}``
+- described: ``{"descriptor": [t, canon], "value": [t, canon]}``
+
+Values that cannot be normalized keep an ``{"invalid": repr}`` marker, so
+they never hash equal to a valid value. The comparator never finds them
+equal either, even to an identical value, so expected_hash() gives them
+INVALID_HASH, which no message hash matches.
+"""
+
+import hashlib
+import json
+from collections.abc import Iterable
+from typing import Any
+
+INTEGER_TYPES = frozenset({
+    "ubyte", "ushort", "uint", "ulong",
+    "byte", "short", "int", "long",
+    "timestamp", "char",
+})
+FLOAT_WIDTHS = {"float": 8, "double": 16}
+COMPOUND_TYPES = frozenset({"list", "map", "array", "described"})
+
+# Stack marker: sort a map's canonical pairs once they are complete
+_SORT = object()
+
+# Expected hash of a value with an invalid marker; never a SHA-256 hex
+INVALID_HASH = "invalid"
+
+
+def canonical_json(value: Any) -> str:
+    """
+    Serialize a canonical value deterministically.
+
+    Values nested deeper than the json encoder can recurse are serialized
+    with an explicit stack, to the same text.
+    """
+    try:
+        return _dumps(value)
+    except RecursionError:
+        return _dumps_iterative(value)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _dumps_iterative(value: Any) -> str:
+    parts: list[str] = []
+    # (is_text, item): text is emitted as is, other items are serialized
+    stack: list[tuple[bool, Any]] = [(False, value)]
+    while stack:
+        is_text, item = stack.pop()
+        if is_text:
+            parts.append(item)
+        elif isinstance(item, (list, tuple)):
+            parts.append("[")
+            stack.append((True, "]"))
+            for i in range(len(item) - 1, -1, -1):
+                stack.append((False, item[i]))
+                if i:
+                    stack.append((True, ","))
+        elif isinstance(item, dict):
+            parts.append("{")
+            stack.append((True, "}"))
+            keys = sorted(item)
+            for i in range(len(keys) - 1, -1, -1):
+                stack.append((False, item[keys[i]]))
+                stack.append((True, _dumps(keys[i]) + ":"))
+                if i:
+                    stack.append((True, ","))
+        else:
+            parts.append(_dumps(item))
+    return "".join(parts)
+
+
+def float_bits(value: Any) -> int | None:
+    """Float/double bit pattern from an int or hex/decimal string, else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        s = value.strip()
+        try:
+            if s.startswith("0x") or s.startswith("0X"):
+                return int(s, 16)
+            return int(s)
+        except ValueError:
+            return None
+    return None
+
+
+def normalize_hex(value: Any) -> str:
+    """Lowercase hex string without ``0x`` or spaces."""
+    if isinstance(value, bytes):
+        return value.hex().lower()
+    if isinstance(value, str):
+        s = value.replace(" ", "").lower()
+        if s.startswith("0x"):
+            s = s[2:]
+        return s
+    return str(value).lower()
+
+
+def canonical_value(amqp_type: str, value: Any) -> Any:
+    """
+    Canonical form of a value of the given AMQP type.
+
+    Nested values are walked with an explicit stack rather than by
+    recursion, so deep values do not hit the Python recursion limit.
+    """
+    root: list[Any] = [None]
+    stack: list[tuple[Any, ...]] = [(amqp_type, value, root, 0)]
+    while stack:
+        task = stack.pop()
+        if task[0] is _SORT:
+            # Runs after all of the map's pairs were filled in
+            if len(task[1]) > 1:
+                task[1].sort(key=canonical_json)
+            continue
+        elem_type, elem_value, target, slot = task
+        target[slot] = _canonical_step(elem_type, elem_value, stack)
+    return root[0]
+
+
+def _canonical_step(amqp_type: str, value: Any, stack: list[tuple[Any, ...]]) -> Any:
+    """
+    Canonical form of one value; nested values are pushed onto the stack.
+
+    The returned container holds placeholders that the pushed tasks fill.
+    Tasks are only pushed once the whole value is known to be well formed,
+    so an invalid value never leaves work behind.
+    """
+    if value is None:
+        return None
+    try:
+        if amqp_type not in COMPOUND_TYPES:
+            return _canonical_leaf(amqp_type, value)
+
+        tasks: list[tuple[Any, ...]] = []
+        result: Any
+        if amqp_type == "list":
+            result = [_pending_element(elem, tasks) for elem in value]
+        elif amqp_type == "map":
+            result = [[_pending_element(k, tasks), _pending_element(v, tasks)] for k, v in value]
+            stack.append((_SORT, result))
+        elif amqp_type == "array":
+            elem_type = value["element_type"]
+            elements = list(value.get("elements", []))
+            if elem_type in COMPOUND_TYPES:
+                canonical = [None] * len(elements)
+                tasks.extend((elem_type, e, canonical, i) for i, e in enumerate(elements))
+            else:
+                canonical = [_canonical_step(elem_type, e, stack) for e in elements]
+            result = {"element_type": elem_type, "elements": canonical}
+        else:
+            result = {
+                "descriptor": _pending_element(value["descriptor"], tasks),
+                "value": _pending_element(value["value"], tasks),
+            }
+        stack.extend(tasks)
+        return result
+    except (TypeError, ValueError, KeyError, IndexError, AttributeError):
+        return {"invalid": repr(value)}
+
+
+def _canonical_leaf(amqp_type: str, value: Any) -> Any:
+    if amqp_type in INTEGER_TYPES:
+        return int(value)
+    if amqp_type in ("string", "symbol"):
+        return str(value)
+    if amqp_type in FLOAT_WIDTHS:
+        bits = float_bits(value)
+        if bits is None:
+            return {"invalid": repr(value)}
+        return f"0x{bits:0{FLOAT_WIDTHS[amqp_type]}x}"
+    if amqp_type == "binary":
+        return normalize_hex(value)
+    if amqp_type == "uuid":
+        return str(value).lower()
+    if amqp_type == "boolean":
+        return bool(value)
+    return value
+
+
+def _pending_element(element: Any, tasks: list[tuple[Any, ...]]) -> list[Any]:
+    """Typed element ``[type, <pending>]`` whose value a queued task fills."""
+    if not isinstance(element, list) or len(element) != 2:
+        return ["invalid", repr(element)]
+    result = [element[0], None]
+    tasks.append((element[0], element[1], result, 1))
+    return result
+
+
+def canonical_element(element: Any) -> list[Any]:
+    """Canonical form of a typed element ``["type", value]``."""
+    if not isinstance(element, list) or len(element) != 2:
+        return ["invalid", repr(element)]
+    return [element[0], canonical_value(element[0], element[1])]
+
+
+def message_hash(amqp_type: str, value: Any) -> str:
+    """SHA-256 hex digest of a message's canonical ``[type, value]``."""
+    encoded = canonical_json([amqp_type, canonical_value(amqp_type, value)]).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def expected_hash(amqp_type: str, value: Any) -> str:
+    """Hash a received message must have to match, or INVALID_HASH for invalid values."""
+    canonical = canonical_json([amqp_type, canonical_value(amqp_type, value)])
+    if has_invalid(canonical):
+        return INVALID_HASH
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def has_invalid(canonical: str) -> bool:
+    """Whether canonical JSON holds an invalid marker (string contents escape their quotes)."""
+    return '{"invalid":' in canonical or '["invalid",' in canonical
+
+
+def messages_digest(messages: Iterable[tuple[str, Any]]) -> str:
+    """SHA-256 hex digest over the concatenated message hashes, in index order."""
+    digest = hashlib.sha256()
+    for amqp_type, value in messages:
+        digest.update(message_hash(amqp_type, value).encode("ascii"))
+    return digest.hexdigest()
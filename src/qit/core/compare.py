@@ -0,0 +1,251 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+Run-to-run comparison.
+
+Compares the export rows of two runs (e.g. before and after a client
+library upgrade): case status transitions, median duration changes per
+shim pair and per type beyond a noise threshold, and per-shim throughput.
+"""
+
+import statistics
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+# Defaults for telling timing changes from noise
+NOISE_RATIO = 0.2
+NOISE_MIN_MS = 20.0
+
+# Statuses that count as a case working
+_OK_STATUSES = ("pass", "xfail", "not_run")
+
+CaseKey = tuple[str, str, str]
+
+
+@dataclass
+class StatusChange:
+    """A case whose outcome differs between the runs."""
+
+    sender: str
+    receiver: str
+    amqp_type: str
+    before: str
+    after: str
+
+    @property
+    def regression(self) -> bool:
+        return self.after == "fail" and self.before in _OK_STATUSES
+
+
+@dataclass
+class TimingChange:
+    """Median case duration of a shim pair or a type in both runs."""
+
+    scope: str  # "pair" or "type"
+    name: str
+    before_ms: float
+    after_ms: float
+
+    @property
+    def ratio(self) -> float:
+        return self.after_ms / self.before_ms if self.before_ms else float("inf")
+
+
+@dataclass
+class Throughput:
+    """Messages and payload bytes a shim moved per second of send or receive time."""
+
+    messages_per_s: float
+    bytes_per_s: float
+
+
+@dataclass
+class ThroughputChange:
+    """Throughput of one shim in one role in both runs."""
+
+    shim: str
+    role: str  # "sender" or "receiver"
+    before: Throughput
+    after: Throughput
+
+    @property
+    def ratio(self) -> float:
+        if not self.before.messages_per_s:
+            return float("inf")
+        return self.after.messages_per_s / self.before.messages_per_s
+
+
+@dataclass
+class RunComparison:
+    """Differences between run A (before) and run B (after)."""
+
+    status_changes: list[StatusChange] = field(default_factory=list)
+    new_xpasses: list[CaseKey] = field(default_factory=list)
+    added: list[CaseKey] = field(default_factory=list)
+    removed: list[CaseKey] = field(default_factory=list)
+    timing_changes: list[TimingChange] = field(default_factory=list)
+    throughput: list[ThroughputChange] = field(default_factory=list)
+    ratio: float = NOISE_RATIO
+
+    @property
+    def status_regressions(self) -> list[StatusChange]:
+        return [c for c in self.status_changes if c.regression]
+
+    @property
+    def slowdowns(self) -> list[TimingChange]:
+        return [c for c in self.timing_changes if c.ratio > 1]
+
+    @property
+    def throughput_drops(self) -> list[ThroughputChange]:
+        return [c for c in self.throughput if c.ratio < 1 - self.ratio]
+
+    def has_regressions(self, timing: bool = True) -> bool:
+        """True for cases that started failing, or (timing) slowdowns and throughput drops."""
+        if self.status_regressions:
+            return True
+        return timing and bool(self.slowdowns or self.throughput_drops)
+
+
+def compare_runs(
+    before: Iterable[dict[str, Any]],
+    after: Iterable[dict[str, Any]],
+    ratio: float = NOISE_RATIO,
+    min_delta_ms: float = NOISE_MIN_MS,
+) -> RunComparison:
+    """
+    Compare the export rows of two runs.
+
+    Args:
+        before: Rows of run A
+        after: Rows of run B
+        ratio: Timing changes smaller than this fraction are noise...
+        min_delta_ms: ...as are changes smaller than this many milliseconds
+
+    Returns:
+        Status changes of all cases; timing and throughput over the cases
+        both runs actually ran
+    """
+    rows_a = _by_case(before)
+    rows_b = _by_case(after)
+    result = RunComparison(
+        added=sorted(rows_b.keys() - rows_a.keys()),
+        removed=sorted(rows_a.keys() - rows_b.keys()),
+        ratio=ratio,
+    )
+
+    common = sorted(rows_a.keys() & rows_b.keys())
+    for key in common:
+        a, b = rows_a[key], rows_b[key]
+        if a["status"] != b["status"]:
+            result.status_changes.append(StatusChange(*key, a["status"], b["status"]))
+        if b.get("xpass") and not a.get("xpass"):
+            result.new_xpasses.append(key)
+
+    timed = [k for k in common if rows_a[k]["status"] != "not_run" and rows_b[k]["status"] != "not_run"]
+    for scope, group_of in (("pair", lambda k: f"{k[0]} → {k[1]}"), ("type", lambda k: k[2])):
+        for name, before_ms, after_ms in _medians(timed, group_of, rows_a, rows_b):
+            delta = after_ms - before_ms
+            if abs(delta) >= min_delta_ms and abs(delta) > ratio * before_ms:
+                result.timing_changes.append(TimingChange(scope, name, before_ms, after_ms))
+    result.timing_changes.sort(key=lambda c: (c.scope, -c.ratio))
+
+    for role, phase in (("sender", "send_ms"), ("receiver", "receive_ms")):
+        shim_index = 0 if role == "sender" else 1
+        for shim in sorted({k[shim_index] for k in timed}):
+            keys = [k for k in timed if k[shim_index] == shim]
+            tp_a = _throughput([rows_a[k] for k in keys], phase)
+            tp_b = _throughput([rows_b[k] for k in keys], phase)
+            if tp_a is not None and tp_b is not None:
+                result.throughput.append(ThroughputChange(shim, role, tp_a, tp_b))
+    return result
+
+
+def format_comparison(comparison: RunComparison, label_a: str, label_b: str) -> str:
+    """Human-readable listing of a comparison."""
+    lines = [f"Comparing {label_a} (A) → {label_b} (B)", ""]
+
+    lines.append(f"Status changes ({len(comparison.status_changes)}, "
+                 f"{len(comparison.status_regressions)} regression(s)):")
+    for sc in comparison.status_changes:
+        marker = "✗" if sc.regression else "•"
+        lines.append(f"  {marker} {sc.sender} → {sc.receiver} ({sc.amqp_type}): {sc.before} → {sc.after}")
+    for sender, receiver, amqp_type in comparison.new_xpasses:
+        lines.append(f"  • {sender} → {receiver} ({amqp_type}): xfail → xpass")
+    if comparison.added or comparison.removed:
+        lines.append(f"  {len(comparison.added)} case(s) only in B, {len(comparison.removed)} only in A")
+    lines.append("")
+
+    lines.append(f"Timing changes beyond noise ({len(comparison.timing_changes)}):")
+    for tc in comparison.timing_changes:
+        marker = "✗" if tc.ratio > 1 else "•"
+        lines.append(f"  {marker} {tc.scope} {tc.name}: median {tc.before_ms:.1f} ms → {tc.after_ms:.1f} ms "
+                     f"({tc.ratio:.2f}x)")
+    lines.append("")
+
+    lines.append("Throughput per shim (messages/s, KiB/s):")
+    for tp in comparison.throughput:
+        marker = "✗" if tp in comparison.throughput_drops else " "
+        lines.append(
+            f"  {marker} {tp.shim} as {tp.role}: "
+            f"{tp.before.messages_per_s:.1f} → {tp.after.messages_per_s:.1f} msg/s, "
+            f"{tp.before.bytes_per_s / 1024:.1f} → {tp.after.bytes_per_s / 1024:.1f} KiB/s ({tp.ratio:.2f}x)"
+        )
+    return "\n".join(lines)
+
+
+def _by_case(rows: Iterable[dict[str, Any]]) -> dict[CaseKey, dict[str, Any]]:
+    return {(row["sender"], row["receiver"], row["type"]): row for row in rows}
+
+
+def _medians(
+    keys: list[CaseKey],
+    group_of: Callable[[CaseKey], str],
+    rows_a: dict[CaseKey, dict[str, Any]],
+    rows_b: dict[CaseKey, dict[str, Any]],
+) -> list[tuple[str, float, float]]:
+    """(group, median duration in A, median duration in B) per group of cases."""
+    groups: dict[str, list[CaseKey]] = {}
+    for key in keys:
+        groups.setdefault(group_of(key), []).append(key)
+    return [
+        (
+            name,
+            statistics.median(rows_a[k]["duration_ms"] for k in members),
+            statistics.median(rows_b[k]["duration_ms"] for k in members),
+        )
+        for name, members in groups.items()
+    ]
+
+
+def _throughput(rows: list[dict[str, Any]], phase: str) -> Throughput | None:
+    """Throughput over the phase time of rows; roundtrips count for both roles."""
+    messages = payload = 0
+    seconds = 0.0
+    for row in rows:
+        ms = row.get(phase) if row.get(phase) is not None else row.get("roundtrip_ms")
+        if ms is None:
+            continue
+        messages += row.get("messages") or 0
+        payload += row.get("payload_bytes") or 0
+        seconds += ms / 1000
+    if seconds <= 0:
+        return None
+    return Throughput(messages / seconds, payload / seconds)
@@ -24,11 +24,41 @@ Compares sent and received messages, accounting for AMQP type-specific
 comparison rules.
 """
 
+import functools
+import operator
+import threading
+from collections import Counter
+from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Any
 
+from qit.core import vectorized
+from qit.core.canonical import (
+    COMPOUND_TYPES,
+    INTEGER_TYPES,
+    canonical_element,
+    canonical_json,
+    float_bits,
+    has_invalid,
+    normalize_hex,
+)
+from qit.core.canonical import expected_hash as canonical_expected_hash
 from qit.core.shim import Message
 
+# Normalized form of a value that never compares equal to anything
+_INVALID = object()
+
+# Errors raised by normalizers/matchers on malformed values
+_VALUE_ERRORS = (TypeError, ValueError, KeyError, IndexError, AttributeError)
+
+Matcher = Callable[[Any, Any], bool]
+ElementsMatcher = Callable[[list[Any], list[Any], int], list[int]]
+CompoundNormalizer = Callable[[Any, list[tuple[Any, ...]]], Any]
+CompoundMatcher = Callable[[Any, Any, list[tuple[Any, ...]]], bool]
+
+# Mismatching array elements listed in a diff message
+MAX_REPORTED_ELEMENTS = 10
+
 
 @dataclass
 class MessageDiff:
@@ -41,17 +71,99 @@ class MessageDiff:
     message: str
 
 
+@dataclass
+class ExpectedValues:
+    """The sent values of one (type, test_values), normalized once for all receivers."""
+
+    amqp_type: str
+    values: list[Any]
+    normalized: list[Any]
+    hashes: list[str]
+
+
 class MessageComparator:
     """Compares AMQP messages for equality."""
 
+    def __init__(self) -> None:
+        # Per type: turn an expected value into its normalized form once ...
+        self._normalizers: dict[str, Callable[[Any], Any]] = {
+            **dict.fromkeys(INTEGER_TYPES, int),
+            "float": self._normalize_float,
+            "double": self._normalize_float,
+            "binary": normalize_hex,
+            "uuid": lambda v: str(v).lower(),
+            "string": str,
+            "symbol": str,
+            "boolean": bool,
+        }
+        # ... and match a normalized expected value against a received value
+        self._matchers: dict[str, Matcher] = {
+            **{t: lambda e, a: e == int(a) for t in INTEGER_TYPES},
+            "float": lambda e, a: e == float_bits(a),
+            "double": lambda e, a: e == float_bits(a),
+            "binary": lambda e, a: e == normalize_hex(a),
+            "uuid": lambda e, a: e == str(a).lower(),
+            "string": lambda e, a: e == str(a),
+            "symbol": lambda e, a: e == str(a),
+            "boolean": lambda e, a: e == bool(a),
+        }
+        # Complex types push their nested values onto an explicit stack
+        # instead of recursing, so nesting depth is not bounded by the
+        # Python recursion limit
+        self._compound_normalizers: dict[str, CompoundNormalizer] = {
+            "array": self._normalize_array,
+            "list": self._normalize_list,
+            "map": self._normalize_map,
+            "described": self._normalize_described,
+        }
+        self._compound_matchers: dict[str, CompoundMatcher] = {
+            "array": self._match_array,
+            "list": self._match_list,
+            "map": self._match_map,
+            "described": self._match_described,
+        }
+        self._element_matchers: dict[str, ElementsMatcher] = {}
+        self._expected: dict[tuple[str, int], ExpectedValues] = {}
+        self._lock = threading.Lock()
+
+    def expected_values(self, amqp_type: str, values: list[Any]) -> ExpectedValues:
+        """
+        Normalized values and hashes for a type's test values.
+
+        Cached per (type, values list), so every receiver in the matrix
+        compares against the same precomputed expected side.
+        """
+        key = (amqp_type, id(values))
+        cached = self._expected.get(key)
+        if cached is not None and cached.values is values:
+            return cached
+
+        serialized = [Message(i, amqp_type, v).to_dict()["value"] for i, v in enumerate(values)]
+        expected = ExpectedValues(
+            amqp_type=amqp_type,
+            values=values,
+            normalized=[self._normalize(amqp_type, v) for v in serialized],
+            hashes=[canonical_expected_hash(amqp_type, v) for v in serialized],
+        )
+        with self._lock:
+            self._expected[key] = expected
+        return expected
+
     def compare_messages(
         self,
         sent: list[Message],
         received: list[Message],
+        expected: ExpectedValues | None = None,
     ) -> list[MessageDiff]:
         """
         Compare sent and received message lists.
 
+        Args:
+            sent: Sent messages
+            received: Received messages
+            expected: Precomputed form of the sent values, when the sent
+                messages are the orchestrator's own copy of the test values
+
         Returns:
             List of differences found (empty if messages match)
         """
@@ -75,12 +187,23 @@ class MessageComparator:
 
         # Compare each message
         for i in range(min_len):
-            msg_diffs = self._compare_message(sent[i], received[i])
+            if expected is not None:
+                msg_diffs = self._compare_message(
+                    sent[i], received[i], expected.normalized[i], expected.hashes[i],
+                )
+            else:
+                msg_diffs = self._compare_message(sent[i], received[i])
             diffs.extend(msg_diffs)
 
         return diffs
 
-    def _compare_message(self, sent: Message, received: Message) -> list[MessageDiff]:
+    def _compare_message(
+        self,
+        sent: Message,
+        received: Message,
+        normalized: Any = _INVALID,
+        expected_hash: str | None = None,
+    ) -> list[MessageDiff]:
         """Compare a single sent/received message pair."""
         diffs: list[MessageDiff] = []
 
@@ -96,15 +219,42 @@ class MessageComparator:
                 )
             )
 
+        # Receivers reporting hashes omit values that matched; compare the
+        # full value only when the hashes differ
+        if received.hash is not None:
+            if expected_hash is None:
+                expected_hash = canonical_expected_hash(sent.amqp_type, sent.value)
+            if received.hash == expected_hash:
+                return diffs
+
+        if not received.has_value:
+            diffs.append(
+                MessageDiff(
+                    index=sent.index,
+                    field="value",
+                    expected=sent.value,
+                    actual=f"<sha256:{received.hash}>",
+                    message=f"Message {sent.index}: value hash mismatch for type {sent.amqp_type}",
+                )
+            )
+            return diffs
+
         # Check value matches (type-specific comparison)
-        if not self._values_equal(sent.amqp_type, sent.value, received.value):
+        if normalized is _INVALID:
+            normalized = self._normalize(sent.amqp_type, sent.value)
+        if not self._match(sent.amqp_type, normalized, received.value):
+            message = f"Message {sent.index}: value mismatch for type {sent.amqp_type}"
+            if sent.amqp_type == "array" and normalized is not _INVALID:
+                indices = self._array_mismatches(normalized, received.value, MAX_REPORTED_ELEMENTS)
+                if indices:
+                    message += f" at element(s) {', '.join(map(str, indices))}"
             diffs.append(
                 MessageDiff(
                     index=sent.index,
                     field="value",
                     expected=sent.value,
                     actual=received.value,
-                    message=f"Message {sent.index}: value mismatch for type {sent.amqp_type}",
+                    message=message,
                 )
             )
 
@@ -118,116 +268,265 @@ class MessageComparator:
         - Float/double representation (hex vs decimal)
         - Binary data (hex string vs bytes)
         - String encodings
-        - Recursive comparison for complex types (array, list, map, described)
+        - Nested comparison for complex types (array, list, map, described)
         """
-        # Handle None/null
-        if expected is None and actual is None:
-            return True
-        if expected is None or actual is None:
-            return False
+        return self._match(amqp_type, self._normalize(amqp_type, expected), actual)
+
+    def _normalize(self, amqp_type: str, value: Any) -> Any:
+        """Normalized form of an expected value (None stays None)."""
+        root: list[Any] = [None]
+        stack: list[tuple[Any, ...]] = [(amqp_type, value, root, 0)]
+        while stack:
+            elem_type, elem_value, target, slot = stack.pop()
+            target[slot] = self._normalize_step(elem_type, elem_value, stack)
+        return root[0]
+
+    def _normalize_step(self, amqp_type: str, value: Any, stack: list[tuple[Any, ...]]) -> Any:
+        """Normalize one value; nested values are pushed as (type, value, target, slot) tasks."""
+        if value is None:
+            return None
+        try:
+            compound = self._compound_normalizers.get(amqp_type)
+            if compound is not None:
+                tasks: list[tuple[Any, ...]] = []
+                result = compound(value, tasks)
+                # Only well-formed values queue their nested values
+                stack.extend(tasks)
+                return result
+            normalizer = self._normalizers.get(amqp_type)
+            return value if normalizer is None else normalizer(value)
+        except _VALUE_ERRORS:
+            return _INVALID
+
+    def _match(self, amqp_type: str, expected: Any, actual: Any) -> bool:
+        """Match a normalized expected value against a received value."""
+        stack: list[tuple[Any, ...]] = [(amqp_type, expected, actual)]
+        while stack:
+            elem_type, exp, act = stack.pop()
+            if exp is None or act is None:
+                if exp is None and act is None:
+                    continue
+                return False
+            if exp is _INVALID:
+                return False
+            try:
+                compound = self._compound_matchers.get(elem_type)
+                if compound is not None:
+                    # Pushes the nested values still to be matched
+                    equal = compound(exp, act, stack)
+                else:
+                    equal = self._matchers.get(elem_type, operator.eq)(exp, act)
+            except _VALUE_ERRORS:
+                return False
+            if not equal:
+                return False
+        return True
 
-        # Complex types — recursive comparison
-        if amqp_type == "array":
-            return self._compare_array(expected, actual)
-        if amqp_type == "list":
-            return self._compare_list(expected, actual)
-        if amqp_type == "map":
-            return self._compare_map(expected, actual)
-        if amqp_type == "described":
-            return self._compare_described(expected, actual)
-
-        # Floating point - compare hex representations for exactness
-        if amqp_type in ("float", "double"):
-            return self._compare_float(expected, actual)
-
-        # Binary - compare hex representations
-        if amqp_type == "binary":
-            return self._normalize_hex(expected) == self._normalize_hex(actual)
-
-        # UUID - normalize string representation
-        if amqp_type == "uuid":
-            return str(expected).lower() == str(actual).lower()
-
-        # String/symbol - direct comparison
-        if amqp_type in ("string", "symbol"):
-            return str(expected) == str(actual)
-
-        # Boolean
-        if amqp_type == "boolean":
-            return bool(expected) == bool(actual)
-
-        # Numeric types - direct comparison
-        if amqp_type in (
-            "ubyte",
-            "ushort",
-            "uint",
-            "ulong",
-            "byte",
-            "short",
-            "int",
-            "long",
-            "timestamp",
-            "char",
-        ):
-            return int(expected) == int(actual)
-
-        # Fallback to equality
-        return expected == actual
-
-    def _compare_typed_element(self, expected: list, actual: list) -> bool:
-        """Compare two typed elements: ["type", value]."""
-        if not isinstance(expected, list) or len(expected) != 2:
+    def _normalize_float(self, value: Any) -> Any:
+        bits = float_bits(value)
+        return _INVALID if bits is None else bits
+
+    # Typed elements ["type", value] normalize to ["type", normalized]
+
+    @staticmethod
+    def _pending_element(element: Any, tasks: list[tuple[Any, ...]]) -> Any:
+        """Normalized typed element whose value a queued task fills in."""
+        if not isinstance(element, list) or len(element) != 2:
+            return _INVALID
+        result = [element[0], None]
+        tasks.append((element[0], element[1], result, 1))
+        return result
+
+    @staticmethod
+    def _push_element(expected: Any, actual: Any, stack: list[tuple[Any, ...]]) -> bool:
+        """Check a typed element's type and queue its value for matching."""
+        if expected is _INVALID:
             return False
         if not isinstance(actual, list) or len(actual) != 2:
             return False
         if expected[0] != actual[0]:
             return False
-        return self._values_equal(expected[0], expected[1], actual[1])
+        stack.append((expected[0], expected[1], actual[1]))
+        return True
 
-    def _compare_array(self, expected: Any, actual: Any) -> bool:
-        """Compare array values: {"element_type": str, "elements": [...]}."""
-        if not isinstance(expected, dict) or not isinstance(actual, dict):
+    def _match_element(self, expected: Any, actual: Any) -> bool:
+        stack: list[tuple[Any, ...]] = []
+        return self._push_element(expected, actual, stack) and self._match(*stack.pop())
+
+    def _normalize_array(self, value: Any, tasks: list[tuple[Any, ...]]) -> Any:
+        """Array: {"element_type": str, "elements": [...]} -> (type, [normalized], packed)."""
+        if not isinstance(value, dict):
+            return _INVALID
+        elem_type = value.get("element_type")
+        if not isinstance(elem_type, str):
+            return _INVALID
+        elements = list(value.get("elements", []))
+        if elem_type in COMPOUND_TYPES:
+            normalized: list[Any] = [None] * len(elements)
+            tasks.extend((elem_type, e, normalized, i) for i, e in enumerate(elements))
+            return (elem_type, normalized, None)
+        normalized = [self._normalize_step(elem_type, e, tasks) for e in elements]
+        return (elem_type, normalized, vectorized.pack(elem_type, normalized))
+
+    def _match_array(self, expected: Any, actual: Any, stack: list[tuple[Any, ...]]) -> bool:
+        elem_type = expected[0]
+        if elem_type not in COMPOUND_TYPES:
+            return self._array_mismatches(expected, actual, limit=1) == []
+        if not isinstance(actual, dict) or actual.get("element_type") != elem_type:
             return False
-        if expected.get("element_type") != actual.get("element_type"):
-            return False
-        exp_elems = expected.get("elements", [])
         act_elems = actual.get("elements", [])
-        if len(exp_elems) != len(act_elems):
+        if len(expected[1]) != len(act_elems):
             return False
-        elem_type = expected["element_type"]
-        for e, a in zip(exp_elems, act_elems):
-            if not self._values_equal(elem_type, e, a):
-                return False
+        stack.extend((elem_type, e, a) for e, a in zip(expected[1], act_elems, strict=True))
         return True
 
-    def _compare_list(self, expected: Any, actual: Any) -> bool:
-        """Compare list values: [["type", value], ...]."""
-        if not isinstance(expected, list) or not isinstance(actual, list):
+    def _array_mismatches(self, expected: Any, actual: Any, limit: int) -> list[int] | None:
+        """
+        Indices of the first mismatching array elements.
+
+        Returns None if the arrays differ in element type or length.
+        Large numeric arrays are compared with NumPy when it is installed.
+        """
+        if not isinstance(actual, dict):
+            return None
+        elem_type, exp_elems, packed = expected
+        if actual.get("element_type") != elem_type:
+            return None
+        act_elems = actual.get("elements", [])
+        if len(exp_elems) != len(act_elems):
+            return None
+        if packed is not None:
+            indices = vectorized.first_mismatches(elem_type, packed, act_elems, limit)
+            if indices is not None:
+                return indices
+        return self._elements_matcher(elem_type)(exp_elems, act_elems, limit)
+
+    def _elements_matcher(self, elem_type: str) -> ElementsMatcher:
+        """Compiled matcher for the elements of an array of elem_type (cached)."""
+        compiled = self._element_matchers.get(elem_type)
+        if compiled is not None:
+            return compiled
+
+        match: Matcher
+        if elem_type in COMPOUND_TYPES:
+            match = functools.partial(self._match, elem_type)
+        else:
+            match = self._matchers.get(elem_type, operator.eq)
+
+        def match_elements(expected: list[Any], actual: list[Any], limit: int) -> list[int]:
+            mismatches: list[int] = []
+            for i, (e, a) in enumerate(zip(expected, actual, strict=True)):
+                if e is None or a is None:
+                    equal = e is a
+                elif e is _INVALID:
+                    equal = False
+                else:
+                    try:
+                        equal = match(e, a)
+                    except _VALUE_ERRORS:
+                        equal = False
+                if not equal:
+                    mismatches.append(i)
+                    if len(mismatches) >= limit:
+                        break
+            return mismatches
+
+        self._element_matchers[elem_type] = match_elements
+        return match_elements
+
+    def _normalize_list(self, value: Any, tasks: list[tuple[Any, ...]]) -> Any:
+        """List: [["type", value], ...] -> [["type", normalized], ...]."""
+        if not isinstance(value, list):
+            return _INVALID
+        return [self._pending_element(e, tasks) for e in value]
+
+    def _match_list(self, expected: Any, actual: Any, stack: list[tuple[Any, ...]]) -> bool:
+        if not isinstance(actual, list) or len(expected) != len(actual):
             return False
-        if len(expected) != len(actual):
+        return all(self._push_element(e, a, stack) for e, a in zip(expected, actual, strict=True))
+
+    def _normalize_map(self, value: Any, tasks: list[tuple[Any, ...]]) -> Any:
+        """Map: [canonical keys (computed on first match), normalized pairs, value]."""
+        if not isinstance(value, list):
+            return _INVALID
+        pairs = [
+            (self._pending_element(pair[0], tasks), self._pending_element(pair[1], tasks))
+            if isinstance(pair, list) and len(pair) == 2 else (_INVALID, _INVALID)
+            for pair in value
+        ]
+        return [None, pairs, value]
+
+    def _match_map(self, expected: Any, actual: Any, stack: list[tuple[Any, ...]]) -> bool:
+        """Match maps as unordered sets of typed key-value pairs."""
+        exp_keys, exp_pairs, exp_value = expected
+        if not isinstance(actual, list) or len(exp_pairs) != len(actual):
             return False
-        for e, a in zip(expected, actual):
-            if not self._compare_typed_element(e, a):
-                return False
-        return True
+        if exp_keys is None:
+            exp_keys = expected[0] = [self._map_key(pair) for pair in exp_value]
+
+        # Maps are unordered — pair entries up by the canonical form of
+        # their key in O(n), then match the values on the stack
+        buckets: dict[str, list[Any]] = {}
+        unmatched_actual: list[Any] = []
+        for act_pair in actual:
+            key = self._map_key(act_pair)
+            if key is None:
+                unmatched_actual.append(act_pair)
+            else:
+                buckets.setdefault(key, []).append(act_pair)
+
+        key_counts = Counter(exp_keys)
+        unmatched_expected: list[Any] = []
+        for key, exp_pair in zip(exp_keys, exp_pairs, strict=True):
+            bucket = buckets.get(key) if key is not None else None
+            if bucket and len(bucket) == 1 and key_counts[key] == 1:
+                act_pair = bucket.pop()
+                if not self._push_element(exp_pair[1], act_pair[1], stack):
+                    return False
+            else:
+                unmatched_expected.append(exp_pair)
+
+        if not unmatched_expected:
+            return True
 
-    def _compare_map(self, expected: Any, actual: Any) -> bool:
-        """Compare map values as unordered set of typed key-value pairs."""
-        if not isinstance(expected, list) or not isinstance(actual, list):
-            return False
+        # Duplicate keys, and pairs without a usable canonical key, go
+        # through the full type-aware comparison
+        for bucket in buckets.values():
+            unmatched_actual.extend(bucket)
+        if len(unmatched_expected) == 1 and len(unmatched_actual) == 1:
+            # Nothing to search: match the last pair on the stack
+            (exp_key, exp_val), act_pair = unmatched_expected[0], unmatched_actual[0]
+            return (
+                isinstance(act_pair, list) and len(act_pair) == 2
+                and self._push_element(exp_key, act_pair[0], stack)
+                and self._push_element(exp_val, act_pair[1], stack)
+            )
+        return self._match_pairs(unmatched_expected, unmatched_actual)
+
+    def _map_key(self, pair: Any) -> str | None:
+        """Canonical form of a map pair's key, or None if it has none."""
+        if not isinstance(pair, list) or len(pair) != 2:
+            return None
+        try:
+            key = canonical_json(canonical_element(pair[0]))
+        except (TypeError, ValueError, RecursionError):
+            return None
+        # Invalid keys never compare equal, even to an identical one
+        if has_invalid(key):
+            return None
+        return key
+
+    def _match_pairs(self, expected: list[Any], actual: list[Any]) -> bool:
+        """Match each normalized expected pair to a distinct equal actual pair (pairwise scan)."""
         if len(expected) != len(actual):
             return False
-        # Maps are unordered — match each expected pair to an actual pair
         used = [False] * len(actual)
-        for exp_pair in expected:
+        for exp_key, exp_value in expected:
             found = False
             for j, act_pair in enumerate(actual):
-                if used[j]:
+                if used[j] or not isinstance(act_pair, list) or len(act_pair) != 2:
                     continue
-                if (
-                    self._compare_typed_element(exp_pair[0], act_pair[0])
-                    and self._compare_typed_element(exp_pair[1], act_pair[1])
-                ):
+                if self._match_element(exp_key, act_pair[0]) and self._match_element(exp_value, act_pair[1]):
                     used[j] = True
                     found = True
                     break
@@ -235,46 +534,19 @@ class MessageComparator:
                 return False
         return True
 
-    def _compare_described(self, expected: Any, actual: Any) -> bool:
-        """Compare described values: {"descriptor": ["type", val], "value": ["type", val]}."""
-        if not isinstance(expected, dict) or not isinstance(actual, dict):
-            return False
-        if not self._compare_typed_element(expected["descriptor"], actual["descriptor"]):
-            return False
-        return self._compare_typed_element(expected["value"], actual["value"])
-
-    def _to_float_bits(self, value: Any) -> int | None:
-        """Normalize a float/double value to its integer bit-pattern."""
-        if isinstance(value, int):
-            return value
-        if isinstance(value, str):
-            s = value.strip()
-            if s.startswith("0x") or s.startswith("0X"):
-                return int(s, 16)
-            try:
-                return int(s)
-            except ValueError:
-                return None
-        return None
-
-    def _compare_float(self, expected: Any, actual: Any) -> bool:
-        """Compare floating point values by normalizing to integer bit-patterns."""
-        exp_bits = self._to_float_bits(expected)
-        act_bits = self._to_float_bits(actual)
-        if exp_bits is None or act_bits is None:
-            return False
-        return exp_bits == act_bits
+    def _normalize_described(self, value: Any, tasks: list[tuple[Any, ...]]) -> Any:
+        """Described: {"descriptor": [...], "value": [...]} -> normalized element pair."""
+        if not isinstance(value, dict):
+            return _INVALID
+        return (self._pending_element(value["descriptor"], tasks), self._pending_element(value["value"], tasks))
 
-    def _normalize_hex(self, value: Any) -> str:
-        """Normalize hex string representation."""
-        if isinstance(value, bytes):
-            return value.hex().lower()
-        if isinstance(value, str):
-            s = value.replace(" ", "").lower()
-            if s.startswith("0x"):
-                s = s[2:]
-            return s
-        return str(value).lower()
+    def _match_described(self, expected: Any, actual: Any, stack: list[tuple[Any, ...]]) -> bool:
+        if not isinstance(actual, dict):
+            return False
+        return (
+            self._push_element(expected[0], actual["descriptor"], stack)
+            and self._push_element(expected[1], actual["value"], stack)
+        )
 
     def format_diff_report(self, diffs: list[MessageDiff]) -> str:
         """Format differences as a human-readable report."""
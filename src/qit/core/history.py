@@ -0,0 +1,446 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+Local run history.
+
+A SQLite database keeps the rows of every recorded run (the same rows as
+the results export), indexed by case and by run. It answers how a case's
+duration trends over runs, what regressed against a baseline run, and
+which cases fail intermittently.
+"""
+
+import json
+import os
+import sqlite3
+import statistics
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+from qit.core.results import COLUMNS, decode_json_columns
+
+DEFAULT_HISTORY_DB = (
+    Path(os.environ.get("XDG_DATA_HOME", Path.home() / ".local" / "share")) / "qit" / "history.sqlite"
+)
+
+# Defaults for flakiness scoring
+FLAKE_WINDOW = 20
+FLAKE_MIN_RUNS = 3
+FLAKE_THRESHOLD = 0.05
+
+# Defaults for duration regressions: slower by this factor and this much
+SLOWDOWN_FACTOR = 1.5
+SLOWDOWN_MIN_MS = 50.0
+
+# Runs that dry-run estimates are based on
+ESTIMATE_WINDOW = 10
+
+# Statuses that count as a case working
+_OK_STATUSES = ("pass", "xfail")
+
+# Per-case columns of the results table (run_id and started live in runs)
+_RESULT_COLUMNS = [name for name in COLUMNS if name != "started"]
+
+_SQL_TYPES = {"string": "TEXT", "json": "TEXT", "int64": "INTEGER", "float64": "REAL"}
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    {", ".join(f"{name} {_SQL_TYPES[COLUMNS[name]]}" for name in _RESULT_COLUMNS)},
+    PRIMARY KEY (run_id, sender, receiver, type)
+);
+CREATE INDEX IF NOT EXISTS results_case ON results (sender, receiver, type);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+"""
+
+CaseKey = tuple[str, str, str]
+
+
+@dataclass
+class RunSummary:
+    """One recorded run."""
+
+    run_id: str
+    started: str
+    cases: int
+    failures: int
+
+
+@dataclass
+class TrendPoint:
+    """Durations of the selected cases in one run."""
+
+    run_id: str
+    started: str
+    cases: int
+    failures: int
+    median_ms: float
+    max_ms: float
+
+
+@dataclass
+class StatusRegression:
+    """A case that passed in a baseline run and fails in a later one."""
+
+    sender: str
+    receiver: str
+    amqp_type: str
+    baseline: str
+    current: str
+    kind: str = "status"
+
+
+@dataclass
+class DurationRegression:
+    """A case that got slower between a baseline run and a later one."""
+
+    sender: str
+    receiver: str
+    amqp_type: str
+    baseline: float
+    current: float
+    kind: str = "duration"
+
+    @property
+    def ratio(self) -> float:
+        return self.current / max(self.baseline, 1e-9)
+
+
+Regression = StatusRegression | DurationRegression
+
+
+@dataclass
+class FlakeScore:
+    """How often a case's outcome was unstable over recent runs."""
+
+    sender: str
+    receiver: str
+    amqp_type: str
+    runs: int
+    failures: int
+    reruns: int
+    rate: float
+
+
+class HistoryStore:
+    """SQLite store of recorded runs."""
+
+    def __init__(self, path: str | Path = DEFAULT_HISTORY_DB) -> None:
+        """
+        Args:
+            path: Database file, created if missing
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+            # Databases written by older versions lack newer export columns
+            existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(results)")}
+            for name in _RESULT_COLUMNS:
+                if name not in existing:
+                    self._conn.execute(f"ALTER TABLE results ADD COLUMN {name} {_SQL_TYPES[COLUMNS[name]]}")
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def record(self, rows: Iterable[dict[str, Any]]) -> int:
+        """
+        Store results-export rows, replacing rows of the same run and case.
+
+        Args:
+            rows: Rows as built by ResultRows or read from a JSON Lines export
+
+        Returns:
+            Number of rows stored
+        """
+        placeholders = ", ".join("?" for _ in _RESULT_COLUMNS)
+        insert = f"INSERT OR REPLACE INTO results ({', '.join(_RESULT_COLUMNS)}) VALUES ({placeholders})"
+        count = 0
+        with self._lock, self._conn:
+            runs: set[str] = set()
+            for row in rows:
+                if row["run_id"] not in runs:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO runs (run_id, started) VALUES (?, ?)",
+                        (row["run_id"], row["started"]),
+                    )
+                    runs.add(row["run_id"])
+                self._conn.execute(insert, [_sql_value(row.get(name)) for name in _RESULT_COLUMNS])
+                count += 1
+        return count
+
+    def runs(self, limit: int = 20) -> list[RunSummary]:
+        """The most recent runs, newest first."""
+        rows = self._query(
+            """
+            SELECT runs.run_id, runs.started, COUNT(results.run_id) AS cases,
+                   SUM(results.status = 'fail') AS failures
+            FROM runs LEFT JOIN results ON results.run_id = runs.run_id
+            GROUP BY runs.run_id ORDER BY runs.started DESC, runs.rowid DESC LIMIT ?
+            """,
+            (limit,),
+        )
+        return [RunSummary(r["run_id"], r["started"], r["cases"], r["failures"] or 0) for r in rows]
+
+    def run_rows(self, run_id: str) -> list[dict[str, Any]]:
+        """Rows of one run, in the results-export format."""
+        rows = self._query(
+            """
+            SELECT results.*, runs.started FROM results JOIN runs ON runs.run_id = results.run_id
+            WHERE results.run_id = ?
+            """,
+            (run_id,),
+        )
+        return [decode_json_columns(dict(row)) for row in rows]
+
+    def latest_run(self) -> str | None:
+        """Identifier of the most recently started run."""
+        runs = self.runs(limit=1)
+        return runs[0].run_id if runs else None
+
+    def trend(
+        self,
+        sender: str | None = None,
+        receiver: str | None = None,
+        amqp_type: str | None = None,
+        limit: int = 20,
+    ) -> list[TrendPoint]:
+        """
+        Case durations per run, oldest first.
+
+        Args:
+            sender: Only cases with this sender (default: all)
+            receiver: Only cases with this receiver (default: all)
+            amqp_type: Only cases of this type (default: all)
+            limit: Number of most recent runs to include
+
+        Returns:
+            One point per run that has matching cases
+        """
+        where, params = _case_filter(sender, receiver, amqp_type)
+        rows = self._query(
+            f"""
+            SELECT results.run_id, runs.started, results.status, results.duration_ms
+            FROM results JOIN runs ON runs.run_id = results.run_id
+            WHERE results.run_id IN (
+                SELECT run_id FROM runs ORDER BY started DESC, rowid DESC LIMIT ?
+            ) {where}
+            ORDER BY runs.started, runs.rowid
+            """,
+            (limit, *params),
+        )
+        by_run: dict[str, list[sqlite3.Row]] = {}
+        for row in rows:
+            by_run.setdefault(row["run_id"], []).append(row)
+        points = []
+        for run_id, run_rows in by_run.items():
+            durations = [r["duration_ms"] for r in run_rows if r["status"] != "not_run"] or [0.0]
+            points.append(TrendPoint(
+                run_id=run_id,
+                started=run_rows[0]["started"],
+                cases=len(run_rows),
+                failures=sum(1 for r in run_rows if r["status"] == "fail"),
+                median_ms=statistics.median(durations),
+                max_ms=max(durations),
+            ))
+        return points
+
+    def regressions(
+        self,
+        baseline: str,
+        run: str | None = None,
+        factor: float = SLOWDOWN_FACTOR,
+        min_delta_ms: float = SLOWDOWN_MIN_MS,
+    ) -> list[Regression]:
+        """
+        Cases that started failing or got slower since a baseline run.
+
+        Args:
+            baseline: Baseline run id
+            run: Run to check (default: the latest)
+            factor: A case is slower if its duration grew by this factor...
+            min_delta_ms: ...and by at least this many milliseconds
+
+        Returns:
+            Status regressions first, then slowdowns by growth
+        """
+        run = run or self.latest_run()
+        rows = self._query(
+            """
+            SELECT cur.sender, cur.receiver, cur.type,
+                   base.status AS base_status, cur.status AS cur_status,
+                   base.duration_ms AS base_ms, cur.duration_ms AS cur_ms
+            FROM results AS cur JOIN results AS base
+              ON base.sender = cur.sender AND base.receiver = cur.receiver AND base.type = cur.type
+            WHERE cur.run_id = ? AND base.run_id = ?
+            ORDER BY cur.sender, cur.receiver, cur.type
+            """,
+            (run, baseline),
+        )
+        status: list[Regression] = []
+        slower: list[DurationRegression] = []
+        for r in rows:
+            case = (r["sender"], r["receiver"], r["type"])
+            if r["base_status"] in _OK_STATUSES and r["cur_status"] == "fail":
+                status.append(StatusRegression(*case, r["base_status"], r["cur_status"]))
+            elif (
+                r["cur_status"] != "not_run" and r["base_status"] != "not_run"
+                and r["cur_ms"] > r["base_ms"] * factor
+                and r["cur_ms"] - r["base_ms"] >= min_delta_ms
+            ):
+                slower.append(DurationRegression(*case, r["base_ms"], r["cur_ms"]))
+        slower.sort(key=lambda reg: reg.ratio, reverse=True)
+        return status + slower
+
+    def flake_scores(
+        self,
+        window: int = FLAKE_WINDOW,
+        min_runs: int = FLAKE_MIN_RUNS,
+    ) -> list[FlakeScore]:
+        """
+        Flake rates of cases over the most recent runs, highest first.
+
+        A case is flaky when it both failed and worked within the window, or
+        needed reruns to pass. Its rate is the share of runs that failed or
+        passed only on rerun. Cases that always fail are not flaky.
+
+        Args:
+            window: Number of most recent runs to consider
+            min_runs: Cases recorded in fewer runs are not scored
+
+        Returns:
+            Scores of cases with a non-zero rate
+        """
+        rows = self._query(
+            """
+            SELECT sender, receiver, type,
+                   COUNT(*) AS runs,
+                   SUM(status = 'fail') AS failures,
+                   SUM(status IN ('pass', 'xfail') AND attempts > 1) AS reruns,
+                   SUM(status IN ('pass', 'xfail') AND attempts <= 1) AS clean
+            FROM results
+            WHERE status != 'not_run' AND run_id IN (
+                SELECT run_id FROM runs ORDER BY started DESC, rowid DESC LIMIT ?
+            )
+            GROUP BY sender, receiver, type
+            HAVING COUNT(*) >= ?
+            """,
+            (window, min_runs),
+        )
+        scores = []
+        for r in rows:
+            unstable = r["failures"] + r["reruns"]
+            if unstable == 0 or r["failures"] == r["runs"]:
+                continue
+            scores.append(FlakeScore(
+                r["sender"], r["receiver"], r["type"],
+                runs=r["runs"], failures=r["failures"], reruns=r["reruns"],
+                rate=unstable / r["runs"],
+            ))
+        scores.sort(key=lambda s: (-s.rate, s.sender, s.receiver, s.amqp_type))
+        return scores
+
+    def flaky_cases(
+        self,
+        threshold: float = FLAKE_THRESHOLD,
+        window: int = FLAKE_WINDOW,
+        min_runs: int = FLAKE_MIN_RUNS,
+    ) -> set[CaseKey]:
+        """(sender, receiver, type) of cases whose flake rate reaches threshold."""
+        return {
+            (s.sender, s.receiver, s.amqp_type)
+            for s in self.flake_scores(window, min_runs)
+            if s.rate >= threshold
+        }
+
+    def case_durations(self, window: int = ESTIMATE_WINDOW) -> dict[CaseKey, float]:
+        """Median duration of every case that ran in the most recent runs."""
+        rows = self._query(
+            """
+            SELECT sender, receiver, type, duration_ms FROM results
+            WHERE status != 'not_run' AND run_id IN (
+                SELECT run_id FROM runs ORDER BY started DESC, rowid DESC LIMIT ?
+            )
+            """,
+            (window,),
+        )
+        durations: dict[CaseKey, list[float]] = {}
+        for r in rows:
+            durations.setdefault((r["sender"], r["receiver"], r["type"]), []).append(r["duration_ms"])
+        return {case: statistics.median(values) for case, values in durations.items()}
+
+    def shim_memory(self, window: int = ESTIMATE_WINDOW) -> dict[str, int]:
+        """Largest peak memory (KiB) of any process of each shim in the most recent runs."""
+        rows = self._query(
+            """
+            SELECT shim, MAX(rss_kb) AS rss_kb FROM (
+                SELECT sender AS shim, sender_rss_kb AS rss_kb, run_id FROM results
+                UNION ALL
+                SELECT receiver, receiver_rss_kb, run_id FROM results
+            )
+            WHERE rss_kb IS NOT NULL AND run_id IN (
+                SELECT run_id FROM runs ORDER BY started DESC, rowid DESC LIMIT ?
+            )
+            GROUP BY shim
+            """,
+            (window,),
+        )
+        return {r["shim"]: r["rss_kb"] for r in rows}
+
+    def _query(self, sql: str, params: tuple[Any, ...] = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+
+def _case_filter(sender: str | None, receiver: str | None, amqp_type: str | None) -> tuple[str, list[str]]:
+    clauses, params = [], []
+    for column, value in (("sender", sender), ("receiver", receiver), ("type", amqp_type)):
+        if value is not None:
+            clauses.append(f"AND results.{column} = ?")
+            params.append(value)
+    return " ".join(clauses), params
+
+
+def _sql_value(value: Any) -> Any:
+    """Objects and lists are stored as JSON text."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    return value
@@ -0,0 +1,185 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+In-process fast path for Python shims.
+
+A shim declaring ``"in_process": "shim.py"`` in shim.json is loaded as a
+module, and its handlers run on the calling worker thread with a private
+proton Container. Messages are passed as Python objects, so a case costs
+no interpreter startup, argv JSON or process spawn.
+"""
+
+import importlib.util
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from qit.core.shim import Message, Shim, ShimConfig, ShimResult
+
+_modules: dict[Path, ModuleType] = {}
+_modules_lock = threading.Lock()
+
+
+def load_shim_module(path: Path) -> ModuleType:
+    """Import a shim source file as a module (once per path)."""
+    path = path.resolve()
+    with _modules_lock:
+        module = _modules.get(path)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(f"qit_shim_{path.parent.name.replace('-', '_')}", path)
+            if spec is None or spec.loader is None:
+                raise ImportError(f"Cannot load shim module: {path}")
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _modules[path] = module
+    return module
+
+
+class InProcessShim(Shim):
+    """Shim whose send/receive handlers run in this process."""
+
+    in_process = True
+
+    def __init__(self, config: ShimConfig, module_path: Path) -> None:
+        super().__init__(config)
+        self.module = load_shim_module(module_path)
+
+    def send(
+        self,
+        broker_url: str,
+        queue_name: str,
+        amqp_type: str,
+        values: list[Any],
+        timeout: int = 30,
+    ) -> ShimResult:
+        """Send messages from a SenderHandler on the calling thread."""
+        data = self._message_data(amqp_type, values)
+        handler = self.module.SenderHandler(broker_url, queue_name, data, amqp_type=amqp_type)
+        return self._run(
+            handler, timeout,
+            lambda: self._sent_result(data, handler.confirmed_count),
+        )
+
+    def receive(
+        self,
+        broker_url: str,
+        queue_name: str,
+        count: int,
+        timeout: int = 30,
+        expected_hashes: list[str] | None = None,
+    ) -> ShimResult:
+        """Receive messages with a ReceiverHandler on the calling thread."""
+        handler = self.module.ReceiverHandler(broker_url, queue_name, count, expected_hashes)
+        return self._run(
+            handler, timeout,
+            lambda: self._received_result(handler.received_messages),
+        )
+
+    def receive_queues(
+        self,
+        broker_url: str,
+        queue_names: list[str],
+        count: int,
+        timeout: int = 30,
+        expected_hashes: list[str] | None = None,
+    ) -> dict[str, ShimResult]:
+        """Drain several queues over one connection."""
+        handler = self.module.MultiQueueReceiverHandler(broker_url, queue_names, count, expected_hashes)
+        result = self._run(
+            handler, timeout,
+            lambda: ShimResult(
+                success=True,
+                messages=[],
+                sections={
+                    queue: self._received_result(msgs)
+                    for queue, msgs in handler.received_by_queue.items()
+                },
+            ),
+        )
+        if not result.success:
+            return dict.fromkeys(queue_names, result)
+        return result.sections or {}
+
+    def roundtrip(
+        self,
+        broker_url: str,
+        queue_name: str,
+        amqp_type: str,
+        values: list[Any],
+        timeout: int = 30,
+        expected_hashes: list[str] | None = None,
+    ) -> tuple[ShimResult, ShimResult]:
+        """Send and receive back on one connection."""
+        data = self._message_data(amqp_type, values)
+        handler = self.module.RoundtripHandler(broker_url, queue_name, data, amqp_type, expected_hashes)
+        result = self._run(
+            handler, timeout,
+            lambda: ShimResult(
+                success=True,
+                messages=[],
+                sections={
+                    "sent": self._sent_result(data, handler.sender.confirmed_count),
+                    "received": self._received_result(handler.receiver.received_messages),
+                },
+            ),
+        )
+        if not result.success:
+            return result, result
+        sections = result.sections or {}
+        return sections["sent"], sections["received"]
+
+    @staticmethod
+    def _message_data(amqp_type: str, values: list[Any]) -> list[dict[str, Any]]:
+        return [Message(i, amqp_type, val).to_dict() for i, val in enumerate(values)]
+
+    def _sent_result(self, data: list[dict[str, Any]], confirmed: int) -> ShimResult:
+        if confirmed < len(data):
+            return ShimResult(
+                success=False,
+                messages=[],
+                error=f"Only {confirmed} of {len(data)} messages were accepted",
+            )
+        return ShimResult(
+            success=True,
+            messages=self._parse_messages({"messages": data}),
+            stats=self.module.client_stats(sent=len(data)),
+            echoed=False,
+        )
+
+    def _received_result(self, received: list[dict[str, Any]]) -> ShimResult:
+        return ShimResult(
+            success=True,
+            messages=self._parse_messages({"messages": received}),
+            stats=self.module.client_stats(received=len(received)),
+        )
+
+    def _run(self, handler: Any, timeout: int, collect: Callable[[], ShimResult]) -> ShimResult:
+        """Run a handler to completion or timeout, then collect its result."""
+        try:
+            self.module.run_handler(handler, timeout)
+            return collect()
+        except Exception as e:
+            return ShimResult(
+                success=False,
+                messages=[],
+                error=f"In-process shim failed: {e}",
+            )
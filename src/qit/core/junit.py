@@ -0,0 +1,200 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+Streaming JUnit XML writer.
+
+Results are serialized one ``<testcase>`` at a time as they arrive, into a
+temporary file per sender, so no document tree is ever held in memory.
+Closing the writer emits one ``<testsuite>`` per sender, whose counts are
+known by then, inside a ``<testsuites>`` root.
+"""
+
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import IO, TYPE_CHECKING
+from xml.sax.saxutils import XMLGenerator
+from xml.sax.xmlreader import AttributesImpl
+
+if TYPE_CHECKING:
+    from qit.core.orchestrator import TestResult
+
+# Message diffs listed per failing case
+MAX_DIFFS = 10
+
+
+@dataclass
+class _Suite:
+    """Spooled testcases and counts of one sender's testsuite."""
+
+    spool: IO[str]
+    xml: XMLGenerator
+    tests: int = 0
+    failures: int = 0
+    skipped: int = 0
+    time: float = 0.0
+
+
+class JUnitWriter:
+    """Writes test results to a JUnit XML file, one testsuite per sender."""
+
+    def __init__(
+        self,
+        output_path: str | Path,
+        strict: bool = False,
+        name: str = "QIT AMQP Interoperability Tests",
+    ) -> None:
+        """
+        Args:
+            output_path: Path of the XML file, written on close()
+            strict: If True, xfails are reported as failures
+            name: Name of the <testsuites> root
+        """
+        self.output_path = Path(output_path)
+        self.strict = strict
+        self.name = name
+        self._suites: dict[str, _Suite] = {}
+        self._lock = threading.Lock()
+
+    def add(self, result: "TestResult") -> None:
+        """Serialize one result into its sender's testsuite (thread-safe)."""
+        with self._lock:
+            suite = self._suite(result.test_case.sender_shim)
+            self._write_testcase(suite, result)
+
+    def close(self) -> None:
+        """Write the XML document and release the spooled testcases."""
+        with self._lock:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.output_path, "w", encoding="utf-8") as out:
+                # Start tags must be complete before spooled testcases are copied in
+                xml = XMLGenerator(out, "utf-8", short_empty_elements=False)
+                xml.startDocument()
+                xml.ignorableWhitespace("\n")
+                xml.startElement("testsuites", self._counts(
+                    self.name,
+                    sum(s.tests for s in self._suites.values()),
+                    sum(s.failures for s in self._suites.values()),
+                    sum(s.skipped for s in self._suites.values()),
+                    sum(s.time for s in self._suites.values()),
+                ))
+                for sender, suite in self._suites.items():
+                    xml.ignorableWhitespace("\n  ")
+                    xml.startElement("testsuite", self._counts(
+                        f"qit.{sender}", suite.tests, suite.failures, suite.skipped, suite.time,
+                    ))
+                    suite.spool.seek(0)
+                    shutil.copyfileobj(suite.spool, out)
+                    xml.ignorableWhitespace("\n  ")
+                    xml.endElement("testsuite")
+                    suite.spool.close()
+                xml.ignorableWhitespace("\n")
+                xml.endElement("testsuites")
+                xml.ignorableWhitespace("\n")
+                xml.endDocument()
+            self._suites.clear()
+
+    def __enter__(self) -> "JUnitWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _suite(self, sender: str) -> _Suite:
+        suite = self._suites.get(sender)
+        if suite is None:
+            spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+            suite = _Suite(spool=spool, xml=XMLGenerator(spool, "utf-8", short_empty_elements=True))
+            self._suites[sender] = suite
+        return suite
+
+    @staticmethod
+    def _counts(name: str, tests: int, failures: int, skipped: int, time: float) -> "AttributesImpl[str]":
+        return AttributesImpl({
+            "name": name,
+            "tests": str(tests),
+            "failures": str(failures),
+            "errors": "0",
+            "skipped": str(skipped),
+            "time": f"{time:.3f}",
+        })
+
+    def _write_testcase(self, suite: _Suite, result: "TestResult") -> None:
+        tc = result.test_case
+        xml = suite.xml
+        suite.tests += 1
+        suite.time += result.duration_ms / 1000
+
+        xml.ignorableWhitespace("\n    ")
+        xml.startElement("testcase", AttributesImpl({
+            "classname": f"qit.{tc.sender_shim}.{tc.receiver_shim}",
+            "name": tc.amqp_type,
+            "time": f"{result.duration_ms / 1000:.3f}",
+        }))
+
+        if not result.success:
+            suite.failures += 1
+            details = []
+            if result.error:
+                details.append(f"Error: {result.error}")
+            if result.diffs:
+                details.append(f"\nMessage Differences ({len(result.diffs)} total):")
+                details.extend(f"  - {diff.message}" for diff in result.diffs[:MAX_DIFFS])
+                if len(result.diffs) > MAX_DIFFS:
+                    details.append(f"  ... and {len(result.diffs) - MAX_DIFFS} more differences")
+            message = result.error if result.error else f"{len(result.diffs)} message difference(s)"
+            self._element(xml, "failure", {"message": message, "type": "InteroperabilityFailure"},
+                          "\n".join(details))
+
+        elif result.xfail_diffs:
+            reasons = sorted({kf.reason for _, kf in result.xfail_diffs})
+            if self.strict:
+                suite.failures += 1
+                self._element(xml, "failure", {
+                    "message": f"{len(result.xfail_diffs)} known issue(s) (strict mode)",
+                    "type": "KnownIssue",
+                }, "\n".join(f"  - {reason}" for reason in reasons))
+            else:
+                suite.skipped += 1
+                known = "Known (not run)" if result.not_run else "Known"
+                self._element(xml, "skipped", {"message": f"{known}: {'; '.join(reasons)}"})
+
+        if result.xpass_entries:
+            self._element(xml, "system-out", {},
+                          "\n".join(f"[XPASS] {kf.reason}" for kf in result.xpass_entries))
+
+        xml.ignorableWhitespace("\n    ")
+        xml.endElement("testcase")
+
+    @staticmethod
+    def _element(xml: XMLGenerator, name: str, attrs: dict[str, str], text: str = "") -> None:
+        xml.ignorableWhitespace("\n      ")
+        xml.startElement(name, AttributesImpl(attrs))
+        if text:
+            xml.characters(text)
+        xml.endElement(name)
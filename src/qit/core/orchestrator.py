@@ -23,6 +23,11 @@ Test orchestration engine.
 Coordinates shim execution, message comparison, and result reporting.
 """
 
+import functools
+import threading
+import time
+import uuid
+from collections.abc import Callable, Collection, Sequence
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from itertools import product
@@ -30,8 +35,39 @@ from typing import Any
 
 from qit.core.broker import BrokerManager
 from qit.core.comparison import MessageComparator, MessageDiff
-from qit.core.shim import Shim
-from qit.core.xfail import KnownFailure, find_known_failure, get_applicable_failures
+from qit.core.shim import Shim, ShimResult
+from qit.core.xfail import DEFAULT_REGISTRY, KnownFailure, KnownFailureRegistry, index_bit
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.time() - start) * 1000
+
+
+@dataclass
+class SuiteCase:
+    """
+    How a case of a message suite (JMS, headers, large content) runs.
+
+    The sender runs once per entry of sends, into the case's queue, then
+    the receiver runs once; verify checks the receiver's JSON output.
+    """
+
+    # Sender arguments of each send, after --broker and --queue
+    sends: list[list[str]]
+    # Receiver arguments, after --broker and --queue
+    receive: list[str]
+    # Differences between the receiver output and what the sends sent
+    verify: Callable[[dict[str, Any]], list[MessageDiff]]
+    # Timeout of each shim process in seconds
+    timeout: int = 30
+    # Broker of the case, if not the run's (e.g. one with another frame size)
+    broker_url: str | None = None
+    # Bytes of message content the sends carry
+    payload_bytes: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.sends:
+            raise ValueError("A suite case needs at least one send")
 
 
 @dataclass
@@ -42,6 +78,8 @@ class TestCase:
     receiver_shim: str
     amqp_type: str
     test_values: list[Any]
+    # Suite cases name their suite test in amqp_type and run their own shim arguments
+    suite: SuiteCase | None = None
 
 
 @dataclass
@@ -55,6 +93,55 @@ class TestResult:
     duration_ms: float = 0.0
     xfail_diffs: list[tuple[MessageDiff, KnownFailure]] | None = None
     xpass_entries: list[KnownFailure] | None = None
+    # True for whole-case known failures skipped without running
+    not_run: bool = False
+    # Milliseconds per phase: send and receive (or roundtrip), compare
+    phase_ms: dict[str, float] | None = None
+    send_stats: dict[str, Any] | None = None
+    receive_stats: dict[str, Any] | None = None
+    # Runs it took; more than 1 when a flaky case was rerun after failing
+    attempts: int = 1
+    # Peak memory of the sender and receiver processes (None: not measured)
+    sender_rss_kb: int | None = None
+    receiver_rss_kb: int | None = None
+
+
+@dataclass
+class MatrixPlan:
+    """Cases of a test matrix, as run_test_matrix runs them."""
+
+    sender_shims: list[str]
+    receiver_shims: list[str]
+    amqp_types: list[str]
+    # Cases to run, in matrix order
+    test_cases: list[TestCase]
+    # Results of whole-case known failures reported without running
+    not_run: dict[tuple[str, str, str], TestResult]
+    # Cases one worker runs together, sharing shim processes
+    units: list[list[TestCase]]
+
+
+def group_cases(
+    test_cases: list[TestCase],
+    fanout: bool = False,
+    consolidate: bool = False,
+) -> list[list[TestCase]]:
+    """
+    Split cases into the units one worker runs together.
+
+    Consolidated receivers share one unit per type, fan-out one per sender
+    and type; otherwise every case is a unit of its own.
+    """
+    if not (consolidate or fanout):
+        return [[tc] for tc in test_cases]
+
+    def key(tc: TestCase) -> Any:
+        return tc.amqp_type if consolidate else (tc.sender_shim, tc.amqp_type)
+
+    groups: dict[Any, list[TestCase]] = {}
+    for tc in test_cases:
+        groups.setdefault(key(tc), []).append(tc)
+    return list(groups.values())
 
 
 class Orchestrator:
@@ -64,10 +151,28 @@ class Orchestrator:
         self,
         shims: dict[str, Shim],
         broker: BrokerManager | None = None,
+        known_failures: KnownFailureRegistry | None = None,
+        flaky_cases: Collection[tuple[str, str, str]] = (),
+        max_reruns: int = 0,
     ) -> None:
+        """
+        Args:
+            shims: Shims by name
+            broker: Broker the shims connect to
+            known_failures: Known failures (default: the built-in list)
+            flaky_cases: (sender, receiver, type) cases known to fail
+                intermittently; when one fails it is rerun
+            max_reruns: Reruns allowed per failing flaky case
+        """
         self.shims = shims
         self.broker = broker
         self.comparator = MessageComparator()
+        self.known_failures = known_failures if known_failures is not None else DEFAULT_REGISTRY
+        self.flaky_cases = frozenset(flaky_cases)
+        self.max_reruns = max_reruns
+        # Part of fan-out address names, so a run never reads messages or
+        # feeds subscriptions left behind by an earlier one
+        self.run_token = uuid.uuid4().hex[:12]
 
     def run_test_matrix(
         self,
@@ -75,6 +180,10 @@ class Orchestrator:
         sender_shims: list[str] | None = None,
         receiver_shims: list[str] | None = None,
         workers: int = 1,
+        fanout: bool = False,
+        consolidate: bool = False,
+        verify_xfail: bool = False,
+        on_result: Callable[[TestResult], None] | None = None,
     ) -> list[TestResult]:
         """
         Run full test matrix: all sender × receiver × type combinations.
@@ -84,10 +193,67 @@ class Orchestrator:
             sender_shims: List of sender shim names (default: all shims)
             receiver_shims: List of receiver shim names (default: all shims)
             workers: Number of parallel workers (1 = sequential)
+            fanout: Send each type once per sender through a multicast
+                address instead of once per receiver
+            consolidate: Launch each receiver once per type, draining the
+                queues of all senders in one process
+            verify_xfail: Also run cases that a whole-case known failure
+                covers; by default they are reported as xfail, not run
+            on_result: Called with each result as it completes, e.g. to
+                stream it into a report
 
         Returns:
             List of test results
         """
+        plan = self.plan_test_matrix(
+            amqp_types, sender_shims, receiver_shims,
+            fanout=fanout, consolidate=consolidate, verify_xfail=verify_xfail,
+        )
+        if on_result is not None:
+            for result in plan.not_run.values():
+                on_result(result)
+
+        total = len(plan.test_cases)
+        mode = "".join([", fan-out" if fanout else "", ", consolidated receivers" if consolidate else ""])
+        print(f"Running {total} test cases (workers={workers}{mode})...")
+        print(f"  Senders: {', '.join(plan.sender_shims)}")
+        print(f"  Receivers: {', '.join(plan.receiver_shims)}")
+        print(f"  Types: {', '.join(plan.amqp_types)}")
+        if plan.not_run:
+            print(f"  Not run: {len(plan.not_run)} whole-case known failure(s) (--verify-xfail runs them)")
+        print()
+
+        results = self._run_cases(plan, workers, fanout, consolidate, on_result)
+        if not plan.not_run:
+            return results
+
+        # Merge the skipped cases back in matrix order
+        by_key = {
+            (r.test_case.sender_shim, r.test_case.receiver_shim, r.test_case.amqp_type): r
+            for r in results
+        }
+        by_key.update(plan.not_run)
+        return [
+            by_key[(sender, receiver, type_name)]
+            for sender, receiver, type_name in product(plan.sender_shims, plan.receiver_shims, plan.amqp_types)
+        ]
+
+    def plan_test_matrix(
+        self,
+        amqp_types: dict[str, list[Any]],
+        sender_shims: list[str] | None = None,
+        receiver_shims: list[str] | None = None,
+        fanout: bool = False,
+        consolidate: bool = False,
+        verify_xfail: bool = False,
+    ) -> MatrixPlan:
+        """
+        Expand a test matrix into the cases run_test_matrix would run.
+
+        Arguments are those of run_test_matrix. Nothing is run: whole-case
+        known failures get their not-run results, and the remaining cases
+        are grouped into the units the workers run.
+        """
         # Default to all available shims
         sender_names = sender_shims or list(self.shims.keys())
         receiver_names = receiver_shims or list(self.shims.keys())
@@ -108,66 +274,206 @@ class Orchestrator:
                 )
             )
 
-        total = len(test_cases)
-        print(f"Running {total} test cases (workers={workers})...")
-        print(f"  Senders: {', '.join(sender_names)}")
-        print(f"  Receivers: {', '.join(receiver_names)}")
-        print(f"  Types: {', '.join(amqp_types.keys())}")
+        plan = self.plan_cases(test_cases, fanout=fanout, consolidate=consolidate, verify_xfail=verify_xfail)
+        plan.sender_shims = sender_names
+        plan.receiver_shims = receiver_names
+        plan.amqp_types = list(amqp_types)
+        return plan
+
+    def plan_cases(
+        self,
+        test_cases: list[TestCase],
+        fanout: bool = False,
+        consolidate: bool = False,
+        verify_xfail: bool = False,
+    ) -> MatrixPlan:
+        """
+        Plan prebuilt cases: set whole-case known failures aside as not run
+        (unless verify_xfail) and group the rest into units.
+        """
+        sender_names = list(dict.fromkeys(tc.sender_shim for tc in test_cases))
+        receiver_names = list(dict.fromkeys(tc.receiver_shim for tc in test_cases))
+        type_names = list(dict.fromkeys(tc.amqp_type for tc in test_cases))
+        not_run: dict[tuple[str, str, str], TestResult] = {}
+        if not verify_xfail:
+            for tc in test_cases:
+                result = self._not_run_result(tc)
+                if result is not None:
+                    not_run[(tc.sender_shim, tc.receiver_shim, tc.amqp_type)] = result
+            test_cases = [
+                tc for tc in test_cases
+                if (tc.sender_shim, tc.receiver_shim, tc.amqp_type) not in not_run
+            ]
+
+        return MatrixPlan(
+            sender_shims=sender_names,
+            receiver_shims=receiver_names,
+            amqp_types=type_names,
+            test_cases=test_cases,
+            not_run=not_run,
+            units=group_cases(test_cases, fanout=fanout, consolidate=consolidate),
+        )
+
+    def run_cases(
+        self,
+        test_cases: list[TestCase],
+        workers: int = 1,
+        verify_xfail: bool = False,
+        on_result: Callable[[TestResult], None] | None = None,
+    ) -> list[TestResult]:
+        """
+        Run prebuilt cases, e.g. those of a message suite, each on its own.
+
+        Args:
+            test_cases: Cases to run
+            workers: Number of parallel workers (1 = sequential)
+            verify_xfail: Also run cases that a whole-case known failure
+                covers; by default they are reported as xfail, not run
+            on_result: Called with each result as it completes
+
+        Returns:
+            Results in the order of test_cases
+        """
+        plan = self.plan_cases(test_cases, verify_xfail=verify_xfail)
+        if on_result is not None:
+            for result in plan.not_run.values():
+                on_result(result)
+
+        print(f"Running {len(plan.test_cases)} test cases (workers={workers})...")
+        print(f"  Senders: {', '.join(plan.sender_shims)}")
+        print(f"  Receivers: {', '.join(plan.receiver_shims)}")
+        print(f"  Tests: {len(plan.amqp_types)}")
+        if plan.not_run:
+            print(f"  Not run: {len(plan.not_run)} whole-case known failure(s) (--verify-xfail runs them)")
         print()
 
+        results = self._run_cases(plan, workers, fanout=False, consolidate=False, on_result=on_result)
+        by_key = {
+            (r.test_case.sender_shim, r.test_case.receiver_shim, r.test_case.amqp_type): r
+            for r in results
+        }
+        by_key.update(plan.not_run)
+        return [by_key[(tc.sender_shim, tc.receiver_shim, tc.amqp_type)] for tc in test_cases]
+
+    def _run_cases(
+        self,
+        plan: MatrixPlan,
+        workers: int,
+        fanout: bool,
+        consolidate: bool,
+        on_result: Callable[[TestResult], None] | None = None,
+    ) -> list[TestResult]:
+        """Run the cases of a plan in the scheduling mode selected for the matrix."""
+        if consolidate:
+            return self._run_grouped(
+                plan, workers, on_result,
+                run_group=lambda group: self.run_type_group(
+                    group[0].amqp_type,
+                    group[0].test_values,
+                    list(dict.fromkeys(tc.sender_shim for tc in group)),
+                    list(dict.fromkeys(tc.receiver_shim for tc in group)),
+                    fanout=fanout,
+                ),
+            )
+        if fanout:
+            return self._run_grouped(
+                plan, workers, on_result,
+                run_group=lambda group: self.run_fanout_group(
+                    group[0].sender_shim,
+                    group[0].amqp_type,
+                    group[0].test_values,
+                    [tc.receiver_shim for tc in group],
+                ),
+            )
         if workers <= 1:
-            return self._run_sequential(test_cases)
-        return self._run_parallel(test_cases, workers)
+            return self._run_sequential(plan.test_cases, on_result)
+        return self._run_parallel(plan.test_cases, workers, on_result)
 
-    def _run_sequential(self, test_cases: list[TestCase]) -> list[TestResult]:
+    def _run_sequential(
+        self,
+        test_cases: list[TestCase],
+        on_result: Callable[[TestResult], None] | None = None,
+    ) -> list[TestResult]:
         results: list[TestResult] = []
         total = len(test_cases)
         for i, test_case in enumerate(test_cases, 1):
             print(f"[{i}/{total}] Testing {test_case.sender_shim} → {test_case.receiver_shim} "
                   f"({test_case.amqp_type})...", end=" ", flush=True)
 
-            result = self.run_test_case(test_case)
+            result = self._rerun_flaky([self.run_test_case(test_case)])[0]
             results.append(result)
             self._print_result(result)
+            if on_result is not None:
+                on_result(result)
 
         return results
 
-    def _run_parallel(self, test_cases: list[TestCase], workers: int) -> list[TestResult]:
-        import threading
+    def _run_parallel(
+        self,
+        test_cases: list[TestCase],
+        workers: int,
+        on_result: Callable[[TestResult], None] | None = None,
+    ) -> list[TestResult]:
+        def run_case(tc: TestCase) -> list[TestResult]:
+            return [self.run_test_case(tc)]
 
-        total = len(test_cases)
+        units = [functools.partial(run_case, tc) for tc in test_cases]
+        return self._run_units(units, len(test_cases), workers, on_result)
+
+    def _run_grouped(
+        self,
+        plan: MatrixPlan,
+        workers: int,
+        on_result: Callable[[TestResult], None] | None,
+        run_group: Callable[[list[TestCase]], list[TestResult]],
+    ) -> list[TestResult]:
+        """Run the units of a plan, which share shim processes, keeping matrix order."""
+        units = [functools.partial(run_group, group) for group in plan.units]
+        results = self._run_units(units, len(plan.test_cases), workers, on_result)
+
+        # Restore matrix order so reports match the per-pair mode
+        by_key = {
+            (r.test_case.sender_shim, r.test_case.receiver_shim, r.test_case.amqp_type): r
+            for r in results
+        }
+        return [by_key[(tc.sender_shim, tc.receiver_shim, tc.amqp_type)] for tc in plan.test_cases]
+
+    def _run_units(
+        self,
+        units: Sequence[Callable[[], list[TestResult]]],
+        total: int,
+        workers: int,
+        on_result: Callable[[TestResult], None] | None = None,
+    ) -> list[TestResult]:
+        """Run units of work that each yield one or more results, printing progress."""
         completed = 0
-        failed = 0
         lock = threading.Lock()
-        result_map: dict[int, TestResult] = {}
+        unit_results: dict[int, list[TestResult]] = {}
 
-        def run_one(index: int, tc: TestCase) -> tuple[int, TestResult]:
-            return index, self.run_test_case(tc)
+        def run_unit(unit: Callable[[], list[TestResult]]) -> list[TestResult]:
+            return self._rerun_flaky(unit())
 
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            futures = {
-                executor.submit(run_one, i, tc): i
-                for i, tc in enumerate(test_cases)
-            }
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            futures = {executor.submit(run_unit, unit): i for i, unit in enumerate(units)}
             for future in as_completed(futures):
-                index, result = future.result()
-                result_map[index] = result
+                unit_results[futures[future]] = future.result()
                 with lock:
-                    completed += 1
-                    if not result.success:
-                        failed += 1
-                    tc = test_cases[index]
-                    status = self._result_symbol(result)
-                    print(f"[{completed}/{total}] {tc.sender_shim} → {tc.receiver_shim} "
-                          f"({tc.amqp_type}) {status}", flush=True)
-
-        results = [result_map[i] for i in range(total)]
-
-        if failed:
+                    for result in unit_results[futures[future]]:
+                        completed += 1
+                        tc = result.test_case
+                        status = self._result_symbol(result)
+                        print(f"[{completed}/{total}] {tc.sender_shim} → {tc.receiver_shim} "
+                              f"({tc.amqp_type}) {status}", flush=True)
+                        if on_result is not None:
+                            on_result(result)
+
+        results = [r for i in range(len(units)) for r in unit_results[i]]
+
+        if any(not r.success for r in results):
             print(f"\nFailed tests:")
-            for i, result in enumerate(results):
+            for result in results:
                 if not result.success:
-                    tc = test_cases[i]
+                    tc = result.test_case
                     print(f"  {tc.sender_shim} → {tc.receiver_shim} ({tc.amqp_type})")
                     if result.error:
                         print(f"    Error: {result.error}")
@@ -176,8 +482,51 @@ class Orchestrator:
 
         return results
 
+    def _rerun_flaky(self, results: list[TestResult]) -> list[TestResult]:
+        """Rerun failed flaky cases on their own until they pass or reruns run out."""
+        if not self.flaky_cases or self.max_reruns <= 0:
+            return results
+        final: list[TestResult] = []
+        for result in results:
+            tc = result.test_case
+            attempts = 1
+            while (
+                not result.success
+                and attempts <= self.max_reruns
+                and (tc.sender_shim, tc.receiver_shim, tc.amqp_type) in self.flaky_cases
+            ):
+                attempts += 1
+                result = self.run_test_case(tc)
+                result.attempts = attempts
+            final.append(result)
+        return final
+
+    def _not_run_result(self, test_case: TestCase) -> TestResult | None:
+        """Result for a case a whole-case known failure covers, else None."""
+        kf = self.known_failures.for_case(
+            test_case.sender_shim,
+            test_case.receiver_shim,
+            test_case.amqp_type,
+        ).whole_case
+        if kf is None:
+            return None
+        return TestResult(
+            test_case=test_case,
+            success=True,
+            diffs=[],
+            xfail_diffs=[(
+                MessageDiff(index=-1, field="case",
+                            expected="run", actual="not run",
+                            message="Not run: whole case is a known failure"),
+                kf,
+            )],
+            not_run=True,
+        )
+
     @staticmethod
     def _result_symbol(result: "TestResult") -> str:
+        if result.not_run:
+            return "✓ (xfail, not run)"
         if result.success and not result.xfail_diffs:
             return "✓"
         if result.success and result.xfail_diffs:
@@ -207,126 +556,427 @@ class Orchestrator:
         Returns:
             Test result
         """
-        import time
-
         start_time = time.time()
 
         try:
-            # Get shims
-            sender = self.shims.get(test_case.sender_shim)
-            receiver = self.shims.get(test_case.receiver_shim)
-
-            if not sender:
-                return TestResult(
-                    test_case=test_case,
-                    success=False,
-                    diffs=[],
-                    error=f"Sender shim not found: {test_case.sender_shim}",
-                )
+            setup_error = self._check_case(test_case)
+            if setup_error is not None:
+                return setup_error
 
-            if not receiver:
-                return TestResult(
-                    test_case=test_case,
-                    success=False,
-                    diffs=[],
-                    error=f"Receiver shim not found: {test_case.receiver_shim}",
-                )
+            if test_case.suite is not None:
+                return self._run_suite_case(test_case, test_case.suite, start_time)
 
-            # Ensure broker is available
-            if self.broker is None:
-                return TestResult(
-                    test_case=test_case,
-                    success=False,
-                    diffs=[],
-                    error="No broker configured (use --mode direct for broker-less tests)",
-                )
+            sender = self.shims[test_case.sender_shim]
+            receiver = self.shims[test_case.receiver_shim]
 
             # Generate unique queue name for this test
             queue_name = f"qit.test.{test_case.amqp_type}.{test_case.sender_shim}.{test_case.receiver_shim}"
 
+            # Diagonal cells: one process sends and receives on one connection
+            if test_case.sender_shim == test_case.receiver_shim:
+                phase_start = time.time()
+                send_result, recv_result = sender.roundtrip(
+                    broker_url=self._require_broker().config.url,
+                    queue_name=queue_name,
+                    amqp_type=test_case.amqp_type,
+                    values=test_case.test_values,
+                    expected_hashes=self._expected_hashes(test_case),
+                )
+                phases = {"roundtrip": _elapsed_ms(phase_start)}
+                if not send_result.success:
+                    return self._send_failure(test_case, send_result, start_time, phases)
+                return self._evaluate(test_case, send_result, recv_result, start_time, phases)
+
             # Send messages
+            phase_start = time.time()
             send_result = sender.send(
-                broker_url=self.broker.config.url,
+                broker_url=self._require_broker().config.url,
                 queue_name=queue_name,
                 amqp_type=test_case.amqp_type,
                 values=test_case.test_values,
             )
+            phases = {"send": _elapsed_ms(phase_start)}
 
             if not send_result.success:
-                duration_ms = (time.time() - start_time) * 1000
-                applicable = get_applicable_failures(
-                    test_case.sender_shim,
-                    test_case.receiver_shim,
-                    test_case.amqp_type,
-                )
-                if applicable:
-                    return TestResult(
-                        test_case=test_case,
-                        success=True,
-                        diffs=[],
-                        error=f"Send failed (xfail): {send_result.error}",
-                        duration_ms=duration_ms,
-                        xfail_diffs=[(
-                            MessageDiff(index=-1, field="error",
-                                        expected="success", actual="send_error",
-                                        message=f"Send error: {send_result.error}"),
-                            applicable[0],
-                        )],
-                    )
-                return TestResult(
-                    test_case=test_case,
-                    success=False,
-                    diffs=[],
-                    error=f"Send failed: {send_result.error}",
-                    duration_ms=duration_ms,
-                )
+                return self._send_failure(test_case, send_result, start_time, phases)
 
             # Receive messages
+            phase_start = time.time()
             recv_result = receiver.receive(
-                broker_url=self.broker.config.url,
+                broker_url=self._require_broker().config.url,
                 queue_name=queue_name,
                 count=len(test_case.test_values),
                 timeout=5,  # 5 second timeout - messages should arrive quickly
+                expected_hashes=self._expected_hashes(test_case),
+            )
+            phases["receive"] = _elapsed_ms(phase_start)
+
+            return self._evaluate(test_case, send_result, recv_result, start_time, phases)
+
+        except Exception as e:
+            return TestResult(
+                test_case=test_case,
+                success=False,
+                diffs=[],
+                error=f"Unexpected error: {e}",
+            )
+
+    def _run_suite_case(self, test_case: TestCase, spec: SuiteCase, start_time: float) -> TestResult:
+        """Run the sends and the receive of a suite case and verify the receiver's output."""
+        sender = self.shims[test_case.sender_shim]
+        receiver = self.shims[test_case.receiver_shim]
+        broker_url = spec.broker_url or self._require_broker().config.url
+        queue_name = f"qit.test.{test_case.amqp_type}.{test_case.sender_shim}.{test_case.receiver_shim}"
+
+        phase_start = time.time()
+        send_rss = []
+        for args in spec.sends:
+            send_result = sender.run("send", broker_url, queue_name, args, timeout=spec.timeout)
+            send_rss.append(send_result.max_rss_kb)
+            if not send_result.success:
+                return self._send_failure(test_case, send_result, start_time, {"send": _elapsed_ms(phase_start)})
+        phases = {"send": _elapsed_ms(phase_start)}
+        measured = [kb for kb in send_rss if kb is not None]
+        send_result.max_rss_kb = max(measured) if measured else None
+
+        phase_start = time.time()
+        recv_result = receiver.run("receive", broker_url, queue_name, spec.receive, timeout=spec.timeout + 10)
+        phases["receive"] = _elapsed_ms(phase_start)
+        return self._evaluate(test_case, send_result, recv_result, start_time, phases)
+
+    def run_fanout_group(
+        self,
+        sender_shim: str,
+        amqp_type: str,
+        test_values: list[Any],
+        receiver_shims: list[str],
+    ) -> list[TestResult]:
+        """
+        Run every receiver for one sender and type from a single send.
+
+        The sender publishes once to a multicast address. Each receiver
+        drains its own subscription queue on that address, and its output
+        is compared against the one send record.
+
+        Args:
+            sender_shim: Sender shim name
+            amqp_type: AMQP type name
+            test_values: Values sent once and expected by every receiver
+            receiver_shims: Receiver shim names
+
+        Returns:
+            One test result per receiver, in receiver_shims order
+        """
+        test_cases = [
+            TestCase(
+                sender_shim=sender_shim,
+                receiver_shim=receiver,
+                amqp_type=amqp_type,
+                test_values=test_values,
             )
+            for receiver in receiver_shims
+        ]
+        return self._run_batch(test_cases, fanout=True, consolidate=False)
+
+    def run_type_group(
+        self,
+        amqp_type: str,
+        test_values: list[Any],
+        sender_shims: list[str],
+        receiver_shims: list[str],
+        fanout: bool = False,
+    ) -> list[TestResult]:
+        """
+        Run all sender × receiver pairs for one type with one receive per receiver.
+
+        Every sender sends first. Each receiver is then launched once and
+        drains the queues of all senders (``receive --queues``), and the
+        grouped output is split back into per-pair results.
+
+        Args:
+            amqp_type: AMQP type name
+            test_values: Values sent by every sender
+            sender_shims: Sender shim names
+            receiver_shims: Receiver shim names
+            fanout: Send once per sender to a multicast address
+
+        Returns:
+            One test result per pair, sender-major order
+        """
+        test_cases = [
+            TestCase(
+                sender_shim=sender,
+                receiver_shim=receiver,
+                amqp_type=amqp_type,
+                test_values=test_values,
+            )
+            for sender, receiver in product(sender_shims, receiver_shims)
+        ]
+        return self._run_batch(test_cases, fanout=fanout, consolidate=True)
 
-            if not recv_result.success:
-                return TestResult(
-                    test_case=test_case,
-                    success=False,
-                    diffs=[],
-                    error=f"Receive failed: {recv_result.error}",
+    def _run_batch(
+        self,
+        test_cases: list[TestCase],
+        fanout: bool,
+        consolidate: bool,
+    ) -> list[TestResult]:
+        """Run cases of one type that share sends or receives, in the given order."""
+        results: dict[tuple[str, str], TestResult] = {}
+        runnable: list[TestCase] = []
+        for test_case in test_cases:
+            setup_error = self._check_case(test_case)
+            if setup_error is not None:
+                results[(test_case.sender_shim, test_case.receiver_shim)] = setup_error
+            else:
+                runnable.append(test_case)
+
+        if runnable:
+            try:
+                results.update(self._run_batch_cases(runnable, fanout, consolidate))
+            except Exception as e:
+                for test_case in runnable:
+                    results[(test_case.sender_shim, test_case.receiver_shim)] = TestResult(
+                        test_case=test_case,
+                        success=False,
+                        diffs=[],
+                        error=f"Unexpected error: {e}",
+                    )
+
+        return [results[(tc.sender_shim, tc.receiver_shim)] for tc in test_cases]
+
+    def _run_batch_cases(
+        self,
+        test_cases: list[TestCase],
+        fanout: bool,
+        consolidate: bool,
+    ) -> dict[tuple[str, str], TestResult]:
+        """Send phase for every pair, then receive phase, charging each pair its share."""
+        broker = self._require_broker()
+        broker_url = broker.config.url
+        sources: dict[tuple[str, str], str] = {}
+        sends: dict[tuple[str, str], tuple[ShimResult, float]] = {}
+
+        by_sender: dict[str, list[TestCase]] = {}
+        for tc in test_cases:
+            by_sender.setdefault(tc.sender_shim, []).append(tc)
+
+        for sender_name, cases in by_sender.items():
+            sender = self.shims[sender_name]
+            amqp_type = cases[0].amqp_type
+            values = cases[0].test_values
+            if fanout:
+                address = f"qit.fanout.{self.run_token}.{amqp_type}.{sender_name}"
+                subscriptions = {tc.receiver_shim: f"{address}.{tc.receiver_shim}" for tc in cases}
+
+                # Subscriptions must exist before the send, or the broker drops the messages
+                broker.prepare_subscriptions(address, list(subscriptions.values()))
+
+                send_start = time.time()
+                send_result = sender.send(broker_url, address, amqp_type, values)
+                send_seconds = time.time() - send_start
+                for tc in cases:
+                    sources[(sender_name, tc.receiver_shim)] = f"{address}::{subscriptions[tc.receiver_shim]}"
+                    sends[(sender_name, tc.receiver_shim)] = (send_result, send_seconds)
+            else:
+                for tc in cases:
+                    queue_name = f"qit.test.{amqp_type}.{sender_name}.{tc.receiver_shim}"
+                    send_start = time.time()
+                    send_result = sender.send(broker_url, queue_name, amqp_type, values)
+                    sources[(sender_name, tc.receiver_shim)] = queue_name
+                    sends[(sender_name, tc.receiver_shim)] = (send_result, time.time() - send_start)
+
+        results: dict[tuple[str, str], TestResult] = {}
+        by_receiver: dict[str, list[TestCase]] = {}
+        for tc in test_cases:
+            key = (tc.sender_shim, tc.receiver_shim)
+            send_result, send_seconds = sends[key]
+            if not send_result.success:
+                results[key] = self._send_failure(
+                    tc, send_result, time.time() - send_seconds, {"send": send_seconds * 1000},
                 )
+            else:
+                by_receiver.setdefault(tc.receiver_shim, []).append(tc)
+
+        for receiver_name, cases in by_receiver.items():
+            receiver = self.shims[receiver_name]
+            count = len(cases[0].test_values)
+            hashes = self._expected_hashes(cases[0])
+            groups = [cases] if consolidate else [[tc] for tc in cases]
+            for group in groups:
+                queues = [sources[(tc.sender_shim, tc.receiver_shim)] for tc in group]
+                recv_start = time.time()
+                if consolidate:
+                    received = receiver.receive_queues(
+                        broker_url, queues, count=count, timeout=5, expected_hashes=hashes,
+                    )
+                else:
+                    received = {
+                        queues[0]: receiver.receive(
+                            broker_url, queues[0], count=count, timeout=5, expected_hashes=hashes,
+                        ),
+                    }
+                recv_seconds = time.time() - recv_start
+
+                # Each pair is charged for its send plus the (shared) receive
+                for tc, queue in zip(group, queues, strict=True):
+                    key = (tc.sender_shim, tc.receiver_shim)
+                    send_result, send_seconds = sends[key]
+                    try:
+                        results[key] = self._evaluate(
+                            tc, send_result, received[queue], time.time() - send_seconds - recv_seconds,
+                            {"send": send_seconds * 1000, "receive": recv_seconds * 1000},
+                        )
+                    except Exception as e:
+                        results[key] = TestResult(
+                            test_case=tc,
+                            success=False,
+                            diffs=[],
+                            error=f"Unexpected error: {e}",
+                        )
 
-            # Compare messages
-            all_diffs = self.comparator.compare_messages(
-                send_result.messages,
-                recv_result.messages,
+        return results
+
+    def _expected_hashes(self, test_case: TestCase) -> list[str]:
+        """Canonical hashes of the messages a case sends, in index order."""
+        return self.comparator.expected_values(test_case.amqp_type, test_case.test_values).hashes
+
+    def _check_case(self, test_case: TestCase) -> TestResult | None:
+        """Return an error result if the case cannot run, else None."""
+        if test_case.sender_shim not in self.shims:
+            return TestResult(
+                test_case=test_case,
+                success=False,
+                diffs=[],
+                error=f"Sender shim not found: {test_case.sender_shim}",
             )
 
-            duration_ms = (time.time() - start_time) * 1000
+        if test_case.receiver_shim not in self.shims:
+            return TestResult(
+                test_case=test_case,
+                success=False,
+                diffs=[],
+                error=f"Receiver shim not found: {test_case.receiver_shim}",
+            )
 
-            # Classify diffs into genuine failures vs expected failures
-            genuine, xfail_diffs, xpass = self._classify_diffs(
-                test_case, all_diffs,
+        # Ensure broker is available
+        if self.broker is None:
+            return TestResult(
+                test_case=test_case,
+                success=False,
+                diffs=[],
+                error="No broker configured (use --mode direct for broker-less tests)",
             )
 
+        return None
+
+    def _require_broker(self) -> BrokerManager:
+        """The broker; cases get this far only once _check_case has found one."""
+        if self.broker is None:
+            raise RuntimeError("No broker configured")
+        return self.broker
+
+    def _send_failure(
+        self,
+        test_case: TestCase,
+        send_result: ShimResult,
+        start_time: float,
+        phases: dict[str, float] | None = None,
+    ) -> TestResult:
+        """Build the result for a failed send, honouring known failures."""
+        duration_ms = (time.time() - start_time) * 1000
+        applicable = self.known_failures.for_case(
+            test_case.sender_shim,
+            test_case.receiver_shim,
+            test_case.amqp_type,
+        ).entries
+        if applicable:
             return TestResult(
                 test_case=test_case,
-                success=len(genuine) == 0,
-                diffs=genuine,
+                success=True,
+                diffs=[],
+                error=f"Send failed (xfail): {send_result.error}",
                 duration_ms=duration_ms,
-                xfail_diffs=xfail_diffs,
-                xpass_entries=xpass,
+                phase_ms=phases,
+                send_stats=send_result.stats,
+                sender_rss_kb=send_result.max_rss_kb,
+                xfail_diffs=[(
+                    MessageDiff(index=-1, field="error",
+                                expected="success", actual="send_error",
+                                message=f"Send error: {send_result.error}"),
+                    applicable[0],
+                )],
             )
+        return TestResult(
+            test_case=test_case,
+            success=False,
+            diffs=[],
+            error=f"Send failed: {send_result.error}",
+            duration_ms=duration_ms,
+            phase_ms=phases,
+            send_stats=send_result.stats,
+            sender_rss_kb=send_result.max_rss_kb,
+        )
 
-        except Exception as e:
+    def _evaluate(
+        self,
+        test_case: TestCase,
+        send_result: ShimResult,
+        recv_result: ShimResult,
+        start_time: float,
+        phases: dict[str, float] | None = None,
+    ) -> TestResult:
+        """Compare a receive against its send record and classify the diffs."""
+        phases = dict(phases or {})
+        if not recv_result.success:
             return TestResult(
                 test_case=test_case,
                 success=False,
                 diffs=[],
-                error=f"Unexpected error: {e}",
+                error=f"Receive failed: {recv_result.error}",
+                duration_ms=(time.time() - start_time) * 1000,
+                phase_ms=phases,
+                send_stats=send_result.stats,
+                sender_rss_kb=send_result.max_rss_kb,
+                receiver_rss_kb=recv_result.max_rss_kb,
             )
 
+        # Compare messages
+        # Senders that did not echo their messages sent exactly the test
+        # values, whose normalized form is shared by every receiver
+        compare_start = time.time()
+        if test_case.suite is not None:
+            all_diffs = test_case.suite.verify(recv_result.output or {})
+        else:
+            expected = None
+            if not send_result.echoed:
+                expected = self.comparator.expected_values(test_case.amqp_type, test_case.test_values)
+            all_diffs = self.comparator.compare_messages(
+                send_result.messages,
+                recv_result.messages,
+                expected=expected,
+            )
+
+        # Classify diffs into genuine failures vs expected failures
+        genuine, xfail_diffs, xpass = self._classify_diffs(
+            test_case, all_diffs,
+        )
+        phases["compare"] = _elapsed_ms(compare_start)
+        duration_ms = (time.time() - start_time) * 1000
+
+        return TestResult(
+            test_case=test_case,
+            success=len(genuine) == 0,
+            diffs=genuine,
+            duration_ms=duration_ms,
+            xfail_diffs=xfail_diffs,
+            xpass_entries=xpass,
+            phase_ms=phases,
+            send_stats=send_result.stats,
+            sender_rss_kb=send_result.max_rss_kb,
+            receive_stats=recv_result.stats,
+            receiver_rss_kb=recv_result.max_rss_kb,
+        )
+
     def _classify_diffs(
         self,
         test_case: TestCase,
@@ -339,33 +989,31 @@ class Orchestrator:
         """
         genuine: list[MessageDiff] = []
         xfail_diffs: list[tuple[MessageDiff, KnownFailure]] = []
-        matched_indices: set[int] = set()
+        case = self.known_failures.for_case(
+            test_case.sender_shim,
+            test_case.receiver_shim,
+            test_case.amqp_type,
+        )
+        matched_mask = 0
+        matched_any = False
 
         for diff in diffs:
-            kf = find_known_failure(
-                test_case.sender_shim,
-                test_case.receiver_shim,
-                test_case.amqp_type,
-                diff.index,
-            )
+            kf = case.find(diff.index)
             if kf is not None:
                 xfail_diffs.append((diff, kf))
-                matched_indices.add(diff.index)
+                matched_any = True
+                if diff.index >= -1:
+                    matched_mask |= index_bit(diff.index)
             else:
                 genuine.append(diff)
 
         # Find xpass: registered failures that didn't produce any diffs
         xpass: list[KnownFailure] = []
-        applicable = get_applicable_failures(
-            test_case.sender_shim,
-            test_case.receiver_shim,
-            test_case.amqp_type,
-        )
-        for kf in applicable:
+        for kf, mask in zip(case.entries, case.masks, strict=True):
             if kf.message_indices is not None:
-                if not kf.message_indices & matched_indices:
+                if not mask & matched_mask:
                     xpass.append(kf)
-            elif not matched_indices:
+            elif not matched_any:
                 xpass.append(kf)
 
         return genuine, xfail_diffs, xpass
@@ -376,7 +1024,9 @@ class Orchestrator:
         passed = sum(1 for r in results if r.success and not r.xfail_diffs)
         failed = sum(1 for r in results if not r.success)
         xfail_count = sum(1 for r in results if r.success and r.xfail_diffs)
+        not_run_count = sum(1 for r in results if r.not_run)
         xpass_count = sum(1 for r in results if r.xpass_entries)
+        rerun_count = sum(1 for r in results if r.success and r.attempts > 1)
 
         lines = [
             "=" * 80,
@@ -387,9 +1037,12 @@ class Orchestrator:
             f"Failed: {failed}",
         ]
         if xfail_count > 0:
-            lines.append(f"XFail:  {xfail_count} (known issues)")
+            not_run_note = f", {not_run_count} not run" if not_run_count else ""
+            lines.append(f"XFail:  {xfail_count} (known issues{not_run_note})")
         if xpass_count > 0:
             lines.append(f"XPass:  {xpass_count} (known issues that now pass)")
+        if rerun_count > 0:
+            lines.append(f"Flaky:  {rerun_count} (passed on rerun)")
         lines.append("")
 
         if failed > 0:
@@ -415,10 +1068,8 @@ class Orchestrator:
                 if result.success and result.xfail_diffs:
                     tc = result.test_case
                     reasons = {kf.reason for _, kf in result.xfail_diffs}
-                    lines.append(
-                        f"  {tc.sender_shim} → {tc.receiver_shim} ({tc.amqp_type}): "
-                        f"{len(result.xfail_diffs)} diff(s)"
-                    )
+                    outcome = "not run" if result.not_run else f"{len(result.xfail_diffs)} diff(s)"
+                    lines.append(f"  {tc.sender_shim} → {tc.receiver_shim} ({tc.amqp_type}): {outcome}")
                     for reason in sorted(reasons):
                         lines.append(f"    [XFAIL] {reason}")
             lines.append("")
@@ -453,89 +1104,8 @@ class Orchestrator:
             output_path: Path to write XML file
             strict: If True, xfails are reported as failures
         """
-        from pathlib import Path
-        from xml.etree.ElementTree import Element, SubElement, tostring
-        from xml.dom import minidom
-
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        from qit.core.junit import JUnitWriter
 
-        total = len(results)
-        failed = sum(1 for r in results if not r.success)
-        skipped = sum(1 for r in results if r.success and r.xfail_diffs)
-        if strict:
-            failed += skipped
-            skipped = 0
-        total_time_sec = sum(r.duration_ms for r in results) / 1000
-
-        testsuite = Element(
-            "testsuite",
-            name="QIT AMQP Interoperability Tests",
-            tests=str(total),
-            failures=str(failed),
-            errors="0",
-            skipped=str(skipped),
-            time=f"{total_time_sec:.3f}",
-        )
-
-        for result in results:
-            tc = result.test_case
-            testcase = SubElement(
-                testsuite,
-                "testcase",
-                classname=f"qit.{tc.sender_shim}.{tc.receiver_shim}",
-                name=f"{tc.amqp_type}",
-                time=f"{result.duration_ms / 1000:.3f}",
-            )
-
-            if not result.success:
-                failure_msg = result.error if result.error else f"{len(result.diffs)} message difference(s)"
-                failure_details = []
-
-                if result.error:
-                    failure_details.append(f"Error: {result.error}")
-
-                if result.diffs:
-                    failure_details.append(f"\nMessage Differences ({len(result.diffs)} total):")
-                    for diff in result.diffs[:10]:
-                        failure_details.append(f"  - {diff.message}")
-                    if len(result.diffs) > 10:
-                        failure_details.append(f"  ... and {len(result.diffs) - 10} more differences")
-
-                failure = SubElement(
-                    testcase,
-                    "failure",
-                    message=failure_msg,
-                    type="InteroperabilityFailure",
-                )
-                failure.text = "\n".join(failure_details)
-
-            elif result.xfail_diffs:
-                if strict:
-                    reasons = {kf.reason for _, kf in result.xfail_diffs}
-                    failure = SubElement(
-                        testcase,
-                        "failure",
-                        message=f"{len(result.xfail_diffs)} known issue(s) (strict mode)",
-                        type="KnownIssue",
-                    )
-                    failure.text = "\n".join(
-                        f"  - {reason}" for reason in sorted(reasons)
-                    )
-                else:
-                    reasons = {kf.reason for _, kf in result.xfail_diffs}
-                    skipped_elem = SubElement(
-                        testcase,
-                        "skipped",
-                        message=f"Known: {'; '.join(sorted(reasons))}",
-                    )
-
-            if result.xpass_entries:
-                sysout = SubElement(testcase, "system-out")
-                xpass_lines = [
-                    f"[XPASS] {kf.reason}" for kf in result.xpass_entries
-                ]
-                sysout.text = "\n".join(xpass_lines)
-
-        xml_str = minidom.parseString(tostring(testsuite, encoding="unicode")).toprettyxml(indent="  ")
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(xml_str)
+        with JUnitWriter(output_path, strict=strict) as writer:
+            for result in results:
+                writer.add(result)
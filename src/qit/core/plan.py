@@ -0,0 +1,303 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+Dry-run estimates.
+
+Works out what a MatrixPlan costs before anything runs: the shim
+processes each unit starts (following shim capabilities and in-process
+support), the payload handed to senders, the wall time for a number of
+workers from the case durations in the run history, and the peak memory
+of shim processes running at the same time.
+"""
+
+import heapq
+import statistics
+from dataclasses import dataclass
+from itertools import product
+from typing import Any
+
+from qit.core.orchestrator import MatrixPlan, TestCase
+from qit.core.results import payload_bytes
+
+# Worker counts the wall time is estimated for, besides the selected one
+DEFAULT_WORKER_COUNTS = (1, 2, 4, 8, 16)
+
+CaseKey = tuple[str, str, str]
+
+
+@dataclass
+class UnitCost:
+    """Shim processes, sends and estimated duration of one unit of a plan."""
+
+    test_cases: list[TestCase]
+    # Shim of each process the unit starts; they run one after another
+    processes: list[str]
+    sends: int
+    payload_bytes: int
+    # Sum of the cases' estimated durations (None: no history)
+    duration_ms: float | None
+
+
+@dataclass
+class ShimMemory:
+    """Memory of one shim's processes at the selected worker count."""
+
+    shim: str
+    in_process: bool
+    processes: int
+    # Processes of this shim that can run at once
+    concurrent: int
+    # Largest process recorded in the history (None: never measured)
+    max_rss_kb: int | None
+
+    @property
+    def peak_kb(self) -> int | None:
+        return None if self.max_rss_kb is None else self.concurrent * self.max_rss_kb
+
+
+@dataclass
+class PlanEstimate:
+    """Cost of a plan."""
+
+    units: list[UnitCost]
+    workers: int
+    payload_bytes: int
+    # Cases without durations of their own, estimated from similar cases
+    borrowed_durations: int
+    # Estimated wall time by worker count; empty without history
+    wall_ms: dict[int, float]
+    memory: list[ShimMemory]
+    # Upper bound for all shim processes at once, over shims with data
+    peak_kb: int
+
+    @property
+    def processes(self) -> int:
+        return sum(len(unit.processes) for unit in self.units)
+
+
+def estimate_plan(
+    plan: MatrixPlan,
+    shims: dict[str, Any],
+    workers: int = 1,
+    fanout: bool = False,
+    consolidate: bool = False,
+    durations: dict[CaseKey, float] | None = None,
+    shim_memory: dict[str, int] | None = None,
+    worker_counts: tuple[int, ...] = DEFAULT_WORKER_COUNTS,
+) -> PlanEstimate:
+    """
+    Estimate the cost of running a plan.
+
+    A case without recorded durations takes the median of its type, or
+    else of all recorded cases. Units of grouped modes are charged the sum
+    of their cases, which overstates receives they share.
+
+    Args:
+        plan: Plan from Orchestrator.plan_test_matrix
+        shims: Shims by name, as given to the orchestrator
+        workers: Selected worker count
+        fanout: Plan was made for fan-out mode
+        consolidate: Plan was made for consolidated receivers
+        durations: Median duration per (sender, receiver, type), e.g. from
+            HistoryStore.case_durations
+        shim_memory: Peak process memory per shim in KiB, e.g. from
+            HistoryStore.shim_memory
+        worker_counts: Worker counts to estimate wall time for
+
+    Returns:
+        The estimate
+    """
+    durations = durations or {}
+    shim_memory = shim_memory or {}
+    by_type: dict[str, list[float]] = {}
+    for (_, _, amqp_type), ms in durations.items():
+        by_type.setdefault(amqp_type, []).append(ms)
+    type_medians = {t: statistics.median(values) for t, values in by_type.items()}
+    overall = statistics.median(durations.values()) if durations else None
+
+    sizes: dict[str, int] = {}
+    borrowed = 0
+    units = []
+    for group in plan.units:
+        processes, sends = _unit_processes(group, shims, fanout, consolidate)
+        amqp_type = group[0].amqp_type
+        if amqp_type not in sizes:
+            sizes[amqp_type] = payload_bytes(amqp_type, group[0].test_values)
+
+        total_ms = 0.0
+        for tc in group:
+            case_ms = durations.get((tc.sender_shim, tc.receiver_shim, tc.amqp_type))
+            if case_ms is None:
+                borrowed += 1
+                case_ms = type_medians.get(tc.amqp_type, overall)
+            if case_ms is not None:
+                total_ms += case_ms
+        units.append(UnitCost(
+            test_cases=group,
+            processes=processes,
+            sends=sends,
+            payload_bytes=sends * sizes[amqp_type],
+            duration_ms=total_ms if durations else None,
+        ))
+
+    wall_ms = {}
+    if durations:
+        for count in sorted({*worker_counts, workers}):
+            wall_ms[count] = schedule_ms([unit.duration_ms or 0.0 for unit in units], count)
+
+    memory = []
+    for name in dict.fromkeys([*plan.sender_shims, *plan.receiver_shims]):
+        using = [unit for unit in units if name in unit.processes]
+        memory.append(ShimMemory(
+            shim=name,
+            in_process=getattr(shims.get(name), "in_process", False),
+            processes=sum(unit.processes.count(name) for unit in units),
+            concurrent=min(max(workers, 1), len(using)),
+            max_rss_kb=shim_memory.get(name),
+        ))
+
+    # Each worker runs one shim process at a time: the peak is the largest
+    # processes that can run together, at most one per worker
+    slots = sorted(
+        (m.max_rss_kb for m in memory if m.max_rss_kb is not None for _ in range(m.concurrent)),
+        reverse=True,
+    )
+
+    return PlanEstimate(
+        units=units,
+        workers=workers,
+        payload_bytes=sum(unit.payload_bytes for unit in units),
+        borrowed_durations=borrowed if durations else 0,
+        wall_ms=wall_ms,
+        memory=memory,
+        peak_kb=sum(slots[:max(workers, 1)]),
+    )
+
+
+def schedule_ms(durations: list[float], workers: int) -> float:
+    """Time to run units in order, each taken by the first free worker."""
+    free = [0.0] * max(workers, 1)
+    for ms in durations:
+        heapq.heappush(free, heapq.heappop(free) + ms)
+    return max(free)
+
+
+def format_plan(plan: MatrixPlan, estimate: PlanEstimate, history_runs: int = 0) -> str:
+    """Case list and estimate of a dry run."""
+    lines = [f"Cases: {len(plan.test_cases)} to run, {len(plan.not_run)} not run (whole-case known failures)"]
+    to_run = {(tc.sender_shim, tc.receiver_shim, tc.amqp_type): tc for tc in plan.test_cases}
+    for key in product(plan.sender_shims, plan.receiver_shims, plan.amqp_types):
+        sender, receiver, amqp_type = key
+        if key in to_run:
+            lines.append(f"  {sender} → {receiver} ({amqp_type}): {len(to_run[key].test_values)} values")
+        elif key in plan.not_run:
+            xfail_diffs = plan.not_run[key].xfail_diffs or []
+            reason = f": {xfail_diffs[0][1].reason}" if xfail_diffs else ""
+            lines.append(f"  {sender} → {receiver} ({amqp_type}): not run{reason}")
+    lines.append("")
+
+    lines.append(
+        f"Work: {len(estimate.units)} unit(s), {estimate.processes} shim process(es), "
+        f"{sum(unit.sends for unit in estimate.units)} send(s) of {_size(estimate.payload_bytes)} payload"
+    )
+    lines.append("")
+
+    if estimate.wall_ms:
+        borrowed = (
+            f"; {estimate.borrowed_durations} case(s) without history estimated from similar cases"
+            if estimate.borrowed_durations else ""
+        )
+        lines.append(f"Estimated wall time (durations of the last {history_runs} recorded run(s){borrowed}):")
+        for count, ms in estimate.wall_ms.items():
+            marker = "  ← selected" if count == estimate.workers else ""
+            lines.append(f"  -j {count:<3d} {_duration(ms)}{marker}")
+    else:
+        lines.append("Estimated wall time: unknown, no recorded runs (record them with --history-db)")
+    lines.append("")
+
+    lines.append(f"Peak shim process memory at -j {estimate.workers}:")
+    for m in estimate.memory:
+        if m.in_process:
+            detail = "in-process (no shim processes)"
+        elif m.max_rss_kb is None:
+            detail = f"{m.processes} process(es), up to {m.concurrent} at once; no recorded memory"
+        else:
+            rss_kb = m.max_rss_kb
+            detail = (
+                f"{m.processes} process(es), up to {m.concurrent} × {_size(rss_kb * 1024)} "
+                f"= {_size(m.concurrent * rss_kb * 1024)}"
+            )
+        lines.append(f"  {m.shim:<20s} {detail}")
+    lines.append(f"  {'all shims':<20s} ≤ {_size(estimate.peak_kb * 1024)}")
+    return "\n".join(lines)
+
+
+def _unit_processes(
+    group: list[TestCase],
+    shims: dict[str, Any],
+    fanout: bool,
+    consolidate: bool,
+) -> tuple[list[str], int]:
+    """Shim of every process a unit starts, and its number of sends."""
+
+    def capable(name: str, capability: str) -> bool:
+        config = getattr(shims.get(name), "config", None)
+        return capability in getattr(config, "capabilities", ())
+
+    if consolidate:
+        senders = list(dict.fromkeys(tc.sender_shim for tc in group))
+        sends = senders if fanout else [tc.sender_shim for tc in group]
+        receives = []
+        for receiver in dict.fromkeys(tc.receiver_shim for tc in group):
+            queues = sum(1 for tc in group if tc.receiver_shim == receiver)
+            receives += [receiver] * (1 if capable(receiver, "receive-queues") else queues)
+    elif fanout:
+        sends = [group[0].sender_shim]
+        receives = [tc.receiver_shim for tc in group]
+    else:
+        tc = group[0]
+        sends = [tc.sender_shim]
+        diagonal = tc.sender_shim == tc.receiver_shim
+        receives = [] if diagonal and capable(tc.sender_shim, "roundtrip") else [tc.receiver_shim]
+
+    processes = [
+        name for name in [*sends, *receives]
+        if not getattr(shims.get(name), "in_process", False)
+    ]
+    return processes, len(sends)
+
+
+def _size(n_bytes: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if n_bytes < 1024:
+            return f"{n_bytes:.0f} {unit}" if unit == "B" else f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024
+    return f"{n_bytes:.1f} GiB"
+
+
+def _duration(ms: float) -> str:
+    seconds = ms / 1000
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(round(seconds), 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
@@ -0,0 +1,256 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+Offline reports built from results exports.
+
+Rows of one or more exports (e.g. the shards of one run) are merged into
+a sender × receiver matrix per type, plus one collapsed across all types.
+The HTML report is a single self-contained page: cells are colored by
+status and show median/p95 case duration, and link to the diffs and
+known-failure reasons of the cases behind them.
+"""
+
+import re
+import statistics
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from html import escape
+from typing import Any
+
+from qit.core.results import STATUSES, percentile
+from qit.types import AmqpComplexTypes, AmqpPrimitiveTypes
+
+# Worst status first; a collapsed cell shows its worst case
+_SEVERITY = ("fail", "xfail", "not_run", "pass")
+
+_CSS = """
+body { font-family: sans-serif; margin: 1.5em; color: #222; }
+table.matrix { border-collapse: collapse; margin-bottom: 1.5em; }
+.matrix th, .matrix td { border: 1px solid #ccc; padding: 4px 8px; text-align: center; font-size: 12px; }
+.matrix th.sender { text-align: right; }
+.matrix td a { color: inherit; text-decoration: none; display: block; }
+.matrix td.empty { background: #fff; }
+.pass { background: #c8e6c9; }
+.xfail { background: #ffe0a3; }
+.fail { background: #f4a6a6; }
+.not_run { background: #e0e0e0; }
+.ms { color: #555; font-size: 11px; }
+.legend span { padding: 2px 8px; margin-right: 6px; }
+details { margin: 0.3em 0; }
+.case { margin: 0.6em 0 0.6em 1em; }
+.case pre { background: #f6f6f6; padding: 6px; white-space: pre-wrap; margin: 0.3em 0; }
+nav a { margin-right: 0.8em; }
+"""
+
+
+@dataclass
+class Cell:
+    """Cases of one sender × receiver cell, for one type or for all of them."""
+
+    rows: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def status(self) -> str:
+        statuses = {row["status"] for row in self.rows}
+        return next(s for s in _SEVERITY if s in statuses)
+
+    def counts(self) -> dict[str, int]:
+        return {s: sum(1 for row in self.rows if row["status"] == s) for s in STATUSES}
+
+    def durations(self) -> list[float]:
+        return [row["duration_ms"] for row in self.rows if row["status"] != "not_run"]
+
+    @property
+    def median_ms(self) -> float | None:
+        durations = self.durations()
+        return statistics.median(durations) if durations else None
+
+    @property
+    def p95_ms(self) -> float | None:
+        durations = self.durations()
+        return percentile(durations, 95) if durations else None
+
+
+class ResultsMatrix:
+    """Merged rows of results exports, indexed by type and shim pair."""
+
+    def __init__(self, rows: Iterable[dict[str, Any]]) -> None:
+        """
+        Args:
+            rows: Export rows; a later row for the same case replaces an earlier one
+        """
+        cases: dict[tuple[str, str, str], dict[str, Any]] = {}
+        run_ids: dict[str, None] = {}
+        for row in rows:
+            cases[(row["type"], row["sender"], row["receiver"])] = row
+            run_ids.setdefault(row["run_id"], None)
+        self.cases = cases
+        self.run_ids = list(run_ids)
+        self.types = _type_order({t for t, _, _ in cases})
+        self.senders = sorted({s for _, s, _ in cases})
+        self.receivers = sorted({r for _, _, r in cases})
+
+    def cell(self, sender: str, receiver: str, amqp_type: str | None = None) -> Cell:
+        """Cell of one type, or collapsed across all types if amqp_type is None."""
+        types = self.types if amqp_type is None else [amqp_type]
+        return Cell([
+            self.cases[(t, sender, receiver)] for t in types
+            if (t, sender, receiver) in self.cases
+        ])
+
+    def totals(self) -> dict[str, int]:
+        return Cell(list(self.cases.values())).counts()
+
+
+def text_summary(matrix: ResultsMatrix) -> str:
+    """Status counts overall and per type."""
+    totals = matrix.totals()
+    lines = [
+        f"Runs:   {', '.join(matrix.run_ids)}",
+        f"Cases:  {len(matrix.cases)} ({len(matrix.senders)} senders × "
+        f"{len(matrix.receivers)} receivers × {len(matrix.types)} types)",
+        "Status: " + ", ".join(f"{totals[s]} {s}" for s in STATUSES),
+    ]
+    for amqp_type in matrix.types:
+        counts = Cell([row for key, row in matrix.cases.items() if key[0] == amqp_type]).counts()
+        if counts["fail"] or counts["xfail"]:
+            lines.append(f"  {amqp_type}: {counts['fail']} fail, {counts['xfail']} xfail")
+    return "\n".join(lines)
+
+
+def render_html(matrix: ResultsMatrix, title: str = "QIT Interoperability Matrix") -> str:
+    """A self-contained HTML page with the matrices and case details."""
+    totals = matrix.totals()
+    parts = [
+        "<!DOCTYPE html>",
+        '<html><head><meta charset="utf-8">',
+        f"<title>{escape(title)}</title>",
+        f"<style>{_CSS}</style>",
+        "</head><body>",
+        f"<h1>{escape(title)}</h1>",
+        f"<p>Runs: {escape(', '.join(matrix.run_ids))}. {len(matrix.cases)} cases: "
+        + ", ".join(f"{totals[s]} {s}" for s in STATUSES) + ".</p>",
+        '<p class="legend">' + "".join(f'<span class="{s}">{s}</span>' for s in STATUSES)
+        + " Cells show median / p95 case duration (ms); senders are rows, receivers columns.</p>",
+        "<nav>Types: " + "".join(
+            f'<a href="#type-{_anchor(t)}">{escape(t)}</a>' for t in ["all", *matrix.types]
+        ) + "</nav>",
+    ]
+
+    parts.append('<h2 id="type-all">All types</h2>')
+    parts.append(_matrix_table(matrix, None))
+    for amqp_type in matrix.types:
+        parts.append(f'<h2 id="type-{_anchor(amqp_type)}">{escape(amqp_type)}</h2>')
+        parts.append(_matrix_table(matrix, amqp_type))
+
+    parts.append("<h2>Details</h2>")
+    parts.append(_details(matrix))
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def _matrix_table(matrix: ResultsMatrix, amqp_type: str | None) -> str:
+    header = "".join(f"<th>{escape(r)}</th>" for r in matrix.receivers)
+    lines = ['<table class="matrix">', f"<tr><th>sender \\ receiver</th>{header}</tr>"]
+    for sender in matrix.senders:
+        cells = []
+        for receiver in matrix.receivers:
+            cell = matrix.cell(sender, receiver, amqp_type)
+            if not cell.rows:
+                cells.append('<td class="empty"></td>')
+                continue
+            counts = cell.counts()
+            label = cell.status if amqp_type else (
+                f"{counts['pass']}/{counts['xfail'] + counts['not_run']}/{counts['fail']}"
+            )
+            timing = (
+                f'<div class="ms">{cell.median_ms:.0f} / {cell.p95_ms:.0f}</div>'
+                if cell.median_ms is not None else ""
+            )
+            tooltip = ", ".join(f"{n} {s}" for s, n in counts.items() if n)
+            body = f"{escape(label)}{timing}"
+            if cell.status != "pass":
+                target = _case_anchor(sender, receiver, amqp_type)
+                body = f'<a href="#{target}">{body}</a>'
+            cells.append(f'<td class="{cell.status}" title="{escape(tooltip)}">{body}</td>')
+        lines.append(f'<tr><th class="sender">{escape(sender)}</th>{"".join(cells)}</tr>')
+    lines.append("</table>")
+    if amqp_type is None:
+        lines.append('<p class="ms">Collapsed cells show pass/xfail (including not run)/fail case counts.</p>')
+    return "\n".join(lines)
+
+
+def _details(matrix: ResultsMatrix) -> str:
+    """Diffs, errors and known-failure reasons of every case that did not simply pass."""
+    lines = []
+    for sender in matrix.senders:
+        for receiver in matrix.receivers:
+            cell = matrix.cell(sender, receiver)
+            problems = [row for row in cell.rows if row["status"] != "pass" or row.get("xpass")]
+            if not problems:
+                continue
+            counts = cell.counts()
+            lines.append(
+                f'<details id="{_case_anchor(sender, receiver, None)}" open>'
+                f"<summary><b>{escape(sender)} → {escape(receiver)}</b>: "
+                f"{counts['fail']} fail, {counts['xfail']} xfail, {counts['not_run']} not run</summary>"
+            )
+            for row in problems:
+                lines.append(_case_details(row))
+            lines.append("</details>")
+    return "\n".join(lines) or "<p>Every case passed.</p>"
+
+
+def _case_details(row: dict[str, Any]) -> str:
+    anchor = _case_anchor(row["sender"], row["receiver"], row["type"])
+    lines = [
+        f'<div class="case" id="{anchor}">',
+        f'<span class="{row["status"]}">{escape(row["status"])}</span> '
+        f"<b>{escape(row['type'])}</b> ({row['duration_ms']:.0f} ms"
+        + (f", {row['attempts']} attempts" if row.get("attempts", 1) > 1 else "") + ")",
+    ]
+    if row.get("error"):
+        lines.append(f"<pre>{escape(row['error'])}</pre>")
+    messages = row.get("diff_messages") or []
+    if messages:
+        more = row.get("diffs", len(messages)) - len(messages)
+        text = "\n".join(messages) + (f"\n... and {more} more" if more > 0 else "")
+        lines.append(f"<pre>{escape(text)}</pre>")
+    for label, key in (("Known failure", "xfail_reasons"), ("Now passing", "xpass_reasons")):
+        for reason in row.get(key) or []:
+            link = f' (<a href="{escape(reason["bug_url"])}">bug</a>)' if reason.get("bug_url") else ""
+            lines.append(f"<div>{label}: {escape(reason['reason'])}{link}</div>")
+    lines.append("</div>")
+    return "\n".join(lines)
+
+
+def _type_order(types: set[str]) -> list[str]:
+    """Types in test-suite order (primitives, then composites), unknown ones last."""
+    known = [*AmqpPrimitiveTypes.get_all_types(), *AmqpComplexTypes.get_all_types()]
+    return [t for t in known if t in types] + sorted(types.difference(known))
+
+
+def _case_anchor(sender: str, receiver: str, amqp_type: str | None) -> str:
+    parts = [sender, receiver] if amqp_type is None else [sender, receiver, amqp_type]
+    return "case-" + "--".join(_anchor(p) for p in parts)
+
+
+def _anchor(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", text)
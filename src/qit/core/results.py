@@ -0,0 +1,313 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+Machine-readable results export.
+
+Every case becomes one flat row (sender, receiver, type, status, counts,
+phase timings, payload size, shim process memory, shim stats and client
+versions). Rows are appended to a JSON Lines file as results arrive; when
+pyarrow is installed, the same rows are also written to a Parquet file
+next to it (pyarrow is imported only then).
+"""
+
+import functools
+import importlib.util
+import json
+import threading
+import uuid
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from pathlib import Path
+from types import TracebackType
+from typing import TYPE_CHECKING, Any
+
+from qit.core.shim import Message
+
+if TYPE_CHECKING:
+    from qit.core.orchestrator import TestResult
+    from qit.core.xfail import KnownFailure
+
+# Rows buffered per Parquet row group
+PARQUET_BATCH = 4096
+
+# Diff messages kept per case
+MAX_DIFF_MESSAGES = 10
+
+# Column name -> type, in row order. Types are Parquet type names, or
+# "json" for objects and lists, stored as JSON text in Parquet and SQLite
+COLUMNS: dict[str, str] = {
+    "run_id": "string",
+    "started": "string",
+    "sender": "string",
+    "receiver": "string",
+    "type": "string",
+    "status": "string",
+    "attempts": "int64",
+    "messages": "int64",
+    "payload_bytes": "int64",
+    "diffs": "int64",
+    "xfail": "int64",
+    "xpass": "int64",
+    "duration_ms": "float64",
+    "send_ms": "float64",
+    "receive_ms": "float64",
+    "roundtrip_ms": "float64",
+    "compare_ms": "float64",
+    "sender_version": "string",
+    "receiver_version": "string",
+    "sender_rss_kb": "int64",
+    "receiver_rss_kb": "int64",
+    "sender_stats": "json",
+    "receiver_stats": "json",
+    "error": "string",
+    "diff_messages": "json",
+    "xfail_reasons": "json",
+    "xpass_reasons": "json",
+}
+
+JSON_COLUMNS = frozenset(name for name, type_name in COLUMNS.items() if type_name == "json")
+
+STATUSES = ("pass", "fail", "xfail", "not_run")
+
+
+def result_status(result: "TestResult") -> str:
+    """One of STATUSES for a test result."""
+    if result.not_run:
+        return "not_run"
+    if not result.success:
+        return "fail"
+    return "xfail" if result.xfail_diffs else "pass"
+
+
+def payload_bytes(amqp_type: str, values: list[Any]) -> int:
+    """Size of the compact JSON message data handed to a sender for these values."""
+    data = [Message(i, amqp_type, value).to_dict() for i, value in enumerate(values)]
+    return len(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+
+def new_run_id() -> str:
+    """A unique identifier for one qit run."""
+    return uuid.uuid4().hex[:12]
+
+
+class ResultRows:
+    """Builds the export rows of one run's results."""
+
+    def __init__(self, run_id: str | None = None) -> None:
+        """
+        Args:
+            run_id: Identifier stored in every row (default: a new one)
+        """
+        self.run_id = run_id or new_run_id()
+        self.started = datetime.now(UTC).isoformat(timespec="seconds")
+        # Payload size per values list, which every pair of a type shares
+        self._payload_sizes: dict[tuple[str, int], tuple[list[Any], int]] = {}
+
+    def row(self, result: "TestResult") -> dict[str, Any]:
+        """The flat row for a result; stats stay nested objects."""
+        tc = result.test_case
+        phases = result.phase_ms or {}
+        send_stats = result.send_stats or {}
+        receive_stats = result.receive_stats or {}
+        return {
+            "run_id": self.run_id,
+            "started": self.started,
+            "sender": tc.sender_shim,
+            "receiver": tc.receiver_shim,
+            "type": tc.amqp_type,
+            "status": result_status(result),
+            "attempts": result.attempts,
+            "messages": len(tc.test_values),
+            "payload_bytes": (
+                tc.suite.payload_bytes if tc.suite is not None
+                else self._payload_bytes(tc.amqp_type, tc.test_values)
+            ),
+            "diffs": len(result.diffs),
+            "xfail": len(result.xfail_diffs or []),
+            "xpass": len(result.xpass_entries or []),
+            "duration_ms": round(result.duration_ms, 3),
+            "send_ms": _round(phases.get("send")),
+            "receive_ms": _round(phases.get("receive")),
+            "roundtrip_ms": _round(phases.get("roundtrip")),
+            "compare_ms": _round(phases.get("compare")),
+            "sender_version": send_stats.get("client_version"),
+            "receiver_version": receive_stats.get("client_version"),
+            "sender_rss_kb": result.sender_rss_kb,
+            "receiver_rss_kb": result.receiver_rss_kb,
+            "sender_stats": result.send_stats,
+            "receiver_stats": result.receive_stats,
+            "error": result.error,
+            "diff_messages": [diff.message for diff in result.diffs[:MAX_DIFF_MESSAGES]],
+            "xfail_reasons": _reasons(kf for _, kf in result.xfail_diffs or []),
+            "xpass_reasons": _reasons(result.xpass_entries or []),
+        }
+
+    def _payload_bytes(self, amqp_type: str, values: list[Any]) -> int:
+        key = (amqp_type, id(values))
+        cached = self._payload_sizes.get(key)
+        if cached is None or cached[0] is not values:
+            cached = (values, payload_bytes(amqp_type, values))
+            self._payload_sizes[key] = cached
+        return cached[1]
+
+
+class ResultsWriter:
+    """Writes one row per test result to JSON Lines (and Parquet if available)."""
+
+    def __init__(
+        self,
+        output_path: str | Path,
+        rows: ResultRows | None = None,
+        parquet: bool | None = None,
+    ) -> None:
+        """
+        Args:
+            output_path: JSON Lines file; the Parquet file gets a .parquet suffix
+            rows: Row builder of the run (default: one for a new run)
+            parquet: Also write Parquet (default: when pyarrow is installed)
+        """
+        self.output_path = Path(output_path)
+        self.parquet_path = self.output_path.with_suffix(".parquet")
+        self.rows = rows or ResultRows()
+        if parquet and not parquet_available():
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+        self.parquet = parquet_available() if parquet is None else parquet
+        self.rows_written = 0
+
+        self._lock = threading.Lock()
+        self._batch: list[dict[str, Any]] = []
+        self._parquet_writer: Any = None
+
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._jsonl = open(self.output_path, "w", encoding="utf-8")
+
+    def add(self, result: "TestResult") -> None:
+        """Append the row for one result (thread-safe)."""
+        with self._lock:
+            row = self.rows.row(result)
+            self._jsonl.write(json.dumps(row, separators=(",", ":")) + "\n")
+            self.rows_written += 1
+            if self.parquet:
+                self._batch.append(row)
+                if len(self._batch) >= PARQUET_BATCH:
+                    self._flush_parquet()
+
+    def close(self) -> None:
+        """Flush and close the output files."""
+        with self._lock:
+            if self._jsonl.closed:
+                return
+            self._jsonl.close()
+            if self.parquet:
+                self._flush_parquet()
+                if self._parquet_writer is None:
+                    # No rows: still leave a readable, empty file
+                    _, pq = _pyarrow()
+                    self._parquet_writer = pq.ParquetWriter(self.parquet_path, _schema())
+                self._parquet_writer.close()
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _flush_parquet(self) -> None:
+        if not self._batch:
+            return
+        pa, pq = _pyarrow()
+        schema = _schema()
+        columns: dict[str, list[Any]] = {name: [] for name in COLUMNS}
+        for row in self._batch:
+            for name in COLUMNS:
+                value = row.get(name)
+                if name in JSON_COLUMNS and value is not None:
+                    value = json.dumps(value, sort_keys=True)
+                columns[name].append(value)
+        table = pa.table(columns, schema=schema)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.parquet_path, schema)
+        self._parquet_writer.write_table(table)
+        self._batch.clear()
+
+
+def read_results(path: str | Path) -> list[dict[str, Any]]:
+    """Rows of a results export, JSON Lines or (with pyarrow) Parquet."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        if not parquet_available():
+            raise RuntimeError("Reading Parquet requires pyarrow (pip install pyarrow)")
+        _, pq = _pyarrow()
+        return [decode_json_columns(row) for row in pq.read_table(path).to_pylist()]
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def decode_json_columns(row: dict[str, Any]) -> dict[str, Any]:
+    """Turn JSON text of a Parquet or SQLite row back into objects and lists."""
+    for name in JSON_COLUMNS:
+        if isinstance(row.get(name), str):
+            row[name] = json.loads(row[name])
+    return row
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile (0 < q <= 100) of non-empty values."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def _reasons(failures: Iterable["KnownFailure"]) -> list[dict[str, str]]:
+    """Distinct known-failure reasons, with bug links, in first-seen order."""
+    seen: dict[str, str] = {}
+    for kf in failures:
+        seen.setdefault(kf.reason, kf.bug_url)
+    return [{"reason": reason, "bug_url": url} for reason, url in seen.items()]
+
+
+def parquet_available() -> bool:
+    """Whether pyarrow is installed, without importing it."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+@functools.cache
+def _pyarrow() -> tuple[Any, Any]:
+    import pyarrow
+    import pyarrow.parquet
+
+    return pyarrow, pyarrow.parquet
+
+
+def _schema() -> Any:
+    pa, _ = _pyarrow()
+    return pa.schema([
+        (name, pa.string() if type_name == "json" else getattr(pa, type_name)())
+        for name, type_name in COLUMNS.items()
+    ])
+
+
+def _round(ms: float | None) -> float | None:
+    return None if ms is None else round(ms, 3)
@@ -26,13 +26,23 @@ and native client shims, plus auto-discovery of shim directories.
 
 import json
 import logging
+import os
+import shutil
+import signal
 import subprocess
-from dataclasses import dataclass
+import sys
+import tempfile
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+from qit.core.canonical import messages_digest
+
 logger = logging.getLogger(__name__)
 
+DISCOVERY_CACHE_FILE = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "qit" / "shims.json"
+
 
 @dataclass
 class ShimInfo:
@@ -43,35 +53,213 @@ class ShimInfo:
     shim_dir: Path
     shim_type: str
     broker_prefix: str
-
-
-def discover_shims(shims_dir: Path) -> dict[str, ShimInfo]:
-    """Scan shims_dir/*/shim.json and return validated ShimInfo dict keyed by directory name."""
+    capabilities: frozenset[str] = frozenset()
+    argv: list[str] | None = None
+    commands: dict[str, list[str]] = field(default_factory=dict)
+    env: dict[str, str] | None = None
+    in_process: Path | None = None
+
+    def command(self, subcommand: str) -> list[str]:
+        """Return the argv prefix for a shim subcommand (direct exec or shim.sh)."""
+        return _build_command(self.shim_dir / "shim.sh", self.argv, self.commands, subcommand)
+
+
+def _build_command(
+    executable: Path,
+    argv: list[str] | None,
+    commands: dict[str, list[str]],
+    subcommand: str,
+) -> list[str]:
+    """
+    Build the argv prefix for a shim subcommand.
+
+    A per-subcommand entry from shim.json ``exec.commands`` replaces the
+    subcommand entirely; ``exec.argv`` is a prefix the subcommand is appended
+    to. Without either, the shim.sh wrapper is used.
+    """
+    if subcommand in commands:
+        return list(commands[subcommand])
+    if argv is not None:
+        return [*argv, subcommand]
+    return [str(executable), subcommand]
+
+
+def _resolve_exec(
+    spec: dict[str, Any],
+    shim_dir: Path,
+    checks: dict[str, bool] | None = None,
+) -> tuple[list[str] | None, dict[str, list[str]], dict[str, str] | None]:
+    """
+    Resolve the optional ``exec`` section of a shim manifest.
+
+    Placeholders ``{shim_dir}``, ``{project_root}`` and ``{python}`` are
+    substituted, the program is resolved on PATH, and paths built from
+    placeholders must exist. Any argv that does not resolve is dropped, so
+    that shim falls back to shim.sh (which reports the missing build).
+
+    Args:
+        spec: The ``exec`` section
+        shim_dir: Shim directory
+        checks: If given, receives every path whose existence was tested
+
+    Returns:
+        (argv, commands, env), env being the variables the shim sets on top
+        of the process environment, or None to inherit it unchanged
+    """
+    checks = {} if checks is None else checks
+
+    def exists(path: Path) -> bool:
+        checks[str(path)] = path.exists()
+        return checks[str(path)]
+
+    shim_dir = shim_dir.resolve()
+    project_root = shim_dir.parent.parent
+    venv_python = project_root / ".venv" / "bin" / "python"
+    python = str(venv_python) if exists(venv_python) else shutil.which("python3") or "python3"
+    values = {"shim_dir": str(shim_dir), "project_root": str(project_root), "python": python}
+
+    def resolve(template: list[str]) -> list[str] | None:
+        resolved = []
+        for arg in template:
+            value = arg.format(**values)
+            if ("{shim_dir}" in arg or "{project_root}" in arg) and not all(
+                exists(Path(part)) for part in value.split(os.pathsep)
+            ):
+                logger.debug("Using shim.sh for %s: %s not found", shim_dir.name, value)
+                return None
+            resolved.append(value)
+        program = shutil.which(resolved[0]) if resolved else None
+        if program is None:
+            logger.debug("Using shim.sh for %s: %s not on PATH", shim_dir.name, template[:1])
+            return None
+        return [program, *resolved[1:]]
+
+    argv = resolve(spec["argv"]) if "argv" in spec else None
+    commands = {}
+    for subcommand, template in spec.get("commands", {}).items():
+        command = resolve(template)
+        if command is not None:
+            commands[subcommand] = command
+
+    env = None
+    if spec.get("env") and (argv is not None or commands):
+        env = {k: v.format(**values) for k, v in spec["env"].items()}
+    return argv, commands, env
+
+
+def default_shims_dir() -> Path:
+    """$QIT_SHIMS_DIR, else the shims directory of a source checkout, else ./shims."""
+    configured = os.environ.get("QIT_SHIMS_DIR")
+    if configured:
+        return Path(configured)
+    checkout = Path(__file__).resolve().parents[3] / "shims"
+    if checkout.is_dir():
+        return checkout
+    return Path.cwd() / "shims"
+
+
+def discover_shims(shims_dir: Path, cache_file: Path | None = None) -> dict[str, ShimInfo]:
+    """
+    Scan shims_dir/*/shim.json and return validated ShimInfo dict keyed by directory name.
+
+    Args:
+        shims_dir: Directory holding one subdirectory per shim
+        cache_file: If given, reuse shims resolved by an earlier call while
+            their manifest mtime, the paths their resolution tested and PATH
+            are unchanged, and store the result there
+
+    Returns:
+        Discovered shims
+    """
     shims: dict[str, ShimInfo] = {}
     if not shims_dir.is_dir():
         return shims
+
+    cache = _load_discovery_cache(cache_file, shims_dir) if cache_file else {}
+    entries: dict[str, dict[str, Any]] = {}
     for manifest in sorted(shims_dir.glob("*/shim.json")):
         shim_dir = manifest.parent
         key = shim_dir.name
-        try:
-            with open(manifest) as f:
-                data = json.load(f)
-            shim_sh = shim_dir / "shim.sh"
-            if not shim_sh.exists():
-                logger.warning("Skipping %s: shim.sh not found", key)
+        shim_sh = shim_dir / "shim.sh"
+        if not shim_sh.exists():
+            logger.warning("Skipping %s: shim.sh not found", key)
+            continue
+        mtime = manifest.stat().st_mtime_ns
+        entry = cache.get(key)
+        if entry is None or entry["mtime"] != mtime or not all(
+            Path(path).exists() == found for path, found in entry["checks"].items()
+        ):
+            try:
+                with open(manifest) as f:
+                    data = json.load(f)
+                checks: dict[str, bool] = {}
+                argv, commands, env = _resolve_exec(data.get("exec", {}), shim_dir, checks)
+                entry = {
+                    "mtime": mtime,
+                    "checks": checks,
+                    "name": data["name"],
+                    "shim_type": data["type"],
+                    "broker_prefix": data.get("broker_prefix", "amqp://"),
+                    "capabilities": sorted(data.get("capabilities", [])),
+                    "argv": argv,
+                    "commands": commands,
+                    "env": env,
+                    "in_process": data.get("in_process"),
+                }
+            except (json.JSONDecodeError, KeyError) as exc:
+                logger.warning("Skipping %s: invalid shim.json: %s", key, exc)
                 continue
-            shims[key] = ShimInfo(
-                name=data["name"],
-                key=key,
-                shim_dir=shim_dir,
-                shim_type=data["type"],
-                broker_prefix=data.get("broker_prefix", "amqp://"),
-            )
-        except (json.JSONDecodeError, KeyError) as exc:
-            logger.warning("Skipping %s: invalid shim.json: %s", key, exc)
+        entries[key] = entry
+        shims[key] = ShimInfo(
+            name=entry["name"],
+            key=key,
+            shim_dir=shim_dir,
+            shim_type=entry["shim_type"],
+            broker_prefix=entry["broker_prefix"],
+            capabilities=frozenset(entry["capabilities"]),
+            argv=entry["argv"],
+            commands=entry["commands"],
+            env={**os.environ, **entry["env"]} if entry["env"] else None,
+            in_process=shim_dir / entry["in_process"] if entry["in_process"] else None,
+        )
+
+    if cache_file and entries != cache:
+        _store_discovery_cache(cache_file, shims_dir, entries)
     return shims
 
 
+def _cache_scope(shims_dir: Path) -> str:
+    """Cache section of a shims directory; resolved programs depend on PATH."""
+    return f"{shims_dir.resolve()}{os.pathsep}{os.environ.get('PATH', '')}"
+
+
+def _load_discovery_cache(cache_file: Path, shims_dir: Path) -> dict[str, dict[str, Any]]:
+    try:
+        with open(cache_file) as f:
+            section = json.load(f).get(_cache_scope(shims_dir), {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+    return section if isinstance(section, dict) else {}
+
+
+def _store_discovery_cache(cache_file: Path, shims_dir: Path, entries: dict[str, dict[str, Any]]) -> None:
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+        if not isinstance(cache, dict):
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    cache[_cache_scope(shims_dir)] = entries
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(cache))
+        tmp.replace(cache_file)
+    except OSError as exc:
+        logger.debug("Cannot write shim discovery cache %s: %s", cache_file, exc)
+
+
 @dataclass
 class ShimConfig:
     """Configuration for a client shim."""
@@ -81,6 +269,10 @@ class ShimConfig:
     client: str
     executable: Path
     jms_only: bool = False
+    capabilities: frozenset[str] = frozenset()
+    argv: list[str] | None = None
+    commands: dict[str, list[str]] = field(default_factory=dict)
+    env: dict[str, str] | None = None
 
 
 @dataclass
@@ -91,6 +283,8 @@ class Message:
     amqp_type: str
     value: Any
     annotations: dict[str, Any] | None = None
+    hash: str | None = None
+    has_value: bool = True
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -122,11 +316,23 @@ class ShimResult:
     messages: list[Message]
     error: str | None = None
     stats: dict[str, Any] | None = None
+    sections: dict[str, "ShimResult"] | None = None
+    digest: str | None = None
+    acks: list[int] | None = None
+    # False when messages are the caller's own copy of the sent values
+    echoed: bool = True
+    # Peak resident memory of the shim process (None: not measured)
+    max_rss_kb: int | None = None
+    # Parsed JSON output of a run(), left to the caller to interpret
+    output: dict[str, Any] | None = None
 
 
 class Shim:
     """Interface to a native AMQP client shim."""
 
+    # True for shims whose handlers run in the qit process (no shim processes)
+    in_process = False
+
     def __init__(self, config: ShimConfig) -> None:
         self.config = config
         if not config.executable.exists():
@@ -153,12 +359,10 @@ class Shim:
         Returns:
             ShimResult with sent message details
         """
-        messages = [Message(i, amqp_type, val) for i, val in enumerate(values)]
-        data_json = json.dumps([msg.to_dict() for msg in messages])
+        data = [Message(i, amqp_type, val).to_dict() for i, val in enumerate(values)]
 
         cmd = [
-            str(self.config.executable),
-            "send",
+            *self._command("send"),
             "--broker",
             broker_url,
             "--queue",
@@ -168,10 +372,20 @@ class Shim:
             "--count",
             str(len(values)),
             "--data",
-            data_json,
+            json.dumps(data),
         ]
 
-        return self._execute(cmd, timeout)
+        # Shims that can digest their input skip echoing it back
+        digest = None
+        if "send-digest" in self.config.capabilities:
+            digest = messages_digest((msg["type"], msg["value"]) for msg in data)
+            cmd += ["--expect-digest", digest]
+
+        result = self._execute(cmd, timeout)
+        if digest is not None and result.success and result.digest == digest and not result.messages:
+            result.messages = self._parse_messages({"messages": data})
+            result.echoed = False
+        return result
 
     def receive(
         self,
@@ -179,6 +393,7 @@ class Shim:
         queue_name: str,
         count: int,
         timeout: int = 30,
+        expected_hashes: list[str] | None = None,
     ) -> ShimResult:
         """
         Receive messages using this shim.
@@ -188,13 +403,15 @@ class Shim:
             queue_name: Queue/address name
             count: Number of messages to receive
             timeout: Execution timeout in seconds
+            expected_hashes: Canonical hashes of the expected messages; shims
+                with the ``receive-hash`` capability then return values only
+                for messages whose hash differs
 
         Returns:
             ShimResult with received message details
         """
         cmd = [
-            str(self.config.executable),
-            "receive",
+            *self._command("receive"),
             "--broker",
             broker_url,
             "--queue",
@@ -203,10 +420,129 @@ class Shim:
             str(count),
             "--timeout",
             str(timeout),
+            *self._hash_args(expected_hashes),
         ]
 
         return self._execute(cmd, timeout + 5)  # Add buffer to shim timeout
 
+    def receive_queues(
+        self,
+        broker_url: str,
+        queue_names: list[str],
+        count: int,
+        timeout: int = 30,
+        expected_hashes: list[str] | None = None,
+    ) -> dict[str, ShimResult]:
+        """
+        Receive messages from several queues in one shim process.
+
+        Shims declaring the ``receive-queues`` capability drain all queues
+        over one connection; other shims are run once per queue.
+
+        Args:
+            broker_url: AMQP broker URL
+            queue_names: Queue/address names
+            count: Number of messages to receive from each queue
+            timeout: Execution timeout in seconds
+            expected_hashes: Canonical hashes expected on every queue
+
+        Returns:
+            ShimResult per queue name
+        """
+        if "receive-queues" not in self.config.capabilities:
+            return {
+                queue: self.receive(broker_url, queue, count, timeout, expected_hashes)
+                for queue in queue_names
+            }
+
+        cmd = [
+            *self._command("receive"),
+            "--broker",
+            broker_url,
+            "--queues",
+            ",".join(queue_names),
+            "--count",
+            str(count),
+            "--timeout",
+            str(timeout),
+            *self._hash_args(expected_hashes),
+        ]
+
+        result = self._execute(cmd, timeout + 5)
+        if not result.success:
+            return dict.fromkeys(queue_names, result)
+
+        grouped = result.sections or {}
+        return {
+            queue: grouped.get(queue, ShimResult(success=True, messages=[]))
+            for queue in queue_names
+        }
+
+    def roundtrip(
+        self,
+        broker_url: str,
+        queue_name: str,
+        amqp_type: str,
+        values: list[Any],
+        timeout: int = 30,
+        expected_hashes: list[str] | None = None,
+    ) -> tuple[ShimResult, ShimResult]:
+        """
+        Send messages and receive them back with this shim.
+
+        Shims declaring the ``roundtrip`` capability do both on one
+        connection in one process; other shims run send then receive.
+
+        Args:
+            broker_url: AMQP broker URL
+            queue_name: Queue/address name
+            amqp_type: AMQP type name
+            values: List of values to send
+            timeout: Timeout of the roundtrip (or of each of send and
+                receive) in seconds
+            expected_hashes: Canonical hashes of the expected messages, as
+                for receive
+
+        Returns:
+            (send result, receive result)
+        """
+        if "roundtrip" not in self.config.capabilities:
+            send_result = self.send(broker_url, queue_name, amqp_type, values, timeout)
+            if not send_result.success:
+                return send_result, ShimResult(success=False, messages=[], error="Not run: send failed")
+            return send_result, self.receive(broker_url, queue_name, len(values), timeout, expected_hashes)
+
+        messages = [Message(i, amqp_type, val) for i, val in enumerate(values)]
+        data_json = json.dumps([msg.to_dict() for msg in messages])
+
+        cmd = [
+            *self._command("roundtrip"),
+            "--broker",
+            broker_url,
+            "--queue",
+            queue_name,
+            "--type",
+            amqp_type,
+            "--count",
+            str(len(values)),
+            "--data",
+            data_json,
+            "--timeout",
+            str(timeout),
+            *self._hash_args(expected_hashes),
+        ]
+
+        result = self._execute(cmd, timeout + 5)
+        sections = result.sections or {}
+        if not result.success or "sent" not in sections or "received" not in sections:
+            failed = ShimResult(
+                success=False,
+                messages=[],
+                error=result.error or "Roundtrip output missing sent/received sections",
+            )
+            return failed, failed
+        return sections["sent"], sections["received"]
+
     def send_direct(
         self,
         host: str,
@@ -221,8 +557,7 @@ class Shim:
         data_json = json.dumps([msg.to_dict() for msg in messages])
 
         cmd = [
-            str(self.config.executable),
-            "send-direct",
+            *self._command("send-direct"),
             "--host",
             host,
             "--port",
@@ -252,8 +587,7 @@ class Shim:
         The caller must manage the process lifecycle and parse output.
         """
         cmd = [
-            str(self.config.executable),
-            "receive-direct",
+            *self._command("receive-direct"),
             "--port",
             str(port),
             "--queue",
@@ -266,45 +600,112 @@ class Shim:
 
         return subprocess.Popen(
             cmd,
+            env=self.config.env,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=False,
         )
 
-    def _execute(self, cmd: list[str], timeout: int) -> ShimResult:
-        """Execute shim command and parse JSON output."""
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                check=False,
+    def run(
+        self,
+        subcommand: str,
+        broker_url: str,
+        queue_name: str,
+        args: list[str],
+        timeout: int = 30,
+    ) -> ShimResult:
+        """
+        Run a subcommand with arguments of the caller's choosing.
+
+        Used by the message suites, whose shim options (JMS types, headers,
+        large content) differ from those of send and receive. The output is
+        not parsed into messages; it is returned as ShimResult.output.
+
+        Args:
+            subcommand: "send" or "receive"
+            broker_url: AMQP broker URL
+            queue_name: Queue/address name
+            args: Further arguments
+            timeout: Execution timeout in seconds
+
+        Returns:
+            ShimResult with the parsed JSON output
+        """
+        cmd = [*self._command(subcommand), "--broker", broker_url, "--queue", queue_name, *args]
+        return self._execute(cmd, timeout, raw=True)
+
+    def _hash_args(self, expected_hashes: list[str] | None) -> list[str]:
+        """Receive options asking for hashes, if the shim supports them."""
+        if expected_hashes is None or "receive-hash" not in self.config.capabilities:
+            return []
+        return ["--expect-hashes", ",".join(expected_hashes)]
+
+    def _command(self, subcommand: str) -> list[str]:
+        """Return the argv prefix for a subcommand."""
+        return _build_command(self.config.executable, self.config.argv, self.config.commands, subcommand)
+
+    @staticmethod
+    def _parse_messages(output: dict[str, Any]) -> list[Message]:
+        """Build Message objects from a shim's JSON ``messages`` list."""
+        return [
+            Message(
+                index=msg["index"],
+                amqp_type=msg["type"],
+                value=msg.get("value"),
+                annotations=msg.get("annotations"),
+                hash=msg.get("hash"),
+                has_value="value" in msg,
             )
+            for msg in output.get("messages", [])
+        ]
+
+    def _execute(self, cmd: list[str], timeout: int, raw: bool = False) -> ShimResult:
+        """Execute shim command and parse JSON output (raw: keep it unparsed in output)."""
+        try:
+            result = _run_measured(cmd, timeout, self.config.env)
 
             if result.returncode != 0:
                 return ShimResult(
                     success=False,
                     messages=[],
                     error=f"Shim exited with code {result.returncode}: {result.stderr}",
+                    max_rss_kb=result.max_rss_kb,
                 )
 
             # Parse JSON output
             output = json.loads(result.stdout)
-            messages = [
-                Message(
-                    index=msg["index"],
-                    amqp_type=msg["type"],
-                    value=msg["value"],
-                    annotations=msg.get("annotations"),
+            if raw:
+                return ShimResult(
+                    success=True,
+                    messages=[],
+                    stats=output.get("stats"),
+                    max_rss_kb=result.max_rss_kb,
+                    output=output,
                 )
-                for msg in output.get("messages", [])
-            ]
+            # Multi-part output: per-queue groups, or both sides of a roundtrip
+            parts = output.get("queues") or {
+                name: output[name] for name in ("sent", "received") if isinstance(output.get(name), dict)
+            }
+            sections = None
+            if parts:
+                sections = {
+                    name: ShimResult(
+                        success=True,
+                        messages=self._parse_messages(part),
+                        stats=part.get("stats"),
+                        max_rss_kb=result.max_rss_kb,
+                    )
+                    for name, part in parts.items()
+                }
 
             return ShimResult(
                 success=True,
-                messages=messages,
+                messages=self._parse_messages(output),
                 stats=output.get("stats"),
+                sections=sections,
+                digest=output.get("digest"),
+                acks=output.get("acks"),
+                max_rss_kb=result.max_rss_kb,
             )
 
         except subprocess.TimeoutExpired:
@@ -318,6 +719,7 @@ class Shim:
                 success=False,
                 messages=[],
                 error=f"Failed to parse shim output: {e}\nOutput: {result.stdout}",
+                max_rss_kb=result.max_rss_kb,
             )
         except Exception as e:
             return ShimResult(
@@ -325,3 +727,71 @@ class Shim:
                 messages=[],
                 error=f"Shim execution failed: {e}",
             )
+
+
+@dataclass
+class _Completed:
+    """Outcome of a shim process."""
+
+    returncode: int
+    stdout: str
+    stderr: str
+    max_rss_kb: int | None = None
+
+
+def _run_measured(cmd: list[str], timeout: float, env: dict[str, str] | None) -> _Completed:
+    """
+    Run a command like subprocess.run, also measuring its peak memory.
+
+    The child is reaped with wait4(), whose resource usage includes its
+    peak resident set size. Output goes through temporary files so that
+    nothing but wait4() reaps it. Platforms without wait4() and waitid()
+    run it unmeasured.
+
+    Raises:
+        subprocess.TimeoutExpired: The process was killed after timeout seconds
+    """
+    if not (hasattr(os, "wait4") and hasattr(os, "waitid")):
+        run = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, check=False, env=env)
+        return _Completed(run.returncode, run.stdout, run.stderr)
+
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(cmd, stdout=out, stderr=err, env=env)
+        lock = threading.Lock()
+        exited = False
+        timed_out = False
+
+        def kill() -> None:
+            nonlocal timed_out
+            # Until exited is set the child is not reaped, so its pid is
+            # still its own and not one the system has reused
+            with lock:
+                if not exited:
+                    timed_out = True
+                    os.kill(proc.pid, signal.SIGKILL)
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            # Wait for the exit without reaping, then reap once kill() is off
+            os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+            with lock:
+                exited = True
+            _, status, usage = os.wait4(proc.pid, 0)
+        finally:
+            timer.cancel()
+        # Reaped here, so Popen must not wait for it again
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        if timed_out:
+            raise subprocess.TimeoutExpired(cmd, timeout)
+
+        out.seek(0)
+        err.seek(0)
+        # ru_maxrss is in KiB on Linux, in bytes on macOS
+        max_rss_kb = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+        return _Completed(
+            proc.returncode,
+            out.read().decode("utf-8", errors="replace"),
+            err.read().decode("utf-8", errors="replace"),
+            max_rss_kb,
+        )
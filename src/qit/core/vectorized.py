@@ -0,0 +1,123 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+Optional NumPy path for comparing large numeric arrays.
+
+Integer elements are packed into int64/uint64 NumPy arrays, float and
+double bit patterns into uint32 and uint64 arrays, and compared in bulk. Everything here returns None when
+NumPy is missing or a side cannot be packed exactly (strings that are not
+float bits, booleans, None elements, values out of 64-bit range), and the
+caller falls back to its per-element Python loop. NumPy is imported on
+the first array large enough to use it, not with this module.
+"""
+
+import functools
+from types import ModuleType
+from typing import Any
+
+from qit.core.canonical import INTEGER_TYPES, float_bits
+
+# Arrays shorter than this are not worth the conversion
+MIN_ELEMENTS = 1024
+
+# Unsigned dtype holding the bit pattern of each floating point type
+BIT_DTYPES = {"float": "uint32", "double": "uint64"}
+
+VECTOR_TYPES = INTEGER_TYPES | frozenset(BIT_DTYPES)
+
+
+def pack(elem_type: str, elements: list[Any]) -> Any:
+    """Pack normalized expected elements into a NumPy array, or None."""
+    if elem_type not in VECTOR_TYPES or len(elements) < MIN_ELEMENTS or _numpy() is None:
+        return None
+    if elem_type in BIT_DTYPES:
+        return _bits_array(elem_type, elements)
+    return _int_array(elements)
+
+
+def first_mismatches(elem_type: str, packed: Any, actual: list[Any], limit: int) -> list[int] | None:
+    """
+    Indices of the first ``limit`` elements of ``actual`` that differ.
+
+    Args:
+        elem_type: Array element type
+        packed: Expected elements from pack()
+        actual: Received elements, same length as the expected ones
+        limit: Maximum number of indices to report
+
+    Returns:
+        Mismatching indices (empty if all match), or None if the received
+        elements cannot be compared in bulk
+    """
+    np = _numpy()
+    if np is None or packed is None:
+        return None
+
+    if elem_type in BIT_DTYPES:
+        # float_bits() rejects booleans, so the packed form must too
+        if any(a is True or a is False for a in actual):
+            return None
+        received = _bits_array(elem_type, actual)
+        if received is None:
+            received = _bits_array(elem_type, [float_bits(a) for a in actual])
+    else:
+        received = _int_array(actual)
+
+    if received is None or received.dtype != packed.dtype or received.shape != packed.shape:
+        return None
+    return [int(i) for i in np.flatnonzero(packed != received)[:limit]]
+
+
+@functools.cache
+def _numpy() -> ModuleType | None:
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover - depends on the environment
+        return None
+    module: ModuleType = numpy
+    return module
+
+
+def _int_array(values: list[Any]) -> Any:
+    """A 1-D int64/uint64 array holding exactly ``values``, or None."""
+    np = _numpy()
+    if np is None:
+        return None
+    try:
+        arr = np.asarray(values)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if arr.ndim != 1 or arr.dtype.kind not in "iu":
+        return None
+    return arr
+
+
+def _bits_array(elem_type: str, values: list[Any]) -> Any:
+    """A 1-D array of the type's bit dtype holding exactly ``values``, or None."""
+    np = _numpy()
+    arr = _int_array(values)
+    if np is None or arr is None:
+        return None
+    dtype = np.dtype(BIT_DTYPES[elem_type])
+    if arr.size and arr.dtype.kind == "i" and arr.min() < 0:
+        return None
+    if arr.size and dtype.itemsize < 8 and arr.max() > (1 << (8 * dtype.itemsize)) - 1:
+        return None
+    return arr.astype(dtype)
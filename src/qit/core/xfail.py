@@ -23,9 +23,27 @@ Known failure registry for expected test failures.
 Tracks client library limitations and known bugs that should not block CI.
 Each entry documents the specific failure, its root cause, and optionally
 a link to the upstream bug tracker.
+
+The built-in entries live in known_failures.toml next to this module;
+deployments can load more from their own TOML or JSON files. Entries are
+compiled into an index keyed by (amqp_type, sender, receiver), so looking
+up the failures of a case or a diff costs the same however many entries
+the registry holds.
 """
 
-from dataclasses import dataclass
+import json
+import os
+import threading
+import tomllib
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+BUILTIN_FAILURES_FILE = Path(__file__).parent / "known_failures.toml"
+
+# Counts runs per suite, to re-verify whole-case known failures every N runs
+RUN_COUNTER_FILE = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "qit" / "xfail-runs.json"
 
 
 @dataclass(frozen=True)
@@ -40,6 +58,151 @@ class KnownFailure:
     bug_url: str = ""
 
 
+def index_bit(message_index: int) -> int:
+    """Bit of a message index in a CaseFailures mask.
+
+    Bits are shifted by one so index -1, used by count-mismatch and
+    send-error diffs, gets a bit of its own.
+    """
+    return 1 << (message_index + 1)
+
+
+@dataclass
+class CaseFailures:
+    """The known failures of one (amqp_type, sender, receiver), precompiled."""
+
+    # All applicable entries, in registry order
+    entries: tuple[KnownFailure, ...] = ()
+    # Message indices of each entry as a bitset of index_bit() (0 for
+    # whole-case entries)
+    masks: tuple[int, ...] = ()
+    # First whole-case entry (message_indices=None), if any
+    whole_case: KnownFailure | None = None
+    # Message index -> first entry listing it, as (registry order, entry)
+    by_index: dict[int, tuple[int, KnownFailure]] = field(default_factory=dict)
+    # Registry order of whole_case
+    whole_case_order: int = -1
+
+    def find(self, message_index: int) -> KnownFailure | None:
+        """First entry, in registry order, covering a message index."""
+        indexed = self.by_index.get(message_index)
+        if indexed is None:
+            return self.whole_case
+        if self.whole_case is not None and self.whole_case_order < indexed[0]:
+            return self.whole_case
+        return indexed[1]
+
+
+class KnownFailureRegistry:
+    """Known failures indexed by (amqp_type, sender, receiver)."""
+
+    def __init__(self, failures: Iterable[KnownFailure] = ()) -> None:
+        self.failures: list[KnownFailure] = []
+        # amqp_type -> (sender or "*", receiver or "*") -> [(order, entry)]
+        self._index: dict[str, dict[tuple[str, str], list[tuple[int, KnownFailure]]]] = {}
+        self._cases: dict[tuple[str, str, str], CaseFailures] = {}
+        self._lock = threading.Lock()
+        self.extend(failures)
+
+    def extend(self, failures: Iterable[KnownFailure]) -> None:
+        """Add entries after the existing ones."""
+        with self._lock:
+            for kf in failures:
+                order = len(self.failures)
+                self.failures.append(kf)
+                by_pair = self._index.setdefault(kf.amqp_type, {})
+                by_pair.setdefault((kf.sender, kf.receiver), []).append((order, kf))
+            self._cases.clear()
+
+    def for_case(self, sender: str, receiver: str, amqp_type: str) -> CaseFailures:
+        """Precompiled failures of a case, with wildcards resolved (cached)."""
+        key = (amqp_type, sender, receiver)
+        case = self._cases.get(key)
+        if case is None:
+            case = self._compile(sender, receiver, amqp_type)
+            with self._lock:
+                self._cases[key] = case
+        return case
+
+    def _compile(self, sender: str, receiver: str, amqp_type: str) -> CaseFailures:
+        by_pair = self._index.get(amqp_type, {})
+        ordered = sorted(
+            entry
+            for pair in {(sender, receiver), (sender, "*"), ("*", receiver), ("*", "*")}
+            for entry in by_pair.get(pair, ())
+        )
+        case = CaseFailures(
+            entries=tuple(kf for _, kf in ordered),
+            masks=tuple(sum(index_bit(i) for i in kf.message_indices or ()) for _, kf in ordered),
+        )
+        for order, kf in ordered:
+            if kf.message_indices is None:
+                if case.whole_case is None:
+                    case.whole_case, case.whole_case_order = kf, order
+            else:
+                for index in kf.message_indices:
+                    case.by_index.setdefault(index, (order, kf))
+        return case
+
+    @classmethod
+    def from_files(cls, *paths: Path, builtin: bool = True) -> "KnownFailureRegistry":
+        """Registry of the built-in entries (optionally) plus those in the given files."""
+        registry = cls(load_known_failures(BUILTIN_FAILURES_FILE) if builtin else ())
+        for path in paths:
+            registry.extend(load_known_failures(path))
+        return registry
+
+
+def load_known_failures(path: Path) -> list[KnownFailure]:
+    """
+    Load known failures from a TOML or JSON file.
+
+    Both formats hold a ``failure`` array of tables/objects with the
+    KnownFailure fields; a JSON file may also be a bare array. Omitting
+    ``message_indices`` marks the whole case as an expected failure; index
+    -1 stands for diffs not tied to one message (count mismatch, send error).
+
+    Raises:
+        ValueError: If the file is not valid or an entry is malformed
+    """
+    path = Path(path)
+    try:
+        if path.suffix == ".json":
+            data: Any = json.loads(path.read_text(encoding="utf-8"))
+        else:
+            with path.open("rb") as f:
+                data = tomllib.load(f)
+    except (json.JSONDecodeError, tomllib.TOMLDecodeError) as e:
+        raise ValueError(f"Invalid known failures file {path}: {e}") from e
+
+    entries = data if isinstance(data, list) else data.get("failure", [])
+    failures = []
+    for i, entry in enumerate(entries):
+        try:
+            indices = entry.get("message_indices")
+            if indices is not None:
+                indices = frozenset(int(x) for x in indices)
+                if any(index < -1 for index in indices):
+                    raise ValueError(f"message index below -1 in {sorted(indices)}")
+            failures.append(KnownFailure(
+                sender=entry.get("sender", "*"),
+                receiver=entry.get("receiver", "*"),
+                amqp_type=entry["amqp_type"],
+                message_indices=indices,
+                reason=entry["reason"],
+                bug_url=entry.get("bug_url", ""),
+            ))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"Invalid known failure #{i} in {path}: {e!r}") from e
+    return failures
+
+
+DEFAULT_REGISTRY = KnownFailureRegistry.from_files()
+
+# Built-in entries, in registry order
+KNOWN_FAILURES: list[KnownFailure] = DEFAULT_REGISTRY.failures
+
+
 def find_known_failure(
     sender: str,
     receiver: str,
@@ -50,17 +213,7 @@ def find_known_failure(
 
     Returns the first matching KnownFailure, or None if no match.
     """
-    for kf in KNOWN_FAILURES:
-        if kf.amqp_type != amqp_type:
-            continue
-        if kf.sender != "*" and kf.sender != sender:
-            continue
-        if kf.receiver != "*" and kf.receiver != receiver:
-            continue
-        if kf.message_indices is not None and message_index not in kf.message_indices:
-            continue
-        return kf
-    return None
+    return DEFAULT_REGISTRY.for_case(sender, receiver, amqp_type).find(message_index)
 
 
 def get_applicable_failures(
@@ -69,155 +222,47 @@ def get_applicable_failures(
     amqp_type: str,
 ) -> list[KnownFailure]:
     """Get all known failures that apply to a given test case."""
-    result = []
-    for kf in KNOWN_FAILURES:
-        if kf.amqp_type != amqp_type:
-            continue
-        if kf.sender != "*" and kf.sender != sender:
-            continue
-        if kf.receiver != "*" and kf.receiver != receiver:
-            continue
-        result.append(kf)
-    return result
-
-
-# ---------------------------------------------------------------------------
-# Registry of known failures
-#
-# Each entry documents a client library limitation that causes predictable
-# test failures. These are NOT QIT bugs — they are upstream issues.
-# ---------------------------------------------------------------------------
-
-KNOWN_FAILURES: list[KnownFailure] = [
-    # --- JavaScript Rhea: parseInt() precision loss for values > 2^53 ---
-    KnownFailure(
-        sender="javascript-rhea", receiver="*", amqp_type="ulong",
-        message_indices=frozenset({6, 7, 8, 9}),
-        reason="JS number precision loss for ulong values > 2^53",
-    ),
-    KnownFailure(
-        sender="*", receiver="javascript-rhea", amqp_type="ulong",
-        message_indices=frozenset({6, 7, 8, 9}),
-        reason="JS number precision loss for ulong values > 2^53",
-    ),
-    KnownFailure(
-        sender="javascript-rhea", receiver="*", amqp_type="long",
-        message_indices=frozenset({0, 3, 13, 14}),
-        reason="JS number precision loss for long values with |v| > 2^53",
-    ),
-    KnownFailure(
-        sender="*", receiver="javascript-rhea", amqp_type="long",
-        message_indices=frozenset({0, 3, 13, 14}),
-        reason="JS number precision loss for long values with |v| > 2^53",
-    ),
-
-    # --- Java ProtonJ2: 16-bit char truncates supplementary codepoints ---
-    KnownFailure(
-        sender="java-protonj2", receiver="*", amqp_type="char",
-        message_indices=frozenset({8}),
-        reason="Java char is 16-bit, truncates codepoints > U+FFFF",
-    ),
-    KnownFailure(
-        sender="*", receiver="java-protonj2", amqp_type="char",
-        message_indices=frozenset({8}),
-        reason="Java char is 16-bit, truncates codepoints > U+FFFF",
-    ),
-
-    # --- .NET Proton: 16-bit char truncates supplementary codepoints ---
-    KnownFailure(
-        sender="dotnet-proton", receiver="*", amqp_type="char",
-        message_indices=frozenset({8}),
-        reason=".NET char is 16-bit, truncates codepoints > U+FFFF",
-    ),
-    KnownFailure(
-        sender="*", receiver="dotnet-proton", amqp_type="char",
-        message_indices=frozenset({8}),
-        reason=".NET char is 16-bit, truncates codepoints > U+FFFF",
-    ),
-
-    # --- .NET Proton: byte[]/binary ambiguity in lists ---
-    # byte[] implements IList<byte>, so Proton .NET encodes it as AMQP
-    # array-of-ubyte instead of binary when it appears inside a list.
-    KnownFailure(
-        sender="dotnet-proton", receiver="*", amqp_type="list",
-        message_indices=frozenset({3, 8}),
-        reason="Proton .NET encodes byte[] as array-of-ubyte in lists",
-    ),
-
-    # --- .NET Proton: timestamp decoded as Int64 in lists ---
-    KnownFailure(
-        sender="*", receiver="dotnet-proton", amqp_type="list",
-        message_indices=frozenset({3, 8}),
-        reason="Proton .NET decodes timestamp as Int64 in list context",
-    ),
-
-    # --- .NET Proton: ListTypeEncoder NRE with null after non-null ---
-    KnownFailure(
-        sender="dotnet-proton", receiver="*", amqp_type="list",
-        message_indices=frozenset({7}),
-        reason="Proton .NET ListTypeEncoder NullReferenceException: null after non-null",
-    ),
-
-    # --- Java ProtonJ2: ListTypeEncoder NRE with null after non-null ---
-    KnownFailure(
-        sender="java-protonj2", receiver="*", amqp_type="list",
-        message_indices=frozenset({7}),
-        reason="ProtonJ2 ListTypeEncoder NullPointerException: null after non-null",
-    ),
-
-    # --- Java ProtonJ2: unsigned long values > Long.MAX_VALUE ---
-    KnownFailure(
-        sender="*", receiver="java-protonj2", amqp_type="ulong",
-        message_indices=frozenset({8, 9}),
-        reason="ProtonJ2 decodes unsigned long values > 2^63 as negative signed long",
-    ),
-
-    # --- .NET Proton: ubyte arrays decoded as binary ---
-    KnownFailure(
-        sender="*", receiver="dotnet-proton", amqp_type="array",
-        message_indices=frozenset({7}),
-        reason="Proton .NET byte[]/binary ambiguity for nested ubyte arrays",
-    ),
-
-    # --- Java ProtonJ2: binary/timestamp decoded incorrectly in lists ---
-    KnownFailure(
-        sender="*", receiver="java-protonj2", amqp_type="list",
-        message_indices=frozenset({3, 8}),
-        reason="ProtonJ2 decodes binary/timestamp incorrectly in list context",
-    ),
-
-    # --- Java ProtonJ2: null character (U+0000) encoding ---
-    KnownFailure(
-        sender="java-protonj2", receiver="*", amqp_type="char",
-        message_indices=frozenset({0}),
-        reason="ProtonJ2 encodes null character (U+0000) incorrectly",
-    ),
-
-    # --- .NET Proton: empty binary round-trip ---
-    KnownFailure(
-        sender="dotnet-proton", receiver="dotnet-proton", amqp_type="binary",
-        message_indices=frozenset({0}),
-        reason="Proton .NET empty binary round-trip type mismatch",
-    ),
-
-    # --- .NET Proton → Java ProtonJ2: binary encoding incompatibility ---
-    KnownFailure(
-        sender="dotnet-proton", receiver="java-protonj2", amqp_type="binary",
-        message_indices=None,
-        reason="Proton .NET binary encoding incompatible with ProtonJ2 binary decoder",
-    ),
-
-    # --- .NET Proton: timestamp decoded as Int64 (primitive type) ---
-    KnownFailure(
-        sender="*", receiver="dotnet-proton", amqp_type="timestamp",
-        message_indices=None,
-        reason="Proton .NET decodes timestamp as Int64 instead of DateTime",
-    ),
-
-    # --- Java ProtonJ2: timestamp decoded as Long (primitive type) ---
-    KnownFailure(
-        sender="*", receiver="java-protonj2", amqp_type="timestamp",
-        message_indices=None,
-        reason="ProtonJ2 decodes timestamp as Long instead of Date",
-    ),
-]
+    return list(DEFAULT_REGISTRY.for_case(sender, receiver, amqp_type).entries)
+
+
+def verification_due(
+    every: int,
+    suite: str,
+    counter_file: Path = RUN_COUNTER_FILE,
+    record: bool = True,
+) -> bool:
+    """
+    Count a run of a suite and tell whether whole-case known failures should run again.
+
+    Cases fully covered by a known failure are skipped by default; running
+    them every ``every`` runs of the same suite keeps xpass detection
+    working. Each suite has its own count, so running other suites in
+    between does not use up a suite's verification run.
+
+    Args:
+        every: Re-verify on every Nth run (0 never)
+        suite: Name of the suite (test command) being run
+        counter_file: JSON file holding the run count of each suite
+        record: Count this run; False only asks (e.g. for a dry run)
+
+    Returns:
+        True if this run should execute whole-case known failures
+    """
+    try:
+        counts = json.loads(counter_file.read_text(encoding="utf-8"))["runs"]
+        if not isinstance(counts, dict):
+            counts = {}
+    except (OSError, ValueError, KeyError, TypeError):
+        counts = {}
+    try:
+        runs = int(counts.get(suite, 0)) + 1
+    except (ValueError, TypeError):
+        runs = 1
+    if record:
+        counts[suite] = runs
+        try:
+            counter_file.parent.mkdir(parents=True, exist_ok=True)
+            counter_file.write_text(json.dumps({"runs": counts}), encoding="utf-8")
+        except OSError:
+            pass
+    return every > 0 and runs % every == 0
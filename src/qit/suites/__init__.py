@@ -0,0 +1,34 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Message suites (JMS, AMQP headers, large content) as orchestrator test cases."""
+
+from qit.suites.base import amqp_pairs, select_cases, star_pairs
+from qit.suites.headers import header_cases
+from qit.suites.jms import jms_cases
+from qit.suites.large_content import large_content_cases
+
+__all__ = [
+    "amqp_pairs",
+    "header_cases",
+    "jms_cases",
+    "large_content_cases",
+    "select_cases",
+    "star_pairs",
+]
@@ -0,0 +1,123 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+Common parts of the message suites: shim pair topologies and case building.
+
+AMQP pairs are every AMQP shim against every other (and itself). The star
+topology puts the JMS shim on at least one side: JMS to each AMQP shim,
+each AMQP shim to JMS, and JMS to itself.
+"""
+
+import json
+from collections.abc import Callable, Collection
+from itertools import product
+from typing import Any
+
+from qit.core.comparison import MessageDiff
+from qit.core.orchestrator import SuiteCase, TestCase
+
+Pair = tuple[str, str]
+
+
+def amqp_pairs(amqp_shims: list[str]) -> list[Pair]:
+    """Every AMQP shim against every AMQP shim."""
+    return list(product(amqp_shims, amqp_shims))
+
+
+def star_pairs(amqp_shims: list[str], jms_shims: list[str]) -> list[Pair]:
+    """Pairs with the (first) JMS shim on at least one side; none without one."""
+    if not jms_shims:
+        return []
+    jms = jms_shims[0]
+    return [(jms, c) for c in amqp_shims] + [(c, jms) for c in amqp_shims] + [(jms, jms)]
+
+
+def select_cases(
+    test_cases: list[TestCase],
+    senders: Collection[str] = (),
+    receivers: Collection[str] = (),
+) -> list[TestCase]:
+    """Cases whose sender and receiver are among those given (empty: any)."""
+    return [
+        tc for tc in test_cases
+        if (not senders or tc.sender_shim in senders) and (not receivers or tc.receiver_shim in receivers)
+    ]
+
+
+def suite_case(
+    pair: Pair,
+    name: str,
+    values: list[Any],
+    sends: list[list[str]],
+    receive: list[str],
+    verify: Callable[[dict[str, Any]], list[MessageDiff]],
+    timeout: int = 30,
+    broker_url: str | None = None,
+    payload_bytes: int | None = None,
+) -> TestCase:
+    """
+    A TestCase running a suite test for one pair.
+
+    Args:
+        pair: (sender, receiver)
+        name: Suite test name, reported as the case's type
+        values: What each message carries, for reports (one per message)
+        sends: Sender arguments of each send, after --broker and --queue
+        receive: Receiver arguments, after --broker and --queue
+        verify: Differences found in the receiver's output
+        timeout: Timeout of each shim process in seconds
+        broker_url: Broker of the case, if not the run's
+        payload_bytes: Content bytes sent (default: size of the values as JSON)
+    """
+    if payload_bytes is None:
+        payload_bytes = len(json.dumps(values, separators=(",", ":")).encode("utf-8"))
+    return TestCase(
+        sender_shim=pair[0],
+        receiver_shim=pair[1],
+        amqp_type=name,
+        test_values=values,
+        suite=SuiteCase(
+            sends=sends,
+            receive=receive,
+            verify=verify,
+            timeout=timeout,
+            broker_url=broker_url,
+            payload_bytes=payload_bytes,
+        ),
+    )
+
+
+def receive_args(count: int, timeout: int) -> list[str]:
+    """Receiver arguments for a number of messages."""
+    return ["--count", str(count), "--timeout", str(timeout)]
+
+
+def received_messages(output: dict[str, Any], count: int) -> tuple[list[dict[str, Any]], list[MessageDiff]]:
+    """The messages of a receiver's output, and a diff if there are not count of them."""
+    received = output.get("messages") or []
+    if len(received) == count:
+        return received, []
+    return received, [MessageDiff(
+        index=-1,
+        field="count",
+        expected=count,
+        actual=len(received),
+        message=f"Message count mismatch: expected {count}, got {len(received)}",
+    )]
@@ -0,0 +1,127 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+AMQP message header suite.
+
+Header section fields (durable, priority, ttl, first-acquirer,
+delivery-count) over every pair of AMQP shims. Each value of a field
+takes one send, as --message-header applies to a whole send, and a case
+receives them all at once.
+"""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+from qit.core.comparison import MessageDiff
+from qit.core.orchestrator import TestCase
+from qit.suites.base import amqp_pairs, receive_args, received_messages, suite_case
+
+DURABLE_VALUES = [True, False]
+PRIORITY_VALUES = [0, 4, 7, 9]
+TTL_VALUES = [60000, 300000]
+FIRST_ACQUIRER_VALUES = [True, False]
+
+# Field -> values, one message each. Brokers deliver higher priorities
+# first, so priorities are sent highest first to arrive in send order.
+HEADER_FIELDS: dict[str, list[Any]] = {
+    "durable": DURABLE_VALUES,
+    "priority": sorted(PRIORITY_VALUES, reverse=True),
+    "ttl": TTL_VALUES,
+    "first_acquirer": FIRST_ACQUIRER_VALUES,
+}
+
+# Body of every message
+HEADER_TEST_MESSAGE = [{"index": 0, "type": "string", "value": "header-test"}]
+
+
+def header_field_problem(field: str, sent: Any, received: Any) -> str | None:
+    """Why a received header field does not match the sent value, or None."""
+    if field == "ttl":
+        if not received or received <= 0:
+            return f"TTL expired (received {received}, sent {sent})"
+        if received > sent:
+            return f"TTL increased (received {received}, sent {sent})"
+        return None
+    if field in ("priority", "delivery_count"):
+        same = received is not None and int(received) == int(sent)
+    else:
+        same = received == sent
+    return None if same else f"{field} mismatch: sent {sent}, received {received}"
+
+
+def header_cases(amqp_shims: list[str], timeout: int = 30) -> list[TestCase]:
+    """
+    The header suite's cases over all AMQP pairs.
+
+    Args:
+        amqp_shims: AMQP shims
+        timeout: Timeout of each shim process in seconds
+
+    Returns:
+        One case per pair and header field, plus one checking that the
+        delivery-count of a first delivery is 0
+    """
+    cases = []
+    for pair in amqp_pairs(amqp_shims):
+        for field, values in HEADER_FIELDS.items():
+            cases.append(suite_case(
+                pair, f"header.{field}", values,
+                sends=[_send_args({field: v}) for v in values],
+                receive=receive_args(len(values), timeout),
+                verify=_verify_field(field, values),
+                timeout=timeout,
+            ))
+        cases.append(suite_case(
+            pair, "header.delivery_count", [0],
+            sends=[_send_args(None)],
+            receive=receive_args(1, timeout),
+            verify=_verify_field("delivery_count", [0]),
+            timeout=timeout,
+        ))
+    return cases
+
+
+def _send_args(message_header: dict[str, Any] | None) -> list[str]:
+    args = ["--type", "string", "--count", "1", "--data", json.dumps(HEADER_TEST_MESSAGE)]
+    if message_header:
+        args += ["--message-header", json.dumps(message_header)]
+    return args
+
+
+def _verify_field(field: str, sent: list[Any]) -> Callable[[dict[str, Any]], list[MessageDiff]]:
+    def verify(output: dict[str, Any]) -> list[MessageDiff]:
+        received, diffs = received_messages(output, len(sent))
+        for i, (value, message) in enumerate(zip(sent, received, strict=False)):
+            header = message.get("message_header")
+            problem: str | None
+            if header is None or field not in header:
+                problem = f"message_header missing '{field}'"
+            else:
+                problem = header_field_problem(field, value, header[field])
+            if problem is not None:
+                diffs.append(MessageDiff(
+                    index=i, field=f"message_header.{field}",
+                    expected=value, actual=(header or {}).get(field),
+                    message=f"Message {i}: {problem}",
+                ))
+        return diffs
+
+    return verify
@@ -0,0 +1,375 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+JMS message suite.
+
+Star topology around the Qpid JMS client (see base.star_pairs). Cases
+cover the JMS message body types, the JMSCorrelationID, JMSReplyTo and
+JMSType headers, and typed application properties. All values of a body
+type travel in one send; header values take one send each, since headers
+apply to everything a send sends.
+"""
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from qit.core.comparison import MessageDiff
+from qit.core.orchestrator import TestCase
+from qit.suites.base import receive_args, received_messages, star_pairs, suite_case
+
+# TextMessage test values
+TEXT_MESSAGE_VALUES = [
+    "",  # Empty string
+    "Hello, world",  # Simple ASCII
+    "Charlie's \"peach\"",  # Quotes and apostrophe
+    "Unicode: ñ 日本語 🎉",  # Unicode characters
+    "The quick brown fox jumped over the lazy dog.",  # Longer text
+]
+
+# BytesMessage test values (hex-encoded binary data)
+# Lengths chosen to avoid 1/2/4/8 bytes which JMS receiver reinterprets as typed values
+BYTES_MESSAGE_VALUES = [
+    "",                   # Empty bytes
+    "48656c6c6f",         # 5 bytes: "Hello" in ASCII
+    "000102fdfeff",       # 6 bytes: boundary values including 0x00 and 0xff
+]
+
+# MapMessage test values (string values to avoid type ambiguity)
+MAP_MESSAGE_VALUES = [
+    "Hello",
+    "world",
+]
+
+# StreamMessage test values (string values to avoid type ambiguity)
+STREAM_MESSAGE_VALUES = [
+    "Hello",
+    "world",
+]
+
+# JMS header test data
+JMS_HEADERS_CORRELATION_ID_STRING = [
+    "Hello, world",
+    "correlation-123",
+    "Charlie's \"peach\"",
+]
+
+JMS_HEADERS_CORRELATION_ID_BYTES = [
+    "48656c6c6f",              # "Hello"
+    "636f7272656c6174696f6e",  # "correlation"
+]
+
+JMS_HEADERS_REPLY_TO_QUEUE = [
+    "reply-queue-1",
+    "reply-queue-2",
+]
+
+JMS_HEADERS_REPLY_TO_TOPIC = [
+    "reply-topic-1",
+    "reply-topic-2",
+]
+
+JMS_HEADERS_JMS_TYPE = [
+    "OrderRequest",
+    "OrderResponse",
+    "Hello, world",
+]
+
+# JMS application properties test data
+JMS_PROPS_BOOLEAN = {
+    "bool_true": {"type": "boolean", "value": True},
+    "bool_false": {"type": "boolean", "value": False},
+}
+JMS_PROPS_BYTE = {
+    "byte_pos": {"type": "byte", "value": "0x0f"},
+    "byte_neg": {"type": "byte", "value": "0xff"},
+    "byte_zero": {"type": "byte", "value": "0x00"},
+}
+JMS_PROPS_SHORT = {
+    "short_pos": {"type": "short", "value": "0x1234"},
+    "short_neg": {"type": "short", "value": "0xffff"},
+    "short_zero": {"type": "short", "value": "0x0000"},
+}
+JMS_PROPS_INT = {
+    "int_pos": {"type": "int", "value": "0x12345678"},
+    "int_neg": {"type": "int", "value": "0xffffffff"},
+    "int_zero": {"type": "int", "value": "0x00000000"},
+}
+JMS_PROPS_LONG = {
+    "long_pos": {"type": "long", "value": "0x0123456789abcdef"},
+    "long_neg": {"type": "long", "value": "0xffffffffffffffff"},
+    "long_zero": {"type": "long", "value": "0x0000000000000000"},
+}
+JMS_PROPS_FLOAT = {
+    "float_pi": {"type": "float", "value": "0x40490fdb"},
+    "float_neg": {"type": "float", "value": "0xc0490fdb"},
+    "float_zero": {"type": "float", "value": "0x00000000"},
+}
+JMS_PROPS_DOUBLE = {
+    "double_pi": {"type": "double", "value": "0x400921fb54442d18"},
+    "double_neg": {"type": "double", "value": "0xc00921fb54442d18"},
+    "double_zero": {"type": "double", "value": "0x0000000000000000"},
+}
+JMS_PROPS_STRING = {
+    "str_hello": {"type": "string", "value": "Hello, world"},
+    "str_special": {"type": "string", "value": "Charlie's \"peach\""},
+    "str_empty": {"type": "string", "value": ""},
+}
+
+
+@dataclass(frozen=True)
+class BodyType:
+    """A JMS message body type and how each kind of shim sends it."""
+
+    name: str
+    values: list[Any]
+    # --type of AMQP senders and of the JMS sender
+    amqp_type: str
+    jms_type: str
+    # Message "type" in the data of AMQP senders and of the JMS sender
+    amqp_value_type: str
+    jms_value_type: str
+
+
+BODY_TYPES = [
+    BodyType("text", TEXT_MESSAGE_VALUES, "string", "JMS_TEXTMESSAGE_TYPE", "string", "text"),
+    BodyType("bytes", BYTES_MESSAGE_VALUES, "binary", "JMS_BYTESMESSAGE_TYPE", "binary", "bytes"),
+    BodyType("message", [None], "null", "JMS_MESSAGE_TYPE", "null", "none"),
+    BodyType("map", MAP_MESSAGE_VALUES, "map", "JMS_MAPMESSAGE_TYPE", "string", "string"),
+    BodyType("stream", STREAM_MESSAGE_VALUES, "list", "JMS_STREAMMESSAGE_TYPE", "string", "string"),
+]
+
+# Header test name -> (header, JSON "type" of the header value, values)
+HEADER_TESTS: dict[str, tuple[str, str, list[str]]] = {
+    "correlation_id_string": ("JMSCorrelationID", "string", JMS_HEADERS_CORRELATION_ID_STRING),
+    "correlation_id_bytes": ("JMSCorrelationID", "bytes", JMS_HEADERS_CORRELATION_ID_BYTES),
+    "reply_to_queue": ("JMSReplyTo", "queue", JMS_HEADERS_REPLY_TO_QUEUE),
+    "reply_to_topic": ("JMSReplyTo", "topic", JMS_HEADERS_REPLY_TO_TOPIC),
+    "jms_type": ("JMSType", "string", JMS_HEADERS_JMS_TYPE),
+}
+
+# Property test name -> properties sent
+PROPERTY_TESTS: dict[str, dict[str, dict[str, Any]]] = {
+    "boolean": JMS_PROPS_BOOLEAN,
+    "byte": JMS_PROPS_BYTE,
+    "short": JMS_PROPS_SHORT,
+    "int": JMS_PROPS_INT,
+    "long": JMS_PROPS_LONG,
+    "float": JMS_PROPS_FLOAT,
+    "double": JMS_PROPS_DOUBLE,
+    "string": JMS_PROPS_STRING,
+}
+
+# Body of the messages carrying headers and properties
+HEADER_TEST_BODY = "header-test"
+
+
+def normalize_message_type(msg_type: str) -> str:
+    """Normalize message type for comparison across JMS and AMQP clients."""
+    if msg_type in ("string", "text"):
+        return "text"
+    if msg_type in ("binary", "bytes"):
+        return "bytes"
+    if msg_type in ("null", "none"):
+        return "none"
+    return msg_type
+
+
+def normalize_value(msg_type: str, value: Any) -> Any:
+    """Normalize message value for comparison."""
+    normalized_type = normalize_message_type(msg_type)
+    if normalized_type == "bytes" and isinstance(value, str):
+        return value.lower()
+    return value
+
+
+def header_problem(header: str, sent: dict[str, Any], received: Any) -> str | None:
+    """Why a received JMS header does not match the sent one, or None."""
+    if header == "JMSCorrelationID":
+        if sent.get("type") == "bytes":
+            if not isinstance(received, dict) or received.get("type") != "bytes":
+                return f"expected bytes correlation ID, got {received!r}"
+            if received["value"].lower() != sent["value"].lower():
+                return f"sent {sent['value']}, got {received['value']}"
+            return None
+        if isinstance(received, str):
+            return None if received == sent["value"] else f"sent {sent['value']!r}, got {received!r}"
+        if isinstance(received, dict) and received.get("type") == "bytes":
+            expected_hex = sent["value"].encode("utf-8").hex()
+            return None if received["value"].lower() == expected_hex else f"sent {sent['value']!r}, got {received!r}"
+        return f"unexpected correlation ID format: {received!r}"
+
+    if header == "JMSReplyTo":
+        if not isinstance(received, dict):
+            return f"should be a dict, got {received!r}"
+        if received.get("type") != sent.get("type"):
+            return f"type mismatch: sent {sent.get('type')}, got {received.get('type')}"
+        if received.get("value") != sent.get("value"):
+            return f"value mismatch: sent {sent.get('value')}, got {received.get('value')}"
+        return None
+
+    expected = sent["value"] if isinstance(sent, dict) else sent
+    return None if received == expected else f"sent {expected!r}, got {received!r}"
+
+
+def property_problem(sent: dict[str, Any], received: Any) -> str | None:
+    """Why a received typed application property does not match the sent one, or None."""
+    if not isinstance(received, dict):
+        return f"should be a dict, got {received!r}"
+    if received.get("type") != sent["type"]:
+        return f"type mismatch: sent {sent['type']}, got {received.get('type')}"
+    if sent["type"] in ("boolean", "string"):
+        same = received.get("value") == sent["value"]
+    else:
+        same = str(received.get("value")).lower() == sent["value"].lower()
+    return None if same else f"value mismatch: sent {sent['value']!r}, got {received.get('value')!r}"
+
+
+def jms_cases(amqp_shims: list[str], jms_shims: list[str], timeout: int = 30) -> list[TestCase]:
+    """
+    The JMS suite's cases over the star pairs.
+
+    Args:
+        amqp_shims: AMQP shims
+        jms_shims: JMS shims; the first one is the star's center
+        timeout: Timeout of each shim process in seconds
+
+    Returns:
+        One case per pair and body type, header test and property type
+    """
+    jms = set(jms_shims)
+    cases = []
+    for pair in star_pairs(amqp_shims, jms_shims):
+        jms_sender = pair[0] in jms
+        for body in BODY_TYPES:
+            value_type = body.jms_value_type if jms_sender else body.amqp_value_type
+            messages = [{"index": i, "type": value_type, "value": v} for i, v in enumerate(body.values)]
+            cases.append(suite_case(
+                pair, f"jms.{body.name}", body.values,
+                sends=[_send_args(jms_sender, body, messages)],
+                receive=receive_args(len(messages), timeout),
+                verify=_verify_bodies(messages),
+                timeout=timeout,
+            ))
+
+        text = BODY_TYPES[0]
+        text_type = text.jms_value_type if jms_sender else text.amqp_value_type
+        message = [{"index": 0, "type": text_type, "value": HEADER_TEST_BODY}]
+        for name, (header, value_type, values) in HEADER_TESTS.items():
+            # One send: each message carries its own header value
+            sent = [{"type": value_type, "value": v} for v in values]
+            messages = [
+                {"index": i, "type": text_type, "value": HEADER_TEST_BODY, "headers": {header: h}}
+                for i, h in enumerate(sent)
+            ]
+            cases.append(suite_case(
+                pair, f"jms.header.{name}", values,
+                sends=[_send_args(jms_sender, text, messages)],
+                receive=receive_args(len(sent), timeout),
+                verify=_verify_headers(header, sent),
+                timeout=timeout,
+            ))
+
+        for name, properties in PROPERTY_TESTS.items():
+            cases.append(suite_case(
+                pair, f"jms.property.{name}", [properties],
+                sends=[_send_args(jms_sender, text, message, properties=properties)],
+                receive=receive_args(1, timeout),
+                verify=_verify_properties(properties),
+                timeout=timeout,
+            ))
+    return cases
+
+
+def _send_args(
+    jms_sender: bool,
+    body: BodyType,
+    messages: list[dict[str, Any]],
+    properties: dict[str, Any] | None = None,
+) -> list[str]:
+    if jms_sender:
+        args = ["--type", body.jms_type, "--data", json.dumps(messages)]
+    else:
+        args = ["--type", body.amqp_type, "--count", str(len(messages)), "--data", json.dumps(messages), "--jms-mode"]
+    if properties:
+        args += ["--properties", json.dumps(properties)]
+    return args
+
+
+def _verify_bodies(sent: list[dict[str, Any]]) -> Callable[[dict[str, Any]], list[MessageDiff]]:
+    def verify(output: dict[str, Any]) -> list[MessageDiff]:
+        received, diffs = received_messages(output, len(sent))
+        for i, (s, r) in enumerate(zip(sent, received, strict=False)):
+            if normalize_message_type(s["type"]) != normalize_message_type(r.get("type", "")):
+                diffs.append(MessageDiff(
+                    index=i, field="type", expected=s["type"], actual=r.get("type"),
+                    message=f"Message {i}: type mismatch - sent {s['type']}, received {r.get('type')}",
+                ))
+            elif normalize_value(s["type"], s["value"]) != normalize_value(r["type"], r.get("value")):
+                diffs.append(MessageDiff(
+                    index=i, field="value", expected=s["value"], actual=r.get("value"),
+                    message=f"Message {i}: value mismatch - sent {s['value']!r}, received {r.get('value')!r}",
+                ))
+        return diffs
+
+    return verify
+
+
+def _verify_headers(header: str, sent: list[dict[str, Any]]) -> Callable[[dict[str, Any]], list[MessageDiff]]:
+    def verify(output: dict[str, Any]) -> list[MessageDiff]:
+        received, diffs = received_messages(output, len(sent))
+        for i, (s, r) in enumerate(zip(sent, received, strict=False)):
+            headers = r.get("headers") or {}
+            problem: str | None
+            if header not in headers:
+                problem = f"missing in received headers {headers}"
+            else:
+                problem = header_problem(header, s, headers[header])
+            if problem is not None:
+                diffs.append(MessageDiff(
+                    index=i, field=f"headers.{header}", expected=s, actual=headers.get(header),
+                    message=f"Message {i}: {header} {problem}",
+                ))
+        return diffs
+
+    return verify
+
+
+def _verify_properties(sent: dict[str, dict[str, Any]]) -> Callable[[dict[str, Any]], list[MessageDiff]]:
+    def verify(output: dict[str, Any]) -> list[MessageDiff]:
+        received, diffs = received_messages(output, 1)
+        if not received:
+            return diffs
+        properties = received[0].get("properties") or {}
+        for name, s in sent.items():
+            problem: str | None
+            if name not in properties:
+                problem = f"missing in received properties {properties}"
+            else:
+                problem = property_problem(s, properties[name])
+            if problem is not None:
+                diffs.append(MessageDiff(
+                    index=0, field=f"properties.{name}", expected=s, actual=properties.get(name),
+                    message=f"Property '{name}': {problem}",
+                ))
+        return diffs
+
+    return verify
@@ -0,0 +1,210 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+Large content suite.
+
+Large binary and string messages, and large collections (list, array,
+map, described) whose elements straddle AMQP frame boundaries. Shims
+generate the content from a seed and the receiver checks it, so only the
+verdict crosses process boundaries. The same payloads can also run
+through brokers configured for small and large frames.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from qit.core.comparison import MessageDiff
+from qit.core.orchestrator import TestCase
+from qit.suites.base import Pair, amqp_pairs, star_pairs, suite_case
+
+SIZE_1MB = 1_048_576
+SIZE_10MB = 10_485_760
+
+# Frame-relative element sizes (default AMQP frame size = 128KB = 131072 bytes)
+# Non-aligned to guarantee elements straddle frame boundaries.
+FRAME_SIZE = 131_072
+SUBFRAME_ELEMENT_SIZE = FRAME_SIZE // 3          # 43690 — fits in frame but doesn't align
+SUBFRAME_ELEMENTS = 24                           # 24 × 43690 ≈ 1.0MB
+SUPERFRAME_ELEMENT_SIZE = FRAME_SIZE * 3 // 2    # 196608 — exceeds frame size
+SUPERFRAME_ELEMENTS = 5                          # 5 × 196608 ≈ 0.96MB
+
+# Frame sizes the frame-size brokers must negotiate
+EXPECTED_SMALL_FRAME_SIZE = 4096
+EXPECTED_LARGE_FRAME_SIZE = 1_048_576
+
+
+@dataclass(frozen=True)
+class LargeTest:
+    """One large-content test: what is sent, between which pairs, in which tier."""
+
+    name: str
+    content: str
+    seed: int
+    # Blob size, or element count and size of collections
+    size: int | None = None
+    elements: int | None = None
+    element_size: int | None = None
+    # JMS star pairs too, or AMQP pairs only
+    star: bool = True
+    extended: bool = False
+    # Also runs through the small- and large-frame brokers (AMQP pairs)
+    frame_variants: bool = True
+    timeout: int = 60
+
+    @property
+    def payload_bytes(self) -> int:
+        if self.size is not None:
+            return self.size
+        return (self.elements or 0) * (self.element_size or 0)
+
+    def content_args(self) -> list[str]:
+        if self.size is not None:
+            sizing = ["--size", str(self.size)]
+        else:
+            sizing = ["--elements", str(self.elements), "--element-size", str(self.element_size)]
+        return ["--large-content", self.content, *sizing, "--seed", str(self.seed)]
+
+
+def _subframe(name: str, content: str, seed: int, **kwargs: Any) -> LargeTest:
+    return LargeTest(name, content, seed, elements=SUBFRAME_ELEMENTS, element_size=SUBFRAME_ELEMENT_SIZE, **kwargs)
+
+
+def _superframe(name: str, content: str, seed: int, **kwargs: Any) -> LargeTest:
+    return LargeTest(name, content, seed, elements=SUPERFRAME_ELEMENTS, element_size=SUPERFRAME_ELEMENT_SIZE, **kwargs)
+
+
+LARGE_TESTS = [
+    LargeTest("binary_1mb", "binary", 42, size=SIZE_1MB),
+    LargeTest("string_1mb", "string", 43, size=SIZE_1MB),
+    LargeTest("binary_10mb", "binary", 44, size=SIZE_10MB, extended=True, frame_variants=False, timeout=120),
+    LargeTest("string_10mb", "string", 45, size=SIZE_10MB, extended=True, frame_variants=False, timeout=120),
+    _subframe("list_subframe", "list", 100),
+    _superframe("list_superframe", "list", 101),
+    _subframe("array_subframe", "array", 102, star=False),
+    _superframe("array_superframe", "array", 103, star=False),
+    _subframe("map_subframe", "map", 104, extended=True),
+    _superframe("map_superframe", "map", 105, extended=True),
+    _subframe("described_subframe", "described", 106, star=False, extended=True),
+    _superframe("described_superframe", "described", 107, star=False, extended=True),
+]
+
+
+def large_content_cases(
+    amqp_shims: list[str],
+    jms_shims: list[str],
+    extended: bool = False,
+    small_frame_url: str | None = None,
+    large_frame_url: str | None = None,
+) -> list[TestCase]:
+    """
+    The large-content suite's cases.
+
+    Args:
+        amqp_shims: AMQP shims
+        jms_shims: JMS shims, for the star pairs
+        extended: Include the extended tier (10 MB, map and described)
+        small_frame_url: Broker with 4 KiB frames; its cases run only if given
+        large_frame_url: Broker with 1 MiB frames; its cases run only if given
+
+    Returns:
+        One case per pair, test and broker
+    """
+    jms = set(jms_shims)
+    star = star_pairs(amqp_shims, jms_shims)
+    amqp = amqp_pairs(amqp_shims)
+    frame_brokers = [(suffix, url) for suffix, url in (("smallframe", small_frame_url),
+                                                      ("largeframe", large_frame_url)) if url]
+    cases = []
+    for test in LARGE_TESTS:
+        if test.extended and not extended:
+            continue
+        for pair in (star + amqp) if test.star else amqp:
+            cases.append(_case(pair, test, f"large.{test.name}", None, pair[0] not in jms and pair[1] in jms))
+        if test.frame_variants:
+            for suffix, url in frame_brokers:
+                for pair in amqp:
+                    cases.append(_case(pair, test, f"large.{test.name}.{suffix}", url, False))
+    return cases
+
+
+def negotiated_frame_size(broker_url: str) -> int:
+    """
+    Max frame size a broker announces when opening a connection.
+
+    Raises:
+        RuntimeError: If no connection could be opened
+    """
+    from proton.handlers import MessagingHandler
+    from proton.reactor import Container
+
+    result: dict[str, Any] = {}
+
+    class FrameChecker(MessagingHandler):
+        def on_start(self, event: Any) -> None:
+            event.container.connect(broker_url)
+
+        def on_connection_opened(self, event: Any) -> None:
+            result["remote_max_frame_size"] = event.connection.transport.remote_max_frame_size
+            event.connection.close()
+
+        def on_transport_error(self, event: Any) -> None:
+            result["error"] = str(event.transport.condition)
+
+    Container(FrameChecker()).run()
+    if "remote_max_frame_size" not in result:
+        raise RuntimeError(f"Cannot connect to broker at {broker_url}: {result.get('error', 'no frame size negotiated')}")
+    return int(result["remote_max_frame_size"])
+
+
+def _case(pair: Pair, test: LargeTest, name: str, broker_url: str | None, jms_mode: bool) -> TestCase:
+    send = test.content_args() + (["--jms-mode"] if jms_mode else [])
+    values: dict[str, Any] = {"content": test.content, "seed": test.seed}
+    if test.size is not None:
+        values["size"] = test.size
+    else:
+        values.update(elements=test.elements, element_size=test.element_size)
+    return suite_case(
+        pair, name, [values],
+        sends=[send],
+        receive=[*test.content_args(), "--timeout", str(test.timeout)],
+        verify=_verify_content(test),
+        timeout=test.timeout,
+        broker_url=broker_url,
+        payload_bytes=test.payload_bytes,
+    )
+
+
+def _verify_content(test: LargeTest) -> Callable[[dict[str, Any]], list[MessageDiff]]:
+    def verify(output: dict[str, Any]) -> list[MessageDiff]:
+        if output.get("match") is True:
+            return []
+        if output.get("error"):
+            detail = output["error"]
+        elif test.size is not None:
+            detail = (f"content mismatch at offset {output.get('first_mismatch_offset', '?')}, "
+                      f"received {output.get('size', '?')}, expected {test.size}")
+        else:
+            detail = (f"element mismatch at element {output.get('first_mismatch_element', '?')}, "
+                      f"offset {output.get('first_mismatch_offset', '?')}")
+        return [MessageDiff(index=0, field="content", expected="match", actual=output.get("match"),
+                            message=f"Message 0: {detail}")]
+
+    return verify
@@ -213,19 +213,95 @@ class AmqpComplexTypes:
         "description": "Described type (descriptor + value)",
     }
 
+    # Nesting depths of the deep tier. Each level costs two or three levels
+    # of JSON between orchestrator and shim, so the deepest value stays
+    # inside the nesting limits of common JSON parsers (around 1000).
+    DEEP_DEPTHS = (16, 64, 256)
+
     @classmethod
-    def get_all_types(cls, include_extended: bool = False) -> dict[str, dict[str, Any]]:
+    def get_all_types(
+        cls, include_extended: bool = False, include_deep: bool = False,
+    ) -> dict[str, dict[str, Any]]:
         """Return all complex type definitions.
 
         Args:
             include_extended: If True, include extended tier test values.
+            include_deep: If True, include deep-nesting tier test values.
         """
-        return {
+        types: dict[str, dict[str, Any]] = {
             "array": cls.ARRAY,
             "list": cls.LIST,
             "map": cls.MAP,
             "described": cls.DESCRIBED,
         }
+        if include_deep:
+            types = {
+                name: {**type_def, "values": type_def["values"] + cls.deep_values(name)}
+                for name, type_def in types.items()
+            }
+        return types
+
+    @classmethod
+    def deep_values(cls, type_name: str) -> list[Any]:
+        """Deep-nesting tier: one value per depth in DEEP_DEPTHS.
+
+        Lists additionally get a value cycling list -> map -> described, so
+        every container type is decoded at depth.
+        """
+        builders = {
+            "array": cls._deep_array,
+            "list": cls._deep_list,
+            "map": cls._deep_map,
+            "described": cls._deep_described,
+        }
+        values = [builders[type_name](depth) for depth in cls.DEEP_DEPTHS]
+        if type_name == "list":
+            values.append(cls._deep_mixed(max(cls.DEEP_DEPTHS)))
+        return values
+
+    @staticmethod
+    def _deep_array(depth: int) -> dict[str, Any]:
+        # Array of array of ... of uint
+        value: dict[str, Any] = {"element_type": "uint", "elements": [depth]}
+        for _ in range(depth - 1):
+            value = {"element_type": "array", "elements": [value]}
+        return value
+
+    @staticmethod
+    def _deep_list(depth: int) -> list[Any]:
+        # Each level holds its level number and the next level
+        value: list[Any] = [["int", depth]]
+        for level in range(depth - 1, 0, -1):
+            value = [["int", level], ["list", value]]
+        return value
+
+    @staticmethod
+    def _deep_map(depth: int) -> list[Any]:
+        value: list[Any] = [[["string", "leaf"], ["int", depth]]]
+        for level in range(depth - 1, 0, -1):
+            value = [[["uint", level], ["map", value]]]
+        return value
+
+    @staticmethod
+    def _deep_described(depth: int) -> dict[str, Any]:
+        value: dict[str, Any] = {"descriptor": ["ulong", depth], "value": ["string", "leaf"]}
+        for level in range(depth - 1, 1, -1):
+            value = {"descriptor": ["ulong", level], "value": ["described", value]}
+        # The outermost level wraps the chain in a list: Python Proton decodes
+        # a message body that is directly described-of-described as None
+        return {"descriptor": ["ulong", 1], "value": ["list", [["described", value]]]}
+
+    @staticmethod
+    def _deep_mixed(depth: int) -> list[Any]:
+        value: list[Any] = [["string", "leaf"]]
+        for level in range(depth - 1, 0, -1):
+            if level % 3 == 0:
+                value = [["int", level], ["list", value]]
+            elif level % 3 == 1:
+                value = [["map", [[["symbol", f"level{level}"], ["list", value]]]]]
+            else:
+                value = [["described", {"descriptor": ["ulong", level], "value": ["list", value]}]]
+        return value
 
     @classmethod
     def get_type_values(cls, type_name: str) -> list[Any]:
@@ -20,6 +20,8 @@
 import pytest
 
 from shim_registry import DISCOVERED_SHIMS, PROJECT_ROOT
+from shim_workers import ShimWorkers, use_workers
+from xdist_support import worker_broker_url
 
 
 def pytest_addoption(parser):
@@ -29,6 +31,20 @@ def pytest_addoption(parser):
         default=False,
         help="Run extended large content tests (10MB)",
     )
+    parser.addoption(
+        "--jms-isolated",
+        action="store_true",
+        default=False,
+        help="Send each JMS header and property test in its own message "
+             "instead of consolidating them per shim pair",
+    )
+    parser.addoption(
+        "--no-shim-workers",
+        action="store_true",
+        default=False,
+        help="Start a shim process for every send and receive instead of "
+             "one long-lived process per shim",
+    )
     parser.addoption(
         "--shims",
         default=None,
@@ -51,7 +67,18 @@ def _extract_shim_keys(item) -> set[str]:
     return keys
 
 
+@pytest.hookimpl(tryfirst=True)
 def pytest_collection_modifyitems(config, items):
+    # With --dist loadgroup (opt-in: xdist then appends "@<group>" to the
+    # node ids), group the tests of each shim pair, so that one worker runs
+    # all of a pair's tests and keeps its per-pair batches warm.
+    # This runs first: xdist reads the groups in its own hook.
+    if getattr(config.option, "dist", None) == "loadgroup":
+        for item in items:
+            params = getattr(item, "callspec", None) and item.callspec.params
+            if params and "sender_client" in params and "receiver_client" in params:
+                item.add_marker(pytest.mark.xdist_group(f"{params['sender_client']}->{params['receiver_client']}"))
+
     if not config.getoption("--large-content"):
         skip_large = pytest.mark.skip(reason="needs --large-content option to run")
         for item in items:
@@ -79,3 +106,34 @@ def pytest_collection_modifyitems(config, items):
 @pytest.fixture(scope="session")
 def project_root():
     return PROJECT_ROOT
+
+
+@pytest.fixture(scope="session")
+def broker_url():
+    """
+    This worker's broker.
+
+    QIT_BROKER_URL may list several comma-separated brokers or acceptors;
+    xdist workers are assigned to them round-robin.
+    """
+    return worker_broker_url("QIT_BROKER_URL", "localhost:5672")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def shim_workers(request):
+    """
+    Long-lived processes of the shims that can serve commands.
+
+    Each xdist worker has its own; they start on first use and end with
+    the session.
+    """
+    if request.config.getoption("--no-shim-workers"):
+        yield None
+        return
+    workers = ShimWorkers()
+    use_workers(workers)
+    try:
+        yield workers
+    finally:
+        use_workers(None)
+        workers.close()
@@ -0,0 +1,204 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+Long-lived shim processes for the pytest suites.
+
+A shim with the "serve" capability runs send and receive commands read as
+JSON lines from stdin, so one process per shim serves a whole test
+session instead of one process per command: the JMS suites stop paying
+JVM startup for every send and receive. Workers start on first use and
+are started again only if one crashes or times out. Shims without the
+capability, and all shims under --no-shim-workers, run a process per
+command as before.
+"""
+
+import collections
+import json
+import queue
+import subprocess
+import threading
+from typing import IO
+
+from qit.core.shim import ShimInfo
+
+# Lines of a worker's own stderr kept for crash reports
+STDERR_TAIL = 50
+
+
+class ShimWorker:
+    """One long-lived "serve" process of a shim, restarted when it dies."""
+
+    def __init__(self, command: list[str], env: dict[str, str] | None = None) -> None:
+        """
+        Args:
+            command: argv of the shim's serve command
+            env: Environment of the process (None: inherit)
+        """
+        self.command = command
+        self.env = env
+        self.starts = 0
+        self._process: subprocess.Popen[str] | None = None
+        self._lines: queue.Queue[str | None] = queue.Queue()
+        self._stderr: collections.deque[str] = collections.deque(maxlen=STDERR_TAIL)
+        self._lock = threading.Lock()
+
+    def run(self, argv: list[str], timeout: float | None = None) -> subprocess.CompletedProcess[str]:
+        """
+        Run one shim command, like subprocess.run with captured text output.
+
+        Args:
+            argv: Subcommand and its options
+            timeout: Seconds to wait for the answer
+
+        Returns:
+            Exit status and output of the command; if the worker died
+            instead, its exit status and last stderr lines
+
+        Raises:
+            subprocess.TimeoutExpired: No answer in time (the worker is killed)
+        """
+        with self._lock:
+            process = self._ensure_started()
+            assert process.stdin is not None
+            try:
+                process.stdin.write(json.dumps({"argv": argv}) + "\n")
+                process.stdin.flush()
+            except OSError:
+                pass  # Died; the reader reports it below
+
+            try:
+                line = self._lines.get(timeout=timeout)
+            except queue.Empty:
+                self._kill()
+                raise subprocess.TimeoutExpired(argv, timeout) from None
+
+            if line is None:
+                returncode = process.wait()
+                self._process = None
+                stderr = "".join(self._stderr)
+                return subprocess.CompletedProcess(
+                    argv, returncode, "", f"{' '.join(self.command)} died (exit status {returncode}):\n{stderr}",
+                )
+            answer = json.loads(line)
+            return subprocess.CompletedProcess(argv, answer["returncode"], answer["stdout"], answer["stderr"])
+
+    def close(self) -> None:
+        """End the worker: closing stdin makes it exit."""
+        with self._lock:
+            process, self._process = self._process, None
+            if process is None:
+                return
+            try:
+                if process.stdin is not None:
+                    process.stdin.close()
+                process.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+                process.wait()
+
+    def _ensure_started(self) -> subprocess.Popen[str]:
+        if self._process is not None and self._process.poll() is None:
+            return self._process
+        self._lines = queue.Queue()
+        self._stderr = collections.deque(maxlen=STDERR_TAIL)
+        self._process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=self.env,
+        )
+        self.starts += 1
+        threading.Thread(target=_read_lines, args=(self._process.stdout, self._lines), daemon=True).start()
+        threading.Thread(target=self._stderr.extend, args=(self._process.stderr,), daemon=True).start()
+        return self._process
+
+    def _kill(self) -> None:
+        process, self._process = self._process, None
+        if process is not None:
+            process.kill()
+            process.wait()
+
+
+def _read_lines(stream: IO[str], lines: "queue.Queue[str | None]") -> None:
+    """Queue the lines of a worker's stdout, then None at its end."""
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+
+class ShimWorkers:
+    """The workers of a test session, one per shim."""
+
+    def __init__(self) -> None:
+        self._workers: dict[str, ShimWorker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, shim: ShimInfo) -> ShimWorker:
+        """The shim's worker, created on first use."""
+        with self._lock:
+            worker = self._workers.get(shim.key)
+            if worker is None:
+                worker = self._workers[shim.key] = ShimWorker(shim.command("serve"), shim.env)
+            return worker
+
+    def close(self) -> None:
+        with self._lock:
+            workers, self._workers = list(self._workers.values()), {}
+        for worker in workers:
+            worker.close()
+
+
+# Workers of the running session; set by the shim_workers fixture
+_session_workers: ShimWorkers | None = None
+
+
+def use_workers(workers: ShimWorkers | None) -> None:
+    """Route run_shim() to these workers (None: a process per command)."""
+    global _session_workers
+    _session_workers = workers
+
+
+def run_shim(
+    shim: ShimInfo,
+    subcommand: str,
+    args: list[str],
+    timeout: float | None = None,
+) -> subprocess.CompletedProcess[str]:
+    """
+    Run a shim command on the shim's session worker, or else in a process of its own.
+
+    Args:
+        shim: Shim to run
+        subcommand: "send" or "receive"
+        args: Options of the subcommand
+        timeout: Seconds to wait for the command
+
+    Returns:
+        Exit status and captured text output, as from subprocess.run
+    """
+    workers = _session_workers
+    if workers is not None and "serve" in shim.capabilities:
+        return workers.get(shim).run([subcommand, *args], timeout=timeout)
+    return subprocess.run(
+        [*shim.command(subcommand), *args],
+        capture_output=True, text=True, timeout=timeout, env=shim.env,
+    )
@@ -28,31 +28,24 @@ Test Pairs:
 """
 
 import json
-import os
-import subprocess
 from pathlib import Path
 from typing import Any
 
 import pytest
 
+from qit.suites.headers import DURABLE_VALUES, FIRST_ACQUIRER_VALUES, PRIORITY_VALUES, TTL_VALUES
 from shim_registry import AMQP_CLIENTS, AMQP_PAIRS, DISCOVERED_SHIMS
+from shim_workers import run_shim
+from xdist_support import unique_queue
 
 
 # =============================================================================
 # Fixtures
 # =============================================================================
 
-@pytest.fixture
-def broker_url():
-    return os.environ.get("QIT_BROKER_URL", "localhost:5672")
-
-
 @pytest.fixture
 def test_queue():
-    import random
-    import string
-    suffix = "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
-    return f"qit.test.amqp_header.{suffix}"
+    return unique_queue("qit.test.amqp_header")
 
 
 # =============================================================================
@@ -72,8 +65,7 @@ def run_sender(
 
     messages = [{"index": 0, "type": "string", "value": "header-test"}]
 
-    cmd = [
-        str(shim.shim_dir / "shim.sh"), "send",
+    args = [
         "--broker", broker,
         "--queue", queue,
         "--type", "string",
@@ -82,9 +74,9 @@ def run_sender(
     ]
 
     if message_header:
-        cmd += ["--message-header", json.dumps(message_header)]
+        args += ["--message-header", json.dumps(message_header)]
 
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    result = run_shim(shim, "send", args, timeout=timeout)
     if result.returncode != 0:
         pytest.fail(f"{shim.name} sender failed: {result.stderr}")
 
@@ -101,15 +93,14 @@ def run_receiver(
     shim = DISCOVERED_SHIMS[client]
     broker = shim.broker_prefix + broker_url
 
-    cmd = [
-        str(shim.shim_dir / "shim.sh"), "receive",
+    args = [
         "--broker", broker,
         "--queue", queue,
         "--count", "1",
         "--timeout", str(timeout),
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout + 5)
+    result = run_shim(shim, "receive", args, timeout=timeout + 5)
     if result.returncode != 0:
         pytest.fail(f"{shim.name} receiver failed: {result.stderr}")
 
@@ -156,16 +147,6 @@ def assert_message_header_field(
         )
 
 
-# =============================================================================
-# Test Data
-# =============================================================================
-
-DURABLE_VALUES = [True, False]
-PRIORITY_VALUES = [0, 4, 7, 9]
-TTL_VALUES = [60000, 300000]
-FIRST_ACQUIRER_VALUES = [True, False]
-
-
 # =============================================================================
 # Tests
 # =============================================================================
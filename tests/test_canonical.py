@@ -0,0 +1,96 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Tests for canonical value hashing."""
+
+from pathlib import Path
+
+from qit.core.canonical import _dumps_iterative, canonical_json, canonical_value, message_hash, messages_digest
+from qit.core.comparison import MessageComparator
+from qit.core.inprocess import load_shim_module
+from qit.core.shim import Message
+from qit.types import AmqpComplexTypes, AmqpPrimitiveTypes
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def test_equal_representations_hash_equal() -> None:
+    """Representations the comparator treats as equal share a hash."""
+    assert message_hash("float", "0x3F800000") == message_hash("float", 0x3F800000)
+    assert message_hash("uuid", "ABCDEF00-0000-0000-0000-000000000000") == message_hash(
+        "uuid", "abcdef00-0000-0000-0000-000000000000"
+    )
+    assert message_hash("binary", "0xDE AD") == message_hash("binary", "dead")
+    assert message_hash("map", [[["int", 1], ["string", "a"]], [["int", 2], ["string", "b"]]]) == message_hash(
+        "map", [[["int", 2], ["string", "b"]], [["int", 1], ["string", "a"]]]
+    )
+
+
+def test_different_values_hash_differently() -> None:
+    """Type, value and invalid input all change the hash."""
+    assert message_hash("int", 1) != message_hash("long", 1)
+    assert message_hash("double", "0x0000000000000000") != message_hash("double", "0x8000000000000000")
+    assert message_hash("int", "corrupt") != message_hash("int", 0)
+
+
+def test_values_deeper_than_recursion_limit_hash() -> None:
+    """Values far deeper than the recursion limit hash like shallow ones do."""
+    deep: list = [["int", 1]]
+    for _ in range(3000):
+        deep = [["list", deep]]
+    shallow = [["list", [["int", 1], ["string", 'a\u00e9"']]], ["map", [[["string", "k"], ["int", 2]]]]]
+
+    expected = MessageComparator().expected_values("list", [deep, shallow])
+
+    assert expected.hashes == [message_hash("list", deep), message_hash("list", shallow)]
+    assert canonical_json(["x", deep]).startswith('["x",[["list",[["list",')
+    canonical = canonical_value("list", shallow)
+    assert _dumps_iterative(canonical) == canonical_json(canonical)
+
+
+def test_python_shim_digest_matches_core() -> None:
+    """The Python shim's copy of the algorithm agrees on every test value."""
+    shim = load_shim_module(PROJECT_ROOT / "shims" / "python-proton" / "shim.py")
+    all_types = {
+        **AmqpPrimitiveTypes.get_all_types(),
+        **AmqpComplexTypes.get_all_types(include_extended=True, include_deep=True),
+    }
+
+    for amqp_type, type_def in all_types.items():
+        data = [Message(i, amqp_type, v).to_dict() for i, v in enumerate(type_def["values"])]
+        assert shim.messages_digest(data) == messages_digest((m["type"], m["value"]) for m in data), amqp_type
+
+
+def test_python_shim_codec_roundtrips_deep_values() -> None:
+    """The shim's encoder and decoder handle the deep-nesting tier."""
+    from proton import Message as ProtonMessage
+
+    from qit.core.comparison import MessageComparator
+
+    shim = load_shim_module(PROJECT_ROOT / "shims" / "python-proton" / "shim.py")
+    comparator = MessageComparator()
+
+    for amqp_type in ("array", "list", "map", "described"):
+        for value in AmqpComplexTypes.deep_values(amqp_type):
+            encoded = ProtonMessage(body=shim.encode_typed_element(amqp_type, value)).encode()
+            decoded = ProtonMessage()
+            decoded.decode(encoded)
+            typed = shim.decode_typed_element(decoded.body)
+            assert typed[0] == amqp_type
+            assert comparator._values_equal(amqp_type, value, typed[1]), amqp_type
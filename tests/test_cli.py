@@ -0,0 +1,86 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Tests for the command-line interface."""
+
+
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Modules only commands that run tests or read results may import
+HEAVY_MODULES = (
+    "qit.core.orchestrator",
+    "qit.core.shim",
+    "numpy",
+    "pyarrow",
+    "sqlite3",
+    "proton",
+    "xml.sax",
+)
+
+# Generous bound on `qit --help` beyond bare interpreter startup
+MAX_STARTUP_OVERHEAD_S = 0.5
+
+
+def _python(code: str) -> subprocess.CompletedProcess[str]:
+    env_path = str(PROJECT_ROOT / "src")
+    return subprocess.run(
+        [sys.executable, "-c", f"import sys; sys.path.insert(0, {env_path!r}); {code}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    )
+
+
+def _best_of(code: str, runs: int = 3) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        _python(code)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_cli_import_defers_core_modules() -> None:
+    """Importing the CLI (as `qit --help` does) loads none of the engine."""
+    out = _python("import json, qit.cli.main; print(json.dumps(sorted(sys.modules)))").stdout
+    loaded = set(json.loads(out))
+    assert not loaded.intersection(HEAVY_MODULES)
+
+
+def test_engine_import_defers_optional_accelerators() -> None:
+    """NumPy and pyarrow are imported only when an array or Parquet file needs them."""
+    out = _python(
+        "import json, qit.core.orchestrator, qit.core.results; print(json.dumps(sorted(sys.modules)))"
+    ).stdout
+    loaded = set(json.loads(out))
+    assert not loaded.intersection({"numpy", "pyarrow", "sqlite3"})
+
+
+def test_cli_startup_time() -> None:
+    """`qit --help` stays close to bare interpreter startup."""
+    baseline = _best_of("pass")
+    startup = _best_of("from qit.cli.main import cli; cli(['--help'], standalone_mode=False)")
+    assert startup - baseline < MAX_STARTUP_OVERHEAD_S, f"qit --help took {startup:.3f}s ({baseline:.3f}s bare)"
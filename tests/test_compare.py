@@ -0,0 +1,95 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Tests for run-to-run comparison."""
+
+
+from typing import Any
+
+from qit.core.compare import compare_runs
+
+
+def _row(sender: str, receiver: str, amqp_type: str, status: str = "pass", ms: float = 100.0, **extra: Any) -> dict[str, Any]:
+    return {
+        "sender": sender,
+        "receiver": receiver,
+        "type": amqp_type,
+        "status": status,
+        "duration_ms": ms,
+        "messages": 10,
+        "payload_bytes": 1000,
+        "send_ms": ms / 2,
+        "receive_ms": ms / 2,
+        **extra,
+    }
+
+
+BEFORE = [
+    _row("a", "b", "int"),
+    _row("a", "b", "map"),
+    _row("b", "a", "int", "fail"),
+    _row("b", "a", "map", "xfail"),
+    _row("b", "b", "int"),
+]
+
+
+def test_status_transitions() -> None:
+    """Transitions are listed; only newly failing cases are regressions."""
+    after = [
+        _row("a", "b", "int", "fail"),
+        _row("a", "b", "map"),
+        _row("b", "a", "int"),
+        _row("b", "a", "map", "xfail", xpass=1),
+        _row("a", "a", "int"),
+    ]
+
+    result = compare_runs(BEFORE, after)
+
+    assert [(c.sender, c.receiver, c.amqp_type, c.before, c.after, c.regression) for c in result.status_changes] == [
+        ("a", "b", "int", "pass", "fail", True),
+        ("b", "a", "int", "fail", "pass", False),
+    ]
+    assert result.new_xpasses == [("b", "a", "map")]
+    assert (result.added, result.removed) == ([("a", "a", "int")], [("b", "b", "int")])
+    assert result.has_regressions(timing=False)
+
+
+def test_timing_changes_beyond_noise() -> None:
+    """Pair and type medians that moved beyond the thresholds are reported."""
+    after = [
+        _row("a", "b", "int", ms=110.0),
+        _row("a", "b", "map", ms=400.0),
+        _row("b", "a", "int", "fail", ms=100.0),
+        _row("b", "a", "map", "xfail", ms=100.0),
+        _row("b", "b", "int", ms=50.0),
+    ]
+
+    result = compare_runs(BEFORE, after, ratio=0.2, min_delta_ms=20.0)
+
+    assert [(c.scope, c.name, c.before_ms, c.after_ms) for c in result.timing_changes] == [
+        ("pair", "a → b", 100.0, 255.0),
+        ("pair", "b → b", 100.0, 50.0),
+        ("type", "map", 100.0, 250.0),
+    ]
+    assert [c.name for c in result.slowdowns] == ["a → b", "map"]
+    drops = {(c.shim, c.role): round(c.ratio, 2) for c in result.throughput_drops}
+    assert drops == {("a", "sender"): 0.39, ("b", "receiver"): 0.54}
+    assert not result.status_changes
+    assert result.has_regressions() and not result.has_regressions(timing=False)
+    assert not compare_runs(BEFORE, after, ratio=10.0).has_regressions()
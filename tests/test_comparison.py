@@ -19,6 +19,12 @@
 
 """Tests for message comparison logic."""
 
+import sys
+
+import pytest
+
+from qit.core import vectorized
+from qit.core.canonical import INVALID_HASH, message_hash
 from qit.core.comparison import MessageComparator
 from qit.core.shim import Message
 
@@ -131,3 +137,135 @@ def test_uuid_comparison() -> None:
 
     diffs = comparator.compare_messages(sent, received)
     assert len(diffs) == 0
+
+
+def test_matching_hash_skips_value_comparison() -> None:
+    """A received hash equal to the expected one needs no value."""
+    comparator = MessageComparator()
+    sent = [Message(0, "float", "0x3f800000"), Message(1, "string", "hello")]
+    received = [
+        Message(0, "float", None, hash=message_hash("float", "0x3F800000"), has_value=False),
+        Message(1, "string", None, hash=message_hash("string", "other"), has_value=False),
+    ]
+
+    diffs = comparator.compare_messages(sent, received)
+    assert [(d.index, d.field) for d in diffs] == [(1, "value")]
+
+
+def test_invalid_values_never_match_by_hash() -> None:
+    """Identical invalid values hash alike but still differ, as in a full comparison."""
+    comparator = MessageComparator()
+    sent = [Message(0, "int", "corrupt")]
+    hashed = [Message(0, "int", None, hash=message_hash("int", "corrupt"), has_value=False)]
+    full = [Message(0, "int", "corrupt")]
+
+    expected = comparator.expected_values("int", ["corrupt"])
+    assert expected.hashes == [INVALID_HASH]
+    assert len(comparator.compare_messages(sent, full, expected=expected)) == 1
+    assert len(comparator.compare_messages(sent, hashed, expected=expected)) == 1
+    assert len(comparator.compare_messages(sent, hashed)) == 1
+
+
+def test_large_map_compared_by_canonical_keys() -> None:
+    """Reordered 20k-entry maps match, and one changed value is caught."""
+    comparator = MessageComparator()
+    pairs = [[["uuid", f"{i:08X}-0000-0000-0000-000000000000"], ["float", f"0x{i:08X}"]] for i in range(20000)]
+    received = [[["uuid", k[1].lower()], ["float", int(v[1], 16)]] for k, v in reversed(pairs)]
+
+    assert comparator._values_equal("map", pairs, received)
+
+    received[123] = [received[123][0], ["float", "0x7fc00000"]]
+    assert not comparator._values_equal("map", pairs, received)
+
+
+def test_map_fallback_for_unnormalizable_pairs() -> None:
+    """Pairs without a canonical key still match through the pairwise scan."""
+    comparator = MessageComparator()
+    expected = [[["int", 1], ["string", "a"]], [["mystery", b"x"], ["int", 2]]]
+    actual = [[["mystery", b"x"], ["int", 2]], [["int", 1], ["string", "a"]]]
+
+    assert comparator._values_equal("map", expected, actual)
+    assert not comparator._values_equal("map", [[["float", "nan?"], ["int", 1]]], [[["float", "nan?"], ["int", 1]]])
+
+
+def test_expected_values_shared_across_receivers() -> None:
+    """Expected values are normalized once per test values list and reused."""
+    comparator = MessageComparator()
+    values = [{"element_type": "double", "elements": ["0x3ff0000000000000", "0x4000000000000000"]}]
+
+    expected = comparator.expected_values("array", values)
+    assert comparator.expected_values("array", values) is expected
+    assert expected.hashes == [message_hash("array", values[0])]
+
+    sent = [Message(0, "array", values[0])]
+    good = [Message(0, "array", {"element_type": "double", "elements": [0x3FF0000000000000, "0X4000000000000000"]})]
+    bad = [Message(0, "array", {"element_type": "double", "elements": ["0x3ff0000000000000", "0x0"]})]
+    assert comparator.compare_messages(sent, good, expected=expected) == []
+    assert [d.field for d in comparator.compare_messages(sent, bad, expected=expected)] == ["value"]
+
+
+def test_array_mismatch_reports_first_elements() -> None:
+    """A large array diff names the first mismatching elements."""
+    comparator = MessageComparator()
+    elements = [f"0x{i:08x}" for i in range(5000)]
+    received = list(range(5000))
+    received[7] = "0x7fc00000"
+    received[4000] = True
+
+    sent = [Message(0, "array", {"element_type": "float", "elements": elements})]
+    diffs = comparator.compare_messages(sent, [Message(0, "array", {"element_type": "float", "elements": received})])
+
+    assert len(diffs) == 1
+    assert diffs[0].message.endswith("at element(s) 7, 4000")
+
+    received[7], received[4000] = 7, 4000
+    assert comparator._values_equal("array", sent[0].value, {"element_type": "float", "elements": received})
+
+
+def _large_float_arrays() -> tuple[dict, dict]:
+    sent = {"element_type": "float", "elements": [f"0x{i:08x}" for i in range(5000)]}
+    received = {"element_type": "float", "elements": list(range(5000))}
+    received["elements"][12] = "0x7fc00000"
+    received["elements"][3000] = 0xFFFFFFFF
+    return sent, received
+
+
+def test_large_array_python_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without NumPy, large arrays are compared element by element."""
+    monkeypatch.setattr(vectorized, "_numpy", lambda: None)
+    comparator = MessageComparator()
+    sent, received = _large_float_arrays()
+
+    assert vectorized.pack("float", list(range(5000))) is None
+    diffs = comparator.compare_messages([Message(0, "array", sent)], [Message(0, "array", received)])
+    assert diffs[0].message.endswith("at element(s) 12, 3000")
+
+
+def test_large_array_numpy_path() -> None:
+    """With NumPy, float bit patterns are packed as uint32 and compared in bulk."""
+    np = pytest.importorskip("numpy")
+    comparator = MessageComparator()
+    sent, received = _large_float_arrays()
+
+    packed = vectorized.pack("float", [int(e, 16) for e in sent["elements"]])
+    assert packed is not None and packed.dtype == np.uint32
+    assert vectorized.pack("double", [1 << 63] * 2000).dtype == np.uint64
+    assert vectorized.first_mismatches("float", packed, received["elements"], 10) == [12, 3000]
+    assert vectorized.first_mismatches("float", packed, [1 << 32] * 5000, 10) is None
+    diffs = comparator.compare_messages([Message(0, "array", sent)], [Message(0, "array", received)])
+    assert diffs[0].message.endswith("at element(s) 12, 3000")
+
+
+def test_deep_nesting_beyond_recursion_limit() -> None:
+    """Values nested deeper than the recursion limit compare without recursing."""
+    comparator = MessageComparator()
+    depth = sys.getrecursionlimit() * 3
+
+    def nest(leaf: int) -> list:
+        value: list = [["int", leaf]]
+        for level in range(depth):
+            value = [["map", [[["uint", level], ["list", value]]]]]
+        return value
+
+    assert comparator._values_equal("list", nest(1), nest(1))
+    assert not comparator._values_equal("list", nest(1), nest(2))
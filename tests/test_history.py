@@ -0,0 +1,97 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Tests for the SQLite run history."""
+
+from pathlib import Path
+from typing import Any
+
+from qit.core.history import DurationRegression, HistoryStore
+
+
+def _row(run: int, sender: str, status: str = "pass", duration_ms: float = 100.0, attempts: int = 1) -> dict[str, Any]:
+    return {
+        "run_id": f"run{run}",
+        "started": f"2026-01-0{run}T00:00:00+00:00",
+        "sender": sender,
+        "receiver": "r",
+        "type": "map",
+        "status": status,
+        "attempts": attempts,
+        "duration_ms": duration_ms,
+        "sender_stats": {"sent": 1},
+    }
+
+
+def _store(tmp_path: Path) -> HistoryStore:
+    store = HistoryStore(tmp_path / "history.sqlite")
+    store.record([
+        _row(1, "steady"), _row(1, "flaky"), _row(1, "broken", "fail"),
+        _row(2, "steady"), _row(2, "flaky", "fail"), _row(2, "broken", "fail"),
+        _row(3, "steady"), _row(3, "flaky", attempts=2), _row(3, "broken", "fail"),
+        _row(4, "steady", duration_ms=400.0), _row(4, "flaky", "fail"), _row(4, "broken", "fail"),
+    ])
+    return store
+
+
+def test_runs_and_trend(tmp_path: Path) -> None:
+    """Runs are listed newest first; trends are per run, oldest first."""
+    with _store(tmp_path) as store:
+        assert [(r.run_id, r.cases, r.failures) for r in store.runs(limit=2)] == [("run4", 3, 2), ("run3", 3, 1)]
+        trend = store.trend(sender="steady")
+        assert [(p.run_id, p.median_ms) for p in trend] == [
+            ("run1", 100.0), ("run2", 100.0), ("run3", 100.0), ("run4", 400.0),
+        ]
+        assert len(store.trend(limit=2)) == 2
+
+
+def test_regressions_against_baseline(tmp_path: Path) -> None:
+    """Cases that started failing or slowed down are reported."""
+    with _store(tmp_path) as store:
+        regressions = store.regressions("run3")
+        assert [(r.sender, r.kind, r.baseline, r.current) for r in regressions] == [
+            ("flaky", "status", "pass", "fail"),
+            ("steady", "duration", 100.0, 400.0),
+        ]
+        slower = regressions[1]
+        assert isinstance(slower, DurationRegression) and slower.ratio == 4.0
+        assert store.regressions("run3", factor=5.0)[1:] == []
+
+
+def test_flake_scores_ignore_steady_and_broken_cases(tmp_path: Path) -> None:
+    """Only cases with mixed outcomes, or passes that needed reruns, are flaky."""
+    with _store(tmp_path) as store:
+        scores = store.flake_scores()
+        assert [(s.sender, s.failures, s.reruns, s.rate) for s in scores] == [("flaky", 2, 1, 0.75)]
+        assert store.flaky_cases() == {("flaky", "r", "map")}
+        assert store.flaky_cases(threshold=0.8) == set()
+        assert store.flake_scores(min_runs=5) == []
+
+
+def test_estimate_inputs(tmp_path: Path) -> None:
+    """Case durations are medians over recent runs; shim memory is the largest process."""
+    with _store(tmp_path) as store:
+        store.record([{**_row(5, "steady"), "sender_rss_kb": 2048, "receiver_rss_kb": 4096}])
+        store.record([{**_row(6, "steady"), "sender_rss_kb": 1024}])
+        durations = store.case_durations()
+        assert durations[("steady", "r", "map")] == 100.0
+        assert durations[("broken", "r", "map")] == 100.0
+        assert store.case_durations(window=1) == {("steady", "r", "map"): 100.0}
+        assert store.shim_memory() == {"steady": 2048, "r": 4096}
+        assert store.shim_memory(window=1) == {"steady": 1024}
@@ -257,13 +257,6 @@ def jms_shim():
     }
 
 
-@pytest.fixture
-def broker_url():
-    """Provide broker URL."""
-    import os
-    return os.getenv("QIT_BROKER_URL", "localhost:5672")
-
-
 # Helper functions
 
 def run_jms_test(shim, broker_url, msg_type, test_values):
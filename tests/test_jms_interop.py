@@ -29,12 +29,13 @@ Phase 2b.3: Other message types (deferred)
 """
 
 import json
-import os
 import subprocess
 from pathlib import Path
 
 import pytest
 
+from xdist_support import unique_queue
+
 
 # Test data for TextMessage
 TEXT_MESSAGE_VALUES = [
@@ -46,20 +47,10 @@ TEXT_MESSAGE_VALUES = [
 ]
 
 
-@pytest.fixture
-def broker_url():
-    """Get broker URL from environment or use default."""
-    return os.environ.get("QIT_BROKER_URL", "localhost:5672")
-
-
 @pytest.fixture
 def test_queue():
     """Generate unique queue name for test isolation."""
-    import random
-    import string
-
-    suffix = "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
-    return f"qit.test.jms.interop.{suffix}"
+    return unique_queue("qit.test.jms.interop")
 
 
 def run_python_sender(broker_url: str, queue: str, messages: list[dict], jms_mode: bool = False):
@@ -35,140 +35,68 @@ Message Types: Incremental
 - Phase 2c: + BytesMessage, Message, MapMessage, StreamMessage
 - Phase 2d: + Headers (JMSCorrelationID, JMSReplyTo, JMSType)
 - Phase 2e: + Properties
+
+Body tests send all values of a body type in one send/receive per pair;
+each value is still reported as its own test.
 """
 
 import json
-import os
 import subprocess
 from pathlib import Path
 from typing import Any
 
 import pytest
 
+from qit.suites.jms import (
+    BODY_TYPES,
+    BYTES_MESSAGE_VALUES,
+    HEADER_TEST_BODY,
+    HEADER_TESTS,
+    JMS_HEADERS_CORRELATION_ID_BYTES,
+    JMS_HEADERS_CORRELATION_ID_STRING,
+    JMS_HEADERS_JMS_TYPE,
+    JMS_HEADERS_REPLY_TO_QUEUE,
+    JMS_HEADERS_REPLY_TO_TOPIC,
+    JMS_PROPS_BOOLEAN,
+    JMS_PROPS_BYTE,
+    JMS_PROPS_DOUBLE,
+    JMS_PROPS_FLOAT,
+    JMS_PROPS_INT,
+    JMS_PROPS_LONG,
+    JMS_PROPS_SHORT,
+    JMS_PROPS_STRING,
+    MAP_MESSAGE_VALUES,
+    PROPERTY_TESTS,
+    STREAM_MESSAGE_VALUES,
+    TEXT_MESSAGE_VALUES,
+    BodyType,
+    normalize_message_type,
+    normalize_value,
+)
 from shim_registry import DISCOVERED_SHIMS, STAR_PAIRS
+from shim_workers import run_shim
+from xdist_support import unique_queue
 
+BODY_TYPES_BY_NAME = {body.name: body for body in BODY_TYPES}
 
-# =============================================================================
-# Test Data
-# =============================================================================
-
-# TextMessage test values (Phase 2b - initial implementation)
-TEXT_MESSAGE_VALUES = [
-    "",  # Empty string
-    "Hello, world",  # Simple ASCII
-    "Charlie's \"peach\"",  # Quotes and apostrophe
-    "Unicode: ñ 日本語 🎉",  # Unicode characters
-    "The quick brown fox jumped over the lazy dog.",  # Longer text
-]
-
-# BytesMessage test values (Phase 2c.1 - hex-encoded binary data)
-# Lengths chosen to avoid 1/2/4/8 bytes which JMS receiver reinterprets as typed values
-BYTES_MESSAGE_VALUES = [
-    "",                   # Empty bytes
-    "48656c6c6f",         # 5 bytes: "Hello" in ASCII
-    "000102fdfeff",       # 6 bytes: boundary values including 0x00 and 0xff
-]
-
-# MapMessage test values (Phase 2c.2 - string values to avoid type ambiguity)
-MAP_MESSAGE_VALUES = [
-    "Hello",
-    "world",
-]
-
-# StreamMessage test values (Phase 2c.2 - string values to avoid type ambiguity)
-STREAM_MESSAGE_VALUES = [
-    "Hello",
-    "world",
-]
-
-# JMS Header test data (Phase 2d)
-JMS_HEADERS_CORRELATION_ID_STRING = [
-    "Hello, world",
-    "correlation-123",
-    "Charlie's \"peach\"",
-]
-
-JMS_HEADERS_CORRELATION_ID_BYTES = [
-    "48656c6c6f",              # "Hello"
-    "636f7272656c6174696f6e",  # "correlation"
-]
-
-JMS_HEADERS_REPLY_TO_QUEUE = [
-    "reply-queue-1",
-    "reply-queue-2",
-]
-
-JMS_HEADERS_REPLY_TO_TOPIC = [
-    "reply-topic-1",
-    "reply-topic-2",
-]
-
-JMS_HEADERS_JMS_TYPE = [
-    "OrderRequest",
-    "OrderResponse",
-    "Hello, world",
-]
-
-# Phase 2e: JMS Application Properties test data
-JMS_PROPS_BOOLEAN = {
-    "bool_true": {"type": "boolean", "value": True},
-    "bool_false": {"type": "boolean", "value": False},
-}
-JMS_PROPS_BYTE = {
-    "byte_pos": {"type": "byte", "value": "0x0f"},
-    "byte_neg": {"type": "byte", "value": "0xff"},
-    "byte_zero": {"type": "byte", "value": "0x00"},
-}
-JMS_PROPS_SHORT = {
-    "short_pos": {"type": "short", "value": "0x1234"},
-    "short_neg": {"type": "short", "value": "0xffff"},
-    "short_zero": {"type": "short", "value": "0x0000"},
-}
-JMS_PROPS_INT = {
-    "int_pos": {"type": "int", "value": "0x12345678"},
-    "int_neg": {"type": "int", "value": "0xffffffff"},
-    "int_zero": {"type": "int", "value": "0x00000000"},
-}
-JMS_PROPS_LONG = {
-    "long_pos": {"type": "long", "value": "0x0123456789abcdef"},
-    "long_neg": {"type": "long", "value": "0xffffffffffffffff"},
-    "long_zero": {"type": "long", "value": "0x0000000000000000"},
-}
-JMS_PROPS_FLOAT = {
-    "float_pi": {"type": "float", "value": "0x40490fdb"},
-    "float_neg": {"type": "float", "value": "0xc0490fdb"},
-    "float_zero": {"type": "float", "value": "0x00000000"},
-}
-JMS_PROPS_DOUBLE = {
-    "double_pi": {"type": "double", "value": "0x400921fb54442d18"},
-    "double_neg": {"type": "double", "value": "0xc00921fb54442d18"},
-    "double_zero": {"type": "double", "value": "0x0000000000000000"},
-}
-JMS_PROPS_STRING = {
-    "str_hello": {"type": "string", "value": "Hello, world"},
-    "str_special": {"type": "string", "value": "Charlie's \"peach\""},
-    "str_empty": {"type": "string", "value": ""},
-}
+# Every property test's properties; their names do not overlap
+ALL_PROPERTIES = {name: prop for props in PROPERTY_TESTS.values() for name, prop in props.items()}
 
 
 # =============================================================================
 # Fixtures
 # =============================================================================
 
-@pytest.fixture
-def broker_url():
-    """Get broker URL from environment or use default."""
-    return os.environ.get("QIT_BROKER_URL", "localhost:5672")
+@pytest.fixture(scope="module")
+def body_batches(broker_url: str, project_root: Path) -> "BodyBatches":
+    """Body-type batches shared by the per-value body tests of this module."""
+    return BodyBatches(broker_url, project_root)
 
 
-@pytest.fixture
-def test_queue():
-    """Generate unique queue name for test isolation."""
-    import random
-    import string
-
-    suffix = "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
-    return f"qit.test.jms.{suffix}"
+@pytest.fixture(scope="module")
+def header_batches(request, broker_url: str, project_root: Path) -> "HeaderBatches":
+    """Header and property batches shared by the header and property tests of this module."""
+    return HeaderBatches(broker_url, project_root, isolated=request.config.getoption("--jms-isolated"))
 
 
 # =============================================================================
@@ -183,24 +111,20 @@ def run_sender(
     project_root: Path,
     amqp_type: str = "string",
     jms_type: str = "JMS_TEXTMESSAGE_TYPE",
-    headers: dict[str, Any] | None = None,
-    properties: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    """Run sender shim for any client."""
+    """Run sender shim for any client; messages may carry their own headers and properties."""
     shim = DISCOVERED_SHIMS[client]
     broker = shim.broker_prefix + broker_url
 
     if shim.shim_type == "jms":
-        cmd = [
-            str(shim.shim_dir / "shim.sh"), "send",
+        args = [
             "--broker", broker_url,
             "--queue", queue,
             "--type", jms_type,
             "--data", json.dumps(messages),
         ]
     else:
-        cmd = [
-            str(shim.shim_dir / "shim.sh"), "send",
+        args = [
             "--broker", broker,
             "--queue", queue,
             "--type", amqp_type,
@@ -209,13 +133,7 @@ def run_sender(
             "--jms-mode",
         ]
 
-    if headers:
-        cmd.extend(["--headers", json.dumps(headers)])
-
-    if properties:
-        cmd.extend(["--properties", json.dumps(properties)])
-
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+    result = run_shim(shim, "send", args, timeout=30)
     if result.returncode != 0:
         pytest.fail(f"{shim.name} sender failed: {result.stderr}")
 
@@ -234,15 +152,14 @@ def run_receiver(
     shim = DISCOVERED_SHIMS[client]
     broker = shim.broker_prefix + broker_url
 
-    cmd = [
-        str(shim.shim_dir / "shim.sh"), "receive",
+    args = [
         "--broker", broker,
         "--queue", queue,
         "--count", str(count),
         "--timeout", str(timeout),
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout + 10)
+    result = run_shim(shim, "receive", args, timeout=timeout + 10)
     if result.returncode != 0:
         pytest.fail(f"{shim.name} receiver failed: {result.stderr}")
 
@@ -253,50 +170,76 @@ def run_receiver(
 # Test Helpers
 # =============================================================================
 
-def normalize_message_type(msg_type: str) -> str:
-    """Normalize message type for comparison across JMS and AMQP clients."""
-    if msg_type in ("string", "text"):
-        return "text"
-    if msg_type in ("binary", "bytes"):
-        return "bytes"
-    if msg_type in ("null", "none"):
-        return "none"
-    return msg_type
-
-
-def normalize_value(msg_type: str, value: Any) -> Any:
-    """Normalize message value for comparison."""
-    normalized_type = normalize_message_type(msg_type)
-    if normalized_type == "bytes" and isinstance(value, str):
-        return value.lower()
-    return value
-
-
-def compare_messages(sent: list[dict], received: list[dict], sender: str, receiver: str) -> None:
-    """Compare sent and received messages."""
+def compare_batch_message(
+    sent: list[dict],
+    received: list[dict],
+    index: int,
+    sender: str,
+    receiver: str,
+) -> None:
+    """Compare the message at index of a sent and received batch."""
     if len(sent) != len(received):
         pytest.fail(
             f"{sender}→{receiver}: Message count mismatch - "
             f"sent {len(sent)}, received {len(received)}"
         )
 
-    for i, (s, r) in enumerate(zip(sent, received)):
-        sent_type = normalize_message_type(s["type"])
-        recv_type = normalize_message_type(r["type"])
+    s, r = sent[index], received[index]
+    sent_type = normalize_message_type(s["type"])
+    recv_type = normalize_message_type(r["type"])
 
-        assert sent_type == recv_type, (
-            f"{sender}→{receiver}: Message {i} type mismatch - "
-            f"sent {s['type']}, received {r['type']}"
-        )
+    assert sent_type == recv_type, (
+        f"{sender}→{receiver}: Message {index} type mismatch - "
+        f"sent {s['type']}, received {r['type']}"
+    )
 
-        sent_value = normalize_value(s["type"], s.get("value"))
-        recv_value = normalize_value(r["type"], r.get("value"))
+    sent_value = normalize_value(s["type"], s.get("value"))
+    recv_value = normalize_value(r["type"], r.get("value"))
 
-        assert sent_value == recv_value, (
-            f"{sender}→{receiver}: Message {i} value mismatch - "
-            f"sent {repr(s['value'])}, received {repr(r['value'])}"
-        )
+    assert sent_value == recv_value, (
+        f"{sender}→{receiver}: Message {index} value mismatch - "
+        f"sent {repr(s['value'])}, received {repr(r['value'])}"
+    )
+
+
+class BodyBatches:
+    """
+    Sent and received messages of one send/receive per body type and pair.
+
+    The first test of a body type and pair sends all of the type's values
+    in one batch and receives them; the tests of the other values look up
+    their message by index. A failed send or receive fails every test of
+    the batch with the same error.
+    """
 
+    def __init__(self, broker_url: str, project_root: Path) -> None:
+        self.broker_url = broker_url
+        self.project_root = project_root
+        self._batches: dict[tuple[str, str, str], tuple[list[dict], list[dict], str | None]] = {}
+
+    def get(self, body: BodyType, sender: str, receiver: str) -> tuple[list[dict], list[dict]]:
+        """Sent and received messages of a body type's batch for a pair."""
+        key = (body.name, sender, receiver)
+        if key not in self._batches:
+            self._batches[key] = self._run(body, sender, receiver)
+        sent, received, error = self._batches[key]
+        if error is not None:
+            pytest.fail(error)
+        return sent, received
+
+    def _run(self, body: BodyType, sender: str, receiver: str) -> tuple[list[dict], list[dict], str | None]:
+        value_type = body.jms_value_type if DISCOVERED_SHIMS[sender].shim_type == "jms" else body.amqp_value_type
+        messages = [{"index": i, "type": value_type, "value": value} for i, value in enumerate(body.values)]
+        queue = unique_queue(f"qit.test.jms.{body.name}")
+        try:
+            run_sender(
+                sender, self.broker_url, queue, messages, self.project_root,
+                amqp_type=body.amqp_type, jms_type=body.jms_type,
+            )
+            recv_result = run_receiver(receiver, self.broker_url, queue, len(messages), self.project_root)
+        except (pytest.fail.Exception, subprocess.SubprocessError) as e:
+            return messages, [], f"{body.name} batch {sender}→{receiver}: {e}"
+        return messages, recv_result["messages"], None
 
 # =============================================================================
 # Test Matrix
@@ -308,9 +251,7 @@ def test_jms_textmessage_interop(
     sender_client: str,
     receiver_client: str,
     text_value: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    body_batches: BodyBatches,
 ):
     """
     Test JMS TextMessage interoperability using star configuration.
@@ -319,18 +260,10 @@ def test_jms_textmessage_interop(
     This validates that each AMQP client can correctly send JMS-annotated
     messages to, and receive JMS messages from, the native JMS client.
     """
-    sender_shim = DISCOVERED_SHIMS[sender_client]
-    if sender_shim.shim_type == "jms":
-        messages = [{"index": 0, "type": "text", "value": text_value}]
-    else:
-        messages = [{"index": 0, "type": "string", "value": text_value}]
-
-    send_result = run_sender(sender_client, broker_url, test_queue, messages, project_root)
-
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, len(messages), project_root)
-    received = recv_result["messages"]
-
-    compare_messages(messages, received, sender_client, receiver_client)
+    sent, received = body_batches.get(BODY_TYPES_BY_NAME["text"], sender_client, receiver_client)
+    compare_batch_message(
+        sent, received, TEXT_MESSAGE_VALUES.index(text_value), sender_client, receiver_client,
+    )
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
@@ -339,55 +272,27 @@ def test_jms_bytesmessage_interop(
     sender_client: str,
     receiver_client: str,
     bytes_value: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    body_batches: BodyBatches,
 ):
     """Test JMS BytesMessage interoperability using star configuration."""
-    sender_shim = DISCOVERED_SHIMS[sender_client]
-    if sender_shim.shim_type == "jms":
-        messages = [{"index": 0, "type": "bytes", "value": bytes_value}]
-    else:
-        messages = [{"index": 0, "type": "binary", "value": bytes_value}]
-
-    send_result = run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        amqp_type="binary", jms_type="JMS_BYTESMESSAGE_TYPE",
+    sent, received = body_batches.get(BODY_TYPES_BY_NAME["bytes"], sender_client, receiver_client)
+    compare_batch_message(
+        sent, received, BYTES_MESSAGE_VALUES.index(bytes_value), sender_client, receiver_client,
     )
 
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, len(messages), project_root)
-    received = recv_result["messages"]
-
-    compare_messages(messages, received, sender_client, receiver_client)
-
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
 def test_jms_message_interop(
     sender_client: str,
     receiver_client: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    body_batches: BodyBatches,
 ):
     """Test JMS Message (empty/no body) interoperability using star configuration."""
     if sender_client == "javascript-rhea" and DISCOVERED_SHIMS[receiver_client].shim_type == "jms":
         pytest.xfail("Rhea sends AmqpValue(null) for empty body, JMS maps this to TextMessage")
 
-    sender_shim = DISCOVERED_SHIMS[sender_client]
-    if sender_shim.shim_type == "jms":
-        messages = [{"index": 0, "type": "none", "value": None}]
-    else:
-        messages = [{"index": 0, "type": "null", "value": None}]
-
-    send_result = run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        amqp_type="null", jms_type="JMS_MESSAGE_TYPE",
-    )
-
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, len(messages), project_root)
-    received = recv_result["messages"]
-
-    compare_messages(messages, received, sender_client, receiver_client)
+    sent, received = body_batches.get(BODY_TYPES_BY_NAME["message"], sender_client, receiver_client)
+    compare_batch_message(sent, received, 0, sender_client, receiver_client)
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
@@ -396,23 +301,14 @@ def test_jms_mapmessage_interop(
     sender_client: str,
     receiver_client: str,
     map_value: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    body_batches: BodyBatches,
 ):
     """Test JMS MapMessage interoperability using star configuration."""
-    messages = [{"index": 0, "type": "string", "value": map_value}]
-
-    send_result = run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        amqp_type="map", jms_type="JMS_MAPMESSAGE_TYPE",
+    sent, received = body_batches.get(BODY_TYPES_BY_NAME["map"], sender_client, receiver_client)
+    compare_batch_message(
+        sent, received, MAP_MESSAGE_VALUES.index(map_value), sender_client, receiver_client,
     )
 
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, len(messages), project_root)
-    received = recv_result["messages"]
-
-    compare_messages(messages, received, sender_client, receiver_client)
-
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
 @pytest.mark.parametrize("stream_value", STREAM_MESSAGE_VALUES)
@@ -420,23 +316,14 @@ def test_jms_streammessage_interop(
     sender_client: str,
     receiver_client: str,
     stream_value: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    body_batches: BodyBatches,
 ):
     """Test JMS StreamMessage interoperability using star configuration."""
-    messages = [{"index": 0, "type": "string", "value": stream_value}]
-
-    send_result = run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        amqp_type="list", jms_type="JMS_STREAMMESSAGE_TYPE",
+    sent, received = body_batches.get(BODY_TYPES_BY_NAME["stream"], sender_client, receiver_client)
+    compare_batch_message(
+        sent, received, STREAM_MESSAGE_VALUES.index(stream_value), sender_client, receiver_client,
     )
 
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, len(messages), project_root)
-    received = recv_result["messages"]
-
-    compare_messages(messages, received, sender_client, receiver_client)
-
 
 # =============================================================================
 # Phase 2d: JMS Headers
@@ -491,12 +378,144 @@ def compare_headers(
             )
 
 
-def _header_test_message(sender_client: str) -> list[dict[str, Any]]:
-    """Create a single TextMessage for header tests."""
-    sender_shim = DISCOVERED_SHIMS[sender_client]
-    if sender_shim.shim_type == "jms":
-        return [{"index": 0, "type": "text", "value": "header-test"}]
-    return [{"index": 0, "type": "string", "value": "header-test"}]
+def correlation_id_bytes_xfail(sender_client: str, receiver_client: str) -> str | None:
+    """Why binary correlation IDs are expected to fail for a pair, or None."""
+    if sender_client in ("dotnet-proton", "java-protonj2"):
+        return f"{sender_client} client cannot send binary correlation IDs (message-id type restriction)"
+    if receiver_client == "java-protonj2":
+        return "ProtonJ2 decodes binary correlation IDs as UTF-8 strings"
+    return None
+
+
+def pack_header_values(
+    variants: list[tuple[str, str]],
+) -> tuple[list[dict[str, Any]], dict[tuple[str, str], int]]:
+    """
+    Pack header test values into as few header sets as possible.
+
+    A message carries at most one value per JMS header, so the n-th value
+    of every header goes into the n-th set.
+
+    Args:
+        variants: (header test name from HEADER_TESTS, value) pairs
+
+    Returns:
+        The header sets, and the index of the set carrying each variant
+    """
+    header_sets: list[dict[str, Any]] = []
+    carriers: dict[tuple[str, str], int] = {}
+    used: dict[str, int] = {}
+    for test, value in variants:
+        header, value_type, _ = HEADER_TESTS[test]
+        index = used.get(header, 0)
+        used[header] = index + 1
+        if index == len(header_sets):
+            header_sets.append({})
+        header_sets[index][header] = {"type": value_type, "value": value}
+        carriers[(test, value)] = index
+    return header_sets, carriers
+
+
+class HeaderBatches:
+    """
+    Received messages of the header and property tests.
+
+    Consolidated (the default), the first header or property test of a pair
+    sends every header value and property type of the pair in one batch of
+    a few messages: each message carries one value per header, and the
+    first also carries all properties. Each test then checks only its own
+    header value or property type, so a mismatch is still reported by the
+    test it belongs to. Header values of a pair's expected failures are left
+    out of its batch. With --jms-isolated, every test sends its own message.
+    """
+
+    def __init__(self, broker_url: str, project_root: Path, isolated: bool = False) -> None:
+        self.broker_url = broker_url
+        self.project_root = project_root
+        self.isolated = isolated
+        self._batches: dict[tuple, tuple[list[dict], dict[tuple[str, str], int], str | None]] = {}
+
+    def headers(self, test: str, value: str, sender: str, receiver: str) -> dict[str, Any]:
+        """Received headers of the message carrying one header test value."""
+        if self.isolated:
+            key: tuple = (sender, receiver, test, value)
+            variants, properties = [(test, value)], {}
+        else:
+            key = (sender, receiver)
+            variants, properties = self._pair_variants(sender, receiver), ALL_PROPERTIES
+        received, carriers = self._get(key, variants, properties, sender, receiver)
+        message = received[carriers[(test, value)]]
+        assert "headers" in message, f"No headers in received message: {message}"
+        return message["headers"]
+
+    def properties(self, test: str, sender: str, receiver: str) -> dict[str, Any]:
+        """Received application properties of a property test."""
+        if self.isolated:
+            key: tuple = (sender, receiver, test)
+            variants, properties = [], PROPERTY_TESTS[test]
+        else:
+            key = (sender, receiver)
+            variants, properties = self._pair_variants(sender, receiver), ALL_PROPERTIES
+        received, _ = self._get(key, variants, properties, sender, receiver)
+        message = received[0]
+        assert "properties" in message, f"No properties in received message: {message}"
+        return message["properties"]
+
+    @staticmethod
+    def _pair_variants(sender: str, receiver: str) -> list[tuple[str, str]]:
+        return [
+            (test, value)
+            for test, (_, _, values) in HEADER_TESTS.items()
+            if not (test == "correlation_id_bytes" and correlation_id_bytes_xfail(sender, receiver))
+            for value in values
+        ]
+
+    def _get(
+        self,
+        key: tuple,
+        variants: list[tuple[str, str]],
+        properties: dict[str, Any],
+        sender: str,
+        receiver: str,
+    ) -> tuple[list[dict], dict[tuple[str, str], int]]:
+        if key not in self._batches:
+            self._batches[key] = self._run(variants, properties, sender, receiver)
+        received, carriers, error = self._batches[key]
+        if error is not None:
+            pytest.fail(error)
+        return received, carriers
+
+    def _run(
+        self,
+        variants: list[tuple[str, str]],
+        properties: dict[str, Any],
+        sender: str,
+        receiver: str,
+    ) -> tuple[list[dict], dict[tuple[str, str], int], str | None]:
+        header_sets, carriers = pack_header_values(variants)
+        value_type = "text" if DISCOVERED_SHIMS[sender].shim_type == "jms" else "string"
+        messages = [
+            {"index": i, "type": value_type, "value": HEADER_TEST_BODY}
+            for i in range(max(len(header_sets), 1))
+        ]
+        for message, headers in zip(messages, header_sets):
+            message["headers"] = headers
+        if properties:
+            messages[0]["properties"] = properties
+
+        queue = unique_queue("qit.test.jms.headers")
+        try:
+            run_sender(sender, self.broker_url, queue, messages, self.project_root)
+            recv_result = run_receiver(receiver, self.broker_url, queue, len(messages), self.project_root)
+        except (pytest.fail.Exception, subprocess.SubprocessError) as e:
+            return [], carriers, f"header batch {sender}→{receiver}: {e}"
+        received = recv_result["messages"]
+        if len(received) != len(messages):
+            return [], carriers, (
+                f"{sender}→{receiver}: Message count mismatch - "
+                f"sent {len(messages)}, received {len(received)}"
+            )
+        return received, carriers, None
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
@@ -505,25 +524,12 @@ def test_jms_header_correlationid_string(
     sender_client: str,
     receiver_client: str,
     corr_id: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    header_batches: HeaderBatches,
 ):
     """Test JMSCorrelationID header with string values."""
-    headers = {"JMSCorrelationID": {"type": "string", "value": corr_id}}
-    messages = _header_test_message(sender_client)
-
-    run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        headers=headers,
-    )
-
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, 1, project_root)
-    received = recv_result["messages"]
-
-    assert len(received) == 1
-    assert "headers" in received[0], f"No headers in received message: {received[0]}"
-    compare_headers(headers, received[0]["headers"], sender_client, receiver_client)
+    header, value_type, _ = HEADER_TESTS["correlation_id_string"]
+    received = header_batches.headers("correlation_id_string", corr_id, sender_client, receiver_client)
+    compare_headers({header: {"type": value_type, "value": corr_id}}, received, sender_client, receiver_client)
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
@@ -532,30 +538,16 @@ def test_jms_header_correlationid_bytes(
     sender_client: str,
     receiver_client: str,
     corr_id_hex: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    header_batches: HeaderBatches,
 ):
     """Test JMSCorrelationID header with binary values."""
-    if sender_client in ("dotnet-proton", "java-protonj2"):
-        pytest.xfail(f"{sender_client} client cannot send binary correlation IDs (message-id type restriction)")
-    if receiver_client == "java-protonj2":
-        pytest.xfail("ProtonJ2 decodes binary correlation IDs as UTF-8 strings")
-
-    headers = {"JMSCorrelationID": {"type": "bytes", "value": corr_id_hex}}
-    messages = _header_test_message(sender_client)
-
-    run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        headers=headers,
-    )
-
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, 1, project_root)
-    received = recv_result["messages"]
+    reason = correlation_id_bytes_xfail(sender_client, receiver_client)
+    if reason:
+        pytest.xfail(reason)
 
-    assert len(received) == 1
-    assert "headers" in received[0], f"No headers in received message: {received[0]}"
-    compare_headers(headers, received[0]["headers"], sender_client, receiver_client)
+    header, value_type, _ = HEADER_TESTS["correlation_id_bytes"]
+    received = header_batches.headers("correlation_id_bytes", corr_id_hex, sender_client, receiver_client)
+    compare_headers({header: {"type": value_type, "value": corr_id_hex}}, received, sender_client, receiver_client)
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
@@ -564,25 +556,12 @@ def test_jms_header_replyto_queue(
     sender_client: str,
     receiver_client: str,
     reply_queue: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    header_batches: HeaderBatches,
 ):
     """Test JMSReplyTo header with queue destination."""
-    headers = {"JMSReplyTo": {"type": "queue", "value": reply_queue}}
-    messages = _header_test_message(sender_client)
-
-    run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        headers=headers,
-    )
-
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, 1, project_root)
-    received = recv_result["messages"]
-
-    assert len(received) == 1
-    assert "headers" in received[0], f"No headers in received message: {received[0]}"
-    compare_headers(headers, received[0]["headers"], sender_client, receiver_client)
+    header, value_type, _ = HEADER_TESTS["reply_to_queue"]
+    received = header_batches.headers("reply_to_queue", reply_queue, sender_client, receiver_client)
+    compare_headers({header: {"type": value_type, "value": reply_queue}}, received, sender_client, receiver_client)
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
@@ -591,25 +570,12 @@ def test_jms_header_replyto_topic(
     sender_client: str,
     receiver_client: str,
     reply_topic: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    header_batches: HeaderBatches,
 ):
     """Test JMSReplyTo header with topic destination."""
-    headers = {"JMSReplyTo": {"type": "topic", "value": reply_topic}}
-    messages = _header_test_message(sender_client)
-
-    run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        headers=headers,
-    )
-
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, 1, project_root)
-    received = recv_result["messages"]
-
-    assert len(received) == 1
-    assert "headers" in received[0], f"No headers in received message: {received[0]}"
-    compare_headers(headers, received[0]["headers"], sender_client, receiver_client)
+    header, value_type, _ = HEADER_TESTS["reply_to_topic"]
+    received = header_batches.headers("reply_to_topic", reply_topic, sender_client, receiver_client)
+    compare_headers({header: {"type": value_type, "value": reply_topic}}, received, sender_client, receiver_client)
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
@@ -618,25 +584,12 @@ def test_jms_header_jmstype(
     sender_client: str,
     receiver_client: str,
     jms_type_value: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    header_batches: HeaderBatches,
 ):
     """Test JMSType header."""
-    headers = {"JMSType": {"type": "string", "value": jms_type_value}}
-    messages = _header_test_message(sender_client)
-
-    run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        headers=headers,
-    )
-
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, 1, project_root)
-    received = recv_result["messages"]
-
-    assert len(received) == 1
-    assert "headers" in received[0], f"No headers in received message: {received[0]}"
-    compare_headers(headers, received[0]["headers"], sender_client, receiver_client)
+    header, value_type, _ = HEADER_TESTS["jms_type"]
+    received = header_batches.headers("jms_type", jms_type_value, sender_client, receiver_client)
+    compare_headers({header: {"type": value_type, "value": jms_type_value}}, received, sender_client, receiver_client)
 
 
 # =============================================================================
@@ -684,175 +637,95 @@ def compare_properties(
 def test_jms_property_boolean(
     sender_client: str,
     receiver_client: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    header_batches: HeaderBatches,
 ) -> None:
     """Test JMS boolean application properties round-trip."""
-    messages = _header_test_message(sender_client)
-    run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        properties=JMS_PROPS_BOOLEAN,
-    )
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, 1, project_root)
-    received = recv_result["messages"]
-    assert len(received) == 1
-    assert "properties" in received[0], f"No properties in received message: {received[0]}"
-    compare_properties(JMS_PROPS_BOOLEAN, received[0]["properties"], sender_client, receiver_client)
+    received = header_batches.properties("boolean", sender_client, receiver_client)
+    compare_properties(JMS_PROPS_BOOLEAN, received, sender_client, receiver_client)
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
 def test_jms_property_byte(
     sender_client: str,
     receiver_client: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    header_batches: HeaderBatches,
 ) -> None:
     """Test JMS byte application properties round-trip."""
     if receiver_client == "javascript-rhea" and sender_client != "javascript-rhea":
         pytest.xfail("Rhea loses AMQP byte type — JS has no typed integers")
-    messages = _header_test_message(sender_client)
-    run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        properties=JMS_PROPS_BYTE,
-    )
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, 1, project_root)
-    received = recv_result["messages"]
-    assert len(received) == 1
-    assert "properties" in received[0], f"No properties in received message: {received[0]}"
-    compare_properties(JMS_PROPS_BYTE, received[0]["properties"], sender_client, receiver_client)
+    received = header_batches.properties("byte", sender_client, receiver_client)
+    compare_properties(JMS_PROPS_BYTE, received, sender_client, receiver_client)
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
 def test_jms_property_short(
     sender_client: str,
     receiver_client: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    header_batches: HeaderBatches,
 ) -> None:
     """Test JMS short application properties round-trip."""
     if receiver_client == "javascript-rhea" and sender_client != "javascript-rhea":
         pytest.xfail("Rhea loses AMQP short type — JS has no typed integers")
-    messages = _header_test_message(sender_client)
-    run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        properties=JMS_PROPS_SHORT,
-    )
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, 1, project_root)
-    received = recv_result["messages"]
-    assert len(received) == 1
-    assert "properties" in received[0], f"No properties in received message: {received[0]}"
-    compare_properties(JMS_PROPS_SHORT, received[0]["properties"], sender_client, receiver_client)
+    received = header_batches.properties("short", sender_client, receiver_client)
+    compare_properties(JMS_PROPS_SHORT, received, sender_client, receiver_client)
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
 def test_jms_property_int(
     sender_client: str,
     receiver_client: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    header_batches: HeaderBatches,
 ) -> None:
     """Test JMS int application properties round-trip."""
     if receiver_client == "javascript-rhea" and sender_client != "javascript-rhea":
         pytest.xfail("Rhea loses AMQP int type — JS has no typed integers")
-    messages = _header_test_message(sender_client)
-    run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        properties=JMS_PROPS_INT,
-    )
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, 1, project_root)
-    received = recv_result["messages"]
-    assert len(received) == 1
-    assert "properties" in received[0], f"No properties in received message: {received[0]}"
-    compare_properties(JMS_PROPS_INT, received[0]["properties"], sender_client, receiver_client)
+    received = header_batches.properties("int", sender_client, receiver_client)
+    compare_properties(JMS_PROPS_INT, received, sender_client, receiver_client)
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
 def test_jms_property_long(
     sender_client: str,
     receiver_client: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    header_batches: HeaderBatches,
 ) -> None:
     """Test JMS long application properties round-trip."""
     if receiver_client == "javascript-rhea" and sender_client != "javascript-rhea":
         pytest.xfail("Rhea loses AMQP long type — JS number can't represent 64-bit integers")
-    messages = _header_test_message(sender_client)
-    run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        properties=JMS_PROPS_LONG,
-    )
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, 1, project_root)
-    received = recv_result["messages"]
-    assert len(received) == 1
-    assert "properties" in received[0], f"No properties in received message: {received[0]}"
-    compare_properties(JMS_PROPS_LONG, received[0]["properties"], sender_client, receiver_client)
+    received = header_batches.properties("long", sender_client, receiver_client)
+    compare_properties(JMS_PROPS_LONG, received, sender_client, receiver_client)
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
 def test_jms_property_float(
     sender_client: str,
     receiver_client: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    header_batches: HeaderBatches,
 ) -> None:
     """Test JMS float application properties round-trip."""
     if receiver_client == "javascript-rhea" and sender_client != "javascript-rhea":
         pytest.xfail("Rhea loses AMQP float type — JS has only double-precision numbers")
-    messages = _header_test_message(sender_client)
-    run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        properties=JMS_PROPS_FLOAT,
-    )
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, 1, project_root)
-    received = recv_result["messages"]
-    assert len(received) == 1
-    assert "properties" in received[0], f"No properties in received message: {received[0]}"
-    compare_properties(JMS_PROPS_FLOAT, received[0]["properties"], sender_client, receiver_client)
+    received = header_batches.properties("float", sender_client, receiver_client)
+    compare_properties(JMS_PROPS_FLOAT, received, sender_client, receiver_client)
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
 def test_jms_property_double(
     sender_client: str,
     receiver_client: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    header_batches: HeaderBatches,
 ) -> None:
     """Test JMS double application properties round-trip."""
-    messages = _header_test_message(sender_client)
-    run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        properties=JMS_PROPS_DOUBLE,
-    )
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, 1, project_root)
-    received = recv_result["messages"]
-    assert len(received) == 1
-    assert "properties" in received[0], f"No properties in received message: {received[0]}"
-    compare_properties(JMS_PROPS_DOUBLE, received[0]["properties"], sender_client, receiver_client)
+    received = header_batches.properties("double", sender_client, receiver_client)
+    compare_properties(JMS_PROPS_DOUBLE, received, sender_client, receiver_client)
 
 
 @pytest.mark.parametrize("sender_client,receiver_client", STAR_PAIRS)
 def test_jms_property_string(
     sender_client: str,
     receiver_client: str,
-    broker_url: str,
-    test_queue: str,
-    project_root: Path,
+    header_batches: HeaderBatches,
 ) -> None:
     """Test JMS string application properties round-trip."""
-    messages = _header_test_message(sender_client)
-    run_sender(
-        sender_client, broker_url, test_queue, messages, project_root,
-        properties=JMS_PROPS_STRING,
-    )
-    recv_result = run_receiver(receiver_client, broker_url, test_queue, 1, project_root)
-    received = recv_result["messages"]
-    assert len(received) == 1
-    assert "properties" in received[0], f"No properties in received message: {received[0]}"
-    compare_properties(JMS_PROPS_STRING, received[0]["properties"], sender_client, receiver_client)
+    received = header_batches.properties("string", sender_client, receiver_client)
+    compare_properties(JMS_PROPS_STRING, received, sender_client, receiver_client)
@@ -32,14 +32,25 @@ Test Pairs:
 """
 
 import json
-import os
-import subprocess
 from pathlib import Path
 from typing import Any
 
 import pytest
 
+from qit.suites.large_content import (
+    EXPECTED_LARGE_FRAME_SIZE,
+    EXPECTED_SMALL_FRAME_SIZE,
+    SIZE_1MB,
+    SIZE_10MB,
+    SUBFRAME_ELEMENT_SIZE,
+    SUBFRAME_ELEMENTS,
+    SUPERFRAME_ELEMENT_SIZE,
+    SUPERFRAME_ELEMENTS,
+    negotiated_frame_size,
+)
 from shim_registry import ALL_PAIRS, AMQP_PAIRS, DISCOVERED_SHIMS, STAR_PAIRS
+from shim_workers import run_shim
+from xdist_support import shared_dir, shared_session_result, unique_queue, worker_broker_url
 
 # Content type mapping for JMS sender which uses its own type names
 JMS_CONTENT_TYPE = {
@@ -54,73 +65,46 @@ JMS_CONTENT_TYPE = {
 # Fixtures
 # =============================================================================
 
-@pytest.fixture
-def broker_url():
-    return os.environ.get("QIT_BROKER_URL", "localhost:5672")
-
-
-EXPECTED_SMALL_FRAME_SIZE = 4096
-EXPECTED_LARGE_FRAME_SIZE = 1_048_576
-
-
-def _verify_broker_frame_size(broker_url: str, expected_max_frame_size: int) -> None:
-    """Connect to broker via Proton and assert the negotiated max frame size."""
-    from proton.handlers import MessagingHandler
-    from proton.reactor import Container
+def _checked_broker_url(tmp_path_factory: pytest.TempPathFactory, env_var: str, default: str, expected: int) -> str:
+    """This worker's broker from env_var, after checking its negotiated max frame size."""
+    url = worker_broker_url(env_var, default)
 
-    result: dict[str, Any] = {}
-
-    class FrameChecker(MessagingHandler):
-        def on_start(self, event):
-            event.container.connect(f"amqp://{broker_url}")
-
-        def on_connection_opened(self, event):
-            result["remote_max_frame_size"] = (
-                event.connection.transport.remote_max_frame_size
-            )
-            event.connection.close()
-
-        def on_transport_error(self, event):
-            result["error"] = str(event.transport.condition)
-
-    Container(FrameChecker()).run()
+    def check() -> dict[str, Any]:
+        try:
+            return {"frame_size": negotiated_frame_size(f"amqp://{url}")}
+        except RuntimeError as e:
+            return {"error": str(e)}
 
+    # Checked once per run; the other xdist workers read the first one's result
+    result = shared_session_result(shared_dir(tmp_path_factory), f"frame-size-{url}", check)
     if "error" in result:
-        pytest.fail(
-            f"Cannot connect to broker at {broker_url}: {result['error']}"
-        )
-    if "remote_max_frame_size" not in result:
-        pytest.fail(
-            f"No frame size negotiated with broker at {broker_url}"
-        )
-    actual = result["remote_max_frame_size"]
-    assert actual == expected_max_frame_size, (
-        f"Broker at {broker_url} negotiated max_frame_size={actual}, "
-        f"expected {expected_max_frame_size}. "
+        pytest.fail(result["error"])
+    actual = result["frame_size"]
+    assert actual == expected, (
+        f"Broker at {url} negotiated max_frame_size={actual}, "
+        f"expected {expected}. "
         f"Check broker acceptor 'maxFrameSize' parameter."
     )
+    return url
 
 
 @pytest.fixture(scope="session")
-def broker_url_small_frame():
-    url = os.environ.get("QIT_BROKER_URL_SMALL_FRAME", "localhost:5673")
-    _verify_broker_frame_size(url, EXPECTED_SMALL_FRAME_SIZE)
-    return url
+def broker_url_small_frame(tmp_path_factory):
+    return _checked_broker_url(
+        tmp_path_factory, "QIT_BROKER_URL_SMALL_FRAME", "localhost:5673", EXPECTED_SMALL_FRAME_SIZE,
+    )
 
 
 @pytest.fixture(scope="session")
-def broker_url_large_frame():
-    url = os.environ.get("QIT_BROKER_URL_LARGE_FRAME", "localhost:5674")
-    _verify_broker_frame_size(url, EXPECTED_LARGE_FRAME_SIZE)
-    return url
+def broker_url_large_frame(tmp_path_factory):
+    return _checked_broker_url(
+        tmp_path_factory, "QIT_BROKER_URL_LARGE_FRAME", "localhost:5674", EXPECTED_LARGE_FRAME_SIZE,
+    )
 
 
 @pytest.fixture
 def test_queue():
-    import random
-    import string
-    suffix = "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
-    return f"qit.test.large.{suffix}"
+    return unique_queue("qit.test.large")
 
 
 # =============================================================================
@@ -141,8 +125,7 @@ def run_large_sender(
     shim = DISCOVERED_SHIMS[client]
     broker = shim.broker_prefix + broker_url
 
-    cmd = [
-        str(shim.shim_dir / "shim.sh"), "send",
+    args = [
         "--broker", broker,
         "--queue", queue,
         "--large-content", content_type,
@@ -150,9 +133,9 @@ def run_large_sender(
         "--seed", str(seed),
     ]
     if jms_mode:
-        cmd.append("--jms-mode")
+        args.append("--jms-mode")
 
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    result = run_shim(shim, "send", args, timeout=timeout)
     if result.returncode != 0:
         pytest.fail(f"{shim.name} sender failed: {result.stderr}")
 
@@ -172,8 +155,7 @@ def run_large_receiver(
     shim = DISCOVERED_SHIMS[client]
     broker = shim.broker_prefix + broker_url
 
-    cmd = [
-        str(shim.shim_dir / "shim.sh"), "receive",
+    args = [
         "--broker", broker,
         "--queue", queue,
         "--large-content", content_type,
@@ -182,7 +164,7 @@ def run_large_receiver(
         "--timeout", str(timeout),
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout + 10)
+    result = run_shim(shim, "receive", args, timeout=timeout + 10)
     if result.returncode != 0:
         pytest.fail(
             f"{shim.name} receiver failed (rc={result.returncode}): {result.stderr}\n"
@@ -202,7 +184,6 @@ def _needs_jms_mode(sender: str, receiver: str) -> bool:
 # Default Tier: 1MB (72 tests, always run)
 # =============================================================================
 
-SIZE_1MB = 1_048_576
 SEED_BINARY = 42
 SEED_STRING = 43
 
@@ -259,7 +240,6 @@ def test_large_string_1mb(
 # Extended Tier: 10MB (72 tests, --large-content flag)
 # =============================================================================
 
-SIZE_10MB = 10_485_760
 SEED_BINARY_10MB = 44
 SEED_STRING_10MB = 45
 
@@ -318,14 +298,6 @@ def test_large_string_10mb(
 # Phase 4b: Large Collection Content Tests
 # =============================================================================
 
-# Frame-relative element sizes (default AMQP frame size = 128KB = 131072 bytes)
-# Non-aligned to guarantee elements straddle frame boundaries.
-FRAME_SIZE = 131_072
-SUBFRAME_ELEMENT_SIZE = FRAME_SIZE // 3          # 43690 — fits in frame but doesn't align
-SUBFRAME_ELEMENTS = 24                           # 24 × 43690 ≈ 1.0MB
-SUPERFRAME_ELEMENT_SIZE = FRAME_SIZE * 3 // 2    # 196608 — exceeds frame size
-SUPERFRAME_ELEMENTS = 5                          # 5 × 196608 ≈ 0.96MB
-
 # Distinct seeds per collection test config
 SEED_LIST_SUB = 100
 SEED_LIST_SUPER = 101
@@ -356,8 +328,7 @@ def run_collection_sender(
     shim = DISCOVERED_SHIMS[client]
     broker = shim.broker_prefix + broker_url
 
-    cmd = [
-        str(shim.shim_dir / "shim.sh"), "send",
+    args = [
         "--broker", broker,
         "--queue", queue,
         "--large-content", content_type,
@@ -366,9 +337,9 @@ def run_collection_sender(
         "--seed", str(seed),
     ]
     if jms_mode:
-        cmd.append("--jms-mode")
+        args.append("--jms-mode")
 
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    result = run_shim(shim, "send", args, timeout=timeout)
     if result.returncode != 0:
         pytest.fail(f"{shim.name} sender failed: {result.stderr}")
     return json.loads(result.stdout)
@@ -388,8 +359,7 @@ def run_collection_receiver(
     shim = DISCOVERED_SHIMS[client]
     broker = shim.broker_prefix + broker_url
 
-    cmd = [
-        str(shim.shim_dir / "shim.sh"), "receive",
+    args = [
         "--broker", broker,
         "--queue", queue,
         "--large-content", content_type,
@@ -399,7 +369,7 @@ def run_collection_receiver(
         "--timeout", str(timeout),
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout + 10)
+    result = run_shim(shim, "receive", args, timeout=timeout + 10)
     if result.returncode != 0:
         pytest.fail(
             f"{shim.name} receiver failed (rc={result.returncode}): {result.stderr}\n"
@@ -0,0 +1,244 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Tests for orchestrator scheduling, using in-memory shims and broker."""
+
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any
+
+from qit.core.broker import BrokerConfig
+from qit.core.junit import JUnitWriter
+from qit.core.orchestrator import Orchestrator
+from qit.core.results import ResultRows, ResultsWriter, payload_bytes, read_results
+from qit.core.shim import Message, ShimResult
+from qit.core.xfail import KnownFailure, KnownFailureRegistry
+
+
+class FakeBroker:
+    """Records subscriptions and stores sent messages per address."""
+
+    def __init__(self) -> None:
+        self.config = BrokerConfig(
+            name="fake", type="artemis", url="amqp://fake:5672", compose_file=Path("compose.yaml")
+        )
+        self.subscriptions: dict[str, list[str]] = {}
+        self.queues: dict[str, list[Message]] = {}
+
+    def prepare_subscriptions(self, address: str, queues: list[str]) -> None:
+        self.subscriptions[address] = list(queues)
+
+
+class FakeShim:
+    """Sends into and receives from a FakeBroker, counting invocations."""
+
+    def __init__(self, broker: FakeBroker, corrupt: bool = False) -> None:
+        self.broker = broker
+        self.corrupt = corrupt
+        self.sends: list[str] = []
+        self.receive_calls = 0
+        self.roundtrips = 0
+        self.roundtrip_hashes: list[list[str] | None] = []
+
+    def send(self, broker_url: str, queue_name: str, amqp_type: str, values: list[Any]) -> ShimResult:
+        self.sends.append(queue_name)
+        messages = [Message(i, amqp_type, v) for i, v in enumerate(values)]
+        targets = self.broker.subscriptions.get(queue_name)
+        for target in (f"{queue_name}::{q}" for q in targets) if targets else [queue_name]:
+            self.broker.queues[target] = list(messages)
+        return ShimResult(success=True, messages=messages)
+
+    def receive(
+        self, broker_url: str, queue_name: str, count: int, timeout: int = 10,
+        expected_hashes: list[str] | None = None,
+    ) -> ShimResult:
+        self.receive_calls += 1
+        return self._drain(queue_name)
+
+    def receive_queues(
+        self, broker_url: str, queue_names: list[str], count: int, timeout: int = 10,
+        expected_hashes: list[str] | None = None,
+    ) -> dict[str, ShimResult]:
+        self.receive_calls += 1
+        return {queue: self._drain(queue) for queue in queue_names}
+
+    def roundtrip(
+        self, broker_url: str, queue_name: str, amqp_type: str, values: list[Any], timeout: int = 10,
+        expected_hashes: list[str] | None = None,
+    ) -> tuple[ShimResult, ShimResult]:
+        self.roundtrips += 1
+        self.roundtrip_hashes.append(expected_hashes)
+        return self.send(broker_url, queue_name, amqp_type, values), self._drain(queue_name)
+
+    def _drain(self, queue_name: str) -> ShimResult:
+        messages = self.broker.queues.pop(queue_name, [])
+        if self.corrupt:
+            messages = [Message(m.index, m.amqp_type, "corrupt") for m in messages]
+        return ShimResult(success=True, messages=messages)
+
+
+def _orchestrator(corrupt_receiver: str | None = None) -> tuple[Orchestrator, dict[str, FakeShim]]:
+    broker = FakeBroker()
+    shims = {name: FakeShim(broker, corrupt=name == corrupt_receiver) for name in ("a", "b", "c")}
+    return Orchestrator(shims=shims, broker=broker), shims
+
+
+def test_fanout_sends_once_per_sender_and_type() -> None:
+    """Fan-out mode sends S times instead of S×R, to addresses unique to the run."""
+    orchestrator, shims = _orchestrator()
+    types = {"string": ["x", "y"], "int": [1, 2]}
+
+    results = orchestrator.run_test_matrix(types, fanout=True)
+
+    assert len(results) == 3 * 3 * 2
+    assert all(r.success for r in results)
+    run = orchestrator.run_token
+    for name, shim in shims.items():
+        assert sorted(shim.sends) == [f"qit.fanout.{run}.int.{name}", f"qit.fanout.{run}.string.{name}"]
+    assert run != _orchestrator()[0].run_token
+
+
+def test_fanout_matches_per_pair_results() -> None:
+    """Fan-out reports the same cases, in the same order, as per-pair mode."""
+    per_pair, _ = _orchestrator(corrupt_receiver="b")
+    fanout, _ = _orchestrator(corrupt_receiver="b")
+    types = {"string": ["x"]}
+
+    expected = per_pair.run_test_matrix(types, workers=2)
+    actual = fanout.run_test_matrix(types, workers=2, fanout=True)
+
+    def summary(results: list) -> list[tuple[str, str, bool]]:
+        return [(r.test_case.sender_shim, r.test_case.receiver_shim, r.success) for r in results]
+
+    assert summary(actual) == summary(expected)
+    assert [s for s in summary(actual) if not s[2]] == [("a", "b", False), ("b", "b", False), ("c", "b", False)]
+
+
+def test_consolidated_receivers_run_once_per_type() -> None:
+    """Each receiver drains all senders' queues in one invocation per type."""
+    orchestrator, shims = _orchestrator(corrupt_receiver="c")
+    types = {"string": ["x", "y"], "int": [1, 2]}
+
+    results = orchestrator.run_test_matrix(types, consolidate=True, fanout=True)
+
+    assert [(r.test_case.sender_shim, r.test_case.receiver_shim) for r in results[:3]] == [
+        ("a", "a"), ("a", "a"), ("a", "b"),
+    ]
+    assert all(shim.receive_calls == 2 for shim in shims.values())
+    assert {r.test_case.receiver_shim for r in results if not r.success} == {"c"}
+
+
+def test_diagonal_cells_use_roundtrip() -> None:
+    """Cases with sender == receiver run as one roundtrip."""
+    orchestrator, shims = _orchestrator()
+
+    results = orchestrator.run_test_matrix({"string": ["x"]})
+
+    assert all(r.success for r in results)
+    assert all(shim.roundtrips == 1 for shim in shims.values())
+    assert all(shim.receive_calls == 2 for shim in shims.values())
+    hashes = orchestrator.comparator.expected_values("string", ["x"]).hashes
+    assert all(shim.roundtrip_hashes == [hashes] for shim in shims.values())
+
+
+def test_whole_case_xfails_not_run_unless_verified() -> None:
+    """Cases covered by a whole-case known failure are skipped by default."""
+    broker = FakeBroker()
+    shims = {name: FakeShim(broker) for name in ("a", "b")}
+    registry = KnownFailureRegistry([KnownFailure("*", "b", "int", None, "b cannot decode int")])
+    orchestrator = Orchestrator(shims=shims, broker=broker, known_failures=registry)
+    types = {"int": [1, 2]}
+
+    results = orchestrator.run_test_matrix(types)
+
+    assert [(r.test_case.sender_shim, r.test_case.receiver_shim, r.not_run) for r in results] == [
+        ("a", "a", False), ("a", "b", True), ("b", "a", False), ("b", "b", True),
+    ]
+    assert shims["b"].receive_calls == 0 and shims["b"].roundtrips == 0
+    assert all(r.success for r in results)
+
+    verified = orchestrator.run_test_matrix(types, verify_xfail=True)
+    assert not any(r.not_run for r in verified)
+    assert [kf.reason for r in verified for kf in r.xpass_entries or []] == ["b cannot decode int"] * 2
+
+
+def test_junit_streams_one_testsuite_per_sender(tmp_path: Path) -> None:
+    """Results fed as they complete land in per-sender testsuites."""
+    broker = FakeBroker()
+    shims = {"a": FakeShim(broker), "b": FakeShim(broker), "c": FakeShim(broker, corrupt=True)}
+    registry = KnownFailureRegistry([KnownFailure("a", "b", "int", None, "a->b int & <bytes>")])
+    orchestrator = Orchestrator(shims=shims, broker=broker, known_failures=registry)
+    output = tmp_path / "reports" / "junit.xml"
+
+    with JUnitWriter(output) as writer:
+        orchestrator.run_test_matrix({"int": [1]}, workers=2, on_result=writer.add)
+
+    root = ET.parse(output).getroot()
+    assert root.tag == "testsuites"
+    assert (root.get("tests"), root.get("failures"), root.get("skipped")) == ("9", "3", "1")
+    suites = {s.get("name"): s for s in root.findall("testsuite")}
+    assert sorted(suites) == ["qit.a", "qit.b", "qit.c"]
+    assert all(s.get("tests") == "3" and s.get("failures") == "1" for s in suites.values())
+    skipped = suites["qit.a"].find("testcase[@classname='qit.a.b']/skipped")
+    assert skipped is not None and skipped.get("message") == "Known (not run): a->b int & <bytes>"
+
+
+def test_results_export_rows(tmp_path: Path) -> None:
+    """The results export has one row per case with status and phase timings."""
+    orchestrator, _ = _orchestrator(corrupt_receiver="b")
+    output = tmp_path / "results.jsonl"
+
+    with ResultsWriter(output, ResultRows("run1"), parquet=False) as writer:
+        orchestrator.run_test_matrix({"string": ["x", "y"]}, workers=2, on_result=writer.add)
+
+    rows = read_results(output)
+    assert len(rows) == 9 and {r["run_id"] for r in rows} == {"run1"}
+    row = {(r["sender"], r["receiver"]): r for r in rows}
+    assert row[("a", "b")]["status"] == "fail" and row[("a", "b")]["diffs"] == 2
+    assert row[("a", "c")]["status"] == "pass"
+    assert row[("a", "c")]["messages"] == 2
+    assert row[("a", "c")]["payload_bytes"] == payload_bytes("string", ["x", "y"])
+    assert row[("a", "c")]["send_ms"] is not None and row[("a", "c")]["roundtrip_ms"] is None
+    assert row[("c", "c")]["roundtrip_ms"] is not None and row[("c", "c")]["send_ms"] is None
+    assert all(r["compare_ms"] is not None for r in rows)
+
+
+def test_flaky_cases_rerun_until_they_pass() -> None:
+    """Failing flaky cases are rerun; other failures are not."""
+
+    class FlakyShim(FakeShim):
+        def _drain(self, queue_name: str) -> ShimResult:
+            # Corrupts only the first receive
+            result = super()._drain(queue_name)
+            self.corrupt = False
+            return result
+
+    broker = FakeBroker()
+    shims = {"a": FakeShim(broker), "b": FlakyShim(broker, corrupt=True), "c": FakeShim(broker, corrupt=True)}
+    orchestrator = Orchestrator(
+        shims=shims, broker=broker,
+        flaky_cases={("a", "b", "int"), ("a", "c", "int")}, max_reruns=2,
+    )
+
+    results = orchestrator.run_test_matrix({"int": [1]}, sender_shims=["a"], workers=2)
+
+    by_receiver = {r.test_case.receiver_shim: r for r in results}
+    assert (by_receiver["a"].success, by_receiver["a"].attempts) == (True, 1)
+    assert (by_receiver["b"].success, by_receiver["b"].attempts) == (True, 2)
+    assert (by_receiver["c"].success, by_receiver["c"].attempts) == (False, 3)
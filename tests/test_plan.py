@@ -0,0 +1,94 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Tests for dry-run planning and estimates."""
+
+from types import SimpleNamespace
+
+from qit.core.orchestrator import Orchestrator
+from qit.core.plan import estimate_plan, format_plan, schedule_ms
+from qit.core.results import payload_bytes
+from qit.core.xfail import KnownFailure, KnownFailureRegistry
+
+
+def _shim(*capabilities: str, in_process: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(config=SimpleNamespace(capabilities=frozenset(capabilities)), in_process=in_process)
+
+
+SHIMS = {"a": _shim(), "b": _shim("roundtrip", "receive-queues"), "py": _shim(in_process=True)}
+TYPES = {"int": [1, 2], "string": ["x"]}
+REGISTRY = KnownFailureRegistry([KnownFailure("a", "b", "string", None, "a cannot send strings to b")])
+
+
+def test_plan_matches_run_expansion() -> None:
+    """Whole-case known failures are planned as not run, the rest as units."""
+    plan = Orchestrator(shims=SHIMS, known_failures=REGISTRY).plan_test_matrix(TYPES, ["a", "b"], ["a", "b"])
+
+    assert list(plan.not_run) == [("a", "b", "string")]
+    assert len(plan.test_cases) == 7 and len(plan.units) == 7
+
+    consolidated = Orchestrator(shims=SHIMS, known_failures=REGISTRY).plan_test_matrix(
+        TYPES, ["a", "b"], ["a", "b"], consolidate=True,
+    )
+    assert [len(unit) for unit in consolidated.units] == [4, 3]
+
+
+def test_estimate_follows_capabilities_and_history() -> None:
+    """Processes follow roundtrip/receive-queues/in-process; wall time comes from durations."""
+    orchestrator = Orchestrator(shims=SHIMS, known_failures=REGISTRY)
+    plan = orchestrator.plan_test_matrix({"int": [1, 2]})
+    durations = {("a", "a", "int"): 100.0, ("b", "b", "int"): 300.0}
+
+    estimate = estimate_plan(plan, SHIMS, workers=2, durations=durations, shim_memory={"a": 1000, "b": 3000})
+
+    processes = {(u.test_cases[0].sender_shim, u.test_cases[0].receiver_shim): u.processes for u in estimate.units}
+    assert processes[("a", "a")] == ["a", "a"]
+    assert processes[("b", "b")] == ["b"]
+    assert processes[("a", "py")] == ["a"] and processes[("py", "py")] == []
+    assert estimate.payload_bytes == 9 * payload_bytes("int", [1, 2])
+    # 2 cases with history, 7 estimated from the int median (200 ms)
+    assert estimate.borrowed_durations == 7
+    assert estimate.wall_ms[1] == 100 + 300 + 7 * 200
+    assert estimate.wall_ms[2] == schedule_ms([u.duration_ms for u in estimate.units], 2)
+
+    memory = {m.shim: m for m in estimate.memory}
+    assert (memory["a"].processes, memory["a"].concurrent, memory["a"].peak_kb) == (6, 2, 2000)
+    assert memory["py"].in_process and memory["py"].processes == 0
+    assert estimate.peak_kb == 6000
+
+    text = format_plan(plan, estimate, history_runs=3)
+    assert "-j 2   " in text and "← selected" in text
+    assert "py → py (int): 2 values" in text
+
+
+def test_estimate_without_history() -> None:
+    """Without recorded runs there is no wall time, and memory is unknown."""
+    plan = Orchestrator(shims=SHIMS).plan_test_matrix(TYPES, fanout=True)
+    estimate = estimate_plan(plan, SHIMS, workers=4, fanout=True)
+
+    assert estimate.wall_ms == {} and estimate.peak_kb == 0
+    # One send per sender and type
+    assert sum(u.sends for u in estimate.units) == 6
+    assert "unknown, no recorded runs" in format_plan(plan, estimate)
+
+
+def test_schedule_takes_units_in_order() -> None:
+    assert schedule_ms([5, 1, 1, 1], 2) == 5
+    assert schedule_ms([1, 1, 1, 5], 2) == 6
+    assert schedule_ms([], 4) == 0
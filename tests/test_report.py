@@ -0,0 +1,79 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Tests for reports built from results exports."""
+
+
+from typing import Any
+
+from qit.core.report import ResultsMatrix, render_html, text_summary
+
+
+def _row(sender: str, receiver: str, amqp_type: str, status: str = "pass", **extra: Any) -> dict[str, Any]:
+    return {
+        "run_id": extra.pop("run_id", "run1"),
+        "sender": sender,
+        "receiver": receiver,
+        "type": amqp_type,
+        "status": status,
+        "duration_ms": extra.pop("duration_ms", 100.0),
+        **extra,
+    }
+
+
+def _matrix() -> ResultsMatrix:
+    shard1 = [
+        _row("a", "b", "map", "fail", diffs=12, diff_messages=["Message 0: <mismatch>"]),
+        _row("a", "b", "int", duration_ms=20.0),
+        _row("b", "a", "int", "xfail", xfail_reasons=[{"reason": "b & a", "bug_url": "https://bugs/1"}]),
+    ]
+    shard2 = [
+        _row("a", "a", "int", run_id="run2"),
+        _row("b", "a", "map", "not_run", duration_ms=0.0, run_id="run2"),
+    ]
+    return ResultsMatrix(shard1 + shard2)
+
+
+def test_matrix_merges_shards_into_cells() -> None:
+    """Cells per type and collapsed; the worst status colors a collapsed cell."""
+    matrix = _matrix()
+
+    assert matrix.run_ids == ["run1", "run2"]
+    assert matrix.types == ["int", "map"]
+    assert (matrix.senders, matrix.receivers) == (["a", "b"], ["a", "b"])
+    assert matrix.cell("a", "b", "int").status == "pass"
+    collapsed = matrix.cell("a", "b")
+    assert collapsed.status == "fail"
+    assert (collapsed.median_ms, collapsed.p95_ms) == (60.0, 100.0)
+    assert matrix.cell("b", "a").status == "xfail"
+    assert matrix.cell("b", "a", "map").median_ms is None
+    assert not matrix.cell("b", "b").rows
+    assert "1 fail, 1 xfail, 1 not_run" in text_summary(matrix)
+
+
+def test_html_links_cells_to_case_details() -> None:
+    """Failing cells link to their diffs and known-failure reasons."""
+    html = render_html(_matrix(), title="<Run>")
+
+    assert "<title>&lt;Run&gt;</title>" in html
+    assert '<a href="#case-a--b--map">' in html and 'id="case-a--b--map"' in html
+    assert '<a href="#case-a--b">' in html and 'id="case-a--b"' in html
+    assert "Message 0: &lt;mismatch&gt;\n... and 11 more" in html
+    assert 'Known failure: b &amp; a (<a href="https://bugs/1">bug</a>)' in html
+    assert "case-a--a" not in html
@@ -0,0 +1,177 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Tests for shim discovery and command resolution."""
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from qit.core.inprocess import InProcessShim
+from qit.core.shim import Shim, ShimConfig, discover_shims
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def _make_shim(shims_dir: Path, key: str, manifest: dict[str, Any], files: tuple[str, ...] = ()) -> Path:
+    shim_dir = shims_dir / key
+    shim_dir.mkdir(parents=True)
+    (shim_dir / "shim.sh").write_text("#!/bin/bash\n")
+    (shim_dir / "shim.json").write_text(json.dumps({"name": key, "type": "amqp", **manifest}))
+    for name in files:
+        (shim_dir / name).write_text("")
+    return shim_dir
+
+
+def test_exec_argv_resolved_at_discovery(tmp_path: Path) -> None:
+    """A resolvable exec.argv is used directly, with placeholders substituted."""
+    shim_dir = _make_shim(
+        tmp_path / "shims", "direct",
+        {"exec": {"argv": ["{python}", "{shim_dir}/shim.py"], "env": {"SHIM_HOME": "{shim_dir}"}}},
+        files=("shim.py",),
+    )
+
+    info = discover_shims(tmp_path / "shims")["direct"]
+
+    command = info.command("send")
+    assert Path(command[0]).name.startswith("python")
+    assert command[1:] == [str(shim_dir.resolve() / "shim.py"), "send"]
+    assert info.env is not None and info.env["SHIM_HOME"] == str(shim_dir.resolve())
+
+
+def test_exec_falls_back_to_shim_sh(tmp_path: Path) -> None:
+    """Missing build artifacts or programs fall back to the shim.sh wrapper."""
+    shims_dir = tmp_path / "shims"
+    _make_shim(shims_dir, "unbuilt", {"exec": {"argv": ["{shim_dir}/build/client"]}})
+    _make_shim(shims_dir, "no-program", {"exec": {"argv": ["qit-no-such-program"]}})
+    jms_dir = _make_shim(
+        shims_dir, "split",
+        {"exec": {"commands": {"send": ["{python}", "{shim_dir}/sender.py"]}}},
+        files=("sender.py",),
+    )
+
+    shims = discover_shims(shims_dir)
+
+    assert shims["unbuilt"].command("send") == [str(shims_dir / "unbuilt" / "shim.sh"), "send"]
+    assert shims["no-program"].command("receive") == [str(shims_dir / "no-program" / "shim.sh"), "receive"]
+    assert shims["split"].command("send")[1:] == [str(jms_dir.resolve() / "sender.py")]
+    assert shims["split"].command("receive") == [str(jms_dir / "shim.sh"), "receive"]
+    assert shims["unbuilt"].env is None
+
+
+def test_discovery_cache_invalidated_by_manifest_and_build(tmp_path: Path) -> None:
+    """Cached shims are reused until a manifest changes or a tested path appears."""
+    shims_dir = tmp_path / "shims"
+    cache_file = tmp_path / "cache" / "shims.json"
+    shim_dir = _make_shim(shims_dir, "built", {"exec": {"argv": ["{shim_dir}/build/client"]}})
+
+    first = discover_shims(shims_dir, cache_file=cache_file)
+    assert cache_file.exists()
+    assert first["built"].command("send")[0] == str(shim_dir / "shim.sh")
+
+    # A stale cache entry shows up if the cache is (wrongly) reused
+    cache = json.loads(cache_file.read_text())
+    for entries in cache.values():
+        entries["built"]["name"] = "from cache"
+    cache_file.write_text(json.dumps(cache))
+    assert discover_shims(shims_dir, cache_file=cache_file)["built"].name == "from cache"
+
+    # The build output the exec argv tested for now exists
+    (shim_dir / "build").mkdir()
+    (shim_dir / "build" / "client").write_text("")
+    (shim_dir / "build" / "client").chmod(0o755)
+    rebuilt = discover_shims(shims_dir, cache_file=cache_file)["built"]
+    assert rebuilt.name == "built"
+    assert rebuilt.command("send") == [str(shim_dir.resolve() / "build" / "client"), "send"]
+
+    # Edited manifest (newer mtime)
+    manifest = shim_dir / "shim.json"
+    manifest.write_text(json.dumps({"name": "renamed", "type": "amqp"}))
+    stat = manifest.stat()
+    os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert discover_shims(shims_dir, cache_file=cache_file)["built"].name == "renamed"
+
+
+def test_in_process_shim_reports_unreachable_broker() -> None:
+    """The in-process Python shim fails a send without a broker, within its timeout."""
+    info = discover_shims(PROJECT_ROOT / "shims")["python-proton"]
+    assert info.in_process is not None
+    shim = InProcessShim(
+        ShimConfig(name=info.key, language="python", client=info.name, executable=info.shim_dir / "shim.sh"),
+        info.in_process,
+    )
+
+    result = shim.send("amqp://127.0.0.1:1", "qit.unreachable", "int", [1], timeout=5)
+
+    assert not result.success
+    assert "accepted" in (result.error or "")
+    assert shim.receive("amqp://127.0.0.1:1", "qit.unreachable", 1, timeout=5).messages == []
+
+
+@pytest.mark.skipif(not hasattr(os, "wait4"), reason="needs wait4()")
+def test_shim_process_memory_measured(tmp_path: Path) -> None:
+    """Shim processes report their peak memory; timeouts still kill them."""
+    script = tmp_path / "shim.py"
+    script.write_text(
+        "import json, sys, time\n"
+        "if sys.argv[1] == 'sleep':\n"
+        "    time.sleep(10)\n"
+        "block = bytearray(32 * 1024 * 1024)\n"
+        "print(json.dumps({'messages': [], 'stats': {'size': len(block)}}))\n"
+    )
+    config = ShimConfig("fake", "python", "fake", script, argv=[sys.executable, str(script)])
+    shim = Shim(config)
+
+    result = shim._execute([sys.executable, str(script), "run"], timeout=30)
+    assert result.success and result.stats == {"size": 32 * 1024 * 1024}
+    assert result.max_rss_kb is not None and result.max_rss_kb >= 32 * 1024
+
+    result = shim._execute([sys.executable, str(script), "sleep"], timeout=1)
+    assert not result.success and "timed out after 1s" in result.error
+
+
+@pytest.mark.skipif(not hasattr(os, "waitid"), reason="needs waitid()")
+def test_timer_firing_after_exit_is_not_a_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A timeout firing once the child has exited neither kills nor fails it."""
+    from qit.core import shim as shim_module
+
+    class LateTimer:
+        """Fires when cancelled, as a timer racing the child's exit would."""
+
+        def __init__(self, interval: float, function: Any) -> None:
+            self.function = function
+
+        def start(self) -> None:
+            pass
+
+        def cancel(self) -> None:
+            self.function()
+
+    monkeypatch.setattr(shim_module.threading, "Timer", LateTimer)
+    kills: list[int] = []
+    monkeypatch.setattr(shim_module.os, "kill", lambda pid, sig: kills.append(pid))
+
+    result = shim_module._run_measured([sys.executable, "-c", "print('ok')"], 30, None)
+
+    assert result.returncode == 0 and result.stdout.strip() == "ok"
+    assert kills == []
@@ -0,0 +1,116 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Tests for the long-lived shim processes of the pytest suites."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from shim_registry import DISCOVERED_SHIMS
+from shim_workers import ShimWorker
+
+# Answers "ok" to a request echoing its argv, dies with status 3 on "crash"
+# and never answers "hang"
+FAKE_SERVE = """
+import json, sys
+for line in sys.stdin:
+    argv = json.loads(line)["argv"]
+    if argv[0] == "crash":
+        print("going down", file=sys.stderr, flush=True)
+        sys.exit(3)
+    if argv[0] != "hang":
+        print(json.dumps({"returncode": 0, "stdout": " ".join(argv), "stderr": ""}), flush=True)
+"""
+
+
+@pytest.fixture
+def fake_worker():
+    worker = ShimWorker([sys.executable, "-c", FAKE_SERVE])
+    yield worker
+    worker.close()
+
+
+def test_worker_serves_commands_in_one_process(fake_worker: ShimWorker) -> None:
+    first = fake_worker.run(["send", "--queue", "q1"], timeout=10)
+    second = fake_worker.run(["receive", "--queue", "q1"], timeout=10)
+
+    assert (first.returncode, first.stdout) == (0, "send --queue q1")
+    assert (second.returncode, second.stdout) == (0, "receive --queue q1")
+    assert fake_worker.starts == 1
+
+
+def test_worker_restarted_after_crash(fake_worker: ShimWorker) -> None:
+    crashed = fake_worker.run(["crash"], timeout=10)
+    after = fake_worker.run(["send"], timeout=10)
+
+    assert crashed.returncode == 3
+    assert "going down" in crashed.stderr
+    assert after.stdout == "send"
+    assert fake_worker.starts == 2
+
+
+def test_worker_killed_and_restarted_after_timeout(fake_worker: ShimWorker) -> None:
+    with pytest.raises(subprocess.TimeoutExpired):
+        fake_worker.run(["hang"], timeout=0.5)
+
+    assert fake_worker.run(["send"], timeout=10).stdout == "send"
+    assert fake_worker.starts == 2
+
+
+@pytest.mark.skipif("python-proton" not in DISCOVERED_SHIMS, reason="python-proton shim not found")
+def test_python_shim_serve_reports_bad_command() -> None:
+    """The Python shim answers a failing command and keeps serving."""
+    shim = DISCOVERED_SHIMS["python-proton"]
+    assert "serve" in shim.capabilities
+    worker = ShimWorker(shim.command("serve"), shim.env)
+    try:
+        bad = worker.run(["bogus"], timeout=30)
+        nested = worker.run(["serve"], timeout=30)
+        missing = worker.run(["send", "--queue", "q"], timeout=30)
+    finally:
+        worker.close()
+
+    assert bad.returncode == 2 and "invalid choice" in bad.stderr
+    assert nested.returncode == 1 and "cannot be nested" in nested.stderr
+    assert missing.returncode == 2 and "--broker" in missing.stderr
+    assert worker.starts == 1
+
+
+@pytest.mark.skipif("python-proton" not in DISCOVERED_SHIMS, reason="python-proton shim not found")
+def test_python_shim_serve_survives_malformed_request() -> None:
+    """A malformed request line gets an error answer; the next line still runs."""
+    shim = DISCOVERED_SHIMS["python-proton"]
+    requests = ["not json", '{"args": []}', '{"argv": "send"}', json.dumps({"argv": ["bogus"]})]
+    result = subprocess.run(
+        shim.command("serve"),
+        input="\n".join(requests) + "\n",
+        env=shim.env,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    answers = [json.loads(line) for line in result.stdout.splitlines()]
+
+    assert result.returncode == 0
+    assert [answer["returncode"] for answer in answers] == [2, 2, 2, 2]
+    assert all("malformed request" in answer["stderr"] for answer in answers[:3])
+    assert "invalid choice" in answers[3]["stderr"]
@@ -0,0 +1,136 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Tests for the message suites, run through the orchestrator with in-memory shims."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+from qit.core.broker import BrokerConfig
+from qit.core.orchestrator import Orchestrator
+from qit.core.results import ResultRows
+from qit.core.shim import ShimResult
+from qit.core.xfail import DEFAULT_REGISTRY, KnownFailure, KnownFailureRegistry
+from qit.suites import header_cases, jms_cases, large_content_cases, select_cases, star_pairs
+from qit.suites.large_content import SIZE_1MB
+
+
+class FakeBroker:
+    def __init__(self) -> None:
+        self.config = BrokerConfig(
+            name="fake", type="artemis", url="amqp://fake:5672", compose_file=Path("compose.yaml")
+        )
+        self.queues: dict[str, list[dict[str, Any]]] = {}
+
+
+class HeaderShim:
+    """Runs header-suite sends and receives against a FakeBroker."""
+
+    def __init__(self, broker: FakeBroker, drop: str | None = None) -> None:
+        self.broker = broker
+        self.drop = drop
+        self.runs: list[str] = []
+
+    def run(self, subcommand: str, broker_url: str, queue_name: str, args: list[str], timeout: int = 30) -> ShimResult:
+        self.runs.append(subcommand)
+        if subcommand == "send":
+            header = json.loads(args[args.index("--message-header") + 1]) if "--message-header" in args else {}
+            message_header = {"durable": False, "priority": 4, "ttl": 0, "first_acquirer": False,
+                              "delivery_count": 0, **header}
+            self.broker.queues.setdefault(queue_name, []).append({"message_header": message_header})
+            return ShimResult(success=True, messages=[], output={})
+        messages = self.broker.queues.pop(queue_name, [])
+        for message in messages:
+            message["message_header"].pop(self.drop, None)
+        return ShimResult(success=True, messages=[], output={"messages": messages}, max_rss_kb=1024)
+
+
+def test_suite_pairs_and_known_failures() -> None:
+    """JMS cases follow the star topology; pytest xfails became whole-case known failures."""
+    amqp = ["javascript-rhea", "python-proton"]
+    jms = ["java-qpid-jms"]
+    assert star_pairs(amqp, jms) == [
+        ("java-qpid-jms", "javascript-rhea"), ("java-qpid-jms", "python-proton"),
+        ("javascript-rhea", "java-qpid-jms"), ("python-proton", "java-qpid-jms"),
+        ("java-qpid-jms", "java-qpid-jms"),
+    ]
+    assert star_pairs(amqp, []) == []
+
+    cases = jms_cases(amqp, jms)
+    assert len(cases) == 5 * (5 + 5 + 8)
+    assert len(select_cases(cases, senders=["python-proton"])) == 5 + 5 + 8
+
+    # All values of a header test go in one send, each message with its own header
+    case = next(tc for tc in cases if tc.amqp_type == "jms.header.reply_to_topic")
+    (send,) = case.suite.sends
+    data = json.loads(send[send.index("--data") + 1])
+    assert [m["headers"]["JMSReplyTo"]["value"] for m in data] == case.test_values
+    assert "--headers" not in send
+
+    plan = Orchestrator(shims={}, known_failures=DEFAULT_REGISTRY).plan_cases(cases)
+    assert sorted(key[2] for key in plan.not_run) == [
+        "jms.message", "jms.property.byte", "jms.property.float", "jms.property.int",
+        "jms.property.long", "jms.property.short",
+    ]
+
+
+def test_header_suite_runs_in_engine() -> None:
+    """Suite cases run through the worker pool, with per-message diffs and known failures."""
+    broker = FakeBroker()
+    shims = {"a": HeaderShim(broker), "b": HeaderShim(broker, drop="priority")}
+    registry = KnownFailureRegistry([
+        KnownFailure("a", "b", "header.priority", frozenset(range(4)), "b loses priority"),
+    ])
+    cases = header_cases(["a", "b"])
+    results = Orchestrator(shims=shims, broker=broker, known_failures=registry).run_cases(cases, workers=3)
+
+    assert [r.test_case for r in results] == cases
+    failed = [r for r in results if not r.success]
+    assert [(r.test_case.sender_shim, r.test_case.amqp_type) for r in failed] == [("b", "header.priority")]
+    assert [d.index for d in failed[0].diffs] == [0, 1, 2, 3]
+    assert "priority" in failed[0].diffs[0].message
+
+    xfailed = next(r for r in results if r.test_case.sender_shim == "a" and r.xfail_diffs)
+    assert xfailed.success and xfailed.test_case.amqp_type == "header.priority"
+    # One send per priority, highest first so the broker keeps send order
+    assert xfailed.test_case.test_values == [9, 7, 4, 0]
+    # Per receiver: 2 durable + 4 priority + 2 ttl + 2 first-acquirer + 1 plain message
+    assert shims["a"].runs.count("send") == 2 * 11
+
+    row = ResultRows().row(xfailed)
+    assert row["messages"] == 4 and row["receiver_rss_kb"] == 1024 and row["send_ms"] is not None
+
+
+def test_large_content_tiers_and_verdicts() -> None:
+    """Extended tests and frame-size brokers add cases; the receiver's verdict becomes a diff."""
+    amqp, jms = ["a", "b"], ["j"]
+    default = large_content_cases(amqp, jms)
+    extended = large_content_cases(amqp, jms, extended=True, small_frame_url="amqp://small:5673")
+    # 1 MB blobs and lists over 5 star + 4 AMQP pairs, arrays over AMQP pairs
+    assert len(default) == 4 * 9 + 2 * 4
+    assert len(extended) == len(default) + 2 * 9 + 2 * 9 + 2 * 4 + 10 * 4
+    small = [tc for tc in extended if tc.amqp_type.endswith(".smallframe")]
+    assert {tc.suite.broker_url for tc in small} == {"amqp://small:5673"}
+
+    to_jms = next(tc for tc in default if tc.sender_shim == "a" and tc.receiver_shim == "j")
+    assert "--jms-mode" in to_jms.suite.sends[0] and to_jms.suite.payload_bytes == SIZE_1MB
+    assert to_jms.suite.verify({"match": True}) == []
+    (diff,) = to_jms.suite.verify({"match": False, "first_mismatch_offset": 17, "size": SIZE_1MB})
+    assert "offset 17" in diff.message
@@ -0,0 +1,139 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Tests for the known failure registry."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from qit.core.comparison import MessageDiff
+from qit.core.orchestrator import Orchestrator
+from qit.core.orchestrator import TestCase as Case
+from qit.core.xfail import (
+    KNOWN_FAILURES,
+    KnownFailure,
+    KnownFailureRegistry,
+    find_known_failure,
+    load_known_failures,
+    verification_due,
+)
+
+
+def test_builtin_registry_loaded_from_data_file() -> None:
+    """The built-in entries come from known_failures.toml."""
+    assert KNOWN_FAILURES
+    kf = find_known_failure("dotnet-proton", "java-protonj2", "binary", 3)
+    assert kf is not None and kf.message_indices is None
+
+
+def test_wildcards_resolved_in_registry_order() -> None:
+    """Lookups return the first entry in file order, across wildcard keys."""
+    whole = KnownFailure("*", "b", "int", None, "whole case")
+    indexed = KnownFailure("a", "*", "int", frozenset({1, 2}), "indices")
+    other = KnownFailure("a", "b", "int", frozenset({2, 5}), "exact")
+    registry = KnownFailureRegistry([indexed, whole, other])
+
+    case = registry.for_case("a", "b", "int")
+    assert case.entries == (indexed, whole, other)
+    assert case.find(1) is indexed
+    assert case.find(5) is whole
+    assert registry.for_case("a", "c", "int").find(5) is None
+    assert registry.for_case("x", "b", "long").entries == ()
+
+
+def test_load_json_and_toml(tmp_path: Path) -> None:
+    """Deployment lists load from JSON or TOML; indices are optional."""
+    json_file = tmp_path / "extra.json"
+    json_file.write_text(json.dumps([
+        {"sender": "a", "amqp_type": "map", "message_indices": [3], "reason": "r"},
+    ]))
+    toml_file = tmp_path / "extra.toml"
+    toml_file.write_text('[[failure]]\nreceiver = "b"\namqp_type = "list"\nreason = "whole"\n')
+
+    assert load_known_failures(json_file) == [KnownFailure("a", "*", "map", frozenset({3}), "r")]
+    assert load_known_failures(toml_file) == [KnownFailure("*", "b", "list", None, "whole")]
+
+    registry = KnownFailureRegistry.from_files(json_file, toml_file)
+    assert len(registry.failures) == len(KNOWN_FAILURES) + 2
+
+    toml_file.write_text('[[failure]]\nsender = "a"\n')
+    with pytest.raises(ValueError, match="Invalid known failure #0"):
+        load_known_failures(toml_file)
+
+
+def test_orchestrator_classifies_with_its_registry() -> None:
+    """Diffs covered by the registry are xfails; unmatched entries are xpasses."""
+    covered = KnownFailure("a", "b", "int", frozenset({0}), "covered")
+    unused = KnownFailure("a", "b", "int", frozenset({4}), "unused")
+    orchestrator = Orchestrator(shims={}, known_failures=KnownFailureRegistry([covered, unused]))
+    diffs = [
+        MessageDiff(index=0, field="value", expected=1, actual=2, message="m0"),
+        MessageDiff(index=1, field="value", expected=1, actual=2, message="m1"),
+    ]
+
+    genuine, xfail_diffs, xpass = orchestrator._classify_diffs(Case("a", "b", "int", [1, 1]), diffs)
+
+    assert genuine == [diffs[1]]
+    assert xfail_diffs == [(diffs[0], covered)]
+    assert xpass == [unused]
+
+
+def test_count_mismatch_index_registered() -> None:
+    """Index -1 entries cover count-mismatch diffs and are not reported as xpass."""
+    count = KnownFailure("a", "b", "int", frozenset({-1}), "drops a message")
+    orchestrator = Orchestrator(shims={}, known_failures=KnownFailureRegistry([count]))
+    diffs = [MessageDiff(index=-1, field="count", expected=2, actual=1, message="count")]
+
+    genuine, xfail_diffs, xpass = orchestrator._classify_diffs(Case("a", "b", "int", [1, 1]), diffs)
+
+    assert genuine == []
+    assert xfail_diffs == [(diffs[0], count)]
+    assert xpass == []
+    assert orchestrator._classify_diffs(Case("a", "b", "int", [1, 1]), [])[2] == [count]
+
+
+def test_load_rejects_indices_below_minus_one(tmp_path: Path) -> None:
+    """Index -1 loads; lower indices are rejected."""
+    toml_file = tmp_path / "extra.toml"
+    toml_file.write_text('[[failure]]\namqp_type = "int"\nmessage_indices = [-1]\nreason = "r"\n')
+    assert load_known_failures(toml_file)[0].message_indices == frozenset({-1})
+
+    toml_file.write_text('[[failure]]\namqp_type = "int"\nmessage_indices = [-2]\nreason = "r"\n')
+    with pytest.raises(ValueError, match="message index below -1"):
+        load_known_failures(toml_file)
+
+
+def test_verification_due_every_n_runs(tmp_path: Path) -> None:
+    """Every Nth counted run re-verifies whole-case known failures."""
+    counter = tmp_path / "cache" / "runs.json"
+
+    assert [verification_due(3, "jms", counter) for _ in range(6)] == [False, False, True, False, False, True]
+    assert not verification_due(0, "jms", counter)
+
+
+def test_verification_due_counts_each_suite(tmp_path: Path) -> None:
+    """Runs of one suite do not count towards another suite's verification run."""
+    counter = tmp_path / "runs.json"
+
+    assert [verification_due(2, "headers", counter) for _ in range(3)] == [False, True, False]
+    assert [verification_due(2, "jms", counter) for _ in range(2)] == [False, True]
+    assert not verification_due(2, "jms", counter, record=False)
+    assert verification_due(2, "headers", counter)
@@ -0,0 +1,111 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""
+Broker, queue and session-check sharing for pytest-xdist workers.
+
+Broker URL variables may list several comma-separated brokers or
+acceptors; each worker uses one of them, round-robin by worker number.
+Queue names carry the worker, and session checks that every worker needs
+(such as a broker's negotiated frame size) run once per test run: the
+first worker stores the result in the run's shared temporary directory
+under a file lock, and the others read it.
+"""
+
+import contextlib
+import json
+import os
+import re
+import uuid
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock, each worker runs its own checks
+    fcntl = None
+
+
+def worker_id() -> str:
+    """The xdist worker, e.g. "gw3", or "master" outside xdist."""
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def worker_index() -> int:
+    """Number of the xdist worker (0 outside xdist)."""
+    worker = worker_id()
+    return int(worker[2:]) if worker.startswith("gw") else 0
+
+
+def worker_broker_url(env_var: str, default: str) -> str:
+    """This worker's broker from a comma-separated list in env_var."""
+    urls = [url.strip() for url in os.environ.get(env_var, default).split(",") if url.strip()]
+    if not urls:
+        return default
+    return urls[worker_index() % len(urls)]
+
+
+def unique_queue(prefix: str) -> str:
+    """A queue name unique to one test of this worker."""
+    return f"{prefix}.{worker_id()}.{uuid.uuid4().hex[:8]}"
+
+
+def shared_dir(tmp_path_factory: Any) -> Path | None:
+    """The temporary directory shared by the workers of this run (None outside xdist)."""
+    if worker_id() == "master":
+        return None
+    return tmp_path_factory.getbasetemp().parent
+
+
+def shared_session_result(directory: Path | None, name: str, produce: Callable[[], Any]) -> Any:
+    """
+    Result of produce(), computed once for all workers of a test run.
+
+    Args:
+        directory: Directory all workers of the run share, or None to
+            just call produce()
+        name: Name of the result, unique within the run
+        produce: Computes the result, which must be JSON-serializable
+
+    Returns:
+        The stored result, or produce()'s if this worker is the first
+    """
+    if directory is None:
+        return produce()
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+    path = directory / f"{name}.json"
+    with _locked(directory / f"{name}.lock"):
+        if path.is_file():
+            return json.loads(path.read_text())
+        result = produce()
+        path.write_text(json.dumps(result))
+        return result
+
+
+@contextlib.contextmanager
+def _locked(lock_path: Path) -> Iterator[None]:
+    with open(lock_path, "w") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)